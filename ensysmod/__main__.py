@@ -2,14 +2,37 @@
 This is the main file of project %name%.
 
 It is invoked when someone runs python like:
-    python -m %name%
+    python -m %name%            # start the API server
+    python -m %name% worker     # start a worker that runs optimization jobs
 """
+import argparse
+
 import uvicorn
 
 
 def main():
-    # noinspection PyTypeChecker
-    uvicorn.run(app="ensysmod.app:app", host="0.0.0.0", port=8080, log_level="info", reload=True)
+    parser = argparse.ArgumentParser(prog="ensysmod")
+    parser.add_argument("command", nargs="?", choices=["server", "worker"], default="server", help="Start the API server or an optimization worker.")
+    parser.add_argument("--worker-id", help="ID of the worker, a unique ID by default.")
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        run_worker(args.worker_id)
+    else:
+        # noinspection PyTypeChecker
+        uvicorn.run(app="ensysmod.app:app", host="0.0.0.0", port=8080, log_level="info", reload=True)
+
+
+def run_worker(worker_id: str | None) -> None:
+    """
+    Run a worker that claims optimization jobs from the database, see core.job_queue.
+    """
+    from ensysmod.core.job_queue import run_worker
+    from ensysmod.database import init_db
+
+    init_db.check_connection()
+    init_db.create_all()
+    run_worker(worker_id)
 
 
 if __name__ == "__main__":
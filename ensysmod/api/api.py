@@ -16,6 +16,8 @@ from .endpoints import (
     energy_transmissions,
     operation_rate_fix,
     operation_rate_max,
+    optimization_jobs,
+    optimization_results,
     regions,
     transmission_distances,
     transmission_losses,
@@ -39,6 +41,8 @@ api_router.include_router(energy_transmissions.router, prefix="/transmissions",
 api_router.include_router(transmission_distances.router, prefix="/transmission-distances", tags=["Transmission Distances"])
 api_router.include_router(transmission_losses.router, prefix="/transmission-losses", tags=["Transmission Losses"])
 api_router.include_router(energy_models.router, prefix="/models", tags=["Energy Models"])
+api_router.include_router(optimization_jobs.router, prefix="/jobs", tags=["Optimization Jobs"])
+api_router.include_router(optimization_results.router, prefix="/results", tags=["Optimization Results"])
 
 api_router.include_router(capacity_fix.router, prefix="/fix-capacities", tags=["Fix Capacities"])
 api_router.include_router(capacity_max.router, prefix="/max-capacities", tags=["Max Capacities"])
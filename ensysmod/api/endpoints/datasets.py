@@ -9,6 +9,7 @@ from starlette.background import BackgroundTask
 
 from ensysmod import crud
 from ensysmod.api import deps, permissions
+from ensysmod.core.esm_cache import esm_cache
 from ensysmod.core.file_download import export_data
 from ensysmod.core.file_upload import process_dataset_zip_archive
 from ensysmod.model import User
@@ -92,6 +93,7 @@ def remove_dataset(
     Delete a dataset.
     """
     permissions.check_modification_permission(db=db, user=current_user, dataset_id=dataset_id)
+    esm_cache.invalidate(dataset_id)
     return crud.dataset.remove(db=db, id=dataset_id)
 
 
@@ -116,6 +118,8 @@ def upload_dataset_zip(
 
     with zipfile.ZipFile(BytesIO(file.file.read()), "r") as zip_archive:
         result = process_dataset_zip_archive(zip_archive, dataset_id, db)
+    # the energy system models of the previous content of the dataset are outdated
+    esm_cache.invalidate(dataset_id)
 
     if result.status != FileStatus.OK:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=jsonable_encoder(result))
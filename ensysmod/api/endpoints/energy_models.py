@@ -1,14 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+
+from anyio import from_thread
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from starlette.background import BackgroundTask
-from utils.utils import remove_file
 
 from ensysmod import crud
 from ensysmod.api import deps, permissions
-from ensysmod.core.fine_esm import generate_esm_from_model, myopic_optimize_esm, optimize_esm
-from ensysmod.model import User
-from ensysmod.schemas import EnergyModelCreate, EnergyModelSchema, EnergyModelUpdate
+from ensysmod.core.esm_validation import validate_esm_data
+from ensysmod.core.fine_esm import generate_esm_from_model, get_esm_data
+from ensysmod.core.optimization_jobs import (
+    FINAL_STATUSES,
+    SYNCHRONOUS_RESULT_FORMAT,
+    cancel_job,
+    remove_job,
+    remove_transient_job,
+    result_file_name,
+    result_media_type,
+    submit_job,
+    wait_for_job,
+)
+from ensysmod.core.problem_size import check_model_problem_size, check_problem_size, estimate_model_problem_size
+from ensysmod.core.profiling import server_timing
+from ensysmod.model import EnergyModel, OptimizationJobStatus, OptimizationJobType, OptimizationResultFormat, User
+from ensysmod.schemas import EnergyModelCreate, EnergyModelSchema, EnergyModelUpdate, OptimizationResultSchema, ProblemSizeSchema
+
+logger = logging.getLogger(__name__)
+
+# interval in seconds at which a request that waits for an optimization checks whether its client disconnected
+DISCONNECT_CHECK_INTERVAL = 1.0
 
 router = APIRouter()
 
@@ -107,14 +128,17 @@ def remove_model(
 @router.get("/{model_id}/esm", response_model=EnergyModelSchema)
 def validate_model(
     model_id: int,
+    *,
+    build_esm: bool = False,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ):
     """
-    Create FINE energy system model from model.
+    Validate the dataset and the override parameters of a model. Returns all errors if the model is not valid.
 
-    Might take a while.
-    And return errors if dataset is not valid.
+    The fast validation checks the references to commodities and regions, the number of time steps of the time series,
+    the override parameters and the shape of the transmission matrices without building the energy system model.
+    If build_esm is set, the FINE energy system model is built as well, which checks more but might take a while.
     """
     energy_model = crud.energy_model.get(db=db, id=model_id)
     if energy_model is None:
@@ -122,13 +146,67 @@ def validate_model(
 
     permissions.check_usage_permission(db, user=current_user, dataset_id=energy_model.ref_dataset)
 
-    generate_esm_from_model(db=db, model=energy_model)
+    errors = validate_esm_data(get_esm_data(db, model=energy_model, apply_overrides=False), energy_model.override_parameters)
+    if errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+
+    if build_esm:
+        generate_esm_from_model(db=db, model=energy_model)
     return energy_model
 
 
+@router.get("/{model_id}/problem_size", response_model=ProblemSizeSchema)
+def estimate_model_size(
+    model_id: int,
+    job_type: OptimizationJobType = OptimizationJobType.OPTIMIZE,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Estimate the number of variables and constraints and the memory of the optimization problem of a model without building it.
+
+    Optimizations that exceed the limits of the server are refused.
+    """
+    energy_model = crud.energy_model.get(db=db, id=model_id)
+    if energy_model is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"EnergyModel {model_id} not found!")
+
+    permissions.check_usage_permission(db, user=current_user, dataset_id=energy_model.ref_dataset)
+
+    problem_size = estimate_model_problem_size(db, energy_model, job_type=job_type)
+    try:
+        check_problem_size(problem_size)
+    except ValueError as e:
+        return ProblemSizeSchema(**problem_size, admissible=False, error=str(e))
+    return ProblemSizeSchema(**problem_size, admissible=True)
+
+
+@router.get("/{model_id}/results", response_model=list[OptimizationResultSchema])
+def get_model_results(
+    model_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+    skip: int = 0,
+    limit: int = 100,
+):
+    """
+    Return the stored results of all optimization jobs of a model.
+
+    The capacities and operation time series of a result are queried at the optimization job of the result.
+    """
+    energy_model = crud.energy_model.get(db=db, id=model_id)
+    if energy_model is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"EnergyModel {model_id} not found!")
+
+    permissions.check_usage_permission(db, user=current_user, dataset_id=energy_model.ref_dataset)
+    return crud.optimization_result.get_multi_by_model(db, skip=skip, limit=limit, model_id=model_id)
+
+
 @router.get("/{model_id}/optimize")
 def optimize_model(
     model_id: int,
+    request: Request,
+    result_format: OptimizationResultFormat | None = None,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ):
@@ -137,6 +215,9 @@ def optimize_model(
 
     Might take a while.
     And return errors if dataset is not valid.
+    Use the optimization job endpoints to optimize the model without waiting for the result.
+    The optimization is cancelled if the client disconnects before the result is returned.
+    The result is an Excel file unless another result_format is selected, e.g. PARQUET, which is faster to write for big models.
     """
     energy_model = crud.energy_model.get(db=db, id=model_id)
     if energy_model is None:
@@ -144,20 +225,20 @@ def optimize_model(
 
     permissions.check_usage_permission(db, user=current_user, dataset_id=energy_model.ref_dataset)
 
-    esM = generate_esm_from_model(db=db, model=energy_model)
-    result_file_path = optimize_esm(esM=esM)
-
-    return FileResponse(
-        path=result_file_path,
-        media_type="application/vnd.openxmlformats-officedocument. spreadsheetml.sheet",
-        filename=f"{energy_model.name}.xlsx",
-        background=BackgroundTask(remove_file, result_file_path),
+    return run_job_and_wait(
+        db,
+        request=request,
+        energy_model=energy_model,
+        user=current_user,
+        job_type=OptimizationJobType.OPTIMIZE,
+        result_format=result_format or SYNCHRONOUS_RESULT_FORMAT,
     )
 
 
 @router.get("/{model_id}/myopic_optimize")
 def myopic_optimize_model(
     model_id: int,
+    request: Request,
     db: Session = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ):
@@ -173,12 +254,57 @@ def myopic_optimize_model(
 
     permissions.check_usage_permission(db, user=current_user, dataset_id=energy_model.ref_dataset)
 
-    esM = generate_esm_from_model(db=db, model=energy_model)
-    zipped_result_file_path = myopic_optimize_esm(esM=esM, optimization_parameters=optimization_parameters)
+    return run_job_and_wait(db, request=request, energy_model=energy_model, user=current_user, job_type=OptimizationJobType.MYOPIC_OPTIMIZE)
+
 
+def run_job_and_wait(
+    db: Session,
+    *,
+    request: Request,
+    energy_model: EnergyModel,
+    user: User,
+    job_type: OptimizationJobType,
+    result_format: OptimizationResultFormat | None = None,
+) -> FileResponse:
+    """
+    Run an optimization job in the worker pool, or by a dedicated worker, and wait for its result file.
+
+    The job is cancelled if the client disconnects while waiting. The job is only a means of waiting for the result,
+    it is deleted with its files and stored results as soon as the result file was sent or the optimization failed.
+    """
+    try:
+        check_model_problem_size(db, energy_model, job_type=job_type)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+
+    job = crud.optimization_job.create(
+        db, obj_in={"ref_model": energy_model.id, "ref_user": user.id, "type": job_type, "result_format": result_format}
+    )
+    future = submit_job(db, job)
+    while not wait_for_job(db, job, future, timeout=DISCONNECT_CHECK_INTERVAL):
+        # sync endpoints run in a worker thread, the connection is checked by the event loop
+        if not job.cancel_requested and from_thread.run(request.is_disconnected):
+            logger.info("Client disconnected, cancelling optimization job %s.", job.id)
+            cancel_job(db, job)
+            if job.status in FINAL_STATUSES:
+                # the job hadn't started, so it doesn't wait until the pool dequeues it
+                if future is not None:
+                    future.cancel()
+                break
+
+    if job.status != OptimizationJobStatus.FINISHED:
+        job_status, error = job.status, job.error
+        remove_job(db, job)
+        if job_status == OptimizationJobStatus.CANCELLED:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=error)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=error)
+
+    # wall time of each phase of the optimization
+    headers = {"Server-Timing": server_timing(job.timing)} if job.timing else None
     return FileResponse(
-        path=zipped_result_file_path,
-        media_type="application/zip",
-        filename=f"{energy_model.name} {optimization_parameters.start_year}-{optimization_parameters.end_year}.zip",
-        background=BackgroundTask(remove_file, zipped_result_file_path),
+        path=job.result_file,
+        media_type=result_media_type(job),
+        filename=result_file_name(job),
+        headers=headers,
+        background=BackgroundTask(remove_transient_job, job.id),
     )
@@ -0,0 +1,412 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from sqlalchemy.orm import Session
+
+from ensysmod import crud
+from ensysmod.api import deps, permissions
+from ensysmod.core import settings
+from ensysmod.core.optimization_jobs import (
+    cancel_job,
+    get_job_years,
+    read_job_year_result,
+    remove_job,
+    result_file_name,
+    result_media_type,
+    resume_job,
+    stream_job_log,
+    submit_job,
+)
+from ensysmod.core.problem_size import check_model_problem_size
+from ensysmod.core.rolling_horizon import get_window_sizes
+from ensysmod.core.scenario_sweep import expand_scenarios
+from ensysmod.model import EnergyModel, OptimizationJob, OptimizationJobStatus, OptimizationJobType, User
+from ensysmod.schemas import (
+    OptimizationJobCreate,
+    OptimizationJobSchema,
+    OptimizationResultCapacitySchema,
+    OptimizationResultOperationSchema,
+    OptimizationResultSchema,
+    ScenarioSweepCreate,
+)
+
+router = APIRouter()
+
+
+def get_job_or_404(db: Session, job_id: int, user: User) -> OptimizationJob:
+    job = crud.optimization_job.get(db, id=job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Optimization job {job_id} not found!")
+    permissions.check_usage_permission(db, user=user, dataset_id=job.model.ref_dataset)
+    return job
+
+
+def get_myopic_job_or_404(db: Session, job_id: int, user: User) -> OptimizationJob:
+    job = get_job_or_404(db, job_id, user)
+    if job.type != OptimizationJobType.MYOPIC_OPTIMIZE:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Optimization job {job_id} is not a myopic optimization!")
+    return job
+
+
+def get_result_ids(db: Session, job: OptimizationJob, year: int | None) -> list[int]:
+    """
+    Return the IDs of the stored results of a job, only of the result of a given year if it is set.
+    """
+    results = crud.optimization_result.get_multi_by_job(db, job_id=job.id)
+    if year is not None:
+        results = [result for result in results if result.year == year]
+        if not results:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Optimization job {job.id} has no result of year {year}!")
+    return [result.id for result in results]
+
+
+def get_warm_start_job(db: Session, request: OptimizationJobCreate, energy_model: EnergyModel) -> OptimizationJob | None:
+    """
+    Return the finished optimization job whose solution is the starting point of a new optimization job.
+    """
+    if request.warm_start_model is not None:
+        warm_start_model = crud.energy_model.get(db, id=request.warm_start_model)
+        if warm_start_model is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"EnergyModel {request.warm_start_model} not found!")
+        if warm_start_model.ref_dataset != energy_model.ref_dataset:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"EnergyModel {request.warm_start_model} is not based on the dataset of EnergyModel {energy_model.id}!",
+            )
+        warm_start_job = crud.optimization_job.get_latest_solved_by_model(db, model_id=request.warm_start_model)
+        if warm_start_job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No finished optimization of EnergyModel {request.warm_start_model} found!",
+            )
+        return warm_start_job
+
+    if request.ref_warm_start_job is not None:
+        warm_start_job = crud.optimization_job.get(db, id=request.ref_warm_start_job)
+        if warm_start_job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Optimization job {request.ref_warm_start_job} not found!")
+        if warm_start_job.model.ref_dataset != energy_model.ref_dataset:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Optimization job {request.ref_warm_start_job} is not based on the dataset of EnergyModel {energy_model.id}!",
+            )
+        if warm_start_job.status != OptimizationJobStatus.FINISHED or warm_start_job.solution_file is None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Optimization job {request.ref_warm_start_job} has no solution to start from!",
+            )
+        return warm_start_job
+
+    return None
+
+
+@router.get("/", response_model=list[OptimizationJobSchema])
+def get_all_jobs(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+    model_id: int | None = None,
+    skip: int = 0,
+    limit: int = 100,
+):
+    """
+    Retrieve all optimization jobs.
+
+    If you provide a model_id, all jobs of that energy model will be returned.
+    Otherwise, all jobs submitted by the current user will be returned.
+    """
+    if model_id is not None:
+        energy_model = crud.energy_model.get(db, id=model_id)
+        if energy_model is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"EnergyModel {model_id} not found!")
+        permissions.check_usage_permission(db, user=current_user, dataset_id=energy_model.ref_dataset)
+        return crud.optimization_job.get_multi_by_model(db, skip=skip, limit=limit, model_id=model_id)
+    return crud.optimization_job.get_multi_by_user(db, skip=skip, limit=limit, user_id=current_user.id)
+
+
+@router.get("/{job_id}", response_model=OptimizationJobSchema)
+def get_job(
+    job_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Get the status of an optimization job.
+    """
+    return get_job_or_404(db, job_id, current_user)
+
+
+@router.post("/", response_model=OptimizationJobSchema)
+def submit_optimization_job(
+    request: OptimizationJobCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Submit an optimization job for an energy model.
+
+    Returns immediately, the optimization runs in a worker process.
+    Poll the status of the job and download the result as soon as it is finished.
+    The job fails if it runs longer than its timeout or the timeout of the server.
+
+    The solver can start from the solution of a finished optimization of the same dataset, given either by the
+    optimization job or by the energy model whose latest solution is used.
+
+    A rolling horizon optimization fixes the capacities of this solution and optimizes the operation at full temporal
+    resolution in windows. Without a solution, the energy model is optimized with typical periods first.
+    """
+    energy_model = crud.energy_model.get(db, id=request.ref_model)
+    if energy_model is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"EnergyModel {request.ref_model} not found!")
+
+    permissions.check_usage_permission(db, user=current_user, dataset_id=energy_model.ref_dataset)
+
+    if request.type == OptimizationJobType.SCENARIO_SWEEP:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Submit scenario sweeps to /jobs/sweep!")
+    if request.type == OptimizationJobType.MYOPIC_OPTIMIZE and energy_model.optimization_parameters is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Optimization parameters for EnergyModel {request.ref_model} not found!")
+
+    warm_start_job = get_warm_start_job(db, request, energy_model)
+    try:
+        check_model_problem_size(
+            db,
+            energy_model,
+            job_type=request.type,
+            window_time_steps=sum(get_window_sizes(request.window_time_steps, request.overlap_time_steps)),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+
+    request_dict = request.model_dump()
+    request_dict["ref_user"] = current_user.id
+    request_dict["ref_warm_start_job"] = warm_start_job.id if warm_start_job is not None else None
+    job = crud.optimization_job.create(db, obj_in=request_dict)
+    submit_job(db, job)
+    return job
+
+
+@router.post("/sweep", response_model=OptimizationJobSchema)
+def submit_scenario_sweep(
+    request: ScenarioSweepCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Submit a scenario sweep for an energy model.
+
+    Every combination of the values in the grid, or every given list of override parameters, is optimized as a scenario.
+    The overrides of a scenario are applied on top of the override parameters of the energy model.
+    The result is an Excel file that compares the objective value and the optimal capacities of all scenarios.
+    """
+    energy_model = crud.energy_model.get(db, id=request.ref_model)
+    if energy_model is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"EnergyModel {request.ref_model} not found!")
+
+    permissions.check_usage_permission(db, user=current_user, dataset_id=energy_model.ref_dataset)
+
+    scenarios = expand_scenarios(request)
+    if len(scenarios) > settings.SCENARIO_SWEEP_MAX_SCENARIOS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"The sweep has {len(scenarios)} scenarios, at most {settings.SCENARIO_SWEEP_MAX_SCENARIOS} are allowed!",
+        )
+    for component_name in {override["component_name"] for scenario in scenarios for override in scenario}:
+        if crud.energy_component.get_by_dataset_and_name(db, dataset_id=energy_model.ref_dataset, name=component_name) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Component {component_name} not found in dataset {energy_model.ref_dataset}!",
+            )
+
+    try:
+        check_model_problem_size(db, energy_model, job_type=OptimizationJobType.SCENARIO_SWEEP, number_of_scenarios=len(scenarios))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+
+    job = crud.optimization_job.create(
+        db,
+        obj_in={
+            "ref_model": energy_model.id,
+            "ref_user": current_user.id,
+            "type": OptimizationJobType.SCENARIO_SWEEP,
+            "scenarios": scenarios,
+            "timeout": request.timeout,
+        },
+    )
+    submit_job(db, job)
+    return job
+
+
+@router.get("/{job_id}/result", responses={409: {"description": "Optimization job is not finished."}})
+def download_job_result(
+    job_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Download the result file of a finished optimization job.
+    """
+    job = get_job_or_404(db, job_id, current_user)
+    if job.status != OptimizationJobStatus.FINISHED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Optimization job {job_id} is {job.status.value}!")
+
+    return FileResponse(path=job.result_file, media_type=result_media_type(job), filename=result_file_name(job))
+
+
+@router.get("/{job_id}/years", response_model=list[int])
+def get_optimized_years(
+    job_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Return the years of a myopic optimization job whose result is available.
+
+    The years are available as soon as they are optimized, while the later years are still optimized, and after the
+    job failed or was cancelled.
+    """
+    job = get_myopic_job_or_404(db, job_id, current_user)
+    return get_job_years(job)
+
+
+@router.get("/{job_id}/years/{year}", responses={404: {"description": "Year is not optimized yet."}})
+def download_year_result(
+    job_id: int,
+    year: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Download the result of an optimized year of a myopic optimization job: a zip file with a CSV file of each result table.
+    """
+    job = get_myopic_job_or_404(db, job_id, current_user)
+    content = read_job_year_result(job, year)
+    if content is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Year {year} of optimization job {job_id} is not optimized!")
+    headers = {"Content-Disposition": f'attachment; filename="{job.model.name} {year}.zip"'}
+    return Response(content=content, media_type="application/zip", headers=headers)
+
+
+@router.get("/{job_id}/results", response_model=list[OptimizationResultSchema])
+def get_job_results(
+    job_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Return the stored results of an optimization job with their objective value.
+
+    An optimization stores one result, a myopic optimization one result of each optimized year. The results of
+    scenario sweeps and rolling horizon optimizations are only available as result file.
+    """
+    job = get_job_or_404(db, job_id, current_user)
+    return crud.optimization_result.get_multi_by_job(db, job_id=job.id)
+
+
+@router.get("/{job_id}/results/capacities", response_model=list[OptimizationResultCapacitySchema])
+def get_job_result_capacities(
+    job_id: int,
+    year: int | None = None,
+    component: list[str] | None = Query(default=None),
+    region: list[str] | None = Query(default=None),
+    variable: list[str] | None = Query(default=None),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Return the optimal capacity variables of the stored results of an optimization job.
+
+    The values can be filtered by the year of a myopic optimization and by one or more components, regions and
+    variables, e.g. ``?component=PV&region=north&variable=capacity``. The variables are the names of the optimal
+    values of FINE without the suffix ``VariablesOptimum``.
+    """
+    job = get_job_or_404(db, job_id, current_user)
+    result_ids = get_result_ids(db, job, year)
+    return crud.optimization_result.get_capacities(db, result_ids=result_ids, components=component, regions=region, variables=variable)
+
+
+@router.get("/{job_id}/results/operations", response_model=list[OptimizationResultOperationSchema])
+def get_job_result_operations(
+    job_id: int,
+    year: int | None = None,
+    component: list[str] | None = Query(default=None),
+    region: list[str] | None = Query(default=None),
+    variable: list[str] | None = Query(default=None),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Return the optimal operation time series of the stored results of an optimization job.
+
+    The time series can be filtered like the capacities, e.g. ``?component=PV&variable=operation``.
+    """
+    job = get_job_or_404(db, job_id, current_user)
+    result_ids = get_result_ids(db, job, year)
+    return crud.optimization_result.get_operations(db, result_ids=result_ids, components=component, regions=region, variables=variable)
+
+
+@router.get("/{job_id}/log", response_class=StreamingResponse, responses={200: {"content": {"text/event-stream": {}}}})
+def stream_optimization_job_log(
+    job_id: int,
+    last_event_id: int = Header(default=0, ge=0),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Stream the log of an optimization job as server-sent events while it runs.
+
+    The log contains the start and the end of every phase of the optimization and the output of FINE and the solver,
+    e.g. the MIP gap. Each line is sent as ``log`` event and each change of the status of the job as ``status`` event.
+    The stream ends when the job is finished, failed or cancelled. A client that reconnects with the ID of the last
+    received event in the Last-Event-ID header only receives the lines after that event.
+    """
+    job = get_job_or_404(db, job_id, current_user)
+    return StreamingResponse(stream_job_log(job.id, offset=last_event_id), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/{job_id}/cancel", response_model=OptimizationJobSchema, responses={409: {"description": "Optimization job is not running."}})
+def cancel_optimization_job(
+    job_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Cancel a pending or running optimization job.
+
+    A pending job is cancelled immediately. The solver of a running job is stopped within seconds, then the job is
+    marked as cancelled and its worker takes the next job.
+    """
+    job = get_job_or_404(db, job_id, current_user)
+    if job.status not in (OptimizationJobStatus.PENDING, OptimizationJobStatus.RUNNING):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Optimization job {job_id} is {job.status.value}!")
+    return cancel_job(db, job)
+
+
+@router.post("/{job_id}/resume", response_model=OptimizationJobSchema, responses={409: {"description": "Optimization job didn't fail."}})
+def resume_optimization_job(
+    job_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Submit a failed or cancelled optimization job again.
+
+    A myopic optimization resumes after the last year that was completed, the other jobs start over.
+    """
+    job = get_job_or_404(db, job_id, current_user)
+    if job.status not in (OptimizationJobStatus.FAILED, OptimizationJobStatus.CANCELLED):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Optimization job {job_id} is {job.status.value}!")
+    return resume_job(db, job)
+
+
+@router.delete("/{job_id}", response_model=OptimizationJobSchema, responses={409: {"description": "Optimization job is still running."}})
+def remove_optimization_job(
+    job_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Delete an optimization job, its result file, its stored results, its solution, its log and its checkpoints.
+    """
+    job = get_job_or_404(db, job_id, current_user)
+    if job.status == OptimizationJobStatus.RUNNING:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Optimization job {job_id} is still running!")
+
+    return remove_job(db, job)
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from ensysmod import crud
+from ensysmod.api import deps, permissions
+from ensysmod.api.endpoints.optimization_jobs import get_job_or_404
+from ensysmod.core.result_comparison import compare_results
+from ensysmod.model import OptimizationResult, User
+from ensysmod.schemas import OptimizationResultComparison
+
+# maximum number of results in one comparison
+MAX_COMPARED_RESULTS = 100
+
+router = APIRouter()
+
+
+@router.get(
+    "/compare",
+    response_model=OptimizationResultComparison,
+    responses={404: {"description": "Optimization job or energy model has no stored results."}},
+)
+def compare_optimization_results(
+    job_id: list[int] = Query(default=[]),
+    model_id: list[int] = Query(default=[]),
+    year: int | None = None,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    """
+    Compare the stored results of optimization jobs and of the latest optimizations of energy models.
+
+    The results are compared in the order of the jobs, then the models, e.g. ``?job_id=4&model_id=1&model_id=2``.
+    A myopic optimization contributes one result of each optimized year, unless only the results of a year are compared.
+    The total cost, the capacities and the yearly commodity balances of all results are returned aligned with their
+    differences to the first result and their minimum, maximum, mean and standard deviation across the results.
+    """
+    results: list[OptimizationResult] = []
+    for id_ in job_id:
+        job = get_job_or_404(db, id_, current_user)
+        job_results = crud.optimization_result.get_multi_by_job(db, job_id=job.id)
+        if not job_results:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Optimization job {id_} has no stored results!")
+        results.extend(job_results)
+    for id_ in model_id:
+        energy_model = crud.energy_model.get(db, id=id_)
+        if energy_model is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"EnergyModel {id_} not found!")
+        permissions.check_usage_permission(db, user=current_user, dataset_id=energy_model.ref_dataset)
+        model_results = crud.optimization_result.get_multi_of_latest_job(db, model_id=id_)
+        if not model_results:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"EnergyModel {id_} has no stored results!")
+        results.extend(model_results)
+
+    if year is not None:
+        results = [result for result in results if result.year == year]
+    # a job may be given directly and as latest job of its model
+    results = list({result.id: result for result in results}.values())
+    if not results:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="No stored results to compare!")
+    if len(results) > MAX_COMPARED_RESULTS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{len(results)} results can't be compared at once, at most {MAX_COMPARED_RESULTS}!",
+        )
+    return compare_results(db, results)
@@ -3,7 +3,9 @@ from fastapi.responses import JSONResponse
 
 from ensysmod.api import api_router
 from ensysmod.core import settings
+from ensysmod.core.optimization_jobs import fail_interrupted_jobs, shutdown_executor
 from ensysmod.database import init_db
+from ensysmod.database.session import SessionLocal
 
 # Create FastAPI app and add all endpoints
 app = FastAPI(title=settings.SERVER_NAME)
@@ -15,6 +17,13 @@ app.include_router(api_router)
 def init_database():
     init_db.check_connection()
     init_db.create_all()
+    with SessionLocal() as db:
+        fail_interrupted_jobs(db)
+
+
+@app.on_event("shutdown")
+def shutdown_optimization_workers():
+    shutdown_executor()
 
 
 @app.exception_handler(Exception)
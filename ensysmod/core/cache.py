@@ -0,0 +1,210 @@
+"""
+Content-addressed caching of files on disk.
+"""
+import enum
+import hashlib
+import os
+import pickle
+import shutil
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from pathlib import Path
+from tempfile import gettempdir
+from typing import Any
+
+import pandas as pd
+
+from ensysmod.core import settings
+from ensysmod.utils.utils import create_temp_file
+
+
+class FileCache:
+    """
+    Cache of files on disk, addressed by a key.
+
+    Entries expire after their time to live. If the total size of the cache exceeds its limit,
+    the least recently used entries are evicted. The cache directory can be shared between processes.
+    """
+
+    def __init__(self, directory: str | Path, max_size: int, ttl: timedelta):
+        """
+        :param directory: Directory of the cache files
+        :param max_size: Maximum total size of the cache in bytes, a size of 0 disables the cache
+        :param ttl: Time to live of a cache entry
+        """
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: str) -> Path | None:
+        """
+        Return the path of a cache entry or None if there is no valid entry for the key.
+        """
+        if not self.enabled:
+            return None
+        path = self.directory / key
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        if self._is_expired(stat):
+            path.unlink(missing_ok=True)
+            return None
+        # the access time marks the last use of an entry, the modification time stays the time of creation
+        try:
+            os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            return None  # evicted by another process in the meantime
+        return path
+
+    def copy_to(self, key: str, target: Path) -> bool:
+        """
+        Copy a cache entry to the target path.
+
+        :return: True if the entry was copied, False if there is no valid entry for the key.
+        """
+        path = self.get(key)
+        if path is None:
+            return False
+        try:
+            shutil.copyfile(path, target)
+        except FileNotFoundError:
+            return False  # evicted by another process in the meantime
+        return True
+
+    def put(self, key: str, source: Path) -> None:
+        """
+        Store a copy of the source file as cache entry for the key.
+        """
+        self._store(key, lambda path: shutil.copyfile(source, path))
+
+    def load(self, key: str) -> Any | None:
+        """
+        Return the object that is cached for the key or None if there is no valid entry for the key.
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            with path.open("rb") as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            return None  # evicted by another process in the meantime
+
+    def dump(self, key: str, obj: Any) -> None:
+        """
+        Store a pickled object as cache entry for the key.
+        """
+
+        def write(path: Path) -> None:
+            with path.open("wb") as file:
+                pickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._store(key, write)
+
+    def _store(self, key: str, write: Callable[[Path], Any]) -> None:
+        if not self.enabled:
+            return
+        # write to a temporary file first, so that other processes never read an incomplete entry
+        temp_file_path = create_temp_file(dir=self.directory, prefix=".", suffix=".tmp")
+        try:
+            write(temp_file_path)
+            temp_file_path.replace(self.directory / key)
+        finally:
+            temp_file_path.unlink(missing_ok=True)
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove all expired entries and the least recently used entries that exceed the size limit.
+        """
+        if not self.directory.is_dir():
+            return
+        entries = []
+        for path in self.directory.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if self._is_expired(stat):
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_atime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+
+    def clear(self) -> None:
+        """
+        Remove all entries of the cache.
+        """
+        if self.directory.is_dir():
+            for path in self.directory.iterdir():
+                path.unlink(missing_ok=True)
+
+    def _is_expired(self, stat: os.stat_result) -> bool:
+        return time.time() - stat.st_mtime > self.ttl.total_seconds()
+
+
+def hash_content(obj: Any) -> str:
+    """
+    Return a SHA-256 hash of the content of an object.
+
+    Dictionaries and sets are hashed independent of their order, data frames and series by their labels and values.
+    """
+    sha = hashlib.sha256()
+    _update_hash(sha, obj)
+    return sha.hexdigest()
+
+
+def _update_hash(sha: "hashlib._Hash", obj: Any) -> None:
+    if isinstance(obj, dict):
+        sha.update(b"{")
+        for key in sorted(obj, key=str):
+            _update_hash(sha, key)
+            sha.update(b":")
+            _update_hash(sha, obj[key])
+        sha.update(b"}")
+    elif isinstance(obj, list | tuple):
+        sha.update(b"[")
+        for element in obj:
+            _update_hash(sha, element)
+        sha.update(b"]")
+    elif isinstance(obj, set | frozenset):
+        sha.update(b"<")
+        for element_hash in sorted(hash_content(element) for element in obj):
+            sha.update(element_hash.encode())
+        sha.update(b">")
+    elif isinstance(obj, pd.DataFrame | pd.Series):
+        sha.update(type(obj).__name__.encode())
+        _update_hash(sha, list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name)
+        _update_hash(sha, list(obj.index))
+        sha.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, enum.Enum):
+        _update_hash(sha, obj.value)
+    else:
+        sha.update(f"{type(obj).__name__}:{obj!r};".encode())
+
+
+result_cache = FileCache(
+    directory=settings.RESULT_CACHE_DIR or Path(gettempdir()) / "ensysmod_result_cache",
+    max_size=settings.RESULT_CACHE_MAX_SIZE_MB * 1024 * 1024,
+    ttl=timedelta(minutes=settings.RESULT_CACHE_TTL_MINUTES),
+)
+
+aggregation_cache = FileCache(
+    directory=settings.AGGREGATION_CACHE_DIR or Path(gettempdir()) / "ensysmod_aggregation_cache",
+    max_size=settings.AGGREGATION_CACHE_MAX_SIZE_MB * 1024 * 1024,
+    ttl=timedelta(minutes=settings.AGGREGATION_CACHE_TTL_MINUTES),
+)
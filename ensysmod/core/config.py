@@ -29,6 +29,68 @@ class Settings(BaseSettings):
     POSTGRES_DB: str | None = None
     SQLALCHEMY_DATABASE_URI: str | None = None
 
+    # Number of worker processes that solve optimization jobs in parallel
+    OPTIMIZATION_WORKERS: int = 1
+    # Leave the optimization jobs to workers started with `python -m ensysmod worker` instead of solving them in the worker
+    # processes of the API. OPTIMIZATION_RESULT_DIR must then be a directory that the API and all workers share.
+    OPTIMIZATION_EXTERNAL_WORKERS: bool = False
+    # Duration of the lease of a job that a worker claimed. The worker renews the lease while the job runs, the job of a
+    # worker that stopped responding is claimed by another worker after the lease expired.
+    WORKER_LEASE_SECONDS: int = 60
+    # Maximum number of workers that may claim a job, a job whose workers stopped responding this often fails
+    WORKER_MAX_ATTEMPTS: int = 3
+    # Directory for the result files of optimization jobs, defaults to the temp directory of the system
+    OPTIMIZATION_RESULT_DIR: str | None = None
+    # Maximum wall-clock time of an optimization in seconds, None for no limit. Jobs may choose a shorter timeout.
+    OPTIMIZATION_TIMEOUT_SECONDS: int | None = None
+    # Maximum memory of a worker process and its solver processes, None for no limit. The solver of an optimization
+    # that exceeds the limit is killed and the optimization fails.
+    OPTIMIZATION_MEMORY_LIMIT_MB: int | None = None
+
+    # Solver of optimizations that don't specify one, None lets FINE choose the first available of gurobi, glpk and cbc
+    DEFAULT_SOLVER: str | None = None
+    # Solvers that users may choose for their optimizations
+    ALLOWED_SOLVERS: list[str] = ["gurobi", "glpk", "cbc", "appsi_highs"]
+
+    # Number of worker processes that solve the scenarios of a scenario sweep in parallel, defaults to the number of CPUs
+    # divided by OPTIMIZATION_WORKERS. Dedicated workers should set it to their share of the CPUs of their host.
+    SCENARIO_SWEEP_WORKERS: int | None = None
+    # Maximum number of scenarios of a scenario sweep
+    SCENARIO_SWEEP_MAX_SCENARIOS: int = 100
+
+    # Cache for optimization results of unchanged models, defaults to a directory in the temp directory of the system
+    RESULT_CACHE_DIR: str | None = None
+    # Maximum size of the result cache, 0 disables the cache
+    RESULT_CACHE_MAX_SIZE_MB: int = 1024
+    # Time to live of cached results
+    # 60 minutes * 24 hours * 7 days = 7 days
+    RESULT_CACHE_TTL_MINUTES: int = 60 * 24 * 7
+
+    # Cache for the clustered time series of the temporal aggregation, defaults to a directory in the temp directory of the system
+    AGGREGATION_CACHE_DIR: str | None = None
+    # Maximum size of the aggregation cache, 0 disables the cache
+    AGGREGATION_CACHE_MAX_SIZE_MB: int = 256
+    # Time to live of cached aggregations
+    # 60 minutes * 24 hours * 7 days = 7 days
+    AGGREGATION_CACHE_TTL_MINUTES: int = 60 * 24 * 7
+
+    # Maximum size of the in-memory cache of built energy system models of each process, 0 disables the cache
+    ESM_CACHE_MAX_SIZE_MB: int = 256
+    # Cache for built energy system models that is shared between processes, defaults to a directory in the temp directory of the system
+    ESM_CACHE_DIR: str | None = None
+    # Maximum size of the shared cache of built energy system models, 0 disables the cache
+    ESM_FILE_CACHE_MAX_SIZE_MB: int = 1024
+    # Time to live of built energy system models in the shared cache
+    # 60 minutes * 24 hours * 7 days = 7 days
+    ESM_FILE_CACHE_TTL_MINUTES: int = 60 * 24 * 7
+
+    # Maximum estimated number of variables of an optimization problem, None for no limit
+    MAX_PROBLEM_VARIABLES: int | None = None
+    # Maximum estimated memory of an optimization, None for no limit. The scenarios of a scenario sweep that are solved
+    # in parallel count together. The limit applies to each job, the jobs of the other workers run at the same time, so
+    # it should be at most the memory of the server divided by OPTIMIZATION_WORKERS.
+    MAX_PROBLEM_MEMORY_MB: int | None = None
+
     @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
     @classmethod
     def assemble_db_connection(cls, v: str | None, values: ValidationInfo) -> str:
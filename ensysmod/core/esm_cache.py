@@ -0,0 +1,196 @@
+"""
+Cache of built energy system models in memory and on disk.
+
+Building an EnergySystemModel validates the parameters of every component, which takes a while for big datasets.
+The cache keeps the built models pickled, so every hit returns an independent deep copy that can be aggregated and
+optimized without changing the cached model. Each process keeps the recently used models in memory, and all models
+are also written to a FileCache that is shared between processes. So a model that was built by the /esm endpoint in the
+API process is loaded by the worker that optimizes it instead of being built again. The entries on disk are keyed by
+the content of the dataset, so they don't need to be invalidated when the dataset changes.
+
+If only some components of a model changed, e.g. while a user edits a component and runs the model again, a cached model
+of the same dataset is updated instead of building all components again: each entry stores a hash of the parameters of
+every component, so only the components whose hash differs are removed and added again, see fine_esm.update_esm().
+"""
+import pickle
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import timedelta
+from pathlib import Path
+from tempfile import gettempdir
+from threading import Lock
+from typing import Any, NamedTuple
+
+from fine import EnergySystemModel
+
+from ensysmod.core import settings
+from ensysmod.core.cache import FileCache, hash_content
+from ensysmod.model import EnergyModel, EnergyModelOverride
+
+
+class _CacheEntry(NamedTuple):
+    dataset_id: int
+    dataset_fingerprint: str
+    data: bytes
+    base_key: str | None
+    component_hashes: dict[str, str] | None
+
+
+class ESMCache:
+    """
+    Least recently used cache of unoptimized energy system models, limited by the total size of the pickled models.
+
+    Models that aren't in memory are loaded from the file cache, if given.
+    """
+
+    def __init__(self, max_size: int, file_cache: FileCache | None = None):
+        """
+        :param max_size: Maximum total size of the pickled models in memory in bytes, a size of 0 disables the cache in memory
+        :param file_cache: Cache on disk that is shared with other processes, None to only cache in memory
+        """
+        self.max_size = max_size
+        self.file_cache = file_cache
+        self.size = 0
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> EnergySystemModel | None:
+        """
+        Return a copy of the cached energy system model or None if there is no entry for the key.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self.file_cache is not None:
+            entry = self.file_cache.load(key)
+            if entry is not None:
+                with self._lock:
+                    self._insert(key, entry)
+        if entry is None:
+            return None
+        return pickle.loads(entry.data)
+
+    def get_base(self, dataset_id: int, base_key: str) -> tuple[EnergySystemModel, dict[str, str]] | None:
+        """
+        Return a copy of the most recently used energy system model of a dataset with the same parameters of the ESM
+        and the hashes of its components, None if there is none. Its components can differ from the requested model.
+
+        :param dataset_id: ID of the dataset
+        :param base_key: Hash of the parameters of the ESM without its components, see fine_esm.esm_base_key().
+        """
+        with self._lock:
+            for key, entry in reversed(self._entries.items()):
+                if entry.dataset_id == dataset_id and entry.base_key == base_key and entry.component_hashes is not None:
+                    self._entries.move_to_end(key)
+                    break
+            else:
+                return None
+        return pickle.loads(entry.data), entry.component_hashes
+
+    def put(
+        self,
+        key: str,
+        esM: EnergySystemModel,
+        *,
+        dataset_id: int,
+        dataset_fingerprint: str,
+        base_key: str | None = None,
+        component_hashes: dict[str, str] | None = None,
+    ) -> None:
+        """
+        Store a copy of an unoptimized energy system model.
+
+        Entries of older versions of the dataset are removed from memory, they can't be hit anymore.
+
+        :param base_key: Hash of the parameters of the ESM without its components, None if the model is only used as a whole.
+        :param component_hashes: Hash of the parameters of each component by its name, see fine_esm.get_component_hashes().
+        """
+        file_cache_enabled = self.file_cache is not None and self.file_cache.enabled
+        if not self.enabled and not file_cache_enabled:
+            return
+        data = pickle.dumps(esM, protocol=pickle.HIGHEST_PROTOCOL)
+        entry = _CacheEntry(dataset_id, dataset_fingerprint, data, base_key, component_hashes)
+        if file_cache_enabled:
+            self.file_cache.dump(key, entry)
+
+        with self._lock:
+            self._remove(lambda other: other.dataset_id == dataset_id and other.dataset_fingerprint != dataset_fingerprint)
+            self._insert(key, entry)
+
+    def invalidate(self, dataset_id: int) -> None:
+        """
+        Remove all energy system models of a dataset from memory.
+        """
+        with self._lock:
+            self._remove(lambda entry: entry.dataset_id == dataset_id)
+
+    def clear(self) -> None:
+        """
+        Remove all entries of the cache, in memory and on disk.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+        if self.file_cache is not None:
+            self.file_cache.clear()
+
+    def _insert(self, key: str, entry: _CacheEntry) -> None:
+        if not self.enabled or len(entry.data) > self.max_size:
+            return
+        if key in self._entries:
+            self.size -= len(self._entries.pop(key).data)
+        self._entries[key] = entry
+        self.size += len(entry.data)
+        while self.size > self.max_size:
+            _, evicted_entry = self._entries.popitem(last=False)
+            self.size -= len(evicted_entry.data)
+
+    def _remove(self, predicate: Callable[[_CacheEntry], bool]) -> None:
+        for key in [key for key, entry in self._entries.items() if predicate(entry)]:
+            self.size -= len(self._entries.pop(key).data)
+
+
+def esm_cache_key(model: EnergyModel) -> str:
+    """
+    Return the key of the energy system model of an energy model in the ESM cache.
+
+    The energy system model is fully determined by the content of the dataset, the override parameters and the number
+    of regions of the spatial aggregation.
+    """
+    key_data = {
+        "dataset_fingerprint": model.dataset.fingerprint,
+        "override_parameters": override_parameters_key(model.override_parameters),
+    }
+    if model.aggregation_parameters is not None and model.aggregation_parameters.number_of_regions is not None:
+        key_data["number_of_regions"] = model.aggregation_parameters.number_of_regions
+    return hash_content(key_data)
+
+
+def override_parameters_key(override_parameters: list[EnergyModelOverride]) -> list[tuple[Any, ...]]:
+    """
+    Return the content of override parameters as part of a cache key.
+
+    The order of the override parameters is kept, because they are applied one after another.
+    """
+    return [
+        (override.component.name, override.attribute, override.operation, override.value, tuple(override.regions) if override.regions else None)
+        for override in override_parameters
+    ]
+
+
+esm_cache = ESMCache(
+    max_size=settings.ESM_CACHE_MAX_SIZE_MB * 1024 * 1024,
+    file_cache=FileCache(
+        directory=settings.ESM_CACHE_DIR or Path(gettempdir()) / "ensysmod_esm_cache",
+        max_size=settings.ESM_FILE_CACHE_MAX_SIZE_MB * 1024 * 1024,
+        ttl=timedelta(minutes=settings.ESM_FILE_CACHE_TTL_MINUTES),
+    ),
+)
@@ -0,0 +1,123 @@
+"""
+Fast validation of the parameters of an energy system model without building it by FINE.
+
+The checks run on the parameters collected by get_esm_data() and report all errors at once, so a model can be
+validated after every change. Building the energy system model by FINE checks more, but takes much longer.
+"""
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from ensysmod.core.fine_esm import COMPONENT_TYPES
+from ensysmod.model import EnergyModelOverride
+
+# parameters with a value per time step and region
+TIME_SERIES_PARAMETERS = ("operationRateFix", "operationRateMax")
+
+# parameters with a value per region, or per pair of regions for transmissions
+REGIONAL_PARAMETERS = ("capacityFix", "capacityMax", "capacityMin", "yearlyFullLoadHoursMax", "yearlyFullLoadHoursMin", "distances", "losses")
+
+
+def validate_esm_data(esm_data: dict[str, Any], override_parameters: list[EnergyModelOverride]) -> list[str]:
+    """
+    Validate the parameters of an ESM and the override parameters of its energy model.
+
+    :param esm_data: Parameters of the ESM and of all its components without override parameters, see get_esm_data()
+    :param override_parameters: Override parameters of the energy model
+    :return: List of errors, empty if the parameters are valid
+    """
+    locations = np.array(sorted(esm_data["esm"]["locations"]))
+    commodities = esm_data["esm"]["commodities"]
+    number_of_time_steps = esm_data["esm"]["numberOfTimeSteps"]
+
+    errors = []
+    if len(locations) == 0:
+        errors.append("The dataset has no regions.")
+    if len(commodities) == 0:
+        errors.append("The dataset has no commodities.")
+
+    components = {component["name"]: component for component_type in COMPONENT_TYPES for component in esm_data[component_type]}
+    for component in components.values():
+        errors.extend(validate_component(component, locations, commodities, number_of_time_steps))
+
+    for override in override_parameters:
+        component = components.get(override.component.name)
+        if component is None:
+            errors.append(f"Override parameter of component {override.component.name}, which is not part of the dataset.")
+        elif override.attribute.name not in component:
+            errors.append(f"Parameter {override.attribute.name} is undefined for component {override.component.name}.")
+        elif override.regions is not None:
+            unknown_regions = sorted(set(override.regions) - set(locations))
+            errors.extend(
+                f"Override parameter {override.attribute.name} of component {override.component.name} refers to the region {region}, "
+                "which is not part of the dataset."
+                for region in unknown_regions
+            )
+    return errors
+
+
+def validate_component(component: dict[str, Any], locations: np.ndarray, commodities: set[str], number_of_time_steps: int) -> list[str]:
+    """
+    Validate the commodities and the regional parameters of a component.
+    """
+    errors = validate_commodities(component, commodities)
+    for parameter in TIME_SERIES_PARAMETERS:
+        if parameter in component:
+            errors.extend(validate_time_series(component["name"], parameter, component[parameter], locations, number_of_time_steps))
+    for parameter in REGIONAL_PARAMETERS:
+        if parameter in component:
+            errors.extend(validate_regional_parameter(component["name"], parameter, component[parameter], locations))
+    return errors
+
+
+def validate_commodities(component: dict[str, Any], commodities: set[str]) -> list[str]:
+    """
+    Validate that the commodities of a component are commodities of the dataset.
+    """
+    used_commodities = set(component.get("commodityConversionFactors", {}))
+    if "commodity" in component:
+        used_commodities.add(component["commodity"])
+    unknown_commodities = sorted(used_commodities - commodities)
+    return [f"Commodity {commodity} of component {component['name']} is not part of the dataset." for commodity in unknown_commodities]
+
+
+def validate_time_series(name: str, parameter: str, data: pd.DataFrame | pd.Series, locations: np.ndarray, number_of_time_steps: int) -> list[str]:
+    """
+    Validate that a time series has a value for each time step and that its regions are regions of the dataset.
+    """
+    if isinstance(data, pd.Series):
+        data = data.to_frame().T  # a single time step
+    errors = validate_regions(name, parameter, data.columns, locations)
+    if data.shape[0] != number_of_time_steps:
+        errors.append(f"{parameter} of component {name} has {data.shape[0]} time steps, the dataset has {number_of_time_steps}.")
+    errors.extend(validate_values(name, parameter, data))
+    return errors
+
+
+def validate_regional_parameter(name: str, parameter: str, data: pd.DataFrame | pd.Series, locations: np.ndarray) -> list[str]:
+    """
+    Validate that a parameter only has values for regions of the dataset. A matrix of pairs of regions must cover all regions.
+    """
+    if isinstance(data, pd.Series):
+        errors = validate_regions(name, parameter, data.index, locations)
+    else:
+        errors = validate_regions(name, parameter, data.index.union(data.columns), locations)
+        if data.shape != (len(locations), len(locations)):
+            errors.append(f"{parameter} of component {name} has the shape {data.shape}, expected a matrix of all {len(locations)} regions.")
+    errors.extend(validate_values(name, parameter, data))
+    return errors
+
+
+def validate_regions(name: str, parameter: str, regions: pd.Index, locations: np.ndarray) -> list[str]:
+    unknown_regions = regions[~np.isin(regions.to_numpy(), locations)]
+    return [f"{parameter} of component {name} has values for the region {region}, which is not part of the dataset." for region in unknown_regions]
+
+
+def validate_values(name: str, parameter: str, data: pd.DataFrame | pd.Series) -> list[str]:
+    values = data.to_numpy(dtype=float)
+    if not np.isfinite(values).all():
+        return [f"{parameter} of component {name} has missing or infinite values."]
+    if (values < 0).any():
+        return [f"{parameter} of component {name} has negative values."]
+    return []
@@ -1,9 +1,11 @@
-from contextlib import chdir
+import logging
+import pickle
+from collections import defaultdict
 from pathlib import Path
-from tempfile import TemporaryDirectory
 from typing import Any
-from zipfile import ZipFile
 
+import pandas as pd
+import pyomo.environ as pyo
 from fine import (
     Conversion,
     EnergySystemModel,
@@ -11,35 +13,123 @@ from fine import (
     Source,
     Storage,
     Transmission,
-    optimizeSimpleMyopic,
     writeOptimizationOutputToExcel,
 )
 from sqlalchemy.orm import Session
 
 from ensysmod import crud
+from ensysmod.core import settings
+from ensysmod.core.cache import hash_content
+from ensysmod.core.esm_cache import esm_cache, esm_cache_key
+from ensysmod.core.profiling import phase
+from ensysmod.core.result_tables import get_result_tables, write_result_file
+from ensysmod.core.solver import configured_solver
+from ensysmod.core.spatial_aggregation import aggregate_model_regions
+from ensysmod.core.time_series_aggregation import cached_clustering
 from ensysmod.model import (
     EnergyComponent,
     EnergyConversion,
     EnergyModel,
-    EnergyModelOptimization,
+    EnergyModelAggregation,
     EnergyModelOverride,
+    EnergyModelOverrideAttribute,
     EnergyModelOverrideOperation,
+    EnergyModelSolver,
     EnergySink,
     EnergySource,
     EnergyStorage,
     EnergyTransmission,
+    OptimizationResultFormat,
 )
+from ensysmod.schemas.energy_model_aggregation import EnergyModelAggregationBase
+from ensysmod.schemas.energy_model_solver import EnergyModelSolverBase
 from ensysmod.utils.utils import create_temp_file, df_or_s
 
+logger = logging.getLogger(__name__)
+
+# regional parameters of all components
+COMPONENT_PARAMETERS = (
+    "capacityFix",
+    "capacityMax",
+    "capacityMin",
+    "operationRateFix",
+    "operationRateMax",
+    "yearlyFullLoadHoursMax",
+    "yearlyFullLoadHoursMin",
+)
+
+# FINE class of the components of each type in the ESM data
+COMPONENT_CLASSES = {"sources": Source, "sinks": Sink, "conversions": Conversion, "storages": Storage, "transmissions": Transmission}
+
+# keys of the components of each type in the ESM data
+COMPONENT_TYPES = tuple(COMPONENT_CLASSES)
+
+# tables of the regional parameters of all components and of the transmissions
+PARAMETER_TABLES = {
+    "capacityFix": crud.capacity_fix,
+    "capacityMax": crud.capacity_max,
+    "capacityMin": crud.capacity_min,
+    "operationRateFix": crud.operation_rate_fix,
+    "operationRateMax": crud.operation_rate_max,
+    "yearlyFullLoadHoursMax": crud.yearly_full_load_hours_max,
+    "yearlyFullLoadHoursMin": crud.yearly_full_load_hours_min,
+    "distances": crud.transmission_distance,
+    "losses": crud.transmission_loss,
+}
+
 
 def generate_esm_from_model(db: Session, model: EnergyModel) -> EnergySystemModel:
     """
     Generate an ESM from a given EnergyModel.
 
+    Built ESMs are cached, so an unchanged model is only built once. The returned ESM is a copy and may be modified.
+    If only some components changed since a model of the dataset was cached, only these components are built again.
+
     :param db: Database session
     :param model: EnergyModel
     :return: ESM
     """
+    cache_key = esm_cache_key(model)
+    with phase("load_cached_esm"):
+        esM = esm_cache.get(cache_key)
+    if esM is not None:
+        return esM
+
+    with phase("read_database"):
+        esm_data = get_esm_data(db, model=model)
+    esm_data = aggregate_model_regions(esm_data, model.aggregation_parameters)
+    base_key = esm_base_key(esm_data)
+    component_hashes = get_component_hashes(esm_data)
+    with phase("build_esm"):
+        cached = esm_cache.get_base(model.ref_dataset, base_key)
+        if cached is None:
+            esM = build_esm(esm_data)
+        else:
+            esM, cached_component_hashes = cached
+            update_esm(esM, esm_data, component_hashes=component_hashes, cached_component_hashes=cached_component_hashes)
+    # don't cache the ESM if the dataset was changed while it was read
+    db.refresh(model.dataset)
+    if esm_cache_key(model) == cache_key:
+        esm_cache.put(
+            cache_key,
+            esM,
+            dataset_id=model.ref_dataset,
+            dataset_fingerprint=model.dataset.fingerprint,
+            base_key=base_key,
+            component_hashes=component_hashes,
+        )
+    return esM
+
+
+def get_esm_data(db: Session, model: EnergyModel, *, apply_overrides: bool = True) -> dict[str, Any]:
+    """
+    Collect all parameters of the ESM of a given EnergyModel with its override parameters applied.
+
+    :param db: Database session
+    :param model: EnergyModel
+    :param apply_overrides: Whether the override parameters of the model are applied.
+    :return: Parameters of the ESM and of all its components
+    """
     regions = model.dataset.regions
     commodities = model.dataset.commodities
     esm_data = {
@@ -52,30 +142,113 @@ def generate_esm_from_model(db: Session, model: EnergyModel) -> EnergySystemMode
         "commodityUnitsDict": {commodity.name: commodity.unit for commodity in model.dataset.commodities},
     }
 
-    esM = EnergySystemModel(verboseLogLevel=0, **esm_data)
+    parameters = get_parameter_dataframes(db, dataset_id=model.ref_dataset)
+    override_parameters = group_override_parameters(model.override_parameters) if apply_overrides else None
+    return {
+        "esm": esm_data,
+        "sources": [
+            source_to_dict(source=source, parameters=parameters, override_parameters=override_parameters) for source in model.dataset.sources
+        ],
+        "sinks": [sink_to_dict(sink=sink, parameters=parameters, override_parameters=override_parameters) for sink in model.dataset.sinks],
+        "conversions": [
+            conversion_to_dict(conversion=conversion, parameters=parameters, override_parameters=override_parameters)
+            for conversion in model.dataset.conversions
+        ],
+        "storages": [
+            storage_to_dict(storage=storage, parameters=parameters, override_parameters=override_parameters) for storage in model.dataset.storages
+        ],
+        "transmissions": [
+            transmission_to_dict(transmission=transmission, parameters=parameters, override_parameters=override_parameters)
+            for transmission in model.dataset.transmissions
+        ],
+    }
 
-    for source in model.dataset.sources:
-        add_source(esM, db, source=source, override_parameters=model.override_parameters)
-    for sink in model.dataset.sinks:
-        add_sink(esM, db, sink=sink, override_parameters=model.override_parameters)
-    for conversion in model.dataset.conversions:
-        add_conversion(esM, db, conversion=conversion, override_parameters=model.override_parameters)
-    for storage in model.dataset.storages:
-        add_storage(esM, db, storage=storage, override_parameters=model.override_parameters)
-    for transmission in model.dataset.transmissions:
-        add_transmission(esM, db, transmission=transmission, override_parameters=model.override_parameters)
+
+def get_parameter_dataframes(db: Session, *, dataset_id: int) -> dict[str, dict[int, pd.DataFrame]]:
+    """
+    Get the regional parameters of all components of a dataset, e.g. the time series of the operation rates.
+
+    Each parameter table is read by one query, instead of one query per component and region.
+
+    :param db: Database session
+    :param dataset_id: ID of the dataset
+    :return: Dataframe of each component by the ID of the component, for each FINE parameter
+    """
+    return {parameter: crud_repo.get_dataframes_by_dataset(db, dataset_id=dataset_id) for parameter, crud_repo in PARAMETER_TABLES.items()}
+
+
+def build_esm(esm_data: dict[str, Any]) -> EnergySystemModel:
+    """
+    Build an ESM from the parameters collected by get_esm_data().
+
+    :param esm_data: Parameters of the ESM and of all its components
+    :return: ESM
+    """
+    esM = EnergySystemModel(verboseLogLevel=0, **esm_data["esm"])
+    # original regions of each region of a spatially aggregated ESM, see aggregate_regions()
+    esM.regionGroups = esm_data.get("regionGroups")
+
+    for component_type, component_class in COMPONENT_CLASSES.items():
+        for component in esm_data[component_type]:
+            esM.add(component_class(esM=esM, **component))
 
     return esM
 
 
-def add_source(
+def esm_base_key(esm_data: dict[str, Any]) -> str:
+    """
+    Return a hash of the parameters of the ESM without its components, e.g. the regions and the time steps.
+    The components of ESMs with the same base key can be exchanged, see update_esm().
+    """
+    return hash_content({"esm": esm_data["esm"], "regionGroups": esm_data.get("regionGroups")})
+
+
+def get_component_hashes(esm_data: dict[str, Any]) -> dict[str, str]:
+    """
+    Return a hash of the type and the parameters of each component by its name.
+    """
+    return {
+        component["name"]: hash_content({"type": component_type, "parameters": component})
+        for component_type in COMPONENT_CLASSES
+        for component in esm_data[component_type]
+    }
+
+
+def update_esm(
     esM: EnergySystemModel,
-    db: Session,
+    esm_data: dict[str, Any],
     *,
-    source: EnergySource,
-    override_parameters: list[EnergyModelOverride] | None,
+    component_hashes: dict[str, str],
+    cached_component_hashes: dict[str, str],
 ) -> None:
-    esm_source = component_to_dict(db, source.component)
+    """
+    Update an unoptimized ESM that was built from other ESM data with the same base key to the components of the ESM data.
+
+    Only the components whose hash differs are removed and built again, the optimization problem is declared from the
+    updated components when the ESM is optimized.
+
+    :param esm_data: Parameters of the ESM and of all its components
+    :param component_hashes: Hashes of the components of the ESM data, see get_component_hashes().
+    :param cached_component_hashes: Hashes of the components of the ESM.
+    """
+    changed_names = {name for name, component_hash in component_hashes.items() if cached_component_hashes.get(name) != component_hash}
+    removed_names = {name for name, component_hash in cached_component_hashes.items() if component_hashes.get(name) != component_hash}
+    for name in removed_names:
+        esM.removeComponent(name)
+    for component_type, component_class in COMPONENT_CLASSES.items():
+        for component in esm_data[component_type]:
+            if component["name"] in changed_names:
+                esM.add(component_class(esM=esM, **component))
+    logger.info("Updated %s of %s components of the cached ESM.", len(changed_names | removed_names), len(component_hashes))
+
+
+def source_to_dict(
+    *,
+    source: EnergySource,
+    parameters: dict[str, dict[int, pd.DataFrame]],
+    override_parameters: dict[int, list[EnergyModelOverride]] | None,
+) -> dict[str, Any]:
+    esm_source = component_to_dict(source.component, parameters)
     esm_source["commodity"] = source.commodity.name
     if source.commodity_cost is not None:
         esm_source["commodityCost"] = source.commodity_cost
@@ -85,19 +258,18 @@ def add_source(
         esm_source["commodityLimitID"] = source.commodity_limit_id
 
     if override_parameters is not None:
-        esm_source = apply_override_parameters(esm_source, override_parameters)
+        esm_source = apply_override_parameters(esm_source, override_parameters.get(source.ref_component, []))
 
-    esM.add(Source(esM=esM, **esm_source))
+    return esm_source
 
 
-def add_sink(
-    esM: EnergySystemModel,
-    db: Session,
+def sink_to_dict(
     *,
     sink: EnergySink,
-    override_parameters: list[EnergyModelOverride] | None,
-) -> None:
-    esm_sink = component_to_dict(db, sink.component)
+    parameters: dict[str, dict[int, pd.DataFrame]],
+    override_parameters: dict[int, list[EnergyModelOverride]] | None,
+) -> dict[str, Any]:
+    esm_sink = component_to_dict(sink.component, parameters)
     esm_sink["commodity"] = sink.commodity.name
     if sink.commodity_cost is not None:
         esm_sink["commodityCost"] = sink.commodity_cost
@@ -107,36 +279,34 @@ def add_sink(
         esm_sink["commodityLimitID"] = sink.commodity_limit_id
 
     if override_parameters is not None:
-        esm_sink = apply_override_parameters(esm_sink, override_parameters)
+        esm_sink = apply_override_parameters(esm_sink, override_parameters.get(sink.ref_component, []))
 
-    esM.add(Sink(esM=esM, **esm_sink))
+    return esm_sink
 
 
-def add_conversion(
-    esM: EnergySystemModel,
-    db: Session,
+def conversion_to_dict(
     *,
     conversion: EnergyConversion,
-    override_parameters: list[EnergyModelOverride] | None,
-) -> None:
-    esm_conversion = component_to_dict(db, conversion.component)
+    parameters: dict[str, dict[int, pd.DataFrame]],
+    override_parameters: dict[int, list[EnergyModelOverride]] | None,
+) -> dict[str, Any]:
+    esm_conversion = component_to_dict(conversion.component, parameters)
     esm_conversion["physicalUnit"] = conversion.physical_unit
     esm_conversion["commodityConversionFactors"] = {x.commodity.name: x.conversion_factor for x in conversion.conversion_factors}
 
     if override_parameters is not None:
-        esm_conversion = apply_override_parameters(esm_conversion, override_parameters)
+        esm_conversion = apply_override_parameters(esm_conversion, override_parameters.get(conversion.ref_component, []))
 
-    esM.add(Conversion(esM=esM, **esm_conversion))
+    return esm_conversion
 
 
-def add_storage(
-    esM: EnergySystemModel,
-    db: Session,
+def storage_to_dict(
     *,
     storage: EnergyStorage,
-    override_parameters: list[EnergyModelOverride] | None,
-) -> None:
-    esm_storage = component_to_dict(db, storage.component)
+    parameters: dict[str, dict[int, pd.DataFrame]],
+    override_parameters: dict[int, list[EnergyModelOverride]] | None,
+) -> dict[str, Any]:
+    esm_storage = component_to_dict(storage.component, parameters)
     esm_storage["commodity"] = storage.commodity.name
     if storage.charge_efficiency is not None:
         esm_storage["chargeEfficiency"] = storage.charge_efficiency
@@ -156,33 +326,30 @@ def add_storage(
         esm_storage["stateOfChargeMax"] = storage.state_of_charge_max
 
     if override_parameters is not None:
-        esm_storage = apply_override_parameters(esm_storage, override_parameters)
+        esm_storage = apply_override_parameters(esm_storage, override_parameters.get(storage.ref_component, []))
 
-    esM.add(Storage(esM=esM, **esm_storage))
+    return esm_storage
 
 
-def add_transmission(
-    esM: EnergySystemModel,
-    db: Session,
+def transmission_to_dict(
     *,
     transmission: EnergyTransmission,
-    override_parameters: list[EnergyModelOverride] | None,
-) -> None:
-    esm_transmission = component_to_dict(db, transmission.component)
+    parameters: dict[str, dict[int, pd.DataFrame]],
+    override_parameters: dict[int, list[EnergyModelOverride]] | None,
+) -> dict[str, Any]:
+    esm_transmission = component_to_dict(transmission.component, parameters)
     esm_transmission["commodity"] = transmission.commodity.name
-    component_id = transmission.component.id
-    if len(transmission.component.distances) > 0:
-        esm_transmission["distances"] = crud.transmission_distance.get_dataframe(db, component_id=component_id)
-    if len(transmission.component.losses) > 0:
-        esm_transmission["losses"] = crud.transmission_loss.get_dataframe(db, component_id=component_id)
+    for parameter in ("distances", "losses"):
+        if transmission.ref_component in parameters[parameter]:
+            esm_transmission[parameter] = parameters[parameter][transmission.ref_component]
 
     if override_parameters is not None:
-        esm_transmission = apply_override_parameters(esm_transmission, override_parameters)
+        esm_transmission = apply_override_parameters(esm_transmission, override_parameters.get(transmission.ref_component, []))
 
-    esM.add(Transmission(esM=esM, **esm_transmission))
+    return esm_transmission
 
 
-def component_to_dict(db: Session, component: EnergyComponent) -> dict[str, Any]:
+def component_to_dict(component: EnergyComponent, parameters: dict[str, dict[int, pd.DataFrame]]) -> dict[str, Any]:
     component_data = {
         "name": component.name,
         "hasCapacityVariable": component.capacity_variable,
@@ -196,104 +363,245 @@ def component_to_dict(db: Session, component: EnergyComponent) -> dict[str, Any]
         "linkedQuantityID": component.linked_quantity_id,
     }
 
-    if len(component.capacity_fix) > 0:
-        component_data["capacityFix"] = df_or_s(crud.capacity_fix.get_dataframe(db, component_id=component.id))
-    if len(component.capacity_max) > 0:
-        component_data["capacityMax"] = df_or_s(crud.capacity_max.get_dataframe(db, component_id=component.id))
-    if len(component.capacity_min) > 0:
-        component_data["capacityMin"] = df_or_s(crud.capacity_min.get_dataframe(db, component_id=component.id))
+    for parameter in COMPONENT_PARAMETERS:
+        if component.id in parameters[parameter]:
+            component_data[parameter] = df_or_s(parameters[parameter][component.id])
 
-    if len(component.operation_rate_fix) > 0:
-        component_data["operationRateFix"] = df_or_s(crud.operation_rate_fix.get_dataframe(db, component_id=component.id))
-    if len(component.operation_rate_max) > 0:
-        component_data["operationRateMax"] = df_or_s(crud.operation_rate_max.get_dataframe(db, component_id=component.id))
+    return component_data
 
-    if len(component.yearly_full_load_hours_max) > 0:
-        component_data["yearlyFullLoadHoursMax"] = df_or_s(crud.yearly_full_load_hours_max.get_dataframe(db, component_id=component.id))
-    if len(component.yearly_full_load_hours_min) > 0:
-        component_data["yearlyFullLoadHoursMin"] = df_or_s(crud.yearly_full_load_hours_min.get_dataframe(db, component_id=component.id))
 
-    return component_data
+def group_override_parameters(override_parameters: list[EnergyModelOverride]) -> dict[int, list[EnergyModelOverride]]:
+    """
+    Group override parameters by the ID of their component, keeping the order in which they are applied.
+    """
+    grouped_override_parameters = defaultdict(list)
+    for override_parameter in override_parameters:
+        grouped_override_parameters[override_parameter.ref_component].append(override_parameter)
+    return grouped_override_parameters
 
 
 def apply_override_parameters(component_dict: dict, override_parameters: list[EnergyModelOverride]) -> dict:
     """
-    Overrides component parameters.
+    Overrides component parameters with the override parameters of the component.
     """
     for override_parameter in override_parameters:
-        if override_parameter.component.name != component_dict["name"]:
-            continue
-
-        attribute_name = override_parameter.attribute.name
-        if attribute_name not in component_dict:
-            raise ValueError(f"Parameter {attribute_name} is undefined for component {component_dict['name']}.")
-
-        if override_parameter.operation == EnergyModelOverrideOperation.add:
-            component_dict[attribute_name] += override_parameter.value
-        elif override_parameter.operation == EnergyModelOverrideOperation.multiply:
-            component_dict[attribute_name] *= override_parameter.value
-        elif override_parameter.operation == EnergyModelOverrideOperation.set:
-            component_dict[attribute_name] = override_parameter.value
-        else:
-            raise ValueError(f"Unknown operation: {override_parameter.operation}")
+        apply_override(
+            component_dict,
+            override_parameter.attribute,
+            override_parameter.operation,
+            override_parameter.value,
+            regions=override_parameter.regions,
+        )
     return component_dict
 
 
-def optimize_esm(esM: EnergySystemModel) -> Path:
+def apply_override(
+    component_dict: dict,
+    attribute: EnergyModelOverrideAttribute,
+    operation: EnergyModelOverrideOperation,
+    value: float,
+    regions: list[str] | None = None,
+) -> None:
+    """
+    Overrides a parameter of a component.
+
+    Regional parameters are overridden in the given regions or in all regions, time series in all their time steps.
+    Parameters are replaced instead of modified in place, so that data frames can be shared between components and scenarios.
+    """
+    attribute_name = attribute.name
+    if attribute_name not in component_dict:
+        raise ValueError(f"Parameter {attribute_name} is undefined for component {component_dict['name']}.")
+
+    data = component_dict[attribute_name]
+    if not isinstance(data, pd.DataFrame | pd.Series):
+        if regions is not None:
+            raise ValueError(f"Parameter {attribute_name} of component {component_dict['name']} has no regional values.")
+        component_dict[attribute_name] = apply_operation(data, operation, value)
+        return
+
+    # time series and transmission matrices have a column per region, other regional parameters an index entry
+    data_regions = data.columns if isinstance(data, pd.DataFrame) else data.index
+    if regions is None:
+        regions = list(data_regions)
+    unknown_regions = [region for region in regions if region not in data_regions]
+    if unknown_regions:
+        raise ValueError(f"Parameter {attribute_name} of component {component_dict['name']} has no values for the regions {unknown_regions}.")
+
+    overridden_data = data.astype(float)  # always a copy
+    overridden_data[regions] = apply_operation(data[regions], operation, value)
+    component_dict[attribute_name] = overridden_data
+
+
+def apply_operation(data: Any, operation: EnergyModelOverrideOperation, value: float) -> Any:
+    """
+    Applies an override operation to a number or to all values of a data frame.
+    """
+    if operation == EnergyModelOverrideOperation.add:
+        return data + value
+    if operation == EnergyModelOverrideOperation.multiply:
+        return data * value
+    if operation == EnergyModelOverrideOperation.set:
+        return value
+    raise ValueError(f"Unknown operation: {operation}")
+
+
+def get_aggregation_kwargs(
+    esM: EnergySystemModel,
+    aggregation_parameters: EnergyModelAggregation | EnergyModelAggregationBase | None,
+) -> dict[str, Any]:
+    """
+    Convert the aggregation parameters of a model to arguments of EnergySystemModel.aggregateTemporally().
+    Without aggregation parameters, the time series are clustered into 7 typical periods with the defaults of FINE.
+    """
+    if aggregation_parameters is None:
+        return {"numberOfTypicalPeriods": 7}
+
+    hours_per_period = aggregation_parameters.hours_per_period
+    if hours_per_period % esM.hoursPerTimeStep != 0:
+        raise ValueError(
+            f"hours_per_period ({hours_per_period}) must be a multiple of the hours per time step of the dataset ({esM.hoursPerTimeStep})."
+        )
+
+    # a period can't have more segments than time steps, the schema only checks the segments against the hours per period
+    time_steps_per_period = hours_per_period // esM.hoursPerTimeStep
+    return {
+        "numberOfTypicalPeriods": aggregation_parameters.number_of_typical_periods,
+        "numberOfTimeStepsPerPeriod": time_steps_per_period,
+        "segmentation": aggregation_parameters.segmentation,
+        "numberOfSegmentsPerPeriod": min(aggregation_parameters.number_of_segments_per_period, int(time_steps_per_period)),
+        "clusterMethod": aggregation_parameters.cluster_method.value,
+    }
+
+
+def optimize_esm(
+    esM: EnergySystemModel,
+    aggregation_parameters: EnergyModelAggregation | None = None,
+    aggregation_cache_key: str | None = None,
+    solver_parameters: EnergyModelSolver | None = None,
+    warm_start_solution: dict[str, dict[Any, float]] | None = None,
+    result_format: OptimizationResultFormat = OptimizationResultFormat.EXCEL,
+) -> Path:
     """
     Optimize the energy system model.
+
+    :param aggregation_cache_key: Key of the time series in the aggregation cache, None to cluster the time series without cache.
+    :param warm_start_solution: Solution of a related optimization to start from, see get_solution().
+    :param result_format: Format of the result file.
     """
-    esM.aggregateTemporally(numberOfTypicalPeriods=7)
-    esM.optimize(timeSeriesAggregation=True)
+    aggregate_and_optimize_esm(
+        esM,
+        aggregation_parameters=aggregation_parameters,
+        aggregation_cache_key=aggregation_cache_key,
+        solver_parameters=solver_parameters,
+        warm_start_solution=warm_start_solution,
+    )
+
+    with phase("write_output"):
+        return write_optimization_output(esM, result_format)
 
-    result_file_path = create_temp_file(prefix="ensysmod_result_", suffix=".xlsx")
-    base_name = str(result_file_path.with_suffix(""))
-    writeOptimizationOutputToExcel(esM=esM, outputFileName=base_name, optSumOutputLevel=2, optValOutputLevel=1)
+
+def write_optimization_output(esM: EnergySystemModel, result_format: OptimizationResultFormat) -> Path:
+    """
+    Write the result of an optimized energy system model to a new result file.
+
+    Excel files are written by FINE. The other formats are zip files with a file of each result table, which are
+    written much faster, see result_tables.write_result_file().
+    """
+    if result_format == OptimizationResultFormat.EXCEL:
+        result_file_path = create_temp_file(dir=settings.OPTIMIZATION_RESULT_DIR, prefix="ensysmod_result_", suffix=".xlsx")
+        base_name = str(result_file_path.with_suffix(""))
+        writeOptimizationOutputToExcel(esM=esM, outputFileName=base_name, optSumOutputLevel=2, optValOutputLevel=1)
+        write_region_groups(esM, result_file_path)
+    else:
+        result_file_path = create_temp_file(dir=settings.OPTIMIZATION_RESULT_DIR, prefix="ensysmod_result_", suffix=".zip")
+        write_result_file(result_file_path, get_result_tables(esM), result_format)
     return result_file_path
 
 
-def myopic_optimize_esm(esM: EnergySystemModel, optimization_parameters: EnergyModelOptimization) -> Path:
-    """
-    Optimization function for myopic approach. For each optimization run, the newly installed capacities
-    will be given as a stock (with capacityFix) to the next optimization run.
-    """
-    start_year = optimization_parameters.start_year
-    end_year = optimization_parameters.end_year
-    nb_of_steps = optimization_parameters.number_of_steps
-    nb_of_represented_years = optimization_parameters.years_per_step
-    CO2_reference = optimization_parameters.CO2_reference
-    CO2_reduction_targets = optimization_parameters.CO2_reduction_targets
-
-    if CO2_reduction_targets is not None:
-        check_CO2_optimization_sink(esM)
-
-    with TemporaryDirectory(prefix="ensysmod_") as temp_dir, chdir(temp_dir):
-        # optimizeSimpleMyopic() can only output files to the current working directory
-        optimizeSimpleMyopic(
-            esM=esM,
-            startYear=start_year,
-            endYear=end_year,
-            nbOfSteps=nb_of_steps,
-            nbOfRepresentedYears=nb_of_represented_years,
-            CO2Reference=CO2_reference,
-            CO2ReductionTargets=CO2_reduction_targets,
-            trackESMs=False,
-        )
-        result_excel_files = [f"ESM{year}.xlsx" for year in range(start_year, end_year + 1, nb_of_represented_years)]
-        zipped_result_file_path = create_temp_file(prefix="ensysmod_result_", suffix=".zip")
-        with ZipFile(zipped_result_file_path, "w") as zip_file:
-            for file in result_excel_files:
-                zip_file.write(file)
+def write_region_groups(esM: EnergySystemModel, result_file_path: str | Path) -> None:
+    """
+    Add the sheet "Regions" with the aggregated region of each region of the dataset to a result file.
+    Nothing is added if the regions of the ESM weren't aggregated.
+    """
+    region_groups = getattr(esM, "regionGroups", None)
+    if region_groups is None:
+        return
+    regions = pd.DataFrame(
+        [(region, aggregated_region) for aggregated_region, group in region_groups.items() for region in group],
+        columns=["region", "aggregated_region"],
+    )
+    with pd.ExcelWriter(result_file_path, mode="a", engine="openpyxl") as writer:
+        regions.sort_values("region").to_excel(writer, sheet_name="Regions", index=False)
+
+
+def aggregate_and_optimize_esm(
+    esM: EnergySystemModel,
+    aggregation_parameters: EnergyModelAggregation | EnergyModelAggregationBase | None = None,
+    aggregation_cache_key: str | None = None,
+    solver_parameters: EnergyModelSolver | EnergyModelSolverBase | None = None,
+    warm_start_solution: dict[str, dict[Any, float]] | None = None,
+) -> None:
+    """
+    Cluster the time series of the energy system model into typical periods and optimize it.
+
+    :param aggregation_cache_key: Key of the time series in the aggregation cache, None to cluster the time series without cache.
+    :param solver_parameters: Solver and solver options, None to use the default solver.
+    :param warm_start_solution: Solution of a related optimization to start from, see get_solution().
+    """
+    with phase("aggregate"), cached_clustering(aggregation_cache_key):
+        esM.aggregateTemporally(**get_aggregation_kwargs(esM, aggregation_parameters))
+    # the problem is declared separately to measure the declaration and the solve, and because the variables of a warm start
+    # only exist after the optimization problem is declared
+    with phase("declare_problem"):
+        esM.declareOptimizationProblem(timeSeriesAggregation=True)
+        if warm_start_solution is not None:
+            set_solution(esM, warm_start_solution)
+    with phase("solve"), configured_solver(solver_parameters, warm_start=warm_start_solution is not None) as solver_kwargs:
+        esM.optimize(declaresOptimizationProblem=False, timeSeriesAggregation=True, warmstart=warm_start_solution is not None, **solver_kwargs)
+
+
+def get_solution(esM: EnergySystemModel) -> dict[str, dict[Any, float]]:
+    """
+    Return the values of all variables of an optimized energy system model, e.g. the capacities and operation of the components.
 
-    return zipped_result_file_path
+    :return: Values of each variable by their index
+    """
+    return {
+        variable.name: {index: value for index, value in variable.extract_values().items() if value is not None}
+        for variable in esM.pyM.component_objects(pyo.Var, active=True)
+    }
 
 
-def check_CO2_optimization_sink(esM: EnergySystemModel) -> None:
+def set_solution(esM: EnergySystemModel, solution: dict[str, dict[Any, float]]) -> int:
     """
-    Checks the required Sink component for the CO2 optimization to function properly.
+    Set the variables of a declared optimization problem to the values of a solution.
+
+    Only values whose variable and index exist in the optimization problem are set, the solution may belong to another
+    energy model of the same dataset, e.g. with different override parameters.
+
+    :return: Number of values that were set
     """
-    if ("CO2 to environment", "SourceSinkModel") not in esM.componentNames.items():
-        raise ValueError("Sink component with the name 'CO2 to environment' is required.")
+    number_of_values = 0
+    for variable in esM.pyM.component_objects(pyo.Var, active=True):
+        values = {index: value for index, value in solution.get(variable.name, {}).items() if index in variable}
+        variable.set_values(values)
+        number_of_values += len(values)
+    return number_of_values
+
 
-    if esM.getComponentAttribute(componentName="CO2 to environment", attributeName="commodityLimitID") is None:
-        raise ValueError("Commodity limit ID of the sink component 'CO2 to environment' must be specified.")
+def write_solution(esM: EnergySystemModel) -> Path:
+    """
+    Write the solution of an optimized energy system model to a file.
+    """
+    solution_file_path = create_temp_file(dir=settings.OPTIMIZATION_RESULT_DIR, prefix="ensysmod_solution_", suffix=".pkl")
+    with solution_file_path.open("wb") as file:
+        pickle.dump(get_solution(esM), file, protocol=pickle.HIGHEST_PROTOCOL)
+    return solution_file_path
+
+
+def read_solution(solution_file_path: str | Path) -> dict[str, dict[Any, float]]:
+    """
+    Read a solution that was written by write_solution().
+    """
+    with Path(solution_file_path).open("rb") as file:
+        return pickle.load(file)
@@ -0,0 +1,78 @@
+"""
+Live log of optimization jobs.
+
+Inside a job_logged() context, the log file of a job receives the log messages, e.g. the start and the end of every
+phase of core.profiling, and everything that FINE and the solver print, including the progress of the solver like the
+MIP gap. The log file is written to OPTIMIZATION_RESULT_DIR, so every API server can stream it to clients as
+server-sent events while the job runs, also if a dedicated worker runs the job, see core.job_queue.
+
+The output is redirected for the whole process. Jobs that run in threads of the API process, see
+optimization_jobs.get_executor(), also write the output of other threads to their log.
+"""
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager, redirect_stdout
+from pathlib import Path
+
+# format of the log messages in the log file of a job
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+@contextmanager
+def job_logged(log_file_path: Path) -> Iterator[None]:
+    """
+    Write the log messages and the output of FINE and the solver inside the context to the log file of a job.
+
+    :param log_file_path: Path of the log file, which is appended to.
+    """
+    ensysmod_logger = logging.getLogger("ensysmod")
+    level = ensysmod_logger.level
+    with log_file_path.open("a", buffering=1, encoding="utf-8") as log_file:
+        handler = logging.StreamHandler(log_file)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logging.getLogger().addHandler(handler)
+        # worker processes don't configure logging, the messages of EnSysMod would be dropped
+        if ensysmod_logger.getEffectiveLevel() > logging.INFO:
+            ensysmod_logger.setLevel(logging.INFO)
+        try:
+            with redirect_stdout(log_file):
+                yield
+        finally:
+            ensysmod_logger.setLevel(level)
+            logging.getLogger().removeHandler(handler)
+
+
+def read_log_lines(log_file_path: Path, offset: int) -> list[tuple[str, int]]:
+    """
+    Read the complete lines that were appended to a log file since an offset.
+
+    :param log_file_path: Path of the log file
+    :param offset: Position in bytes up to which the log file was read.
+    :return: The new lines, each with the position in bytes after the line.
+    """
+    if not log_file_path.exists():
+        return []
+    with log_file_path.open("rb") as log_file:
+        log_file.seek(offset)
+        data = log_file.read()
+    # a line that is still being written is read the next time
+    complete = data[: data.rfind(b"\n") + 1]
+    lines = []
+    for line in complete.splitlines(keepends=True):
+        offset += len(line)
+        lines.append((line.decode("utf-8", errors="replace").rstrip("\r\n"), offset))
+    return lines
+
+
+def server_sent_event(event: str, data: str, event_id: int | None = None) -> str:
+    """
+    Format a server-sent event.
+
+    :param event: Type of the event
+    :param data: Data of the event, a single line
+    :param event_id: ID of the event, which a reconnecting client sends in the Last-Event-ID header.
+    """
+    lines = [f"event: {event}", f"data: {data}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,112 @@
+"""
+Database-backed queue of optimization jobs for dedicated worker processes.
+
+With the OPTIMIZATION_EXTERNAL_WORKERS setting, the API only stores submitted jobs as pending and solves nothing
+itself. Workers that are started with ``python -m ensysmod worker`` on any machine with access to the database claim
+the jobs one at a time. A claimed job is leased to its worker, which renews the lease by a heartbeat while the job runs.
+If a worker dies, its lease expires and another worker claims the job again, up to WORKER_MAX_ATTEMPTS times.
+A worker that loses the lease, e.g. because it couldn't reach the database in time, kills its solver and discards
+its result, so that a job is never finished by two workers.
+
+On Postgres, the next job is claimed with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers never wait for each
+other. SQLite doesn't lock rows, there a job is claimed by an UPDATE that only succeeds if the job is still claimable.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from ensysmod import crud
+from ensysmod.core import settings
+from ensysmod.core.optimization_jobs import process_job
+from ensysmod.database.session import BackgroundSessionLocal, SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# interval in seconds at which an idle worker looks for new jobs
+WORKER_POLL_INTERVAL = 1.0
+
+
+def new_worker_id() -> str:
+    """
+    Return a unique ID of a worker process, which tells the machine and the process of the worker.
+    """
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+def run_worker(worker_id: str | None = None) -> None:
+    """
+    Claim and run optimization jobs until the process is stopped.
+
+    :param worker_id: ID of the worker, a new unique ID by default.
+    """
+    worker_id = worker_id or new_worker_id()
+    logger.info("Worker %s started.", worker_id)
+    try:
+        while True:
+            if not run_next_job(worker_id):
+                time.sleep(WORKER_POLL_INTERVAL)
+    except KeyboardInterrupt:
+        logger.info("Worker %s stopped.", worker_id)
+
+
+def run_next_job(worker_id: str) -> bool:
+    """
+    Claim the next optimization job and run it.
+
+    :param worker_id: ID of the worker
+    :return: Whether a job was claimed.
+    """
+    with SessionLocal() as db:
+        for job_id in crud.optimization_job.fail_expired(db, max_attempts=settings.WORKER_MAX_ATTEMPTS):
+            logger.warning("Optimization job %s failed, its workers stopped responding.", job_id)
+
+        job = crud.optimization_job.claim_next(
+            db,
+            worker=worker_id,
+            lease_seconds=settings.WORKER_LEASE_SECONDS,
+            max_attempts=settings.WORKER_MAX_ATTEMPTS,
+        )
+        if job is None:
+            return False
+
+        logger.info("Worker %s claimed optimization job %s (attempt %s).", worker_id, job.id, job.attempts)
+        with heartbeat(job.id, worker_id) as lease_lost:
+            process_job(db, job, worker=worker_id, lease_lost=lease_lost)
+        return True
+
+
+@contextmanager
+def heartbeat(job_id: int, worker_id: str) -> Iterator[threading.Event]:
+    """
+    Renew the lease of a job in a background thread while the context is active.
+
+    :return: Event that is set once the worker lost the lease, e.g. because another worker claimed the expired lease.
+    """
+    stopped = threading.Event()
+    lease_lost = threading.Event()
+
+    def renew() -> None:
+        while not stopped.wait(settings.WORKER_LEASE_SECONDS / 3):
+            try:
+                # the session of the job is in the middle of a transaction, which the heartbeat must not commit
+                with BackgroundSessionLocal() as db:
+                    if not crud.optimization_job.renew_lease(db, id=job_id, worker=worker_id, lease_seconds=settings.WORKER_LEASE_SECONDS):
+                        logger.warning("Worker %s lost the lease of optimization job %s.", worker_id, job_id)
+                        lease_lost.set()
+                        return
+            except Exception:
+                # the lease is renewed again at the next heartbeat, until then it may expire
+                logger.exception("Heartbeat of optimization job %s failed.", job_id)
+
+    thread = threading.Thread(target=renew, daemon=True)
+    thread.start()
+    try:
+        yield lease_lost
+    finally:
+        stopped.set()
+        thread.join()
@@ -0,0 +1,319 @@
+"""
+Myopic optimization of the transformation pathway of an energy system with checkpoints.
+
+The years of the pathway are optimized one after another like in optimizeSimpleMyopic() of FINE: the capacities that
+are installed in a year are the stock of the following years until their technical lifetime ends. Unlike FINE, the
+installed capacities are carried between the years as DataFrames and the energy system model is reused, only the stock
+components are added and removed. The result tables of all years are written once at the end as CSV files in a zip
+file, see core.result_tables, instead of an Excel file per year.
+
+After each year, the result tables of the year and the installed capacities are saved to a checkpoint directory. An
+optimization that failed or was interrupted resumes after the last completed year instead of starting over, and the
+results of the completed years can be read while the later years are still optimized.
+"""
+import copy
+import logging
+import pickle
+import re
+import shutil
+from collections.abc import Callable
+from io import BytesIO
+from pathlib import Path
+from zipfile import ZIP_DEFLATED, ZipFile
+
+import pandas as pd
+from fine import EnergySystemModel
+from fine import utils as fine_utils
+
+from ensysmod.core import settings
+from ensysmod.core.cache import hash_content
+from ensysmod.core.fine_esm import get_aggregation_kwargs
+from ensysmod.core.profiling import phase
+from ensysmod.core.result_tables import get_result_tables, write_csv_tables
+from ensysmod.core.solver import configured_solver
+from ensysmod.core.time_series_aggregation import cached_clustering
+from ensysmod.core.watchdog import check_stopped
+from ensysmod.model import EnergyModelAggregation, EnergyModelOptimization, EnergyModelSolver
+from ensysmod.utils.utils import create_temp_file
+
+logger = logging.getLogger(__name__)
+
+# version of the results and checkpoints of myopic optimizations, part of the cache key of their results
+RESULT_FORMAT_VERSION = 2
+
+# file of the checkpoint in the checkpoint directory: the checkpoint key, the next step and the installed capacities
+CHECKPOINT_FILE_NAME = "checkpoint.pkl"
+
+# file of the result tables of a year in the checkpoint directory
+YEAR_TABLES_FILE_PATTERN = re.compile(r"tables_(\d+)\.pkl")
+
+# directory of the result tables of a year in the zipped result
+YEAR_DIR_PATTERN = re.compile(r"(\d+)/")
+
+# name of a stock component, see stock_component_name()
+STOCK_COMPONENT_PATTERN = re.compile(r"(.+)_stock_(\d+)")
+
+# installed capacities of the components by the year in which they were installed
+Capacities = dict[int, dict[str, pd.Series | pd.DataFrame]]
+
+
+def year_tables_file_name(year: int) -> str:
+    return f"tables_{year}.pkl"
+
+
+def get_years(optimization_parameters: EnergyModelOptimization) -> tuple[list[int], int]:
+    """
+    Return the optimized years of a myopic optimization and the number of years that each optimization represents.
+    """
+    # the validation of the optimization parameters derives the number of steps and the years per step, possibly as floats
+    number_of_steps = int(optimization_parameters.number_of_steps)
+    years_per_step = int(optimization_parameters.years_per_step)
+    return [optimization_parameters.start_year + step * years_per_step for step in range(number_of_steps + 1)], years_per_step
+
+
+def myopic_optimize_esm(
+    esM: EnergySystemModel,
+    optimization_parameters: EnergyModelOptimization,
+    aggregation_parameters: EnergyModelAggregation | None = None,
+    aggregation_cache_key: str | None = None,
+    solver_parameters: EnergyModelSolver | None = None,
+    checkpoint_dir: Path | None = None,
+    checkpoint_key: str | None = None,
+    on_year_optimized: Callable[[int, float, dict[str, pd.DataFrame]], None] | None = None,
+) -> Path:
+    """
+    Optimization function for myopic approach. For each optimization run, the newly installed capacities
+    will be given as a stock (with capacityFix) to the next optimization run.
+    FINE doesn't segment the typical periods of a myopic optimization, so the segmentation parameters are ignored.
+
+    :param aggregation_cache_key: Key of the time series in the aggregation cache, None to cluster the time series without cache.
+    :param checkpoint_dir: Directory of the checkpoints, None to optimize without checkpoints.
+    :param checkpoint_key: Key of the model and its parameters. A checkpoint of another key is discarded.
+    :param on_year_optimized: Called with the year, the objective value and the result tables of each optimized year
+        before its checkpoint is saved, e.g. to store the result in the database.
+    :return: Path of a zip file with a directory of CSV files with the result tables of each year.
+    """
+    years, _ = get_years(optimization_parameters)
+    CO2_reference = optimization_parameters.CO2_reference
+    CO2_reduction_targets = optimization_parameters.CO2_reduction_targets
+    if CO2_reduction_targets is not None:
+        check_CO2_optimization_sink(esM)
+        fine_utils.checkCO2ReductionTargets(CO2_reduction_targets, len(years) - 1)
+
+    aggregation_kwargs = {
+        key: value
+        for key, value in get_aggregation_kwargs(esM, aggregation_parameters).items()
+        if key in ("numberOfTypicalPeriods", "numberOfTimeStepsPerPeriod", "clusterMethod")
+    }
+
+    # the components of the model, without the stock components that are added for the installed capacities
+    component_names = set(esM.componentNames)
+    first_step = 0
+    capacities: Capacities = {}
+    year_tables = {}
+    if checkpoint_dir is not None:
+        checkpoint = read_checkpoint(checkpoint_dir, checkpoint_key)
+        if checkpoint is not None:
+            first_step, capacities = checkpoint
+            logger.info("Resuming the myopic optimization after the year %s.", years[first_step - 1])
+            year_tables = {year: read_year_tables(checkpoint_dir, year) for year in years[:first_step]}
+
+    with phase("myopic_optimization"), configured_solver(solver_parameters) as solver_kwargs:
+        for step in range(first_step, len(years)):
+            year = years[step]
+            logger.info("Optimizing the year %s.", year)
+            update_stock(esM, capacities, year)
+            fine_utils.setNewCO2ReductionTarget(esM, CO2_reference, CO2_reduction_targets, step)
+            # the stock of the previous years changes the time series, so each year has its own clustering
+            year_cache_key = hash_content({"cache_key": aggregation_cache_key, "year": year}) if aggregation_cache_key is not None else None
+            with cached_clustering(year_cache_key):
+                esM.aggregateTemporally(
+                    **aggregation_kwargs,
+                    segmentation=False,
+                    sortValues=True,
+                    rescaleClusterPeriods=True,
+                    representationMethod=None,
+                )
+            esM.optimize(declaresOptimizationProblem=True, timeSeriesAggregation=True, **solver_kwargs)
+            # FINE only warns about a solver that was killed by the watchdog, the result of the year is invalid
+            check_stopped()
+
+            year_tables[year] = get_result_tables(esM)
+            capacities[year] = get_installed_capacities(esM, component_names)
+            if on_year_optimized is not None:
+                on_year_optimized(year, esM.objectiveValue, year_tables[year])
+            if checkpoint_dir is not None:
+                write_year_tables(checkpoint_dir, year, year_tables[year])
+                write_checkpoint(checkpoint_dir, checkpoint_key, step + 1, capacities)
+
+    zipped_result_file_path = create_temp_file(dir=settings.OPTIMIZATION_RESULT_DIR, prefix="ensysmod_result_", suffix=".zip")
+    with phase("write_output"), ZipFile(zipped_result_file_path, "w", compression=ZIP_DEFLATED) as zip_file:
+        for year, tables in year_tables.items():
+            write_csv_tables(zip_file, tables, prefix=f"{year}/")
+    return zipped_result_file_path
+
+
+def get_installed_capacities(esM: EnergySystemModel, component_names: set[str]) -> dict[str, pd.Series | pd.DataFrame]:
+    """
+    Return the capacities that were installed in the optimized year: the optimal capacities of the components of the model.
+
+    Components without capacity are left out, they don't need a stock component.
+
+    :param component_names: Names of the components of the model, without the stock components.
+    :return: Capacity of each location or, for transmission components, of each pair of locations by component name.
+    """
+    capacities = {}
+    for model in esM.componentModelingDict.values():
+        values = model.getOptimalValues("capacityVariablesOptimum", ip=0)["values"]
+        if values is None:
+            continue
+        for component_name in values.index.get_level_values(0).unique():
+            capacity = values.loc[component_name]
+            if component_name in component_names and capacity.fillna(0).to_numpy().any():
+                capacities[component_name] = capacity
+    return capacities
+
+
+def stock_component_name(component_name: str, year: int) -> str:
+    """
+    Return the name of the stock component of the capacities of a component that were installed in a year, as in FINE.
+    """
+    return f"{component_name}_stock_{year}"
+
+
+def stock_origin(component_name: str) -> str:
+    """
+    Return the name of the component whose installed capacities a stock component holds, the name itself for other components.
+    """
+    match = STOCK_COMPONENT_PATTERN.fullmatch(component_name)
+    return match[1] if match else component_name
+
+
+def update_stock(esM: EnergySystemModel, capacities: Capacities, year: int) -> None:
+    """
+    Add a stock component with the fixed capacities of each component that were installed in an earlier year and are
+    still in operation, and remove the stock components whose technical lifetime ended.
+
+    Like getStock() of FINE, the capacities installed in year V are in operation in year Y if the technical lifetime of
+    the component is longer than Y - V in all locations.
+
+    :param capacities: Installed capacities of the components by the year in which they were installed.
+    :param year: The year that is optimized next.
+    """
+    for installation_year, installed_capacities in capacities.items():
+        if installation_year >= year:
+            continue
+        for component_name, capacity in installed_capacities.items():
+            stock_name = stock_component_name(component_name, installation_year)
+            component = esM.getComponent(component_name)
+            if (component.technicalLifetime - (year - installation_year) <= 0).any():
+                if stock_name in esM.componentNames:
+                    esM.removeComponent(stock_name)
+                continue
+            if stock_name in esM.componentNames:
+                continue
+
+            stock_component = copy.deepcopy(component)
+            stock_component.name = stock_name
+            # a fixed capacity of the component also fixes the capacity of its stock
+            if stock_component.capacityFix is None:
+                if isinstance(capacity, pd.DataFrame):
+                    # FINE marks the missing connections of transmission components with -1
+                    stock_component.processedCapacityFix = {0: fine_utils.preprocess2dimData(capacity.fillna(value=-1), discard=False)}
+                else:
+                    stock_component.processedCapacityFix = {0: capacity}
+            esM.add(stock_component)
+
+
+def write_year_tables(checkpoint_dir: Path, year: int, tables: dict[str, pd.DataFrame]) -> None:
+    """
+    Save the result tables of an optimized year. The file only appears under its name when it is complete.
+    """
+    partial_file_path = checkpoint_dir / f"{year_tables_file_name(year)}.partial"
+    with partial_file_path.open("wb") as file:
+        pickle.dump(tables, file, protocol=pickle.HIGHEST_PROTOCOL)
+    partial_file_path.replace(checkpoint_dir / year_tables_file_name(year))
+
+
+def read_year_tables(checkpoint_dir: Path, year: int) -> dict[str, pd.DataFrame]:
+    """
+    Return the result tables of an optimized year in a checkpoint directory.
+    """
+    with (checkpoint_dir / year_tables_file_name(year)).open("rb") as file:
+        return pickle.load(file)
+
+
+def write_checkpoint(checkpoint_dir: Path, checkpoint_key: str | None, next_step: int, capacities: Capacities) -> None:
+    """
+    Save the installed capacities after a step. A checkpoint is replaced only when the new one is complete.
+    """
+    partial_file_path = checkpoint_dir / f"{CHECKPOINT_FILE_NAME}.partial"
+    with partial_file_path.open("wb") as file:
+        pickle.dump((checkpoint_key, next_step, capacities), file, protocol=pickle.HIGHEST_PROTOCOL)
+    partial_file_path.replace(checkpoint_dir / CHECKPOINT_FILE_NAME)
+
+
+def read_checkpoint(checkpoint_dir: Path, checkpoint_key: str | None) -> tuple[int, Capacities] | None:
+    """
+    Return the next step and the installed capacities of the last checkpoint, None if there is none.
+
+    A checkpoint of another key, e.g. of a model that was changed in the meantime, is deleted with the result tables.
+    """
+    checkpoint_file_path = checkpoint_dir / CHECKPOINT_FILE_NAME
+    if not checkpoint_file_path.is_file():
+        return None
+    with checkpoint_file_path.open("rb") as file:
+        key, next_step, capacities = pickle.load(file)
+    if key != checkpoint_key:
+        logger.warning("The model was changed since the checkpoint in %s, the myopic optimization starts over.", checkpoint_dir)
+        shutil.rmtree(checkpoint_dir)
+        checkpoint_dir.mkdir()
+        return None
+    return next_step, capacities
+
+
+def get_completed_years(checkpoint_dir: Path) -> list[int]:
+    """
+    Return the years whose result tables are in a checkpoint directory.
+    """
+    if not checkpoint_dir.is_dir():
+        return []
+    return sorted(int(match[1]) for path in checkpoint_dir.iterdir() if (match := YEAR_TABLES_FILE_PATTERN.fullmatch(path.name)))
+
+
+def get_zipped_years(result_file_path: Path) -> list[int]:
+    """
+    Return the years whose result tables are in the zipped result of a myopic optimization.
+    """
+    with ZipFile(result_file_path) as zip_file:
+        return sorted({int(match[1]) for name in zip_file.namelist() if (match := YEAR_DIR_PATTERN.match(name))})
+
+
+def read_year_result(year: int, checkpoint_dir: Path | None = None, result_file_path: Path | None = None) -> bytes:
+    """
+    Return a zip file with CSV files of the result tables of an optimized year.
+
+    :param checkpoint_dir: Checkpoint directory of the running myopic optimization.
+    :param result_file_path: Zipped result of the finished myopic optimization, if there is no checkpoint directory.
+    """
+    buffer = BytesIO()
+    with ZipFile(buffer, "w", compression=ZIP_DEFLATED) as year_zip_file:
+        if checkpoint_dir is not None:
+            write_csv_tables(year_zip_file, read_year_tables(checkpoint_dir, year))
+        else:
+            with ZipFile(result_file_path) as zip_file:
+                for name in zip_file.namelist():
+                    if name.startswith(f"{year}/"):
+                        year_zip_file.writestr(name.removeprefix(f"{year}/"), zip_file.read(name))
+    return buffer.getvalue()
+
+
+def check_CO2_optimization_sink(esM: EnergySystemModel) -> None:
+    """
+    Checks the required Sink component for the CO2 optimization to function properly.
+    """
+    if ("CO2 to environment", "SourceSinkModel") not in esM.componentNames.items():
+        raise ValueError("Sink component with the name 'CO2 to environment' is required.")
+
+    if esM.getComponentAttribute(componentName="CO2 to environment", attributeName="commodityLimitID") is None:
+        raise ValueError("Commodity limit ID of the sink component 'CO2 to environment' must be specified.")
@@ -0,0 +1,777 @@
+"""
+Execution of optimization jobs in a pool of worker processes.
+
+Jobs are stored in the database and only their ID is handed to the worker processes,
+so a solve never blocks the threads that answer API requests. Instead of the worker processes of the API,
+dedicated workers on other machines can claim the jobs from the database, see core.job_queue.
+A watchdog stops jobs that are cancelled, exceed their timeout or the memory limit, see core.watchdog.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import shutil
+import threading
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from fine import EnergySystemModel
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from ensysmod import crud
+from ensysmod.core import settings
+from ensysmod.core.cache import hash_content, result_cache
+from ensysmod.core.esm_cache import override_parameters_key
+from ensysmod.core.fine_esm import (
+    aggregate_and_optimize_esm,
+    build_esm,
+    generate_esm_from_model,
+    get_esm_data,
+    get_solution,
+    optimize_esm,
+    read_solution,
+    write_solution,
+)
+from ensysmod.core.job_log import job_logged, read_log_lines, server_sent_event
+from ensysmod.core.myopic import RESULT_FORMAT_VERSION, get_completed_years, get_zipped_years, myopic_optimize_esm, read_year_result
+from ensysmod.core.problem_size import check_model_problem_size
+from ensysmod.core.profiling import phase, profiled, server_timing
+from ensysmod.core.result_store import share_stored_results, store_result
+from ensysmod.core.result_tables import get_result_tables
+from ensysmod.core.rolling_horizon import get_capacities, get_window_sizes, rolling_horizon_optimize_esm
+from ensysmod.core.scenario_sweep import optimize_scenarios
+from ensysmod.core.solver_options import get_solver_name
+from ensysmod.core.spatial_aggregation import aggregate_model_regions
+from ensysmod.core.time_series_aggregation import time_series_cache_key
+from ensysmod.core.watchdog import OptimizationStoppedError, check_stopped, supervised
+from ensysmod.database.session import BackgroundSessionLocal, SessionLocal
+from ensysmod.model import OptimizationJob, OptimizationJobStatus, OptimizationJobType, OptimizationResultFormat
+from ensysmod.schemas import EnergyModelAggregationSchema, EnergyModelSolverSchema
+from ensysmod.utils.utils import create_temp_dir, create_temp_file
+
+logger = logging.getLogger(__name__)
+
+# statuses of jobs that are done
+FINAL_STATUSES = (OptimizationJobStatus.FINISHED, OptimizationJobStatus.FAILED, OptimizationJobStatus.CANCELLED)
+
+# interval in seconds at which the status of a job of a dedicated worker is polled
+JOB_POLL_INTERVAL = 0.5
+
+# interval in seconds at which the log of a job is checked for new lines while it is streamed
+LOG_POLL_INTERVAL = 0.5
+
+# format of the result file of an OPTIMIZE job that doesn't select one, Excel files are slow to write for big models
+DEFAULT_RESULT_FORMAT = OptimizationResultFormat.PARQUET
+
+# format of the result file of the synchronous optimization endpoint, which only returned Excel files before the job API
+SYNCHRONOUS_RESULT_FORMAT = OptimizationResultFormat.EXCEL
+
+_executor: Executor | None = None
+
+
+def get_executor() -> Executor:
+    """
+    Return the process pool for optimization jobs. The pool is created on first use.
+
+    Worker processes can't reach an in-memory database, so jobs run in a thread of the API process in that case.
+    """
+    global _executor
+    if _executor is None:
+        if settings.SQLALCHEMY_DATABASE_URI == "sqlite://":
+            _executor = ThreadPoolExecutor(max_workers=settings.OPTIMIZATION_WORKERS)
+        else:
+            # spawn fresh interpreters, forked workers would inherit the database connection of the API process
+            _executor = ProcessPoolExecutor(max_workers=settings.OPTIMIZATION_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """
+    Shut down the process pool. Pending jobs are cancelled, running jobs are finished by their worker.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def submit_job(db: Session, job: OptimizationJob) -> Future | None:
+    """
+    Submit an optimization job to the process pool.
+
+    If the result of an identical optimization is cached, the job is finished immediately instead.
+    With dedicated workers, the job stays pending until a worker claims it, see core.job_queue.
+
+    :param db: Database session
+    :param job: The pending optimization job.
+    :return: Future that is done as soon as the job is finished or failed, None if a dedicated worker runs the job.
+    """
+    cache_key = result_cache_key(job)
+    cached_file_path = copy_cached_result(job, cache_key)
+    if cached_file_path is not None:
+        share_stored_results(db, job, cache_key)
+        now = _now()
+        cached_solution_file_path = copy_cached_solution(cache_key)
+        crud.optimization_job.update(
+            db,
+            db_obj=job,
+            obj_in={
+                "status": OptimizationJobStatus.FINISHED,
+                "started_at": now,
+                "finished_at": now,
+                "result_file": str(cached_file_path),
+                "solution_file": str(cached_solution_file_path) if cached_solution_file_path is not None else None,
+            },
+        )
+        future = Future()
+        future.set_result(None)
+        return future
+    if settings.OPTIMIZATION_EXTERNAL_WORKERS:
+        return None
+    return get_executor().submit(run_job, job.id)
+
+
+def wait_for_job(db: Session, job: OptimizationJob, future: Future | None, timeout: float) -> bool:
+    """
+    Wait until an optimization job is finished, failed or cancelled.
+
+    :param db: Database session
+    :param job: The submitted optimization job, which is refreshed.
+    :param future: Future of the job in the process pool, None if a dedicated worker runs the job.
+    :param timeout: Maximum time to wait in seconds
+    :return: Whether the job is done.
+    """
+    if future is not None:
+        wait([future], timeout=timeout)
+        db.refresh(job)
+        return future.done()
+
+    deadline = time.monotonic() + timeout
+    while True:
+        db.refresh(job)
+        if job.status in FINAL_STATUSES:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(min(JOB_POLL_INTERVAL, deadline - time.monotonic()))
+
+
+def fail_interrupted_jobs(db: Session) -> None:
+    """
+    Mark all jobs as failed that were pending or running when the server stopped.
+
+    Jobs of dedicated workers are left to the workers, which claim the jobs of stopped workers again.
+    """
+    if settings.OPTIMIZATION_EXTERNAL_WORKERS:
+        return
+    for job in crud.optimization_job.get_multi_unfinished(db):
+        crud.optimization_job.update(
+            db,
+            db_obj=job,
+            obj_in={"status": OptimizationJobStatus.FAILED, "finished_at": _now(), "error": "Interrupted by a restart of the server."},
+        )
+
+
+def run_job(job_id: int) -> None:
+    """
+    Run an optimization job. This function is executed inside a worker process of the pool.
+
+    :param job_id: ID of the optimization job.
+    """
+    with SessionLocal() as db:
+        job = crud.optimization_job.get(db, id=job_id)
+        if job is None or job.status != OptimizationJobStatus.PENDING:
+            return  # job was deleted or cancelled before a worker picked it up
+
+        crud.optimization_job.update(db, db_obj=job, obj_in={"status": OptimizationJobStatus.RUNNING, "started_at": _now()})
+        process_job(db, job)
+
+
+def process_job(db: Session, job: OptimizationJob, *, worker: str | None = None, lease_lost: threading.Event | None = None) -> None:
+    """
+    Execute a running optimization job and store its result, or its error if it fails.
+
+    A dedicated worker only stores the result while it holds the lease of the job. If it loses the lease, the watchdog
+    kills the solver, because another worker may run the job again.
+
+    :param db: Database session
+    :param job: The running optimization job.
+    :param worker: ID of the dedicated worker that claimed the job, None for the worker processes of the API.
+    :param lease_lost: Event of the heartbeat of the dedicated worker, which is set once the worker lost the lease.
+    """
+    log_file_path = create_temp_file(dir=settings.OPTIMIZATION_RESULT_DIR, prefix="ensysmod_log_", suffix=".log")
+    crud.optimization_job.update(db, db_obj=job, obj_in={"log_file": str(log_file_path)})
+    with (
+        job_logged(log_file_path),
+        profiled() as phases,
+        supervised(
+            is_cancelled=functools.partial(is_cancel_requested, job.id, lease_lost),
+            timeout=get_job_timeout(job),
+            memory_limit_mb=settings.OPTIMIZATION_MEMORY_LIMIT_MB,
+        ) as watchdog,
+    ):
+        try:
+            result_file_path, solution_file_path = execute_job(db, job, worker=worker)
+        except Exception as e:
+            # the error of the solver that was killed by the watchdog doesn't tell why it was killed
+            error = watchdog.error or str(e)
+            if watchdog.cancelled:
+                logger.info("Optimization job %s was cancelled.", job.id)
+            else:
+                logger.exception("Optimization job %s failed.", job.id)
+            db.rollback()
+            db.refresh(job)
+            finish_job(
+                db,
+                job,
+                worker,
+                {
+                    "status": OptimizationJobStatus.CANCELLED if watchdog.cancelled else OptimizationJobStatus.FAILED,
+                    "finished_at": _now(),
+                    "error": error,
+                    "timing": phases,
+                },
+            )
+            return
+
+        logger.info("Optimization job %s finished: %s", job.id, server_timing(phases))
+    finished = finish_job(
+        db,
+        job,
+        worker,
+        {
+            "status": OptimizationJobStatus.FINISHED,
+            "finished_at": _now(),
+            "result_file": str(result_file_path),
+            "solution_file": str(solution_file_path) if solution_file_path is not None else None,
+            "timing": phases,
+        },
+    )
+    if not finished:
+        for file_path in (result_file_path, solution_file_path):
+            if file_path is not None:
+                file_path.unlink(missing_ok=True)
+
+
+def finish_job(db: Session, job: OptimizationJob, worker: str | None, obj_in: dict[str, Any]) -> bool:
+    """
+    Store the final status of a job, unless the dedicated worker of the job lost its lease.
+
+    :param worker: ID of the dedicated worker that claimed the job, None for the worker processes of the API.
+    :param obj_in: Final status of the job and its result or error.
+    :return: Whether the final status was stored.
+    """
+    if worker is None:
+        crud.optimization_job.update(db, db_obj=job, obj_in=obj_in)
+        return True
+    if crud.optimization_job.update_leased(db, db_obj=job, worker=worker, obj_in=obj_in):
+        return True
+    logger.warning("Worker %s lost the lease of optimization job %s, its result is discarded.", worker, job.id)
+    return False
+
+
+def check_lease(db: Session, job: OptimizationJob, worker: str | None) -> None:
+    """
+    Raise an error if the dedicated worker of a job lost its lease, so that it doesn't store results of a job that
+    another worker runs again.
+
+    :param worker: ID of the dedicated worker that claimed the job, None for the worker processes of the API.
+    """
+    if worker is not None and not crud.optimization_job.holds_lease(db, id=job.id, worker=worker):
+        raise OptimizationStoppedError(f"Worker {worker} lost the lease of the optimization job.")
+
+
+async def stream_job_log(job_id: int, offset: int = 0) -> AsyncIterator[str]:
+    """
+    Stream the log of an optimization job as server-sent events until the job is finished, failed or cancelled.
+
+    Every new line of the log is sent as ``log`` event, whose ID is the position after the line in the log file,
+    and every change of the status of the job as ``status`` event. The job and its log are read in the thread pool,
+    no thread is blocked while the stream waits for new lines.
+
+    :param job_id: ID of the optimization job.
+    :param offset: Position in the log file after which the lines are sent.
+    """
+    job_status = None
+    while True:
+        job = await run_in_threadpool(get_job_log_file, job_id)
+        if job is None:
+            return  # job was deleted
+
+        # the log is complete once the status is final, because the status is updated after the log is written
+        status, log_file = job
+        if log_file is not None:
+            for line, line_end in await run_in_threadpool(read_log_lines, Path(log_file), offset):
+                offset = line_end
+                yield server_sent_event("log", line, event_id=offset)
+        if status != job_status:
+            job_status = status
+            yield server_sent_event("status", job_status.value)
+        if job_status in FINAL_STATUSES:
+            return
+        await asyncio.sleep(LOG_POLL_INTERVAL)
+
+
+def get_job_log_file(job_id: int) -> tuple[OptimizationJobStatus, str | None] | None:
+    """
+    Return the status and the log file of an optimization job, None if the job was deleted.
+    """
+    with SessionLocal() as db:
+        job = crud.optimization_job.get(db, id=job_id)
+        return (job.status, job.log_file) if job is not None else None
+
+
+def remove_job(db: Session, job: OptimizationJob) -> OptimizationJob:
+    """
+    Delete an optimization job that isn't running, its result file, its stored results, its solution, its log and its checkpoints.
+
+    :param db: Database session
+    :param job: The optimization job.
+    :return: The deleted optimization job.
+    """
+    for file in (job.result_file, job.solution_file, job.log_file):
+        if file is not None:
+            Path(file).unlink(missing_ok=True)
+    if job.checkpoint_dir is not None:
+        shutil.rmtree(job.checkpoint_dir, ignore_errors=True)
+    crud.optimization_result.remove_by_job(db, job_id=job.id)
+    return crud.optimization_job.remove(db, id=job.id)
+
+
+def remove_transient_job(job_id: int) -> None:
+    """
+    Delete the job of a synchronous optimization once its result file was sent. Runs as background task of the response.
+
+    :param job_id: ID of the optimization job.
+    """
+    with SessionLocal() as db:
+        job = crud.optimization_job.get(db, id=job_id)
+        if job is not None:
+            remove_job(db, job)
+
+
+def cancel_job(db: Session, job: OptimizationJob) -> OptimizationJob:
+    """
+    Cancel a pending or running optimization job.
+
+    A pending job is cancelled immediately. A running job is cancelled by the watchdog of its worker, which kills the
+    solver and marks the job as cancelled, see core.watchdog.
+
+    :param db: Database session
+    :param job: The pending or running optimization job.
+    :return: The updated optimization job.
+    """
+    if job.status == OptimizationJobStatus.PENDING:
+        # the cancellation is also requested in case a dedicated worker claims the job at the same time
+        return crud.optimization_job.update(
+            db,
+            db_obj=job,
+            obj_in={
+                "status": OptimizationJobStatus.CANCELLED,
+                "finished_at": _now(),
+                "error": "The optimization was cancelled.",
+                "cancel_requested": True,
+            },
+        )
+    return crud.optimization_job.update(db, db_obj=job, obj_in={"cancel_requested": True})
+
+
+def is_cancel_requested(job_id: int, lease_lost: threading.Event | None = None) -> bool:
+    """
+    Return whether the cancellation of a running job was requested or its dedicated worker lost the lease. Called by the
+    watchdog thread of the worker, which doesn't share the connection of the job.
+    """
+    if lease_lost is not None and lease_lost.is_set():
+        return True
+    with BackgroundSessionLocal() as db:
+        return crud.optimization_job.is_cancel_requested(db, id=job_id)
+
+
+def get_job_timeout(job: OptimizationJob) -> int | None:
+    """
+    Return the wall-clock timeout of a job in seconds: the shorter of the timeout of the job and of the server.
+    """
+    timeouts = [timeout for timeout in (job.timeout, settings.OPTIMIZATION_TIMEOUT_SECONDS) if timeout is not None]
+    return min(timeouts, default=None)
+
+
+def execute_job(db: Session, job: OptimizationJob, *, worker: str | None = None) -> tuple[Path, Path | None]:
+    """
+    Generate the energy system model of the job and optimize it. A scenario sweep optimizes the energy system model of each scenario.
+
+    If the result of an identical optimization is cached, the cached result is returned instead.
+
+    :param db: Database session
+    :param job: The optimization job.
+    :param worker: ID of the dedicated worker that claimed the job, None for the worker processes of the API.
+    :return: Path to the result file and path to the solution of an OPTIMIZE job.
+    """
+    energy_model = job.model
+    if job.type == OptimizationJobType.MYOPIC_OPTIMIZE and energy_model.optimization_parameters is None:
+        raise ValueError(f"Optimization parameters for EnergyModel {energy_model.id} not found!")
+
+    cache_key = result_cache_key(job)
+    cached_file_path = copy_cached_result(job, cache_key)
+    if cached_file_path is not None:
+        check_lease(db, job, worker)
+        share_stored_results(db, job, cache_key)
+        return cached_file_path, copy_cached_solution(cache_key)
+
+    esM, esm_data = load_job_model(db, job)
+    # don't cache the result if the dataset was changed while it was read
+    db.refresh(energy_model.dataset)
+    cacheable = result_cache_key(job) == cache_key
+    # all models of a dataset that don't override operation rates share the clusterings of the time series
+    number_of_regions = energy_model.aggregation_parameters.number_of_regions if energy_model.aggregation_parameters else None
+    aggregation_cache_key = (
+        time_series_cache_key(energy_model.dataset.fingerprint, override_parameters_key(energy_model.override_parameters), number_of_regions)
+        if cacheable
+        else None
+    )
+
+    solution_file_path = None
+    if job.type == OptimizationJobType.SCENARIO_SWEEP:
+        aggregation_parameters = energy_model.aggregation_parameters
+        solver_parameters = energy_model.solver_parameters
+        with phase("optimize_scenarios"):
+            result_file_path = optimize_scenarios(
+                esm_data=esm_data,
+                scenarios=job.scenarios,
+                aggregation_parameters=EnergyModelAggregationSchema.model_validate(aggregation_parameters) if aggregation_parameters else None,
+                aggregation_cache_key=aggregation_cache_key,
+                solver_parameters=EnergyModelSolverSchema.model_validate(solver_parameters) if solver_parameters else None,
+            )
+    elif job.type == OptimizationJobType.ROLLING_HORIZON:
+        window_time_steps, overlap_time_steps = get_window_sizes(job.window_time_steps, job.overlap_time_steps)
+        result_file_path = rolling_horizon_optimize_esm(
+            esm_data=esm_data,
+            capacities=get_rolling_horizon_capacities(db, job, esm_data, aggregation_cache_key),
+            window_time_steps=window_time_steps,
+            overlap_time_steps=overlap_time_steps,
+            solver_parameters=energy_model.solver_parameters,
+        )
+    elif job.type == OptimizationJobType.MYOPIC_OPTIMIZE:
+        checkpoint_dir = get_checkpoint_dir(db, job)
+        # the years of a checkpoint of another key are optimized again, e.g. because the model was changed
+        crud.optimization_result.remove_by_job(db, job_id=job.id, except_cache_key=cache_key)
+        result_file_path = myopic_optimize_esm(
+            esM=esM,
+            optimization_parameters=energy_model.optimization_parameters,
+            aggregation_parameters=energy_model.aggregation_parameters,
+            aggregation_cache_key=aggregation_cache_key,
+            solver_parameters=energy_model.solver_parameters,
+            checkpoint_dir=checkpoint_dir,
+            checkpoint_key=cache_key,
+            on_year_optimized=functools.partial(store_year_result, db, job, cache_key=cache_key, worker=worker),
+        )
+        # the result files of all years are in the result file now
+        crud.optimization_job.update(db, db_obj=job, obj_in={"checkpoint_dir": None})
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    else:
+        result_file_path = optimize_esm(
+            esM=esM,
+            aggregation_parameters=energy_model.aggregation_parameters,
+            aggregation_cache_key=aggregation_cache_key,
+            solver_parameters=energy_model.solver_parameters,
+            warm_start_solution=get_warm_start_solution(db, job),
+            result_format=get_result_format(job),
+        )
+        # FINE only warns about a solver that was killed by the watchdog, the result of the optimization is invalid
+        check_stopped()
+        with phase("write_solution"):
+            solution_file_path = write_solution(esM)
+        with phase("store_result"):
+            check_lease(db, job, worker)
+            store_result(db, job, esM.objectiveValue, get_result_tables(esM), cache_key=cache_key)
+
+    check_stopped()
+    if cacheable:
+        result_cache.put(cache_key, result_file_path)
+        if solution_file_path is not None:
+            result_cache.put(solution_cache_key(cache_key), solution_file_path)
+    return result_file_path, solution_file_path
+
+
+def load_job_model(db: Session, job: OptimizationJob) -> tuple[EnergySystemModel | None, dict[str, Any] | None]:
+    """
+    Check that the problem of a job doesn't exceed the limits of the server, the dataset may have grown since the job
+    was submitted. Then read the ESM data of a scenario sweep or a rolling horizon job or generate the ESM of any other job.
+
+    :return: ESM of the job, None for a scenario sweep or a rolling horizon, and ESM data of the job, None for any other job.
+    """
+    energy_model = job.model
+    esm_data = None
+    if job.type in (OptimizationJobType.SCENARIO_SWEEP, OptimizationJobType.ROLLING_HORIZON):
+        with phase("read_database"):
+            esm_data = get_esm_data(db=db, model=energy_model)
+    check_model_problem_size(
+        db,
+        energy_model,
+        job_type=job.type,
+        number_of_scenarios=len(job.scenarios or ()),
+        window_time_steps=sum(get_window_sizes(job.window_time_steps, job.overlap_time_steps)),
+        esm_data=esm_data,
+    )
+
+    if job.type == OptimizationJobType.SCENARIO_SWEEP:
+        return None, esm_data
+    if job.type == OptimizationJobType.ROLLING_HORIZON:
+        return None, aggregate_model_regions(esm_data, energy_model.aggregation_parameters)
+    return generate_esm_from_model(db=db, model=energy_model), None
+
+
+def store_year_result(
+    db: Session,
+    job: OptimizationJob,
+    year: int,
+    objective_value: float,
+    tables: dict[str, pd.DataFrame],
+    *,
+    cache_key: str,
+    worker: str | None = None,
+) -> None:
+    """
+    Store the result of an optimized year of a myopic optimization job, see myopic_optimize_esm().
+    """
+    with phase("store_result"):
+        check_lease(db, job, worker)
+        store_result(db, job, objective_value, tables, year=year, cache_key=cache_key)
+
+
+def get_checkpoint_dir(db: Session, job: OptimizationJob) -> Path:
+    """
+    Return the checkpoint directory of a myopic optimization job. The directory is created when the job runs the first time.
+    """
+    if job.checkpoint_dir is not None:
+        return Path(job.checkpoint_dir)
+    checkpoint_dir = create_temp_dir(dir=settings.OPTIMIZATION_RESULT_DIR, prefix="ensysmod_checkpoint_")
+    crud.optimization_job.update(db, db_obj=job, obj_in={"checkpoint_dir": str(checkpoint_dir)})
+    return checkpoint_dir
+
+
+def get_job_years(job: OptimizationJob) -> list[int]:
+    """
+    Return the years of a myopic optimization job whose result is available, also while the later years are optimized.
+    """
+    if job.status == OptimizationJobStatus.FINISHED and job.result_file is not None:
+        return get_zipped_years(Path(job.result_file))
+    if job.checkpoint_dir is not None:
+        return get_completed_years(Path(job.checkpoint_dir))
+    return []
+
+
+def read_job_year_result(job: OptimizationJob, year: int) -> bytes | None:
+    """
+    Return a zip file with the result tables of a year of a myopic optimization job, None if the year isn't optimized yet.
+    """
+    if year not in get_job_years(job):
+        return None
+    if job.checkpoint_dir is not None:
+        return read_year_result(year, checkpoint_dir=Path(job.checkpoint_dir))
+    return read_year_result(year, result_file_path=Path(job.result_file))
+
+
+def resume_job(db: Session, job: OptimizationJob) -> OptimizationJob:
+    """
+    Submit a failed or cancelled optimization job again. A myopic optimization resumes after the last completed year.
+
+    :param db: Database session
+    :param job: The failed or cancelled optimization job.
+    :return: The pending optimization job.
+    """
+    job = crud.optimization_job.update(
+        db,
+        db_obj=job,
+        obj_in={
+            "status": OptimizationJobStatus.PENDING,
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "cancel_requested": False,
+            "attempts": 0,
+        },
+    )
+    submit_job(db, job)
+    return job
+
+
+def get_warm_start_solution(db: Session, job: OptimizationJob) -> dict[str, dict[Any, float]] | None:
+    """
+    Return the solution that the solver of a job starts from, None to start cold.
+
+    A warm start only speeds up the solver, so the job starts cold if the solution was deleted in the meantime.
+    """
+    if job.ref_warm_start_job is None:
+        return None
+    warm_start_job = crud.optimization_job.get(db, id=job.ref_warm_start_job)
+    if warm_start_job is None or warm_start_job.solution_file is None or not Path(warm_start_job.solution_file).is_file():
+        logger.warning("Optimization job %s: Solution of optimization job %s not found.", job.id, job.ref_warm_start_job)
+        return None
+    logger.info("Optimization job %s: Using the solution of optimization job %s.", job.id, job.ref_warm_start_job)
+    return read_solution(warm_start_job.solution_file)
+
+
+def get_rolling_horizon_capacities(
+    db: Session,
+    job: OptimizationJob,
+    esm_data: dict[str, Any],
+    aggregation_cache_key: str | None,
+) -> dict[str, dict[str, float]]:
+    """
+    Return the capacities that a rolling horizon job fixes: the capacities of the solution of the referenced job or, without
+    a reference, of an optimization of the energy model with typical periods.
+    """
+    solution = get_warm_start_solution(db, job)
+    if solution is None:
+        with phase("build_esm"):
+            esM = build_esm(esm_data)
+        aggregate_and_optimize_esm(
+            esM,
+            aggregation_parameters=job.model.aggregation_parameters,
+            aggregation_cache_key=aggregation_cache_key,
+            solver_parameters=job.model.solver_parameters,
+        )
+        solution = get_solution(esM)
+    return get_capacities(solution)
+
+
+def result_cache_key(job: OptimizationJob) -> str:
+    """
+    Return the key of the result of a job in the result cache.
+
+    The result is fully determined by the content of the dataset, the override parameters and the settings of the optimization.
+    The content of the dataset is represented by its fingerprint.
+
+    :param job: The optimization job.
+    :return: Cache key
+    """
+    energy_model = job.model
+    key_data = {
+        "type": job.type,
+        "dataset_fingerprint": energy_model.dataset.fingerprint,
+        "override_parameters": override_parameters_key(energy_model.override_parameters),
+    }
+    aggregation_parameters = energy_model.aggregation_parameters
+    if aggregation_parameters is not None:
+        key_data["aggregation_parameters"] = {
+            "number_of_typical_periods": aggregation_parameters.number_of_typical_periods,
+            "hours_per_period": aggregation_parameters.hours_per_period,
+            "segmentation": aggregation_parameters.segmentation,
+            "number_of_segments_per_period": aggregation_parameters.number_of_segments_per_period,
+            "cluster_method": aggregation_parameters.cluster_method,
+            "number_of_regions": aggregation_parameters.number_of_regions,
+        }
+    solver_parameters = energy_model.solver_parameters
+    key_data["solver"] = get_solver_name(solver_parameters)
+    if solver_parameters is not None:
+        key_data["solver_parameters"] = {
+            "threads": solver_parameters.threads,
+            "time_limit": solver_parameters.time_limit,
+            "mip_gap": solver_parameters.mip_gap,
+            "presolve": solver_parameters.presolve,
+        }
+    if job.type == OptimizationJobType.SCENARIO_SWEEP:
+        key_data["scenarios"] = job.scenarios
+    if job.type == OptimizationJobType.ROLLING_HORIZON:
+        # the capacities of the referenced solution are fixed
+        key_data["ref_warm_start_job"] = job.ref_warm_start_job
+        key_data["window_time_steps"] = job.window_time_steps
+        key_data["overlap_time_steps"] = job.overlap_time_steps
+    optimization_parameters = energy_model.optimization_parameters
+    if job.type == OptimizationJobType.MYOPIC_OPTIMIZE and optimization_parameters is not None:
+        key_data["optimization_parameters"] = {
+            "start_year": optimization_parameters.start_year,
+            "end_year": optimization_parameters.end_year,
+            "number_of_steps": optimization_parameters.number_of_steps,
+            "years_per_step": optimization_parameters.years_per_step,
+            "CO2_reference": optimization_parameters.CO2_reference,
+            "CO2_reduction_targets": optimization_parameters.CO2_reduction_targets,
+        }
+        # results and checkpoints of an earlier version have another content
+        key_data["result_format_version"] = RESULT_FORMAT_VERSION
+    if job.type == OptimizationJobType.OPTIMIZE:
+        key_data["result_format"] = get_result_format(job)
+    return hash_content(key_data)
+
+
+def copy_cached_result(job: OptimizationJob, cache_key: str) -> Path | None:
+    """
+    Copy the cached result of a job to a new result file.
+
+    :param job: The optimization job.
+    :param cache_key: Key of the result in the result cache.
+    :return: Path to the result file or None if the result is not cached.
+    """
+    result_file_path = create_temp_file(dir=settings.OPTIMIZATION_RESULT_DIR, prefix="ensysmod_result_", suffix=Path(result_file_name(job)).suffix)
+    if result_cache.copy_to(cache_key, result_file_path):
+        logger.info("Optimization job %s: Using cached result %s.", job.id, cache_key)
+        return result_file_path
+    result_file_path.unlink()
+    return None
+
+
+def solution_cache_key(cache_key: str) -> str:
+    """
+    Return the key of the solution of an optimization in the result cache.
+    """
+    return f"{cache_key}.solution"
+
+
+def copy_cached_solution(cache_key: str) -> Path | None:
+    """
+    Copy the cached solution of an optimization to a new solution file.
+
+    :param cache_key: Key of the result in the result cache.
+    :return: Path to the solution file or None if no solution is cached.
+    """
+    solution_file_path = create_temp_file(dir=settings.OPTIMIZATION_RESULT_DIR, prefix="ensysmod_solution_", suffix=".pkl")
+    if result_cache.copy_to(solution_cache_key(cache_key), solution_file_path):
+        return solution_file_path
+    solution_file_path.unlink()
+    return None
+
+
+def get_result_format(job: OptimizationJob) -> OptimizationResultFormat | None:
+    """
+    Return the format of the result file of an OPTIMIZE job, None for the other types whose result files have a fixed format.
+    """
+    if job.type != OptimizationJobType.OPTIMIZE:
+        return None
+    return job.result_format or DEFAULT_RESULT_FORMAT
+
+
+def result_media_type(job: OptimizationJob) -> str:
+    """
+    Return the media type of the result file of a job.
+    """
+    if job.type == OptimizationJobType.MYOPIC_OPTIMIZE or get_result_format(job) not in (None, OptimizationResultFormat.EXCEL):
+        return "application/zip"
+    return "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def result_file_name(job: OptimizationJob) -> str:
+    """
+    Return the file name under which the result file of a job is downloaded.
+    """
+    if job.type == OptimizationJobType.MYOPIC_OPTIMIZE:
+        optimization_parameters = job.model.optimization_parameters
+        return f"{job.model.name} {optimization_parameters.start_year}-{optimization_parameters.end_year}.zip"
+    if job.type == OptimizationJobType.SCENARIO_SWEEP:
+        return f"{job.model.name} scenarios.xlsx"
+    if job.type == OptimizationJobType.ROLLING_HORIZON:
+        return f"{job.model.name} rolling horizon.xlsx"
+    result_format = get_result_format(job)
+    if result_format != OptimizationResultFormat.EXCEL:
+        # e.g. "Model parquet.zip"
+        return f"{job.model.name} {result_format.value.lower()}.zip"
+    return f"{job.model.name}.xlsx"
+
+
+def _now() -> datetime:
+    return datetime.now(tz=UTC)
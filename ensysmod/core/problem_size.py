@@ -0,0 +1,334 @@
+"""
+Estimation of the size of the optimization problem of an energy model before it is built.
+
+Declaring the Pyomo model of a large multi-regional energy model takes a lot of memory. The size of the problem is
+estimated from the shape of the dataset, so that oversized optimizations are refused before they are built.
+The estimate counts the variables and constraints that FINE declares per component, location and time step.
+It is meant to be accurate within a small factor, not exact.
+
+The shape of a dataset is counted by the database, see query_problem_shape(), so that the API can check a model without
+reading its time series. The override parameters and the values of the time series are ignored by these counts.
+A worker that has already read the parameters of the ESM gets the shape from them instead, see get_problem_shape().
+"""
+from typing import Any, NamedTuple
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from ensysmod import crud
+from ensysmod.core import settings
+from ensysmod.core.fine_esm import COMPONENT_TYPES
+from ensysmod.core.rolling_horizon import get_window_sizes
+from ensysmod.core.scenario_sweep import get_sweep_workers
+from ensysmod.model import CapacityVariableDomain, EnergyComponentType, EnergyModel, EnergyModelAggregation, OptimizationJobType
+from ensysmod.schemas.energy_model_aggregation import EnergyModelAggregationBase
+
+# approximate memory of a variable and of a constraint, half of it for the Pyomo model and half for the copy of the solver
+BYTES_PER_VARIABLE = 1000
+BYTES_PER_CONSTRAINT = 1000
+
+# parameters whose regions with values are the locations of a component
+LOCATION_PARAMETERS = ("capacityFix", "capacityMax", "operationRateFix", "operationRateMax")
+
+# key of the components of each type in the ESM data
+COMPONENT_TYPE_KEYS = {
+    EnergyComponentType.SOURCE: "sources",
+    EnergyComponentType.SINK: "sinks",
+    EnergyComponentType.CONVERSION: "conversions",
+    EnergyComponentType.STORAGE: "storages",
+    EnergyComponentType.TRANSMISSION: "transmissions",
+}
+
+
+class ComponentShape(NamedTuple):
+    # key of the type of the component in the ESM data, e.g. "storages"
+    component_type: str
+    # number of regions of the component, or of connections of a transmission
+    locations: int
+    has_capacity_variable: bool
+    discrete: bool
+
+
+class ProblemShape(NamedTuple):
+    regions: int
+    commodities: int
+    number_of_time_steps: int
+    hours_per_time_step: float
+    components: list[ComponentShape]
+
+
+def get_problem_shape(esm_data: dict[str, Any], number_of_regions: int | None = None) -> ProblemShape:
+    """
+    Return the shape of the optimization problem of the parameters of an ESM.
+
+    :param esm_data: Parameters of the ESM and of all its components, see get_esm_data()
+    :param number_of_regions: Number of regions of a spatial aggregation of the ESM data, None if the regions aren't aggregated
+    """
+    regions = len(esm_data["esm"]["locations"])
+    components = []
+    for component_type in COMPONENT_TYPES:
+        for component in esm_data[component_type]:
+            if component_type == "transmissions":
+                locations = get_transmission_connections(component, regions)
+            else:
+                locations = get_component_locations(component, regions)
+            components.append(
+                ComponentShape(
+                    component_type=component_type,
+                    locations=locations,
+                    has_capacity_variable=component["hasCapacityVariable"],
+                    discrete=component.get("capacityVariableDomain") == "discrete",
+                )
+            )
+    shape = ProblemShape(
+        regions=regions,
+        commodities=len(esm_data["esm"]["commodities"]),
+        number_of_time_steps=esm_data["esm"]["numberOfTimeSteps"],
+        hours_per_time_step=esm_data["esm"]["hoursPerTimeStep"],
+        components=components,
+    )
+    return aggregate_problem_shape(shape, number_of_regions)
+
+
+def query_problem_shape(db: Session, energy_model: EnergyModel) -> ProblemShape:
+    """
+    Return the shape of the optimization problem of an energy model by counting the rows of its dataset, without reading
+    the time series. The regions are aggregated by the aggregation parameters of the model.
+    """
+    dataset_id = energy_model.ref_dataset
+    regions = crud.region.count_by_dataset(db, dataset_id=dataset_id)
+    located_regions = crud.energy_component.count_regions_by_component(
+        db,
+        dataset_id=dataset_id,
+        parameter_tables=[crud.capacity_fix, crud.capacity_max, crud.operation_rate_fix, crud.operation_rate_max],
+    )
+    transmission_connections = crud.transmission_distance.count_located_by_component(db, dataset_id=dataset_id)
+
+    components = []
+    for component in energy_model.dataset.components:
+        if component.type == EnergyComponentType.TRANSMISSION:
+            locations = transmission_connections.get(component.id, regions * (regions - 1))
+        else:
+            locations = located_regions.get(component.id, regions)
+        components.append(
+            ComponentShape(
+                component_type=COMPONENT_TYPE_KEYS[component.type],
+                locations=locations,
+                has_capacity_variable=component.capacity_variable,
+                discrete=component.capacity_variable_domain == CapacityVariableDomain.DISCRETE,
+            )
+        )
+    shape = ProblemShape(
+        regions=regions,
+        commodities=crud.energy_commodity.count_by_dataset(db, dataset_id=dataset_id),
+        number_of_time_steps=energy_model.dataset.number_of_time_steps,
+        hours_per_time_step=energy_model.dataset.hours_per_time_step,
+        components=components,
+    )
+    number_of_regions = energy_model.aggregation_parameters.number_of_regions if energy_model.aggregation_parameters else None
+    return aggregate_problem_shape(shape, number_of_regions)
+
+
+def aggregate_problem_shape(shape: ProblemShape, number_of_regions: int | None) -> ProblemShape:
+    """
+    Return the shape of a problem whose regions are aggregated, see spatial_aggregation.aggregate_regions().
+    A component is located in at most all aggregated regions and a transmission connects at most all their pairs.
+    """
+    if number_of_regions is None or number_of_regions >= shape.regions:
+        return shape
+    max_connections = number_of_regions * (number_of_regions - 1)
+    components = [
+        component._replace(locations=min(component.locations, max_connections if component.component_type == "transmissions" else number_of_regions))
+        for component in shape.components
+    ]
+    return shape._replace(regions=number_of_regions, components=components)
+
+
+def estimate_problem_size(
+    shape: ProblemShape,
+    aggregation_parameters: EnergyModelAggregation | EnergyModelAggregationBase | None,
+    *,
+    segmentation: bool = True,
+    time_steps: int | None = None,
+) -> dict[str, Any]:
+    """
+    Estimate the number of variables and constraints and the memory of the optimization problem of an ESM.
+
+    :param shape: Shape of the problem, see get_problem_shape() and query_problem_shape()
+    :param aggregation_parameters: Temporal aggregation parameters of the energy model
+    :param segmentation: Whether the typical periods are segmented, FINE doesn't segment myopic optimizations.
+    :param time_steps: Number of time steps of an optimization at full temporal resolution, e.g. of a window of a rolling
+        horizon optimization. None for an optimization of typical periods.
+    :return: Size of the optimization problem
+    """
+    if time_steps is None:
+        time_steps, periods = get_aggregated_time_steps(shape, aggregation_parameters, segmentation=segmentation)
+    else:
+        periods = 1
+
+    variables = 0
+    integer_variables = 0
+    constraints = 0
+    transmission_connections = 0
+    for component in shape.components:
+        locations = component.locations
+        if component.component_type == "transmissions":
+            transmission_connections += locations
+
+        if component.has_capacity_variable:
+            # capacity, number of plants, commissioning and decommissioning of each location
+            variables += 4 * locations
+            constraints += 2 * locations
+            if component.discrete:
+                # the number of plants is an integer
+                integer_variables += locations
+
+        if component.component_type == "storages":
+            # charge, discharge and state of charge of each time step and the state of charge between the periods
+            variables += (3 * time_steps + periods + 1) * locations
+            constraints += (4 * time_steps + periods) * locations
+        else:
+            variables += time_steps * locations
+            constraints += time_steps * locations
+
+    # balance of each commodity in each region and time step
+    constraints += shape.commodities * shape.regions * time_steps
+
+    return {
+        "regions": shape.regions,
+        "components": len(shape.components),
+        "transmission_connections": transmission_connections,
+        "time_steps": time_steps,
+        "variables": variables,
+        "integer_variables": integer_variables,
+        "constraints": constraints,
+        "memory_mb": (variables * BYTES_PER_VARIABLE + constraints * BYTES_PER_CONSTRAINT) / (1024 * 1024),
+    }
+
+
+def get_aggregated_time_steps(
+    shape: ProblemShape,
+    aggregation_parameters: EnergyModelAggregation | EnergyModelAggregationBase | None,
+    *,
+    segmentation: bool,
+) -> tuple[int, int]:
+    """
+    Return the number of time steps of the typical periods and the number of periods of the full time series.
+    Without aggregation parameters, FINE clusters 7 typical periods of 24 time steps, see get_aggregation_kwargs().
+    """
+    number_of_time_steps = shape.number_of_time_steps
+    if aggregation_parameters is None:
+        time_steps_per_period = min(24, number_of_time_steps)
+        return 7 * time_steps_per_period, max(number_of_time_steps // time_steps_per_period, 1)
+
+    time_steps_per_period = max(int(aggregation_parameters.hours_per_period // shape.hours_per_time_step), 1)
+    periods = max(number_of_time_steps // time_steps_per_period, 1)
+    if segmentation and aggregation_parameters.segmentation:
+        time_steps_per_period = min(aggregation_parameters.number_of_segments_per_period, time_steps_per_period)
+    return aggregation_parameters.number_of_typical_periods * time_steps_per_period, periods
+
+
+def get_component_locations(component: dict[str, Any], number_of_regions: int) -> int:
+    """
+    Return the number of regions of a component. A component with regional parameters is located in their regions with
+    non-zero values, otherwise in all regions.
+    """
+    locations = None
+    for parameter in LOCATION_PARAMETERS:
+        data = component.get(parameter)
+        if isinstance(data, pd.DataFrame):
+            located = data.columns[(data != 0).any(axis=0)]
+        elif isinstance(data, pd.Series):
+            located = data.index[data != 0]
+        else:
+            continue
+        locations = set(located) if locations is None else locations | set(located)
+    return number_of_regions if locations is None else len(locations)
+
+
+def get_transmission_connections(component: dict[str, Any], number_of_regions: int) -> int:
+    """
+    Return the number of connections of a transmission. A transmission with distances connects the pairs of regions
+    with a non-zero distance, otherwise all pairs of regions.
+    """
+    distances = component.get("distances")
+    if isinstance(distances, pd.DataFrame):
+        return int((distances.to_numpy() != 0).sum())
+    return number_of_regions * (number_of_regions - 1)
+
+
+def check_problem_size(problem_size: dict[str, Any], *, parallel_problems: int = 1) -> None:
+    """
+    Check that the optimization problem doesn't exceed the limits of the server.
+
+    The memory limit is the budget of one job, the jobs of the other workers aren't counted, see MAX_PROBLEM_MEMORY_MB.
+
+    :param problem_size: Estimated size of the optimization problem, see estimate_problem_size()
+    :param parallel_problems: Number of problems of this size that are solved in parallel, e.g. by a scenario sweep
+    :raises ValueError: If the problem exceeds a limit
+    """
+    if settings.MAX_PROBLEM_VARIABLES is not None and problem_size["variables"] > settings.MAX_PROBLEM_VARIABLES:
+        raise ValueError(
+            f"The optimization problem has about {problem_size['variables']} variables, at most {settings.MAX_PROBLEM_VARIABLES} are allowed. "
+            "Reduce the number of typical periods, segments or regions."
+        )
+    memory_mb = problem_size["memory_mb"] * parallel_problems
+    if settings.MAX_PROBLEM_MEMORY_MB is not None and memory_mb > settings.MAX_PROBLEM_MEMORY_MB:
+        raise ValueError(
+            f"The optimization needs about {memory_mb:.0f} MB of memory, at most {settings.MAX_PROBLEM_MEMORY_MB} MB are allowed. "
+            "Reduce the number of typical periods, segments or regions."
+        )
+
+
+def estimate_model_problem_size(
+    db: Session,
+    energy_model: EnergyModel,
+    *,
+    job_type: OptimizationJobType,
+    window_time_steps: int | None = None,
+    esm_data: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """
+    Estimate the size of the optimization problem of an energy model with its aggregated regions.
+
+    A myopic optimization solves one problem of this size per step, a scenario sweep one per scenario.
+    A rolling horizon optimization solves the model with typical periods to find the capacities and one problem per window,
+    the larger of both is returned.
+
+    :param window_time_steps: Number of time steps of a window of a rolling horizon optimization including its overlap, None for the default windows
+    :param esm_data: Parameters of the ESM of the model that were already read, see get_esm_data(). None to count the
+        shape of the dataset in the database.
+    """
+    aggregation_parameters = energy_model.aggregation_parameters
+    if esm_data is None:
+        shape = query_problem_shape(db, energy_model)
+    else:
+        shape = get_problem_shape(esm_data, aggregation_parameters.number_of_regions if aggregation_parameters else None)
+    problem_size = estimate_problem_size(shape, aggregation_parameters, segmentation=job_type != OptimizationJobType.MYOPIC_OPTIMIZE)
+    if job_type == OptimizationJobType.ROLLING_HORIZON:
+        window_time_steps = window_time_steps or sum(get_window_sizes(None, None))
+        window_problem_size = estimate_problem_size(shape, None, time_steps=min(window_time_steps, shape.number_of_time_steps))
+        problem_size = max(problem_size, window_problem_size, key=lambda size: size["variables"])
+    return problem_size
+
+
+def check_model_problem_size(
+    db: Session,
+    energy_model: EnergyModel,
+    *,
+    job_type: OptimizationJobType,
+    number_of_scenarios: int = 1,
+    window_time_steps: int | None = None,
+    esm_data: dict[str, Any] | None = None,
+) -> None:
+    """
+    Check that the optimization of an energy model doesn't exceed the limits of the server, before its problem is built.
+
+    :param esm_data: Parameters of the ESM of the model that were already read, None to count the shape of the dataset in the database.
+    :raises ValueError: If the problem exceeds a limit
+    """
+    if settings.MAX_PROBLEM_VARIABLES is None and settings.MAX_PROBLEM_MEMORY_MB is None:
+        return
+    problem_size = estimate_model_problem_size(db, energy_model, job_type=job_type, window_time_steps=window_time_steps, esm_data=esm_data)
+    parallel_problems = get_sweep_workers(number_of_scenarios) if job_type == OptimizationJobType.SCENARIO_SWEEP else 1
+    check_problem_size(problem_size, parallel_problems=parallel_problems)
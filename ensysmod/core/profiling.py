@@ -0,0 +1,121 @@
+"""
+Measurement of the phases of an optimization.
+
+Inside a profiled() context, every phase() records its wall time, its CPU time and the peak resident set size (RSS)
+of the process. The CPU time and the RSS include child processes, e.g. a solver that runs as its own executable.
+The RSS is sampled periodically, so the peak of a phase misses allocations that are freed again within milliseconds.
+Phases outside of a profiled() context aren't measured. The start and the end of a measured phase are logged, so they
+appear in the log of the optimization job, see core.job_log.
+"""
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from typing import Any
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# interval in seconds at which the RSS is sampled during a phase
+RSS_SAMPLING_INTERVAL = 0.1
+
+# measured phases of the current optimization, None if the phases aren't measured
+_profile_context: ContextVar[list[dict[str, Any]] | None] = ContextVar("_profile_context", default=None)
+
+
+@contextmanager
+def profiled() -> Iterator[list[dict[str, Any]]]:
+    """
+    Measure all phases inside the context.
+
+    :return: List of the measured phases, which is filled while the context is active.
+    """
+    phases = []
+    token = _profile_context.set(phases)
+    try:
+        yield phases
+    finally:
+        _profile_context.reset(token)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Measure a phase of the optimization, e.g. the solve.
+
+    :param name: Name of the phase
+    """
+    phases = _profile_context.get()
+    if phases is None:
+        yield
+        return
+
+    logger.info("Phase %s started.", name)
+    process = psutil.Process()
+    sampler = _RSSSampler(process)
+    sampler.start()
+    start_cpu_time = _cpu_time(process)
+    start_wall_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall_time = time.perf_counter() - start_wall_time
+        cpu_time = _cpu_time(process) - start_cpu_time
+        sampler.stop()
+        phases.append({"phase": name, "wall_time": wall_time, "cpu_time": cpu_time, "peak_rss": sampler.peak_rss})
+        logger.info("Phase %s finished after %.1f seconds.", name, wall_time)
+
+
+def server_timing(phases: list[dict[str, Any]]) -> str:
+    """
+    Format measured phases as value of a Server-Timing header with the wall times in milliseconds.
+    """
+    return ", ".join(f"{measured_phase['phase']};dur={measured_phase['wall_time'] * 1000:.1f}" for measured_phase in phases)
+
+
+def _cpu_time(process: psutil.Process) -> float:
+    # CPU time of child processes is only counted after they terminated
+    cpu_times = process.cpu_times()
+    return cpu_times.user + cpu_times.system + cpu_times.children_user + cpu_times.children_system
+
+
+def get_rss(process: psutil.Process) -> int:
+    """
+    Return the resident set size of a process and all its child processes in bytes.
+    """
+    rss = process.memory_info().rss
+    for child in process.children(recursive=True):
+        # the child may have terminated in the meantime
+        with suppress(psutil.NoSuchProcess):
+            rss += child.memory_info().rss
+    return rss
+
+
+class _RSSSampler:
+    """
+    Samples the RSS of a process and its children in a background thread and keeps the maximum.
+    """
+
+    def __init__(self, process: psutil.Process):
+        self.process = process
+        self.peak_rss = get_rss(process)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self._sample()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(RSS_SAMPLING_INTERVAL):
+            self._sample()
+
+    def _sample(self) -> None:
+        self.peak_rss = max(self.peak_rss, get_rss(self.process))
@@ -0,0 +1,142 @@
+"""
+Comparison of stored optimization results, e.g. of the scenarios of a study.
+
+The values of all results are aligned in a matrix with a row of each compared value, e.g. the capacity of a component
+in a region, and a column of each result. The differences to the first result and the statistics across the results
+are computed for all rows at once. A value that a result doesn't contain, e.g. the capacity of a component that only
+exists in the dataset of another result, is 0.
+"""
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from ensysmod import crud
+from ensysmod.core.myopic import stock_origin
+from ensysmod.model import Dataset, OptimizationResult
+
+# variables of the operation time series that produce or consume a commodity
+BALANCE_VARIABLES = ("operation", "chargeOperation", "dischargeOperation")
+
+# commodities and their factors by component and variable, see get_commodity_factors()
+CommodityFactors = dict[tuple[str, str], list[tuple[str, float]]]
+
+
+def compare_results(db: Session, results: list[OptimizationResult]) -> dict[str, Any]:
+    """
+    Compare the total cost, the capacities and the yearly commodity balances of stored optimization results.
+
+    :param results: Compared results, the first result is the reference of the differences.
+    :return: Comparison of the results, see OptimizationResultComparison.
+    """
+    result_ids = [result.id for result in results]
+    [total_cost] = compare_values(np.array([[result.objective_value for result in results]], dtype=float))
+    return {
+        "results": results,
+        "total_cost": total_cost,
+        "capacities": compare_rows(get_capacity_matrix(db, result_ids)),
+        "commodity_balances": compare_rows(get_commodity_balance_matrix(db, results)),
+    }
+
+
+def get_capacity_matrix(db: Session, result_ids: list[int]) -> pd.DataFrame:
+    """
+    Return the capacities of results with a row of each component in each region and a column of each result.
+
+    The capacities of the stock of a myopic optimization are added to the capacities of the component itself.
+    """
+    capacities = crud.optimization_result.get_capacities(db, result_ids=result_ids, variables=["capacity"])
+    frame = pd.DataFrame(
+        [(capacity.ref_result, stock_origin(capacity.component), capacity.region, capacity.region_to, capacity.value) for capacity in capacities],
+        columns=["result", "component", "region", "region_to", "value"],
+    )
+    return _to_matrix(frame, ["component", "region", "region_to"], result_ids)
+
+
+def get_commodity_balance_matrix(db: Session, results: list[OptimizationResult]) -> pd.DataFrame:
+    """
+    Return the yearly amounts of the commodities that the components produce and consume, with a row of each commodity,
+    region and component and a column of each result.
+
+    The amounts are the sums of the operation time series, multiplied by the conversion factors of conversions.
+    Transmissions consume the commodity in the region where they start and produce it in the region where they end,
+    their losses are not included.
+    """
+    factors_by_dataset: dict[int, CommodityFactors] = {}
+    rows = []
+    for result in results:
+        dataset = result.model.dataset
+        if dataset.id not in factors_by_dataset:
+            factors_by_dataset[dataset.id] = get_commodity_factors(dataset)
+        factors = factors_by_dataset[dataset.id]
+
+        operations = crud.optimization_result.get_operations(db, result_ids=[result.id], variables=list(BALANCE_VARIABLES))
+        if not operations:
+            continue
+        # all time series of a result have the same time steps
+        totals = np.asarray([operation.values for operation in operations], dtype=float).sum(axis=1)  # noqa: PD011
+        for operation, total in zip(operations, totals.tolist(), strict=True):
+            component = stock_origin(operation.component)
+            for commodity, factor in factors.get((component, operation.variable), ()):
+                rows.append((result.id, commodity, operation.region, component, factor * total))
+                if operation.region_to is not None:
+                    rows.append((result.id, commodity, operation.region_to, component, -factor * total))
+    frame = pd.DataFrame(rows, columns=["result", "commodity", "region", "component", "value"])
+    return _to_matrix(frame, ["commodity", "region", "component"], [result.id for result in results])
+
+
+def get_commodity_factors(dataset: Dataset) -> CommodityFactors:
+    """
+    Return the commodities that a unit of each operation variable of each component of a dataset produces (positive
+    factor) or consumes (negative factor), by the name of the component and the variable.
+    """
+    factors: CommodityFactors = {}
+    for source in dataset.sources:
+        factors[(source.component.name, "operation")] = [(source.commodity.name, 1.0)]
+    for sink in dataset.sinks:
+        factors[(sink.component.name, "operation")] = [(sink.commodity.name, -1.0)]
+    for conversion in dataset.conversions:
+        factors[(conversion.component.name, "operation")] = [
+            (conversion_factor.commodity.name, conversion_factor.conversion_factor) for conversion_factor in conversion.conversion_factors
+        ]
+    for storage in dataset.storages:
+        factors[(storage.component.name, "chargeOperation")] = [(storage.commodity.name, -1.0)]
+        factors[(storage.component.name, "dischargeOperation")] = [(storage.commodity.name, 1.0)]
+    for transmission in dataset.transmissions:
+        # consumed in the region where the transmission starts, see get_commodity_balance_matrix()
+        factors[(transmission.component.name, "operation")] = [(transmission.commodity.name, -1.0)]
+    return factors
+
+
+def compare_values(values: np.ndarray) -> list[dict[str, Any]]:
+    """
+    Return the values of each row of a matrix with a column of each result, their differences to the values of the first
+    result and their statistics across the results.
+    """
+    differences = values - values[:, :1]
+    columns = {
+        "values": values.tolist(),
+        "differences": differences.tolist(),
+        "min": values.min(axis=1).tolist(),
+        "max": values.max(axis=1).tolist(),
+        "mean": values.mean(axis=1).tolist(),
+        "std": values.std(axis=1).tolist(),
+    }
+    return [dict(zip(columns, row, strict=True)) for row in zip(*columns.values(), strict=True)]
+
+
+def compare_rows(matrix: pd.DataFrame) -> list[dict[str, Any]]:
+    """
+    Return the compared values of each row of a matrix with a column of each result, together with the keys of the row.
+    """
+    keys = matrix.index.to_frame(index=False).astype(object)
+    # e.g. the missing region at the other end of components that aren't transmissions
+    keys = keys.where(keys.notna(), None).to_dict("records")
+    return [{**key, **compared} for key, compared in zip(keys, compare_values(matrix.to_numpy(dtype=float)), strict=True)]
+
+
+def _to_matrix(frame: pd.DataFrame, index: list[str], result_ids: list[int]) -> pd.DataFrame:
+    # keeps the missing region at the other end as key, unlike pivot_table()
+    matrix = frame.groupby([*index, "result"], dropna=False)["value"].sum().unstack("result", fill_value=0.0)  # noqa: PD010
+    return matrix.reindex(columns=result_ids, fill_value=0.0)
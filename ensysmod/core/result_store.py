@@ -0,0 +1,100 @@
+"""
+Structured results of optimizations in the database.
+
+The objective value, the capacity variables of each component in each region and the operation time series of the
+result tables, see core.result_tables, are stored for every optimization of an OPTIMIZE job and every optimized year of
+a MYOPIC_OPTIMIZE job. Clients query single tables, filtered by component, region and variable, instead of downloading
+and parsing the result file.
+"""
+import logging
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from ensysmod import crud
+from ensysmod.model import OptimizationJob, OptimizationResult
+from ensysmod.schemas import OptimizationResultCreate
+
+logger = logging.getLogger(__name__)
+
+# suffix of the names of the optimal values of FINE, e.g. "capacityVariablesOptimum"
+VARIABLE_SUFFIX = "VariablesOptimum"
+
+
+def store_result(
+    db: Session,
+    job: OptimizationJob,
+    objective_value: float,
+    tables: dict[str, pd.DataFrame],
+    *,
+    year: int | None = None,
+    cache_key: str | None = None,
+) -> OptimizationResult:
+    """
+    Store the result of an optimization of a job. A stored result of the same year is replaced.
+
+    :param objective_value: Value of the objective function of the optimization.
+    :param tables: Result tables of the optimization, see get_result_tables().
+    :param year: Optimized year of a myopic optimization, None for the other jobs.
+    :param cache_key: Key of the result in the result cache, see optimization_jobs.result_cache_key().
+    """
+    return crud.optimization_result.create_with_values(
+        db,
+        obj_in=OptimizationResultCreate(ref_job=job.id, ref_model=job.ref_model, year=year, objective_value=objective_value, cache_key=cache_key),
+        capacities=get_capacity_rows(tables),
+        operations=get_operation_rows(tables),
+    )
+
+
+def share_stored_results(db: Session, job: OptimizationJob, cache_key: str) -> int:
+    """
+    Share the stored results of an identical optimization with a job whose result was taken from the result cache.
+
+    The results of the job reference the values of the identical optimization, the values are stored only once.
+
+    :return: Number of shared results, 0 if no identical optimization stored its results.
+    """
+    results = crud.optimization_result.get_multi_by_cache_key(db, cache_key=cache_key)
+    for result in results:
+        crud.optimization_result.share_with_job(db, result=result, job=job)
+    if not results:
+        logger.info("Optimization job %s: No stored results of the cached result %s.", job.id, cache_key)
+    return len(results)
+
+
+def get_capacity_rows(tables: dict[str, pd.DataFrame]) -> list[dict[str, Any]]:
+    """
+    Return a row of each capacity variable of each component in each region of the time-independent result tables.
+    """
+    rows = []
+    for name, table in tables.items():
+        if "_TIoptVar_" not in name:
+            continue
+        for index, values in zip(table.index, table.to_numpy(dtype=float), strict=True):
+            # the columns are the regions or, for transmissions, the regions at the other end
+            for column, value in zip(table.columns, values, strict=True):
+                # missing values mark regions without the component
+                if not np.isnan(value):
+                    variable, component, *regions = (*index, column)
+                    rows.append(_row(variable, component, *regions, value=float(value)))
+    return rows
+
+
+def get_operation_rows(tables: dict[str, pd.DataFrame]) -> list[dict[str, Any]]:
+    """
+    Return a row of the time series of each operation variable of each component in each region of the time-dependent result tables.
+    """
+    rows = []
+    for name, table in tables.items():
+        if "_TDoptVar_" not in name:
+            continue
+        for index, values in zip(table.index, table.to_numpy(dtype=float).tolist(), strict=True):
+            variable, component, *regions = index
+            rows.append(_row(variable, component, *regions, values=values))
+    return rows
+
+
+def _row(variable: str, component: str, region: str, region_to: str | None = None, **values: Any) -> dict[str, Any]:
+    return {"component": component, "region": region, "region_to": region_to, "variable": variable.removesuffix(VARIABLE_SUFFIX), **values}
@@ -0,0 +1,147 @@
+"""
+Results of an optimized energy system model as tables.
+
+The tables are the sheets that writeOptimizationOutputToExcel() of FINE writes, so results can be stored and
+written in other formats than Excel, which is slow to write and read for big models.
+"""
+from io import BytesIO
+from pathlib import Path
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fine import EnergySystemModel
+from fine.component import ComponentModel
+
+from ensysmod.model import OptimizationResultFormat
+
+
+def get_result_tables(esM: EnergySystemModel, opt_sum_output_level: int = 2, opt_val_output_level: int = 1) -> dict[str, pd.DataFrame]:
+    """
+    Return the results of an optimized energy system model by the names of the sheets of writeOptimizationOutputToExcel().
+
+    The sheet "Regions" with the aggregated region of each region of the dataset is added if the regions of the ESM were aggregated.
+
+    :param opt_sum_output_level: Output level of the optimization summaries, see EnergySystemModel.getOptimizationSummary().
+    :param opt_val_output_level: 1 to drop the rows of the optimal values that contain only zeros, 0 to keep all rows.
+    """
+    tables = {}
+    for model_name, model in esM.componentModelingDict.items():
+        # e.g. "SourceSink" of "SourceSinkModel"
+        prefix = model_name[:-5]
+        summary = esM.getOptimizationSummary(model_name, ip=0, outputLevel=opt_sum_output_level)
+        if not summary.empty:
+            tables[f"{prefix}OptSummary_{model.dimension}"] = summary
+
+        tables.update(_get_optimal_value_tables(model, prefix, opt_val_output_level))
+
+    tables["Misc"] = pd.DataFrame([esM.periodsOrder[0]], index=["periodsOrder"], columns=esM.periods)
+    region_groups = getattr(esM, "regionGroups", None)
+    if region_groups is not None:
+        tables["Regions"] = (
+            pd.DataFrame(
+                [(region, aggregated_region) for aggregated_region, group in region_groups.items() for region in group],
+                columns=["region", "aggregated_region"],
+            )
+            .sort_values("region")
+            .set_index("region")
+        )
+    return tables
+
+
+def _get_optimal_value_tables(model: ComponentModel, prefix: str, opt_val_output_level: int) -> dict[str, pd.DataFrame]:
+    """
+    Return the tables of the time-dependent and the time-independent optimal values of a FINE modeling class.
+    """
+    time_dependent = {"1dim": {}, "2dim": {}}
+    time_independent = {}
+    for variable_name, optimal_values in model.getOptimalValues(ip=0).items():
+        if optimal_values["values"] is None:
+            continue
+        if optimal_values["timeDependent"]:
+            time_dependent[optimal_values["dimension"]][variable_name] = optimal_values["values"]
+        else:
+            time_independent[variable_name] = optimal_values["values"]
+
+    tables = {}
+    index_names = {"1dim": ["Variable", "Component", "Location"], "2dim": ["Variable", "Component", "LocationIn", "LocationOut"]}
+    for dimension, values in time_dependent.items():
+        if values:
+            tables[f"{prefix}_TDoptVar_{dimension}"] = _drop_zero_rows(pd.concat(values, names=index_names[dimension]), opt_val_output_level)
+    if time_independent:
+        names = ["Variable type", "Component"] if model.dimension == "1dim" else ["Variable type", "Component", "Location"]
+        tables[f"{prefix}_TIoptVar_{model.dimension}"] = _drop_zero_rows(pd.concat(time_independent, names=names), opt_val_output_level)
+    # like FINE, tables without rows are left out
+    return {name: table for name, table in tables.items() if not table.empty}
+
+
+def _drop_zero_rows(table: pd.DataFrame, opt_val_output_level: int) -> pd.DataFrame:
+    if opt_val_output_level == 1:
+        return table.loc[((table != 0) & (~table.isna())).any(axis=1)]
+    return table
+
+
+def write_csv_tables(zip_file: ZipFile, tables: dict[str, pd.DataFrame], prefix: str = "") -> None:
+    """
+    Write result tables as CSV files to a zip file.
+
+    :param zip_file: Zip file opened for writing
+    :param tables: Result tables by name, see get_result_tables().
+    :param prefix: Prefix of the names of the CSV files in the zip file, e.g. a directory.
+    """
+    for name, table in tables.items():
+        zip_file.writestr(f"{prefix}{name}.csv", table.to_csv())
+
+
+def write_parquet_tables(zip_file: ZipFile, tables: dict[str, pd.DataFrame], prefix: str = "") -> None:
+    """
+    Write result tables as Parquet files to a zip file. The files keep the index and the types of the columns.
+
+    :param zip_file: Zip file opened for writing
+    :param tables: Result tables by name, see get_result_tables().
+    :param prefix: Prefix of the names of the Parquet files in the zip file, e.g. a directory.
+    """
+    for name, table in tables.items():
+        buffer = BytesIO()
+        pq.write_table(_to_arrow_table(table), buffer)
+        # Parquet files are compressed already
+        zip_file.writestr(f"{prefix}{name}.parquet", buffer.getvalue(), compress_type=ZIP_STORED)
+
+
+def write_arrow_tables(zip_file: ZipFile, tables: dict[str, pd.DataFrame], prefix: str = "") -> None:
+    """
+    Write result tables as compressed Arrow IPC files to a zip file. The files keep the index and the types of the columns.
+
+    :param zip_file: Zip file opened for writing
+    :param tables: Result tables by name, see get_result_tables().
+    :param prefix: Prefix of the names of the Arrow files in the zip file, e.g. a directory.
+    """
+    for name, table in tables.items():
+        arrow_table = _to_arrow_table(table)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_file(sink, arrow_table.schema, options=pa.ipc.IpcWriteOptions(compression="zstd")) as writer:
+            writer.write_table(arrow_table)
+        zip_file.writestr(f"{prefix}{name}.arrow", sink.getvalue().to_pybytes(), compress_type=ZIP_STORED)
+
+
+def write_result_file(result_file_path: str | Path, tables: dict[str, pd.DataFrame], result_format: OptimizationResultFormat) -> None:
+    """
+    Write result tables to a zip file with a file of each table in the given format, e.g. "SourceSinkOptSummary_1dim.parquet".
+
+    Excel files are written by FINE instead, see fine_esm.write_optimization_output().
+    """
+    writers = {
+        OptimizationResultFormat.PARQUET: write_parquet_tables,
+        OptimizationResultFormat.ARROW: write_arrow_tables,
+        OptimizationResultFormat.CSV: write_csv_tables,
+    }
+    if result_format not in writers:
+        raise ValueError(f"Result tables can't be written as {result_format.value} to a zip file!")
+    with ZipFile(result_file_path, "w", compression=ZIP_DEFLATED) as zip_file:
+        writers[result_format](zip_file, tables)
+
+
+def _to_arrow_table(table: pd.DataFrame) -> pa.Table:
+    # the names of the columns, e.g. the time steps, must be strings
+    return pa.Table.from_pandas(table.rename(columns=str))
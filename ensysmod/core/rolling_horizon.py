@@ -0,0 +1,348 @@
+"""
+Rolling horizon optimization of the operation of an energy system model at full temporal resolution.
+
+A monolithic optimization of all time steps of a year at full resolution needs too much memory for big models. The
+capacities of all components are fixed to the capacities of a previous optimization with typical periods, and the year
+is split into windows, which are optimized one after another. Each window is extended by an overlap, so the operation at
+its end isn't distorted by the end of the horizon. Only the time steps without the overlap are kept, the state of charge
+of the storages at the end of these time steps is the initial state of charge of the next window. The storages must be
+charged again at the end of the year to their state of charge at the beginning of the first window.
+
+Each window builds its own energy system model with the time series of its time steps, so the memory of the
+optimization is bounded by the size of a window instead of the size of the year.
+
+The yearly limits of the commodities and the yearly full load hours aren't constrained in the windows: FINE would scale
+them to the length of each window, e.g. a minimal number of full load hours of a solar plant would have to be reached in
+every winter week. They constrain the optimization with typical periods whose capacities are fixed.
+"""
+from collections import defaultdict
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pyomo.environ as pyo
+from fine import EnergySystemModel
+
+from ensysmod.core import settings
+from ensysmod.core.fine_esm import COMPONENT_TYPES, build_esm, write_region_groups
+from ensysmod.core.profiling import phase
+from ensysmod.core.solver import configured_solver
+from ensysmod.core.spatial_aggregation import TIME_SERIES_PARAMETERS
+from ensysmod.model import EnergyModelSolver
+from ensysmod.schemas.energy_model_solver import EnergyModelSolverBase
+from ensysmod.utils.utils import create_temp_file
+
+DEFAULT_WINDOW_TIME_STEPS = 168
+DEFAULT_OVERLAP_TIME_STEPS = 24
+
+# capacity variables of the FINE modeling classes, indexed by location, component and investment period
+CAPACITY_VARIABLES = ("cap_srcSnk", "cap_conv", "cap_stor", "cap_trans")
+
+# operation variables of the FINE modeling classes, indexed by location, component, investment period, period and time step
+OPERATION_VARIABLES = ("op_srcSnk", "op_conv", "chargeOp_stor", "dischargeOp_stor", "op_trans")
+
+# parameters that bound the capacity variables, the fixed capacities already satisfy them
+UNFIXED_CAPACITY_PARAMETERS = ("capacityMax", "capacityMin", "sharedPotentialID")
+
+# parameters of yearly constraints of the operation, which FINE scales to the length of a window
+YEARLY_PARAMETERS = ("yearlyLimit", "commodityLimitID", "yearlyFullLoadHoursMin", "yearlyFullLoadHoursMax")
+
+# the capacities of typical periods may not cover the demand of every time step at full resolution, unserved demand is
+# supplied by a source per demanded commodity at a multiple of the highest cost per operation of the dataset, or at one
+# cost unit per unit of the commodity if the operation of all components is free of cost
+UNSERVED_DEMAND_COST_FACTOR = 1000.0
+UNSERVED_DEMAND_PREFIX = "Unserved "
+
+# parameters of the costs and revenues per operation of the components, the capacities are fixed in every window
+OPERATION_COST_PARAMETERS = ("opexPerOperation", "opexPerChargeOperation", "opexPerDischargeOperation", "commodityCost", "commodityRevenue")
+
+# state of charge of the storages, with one more time step than the operation
+STATE_OF_CHARGE_VARIABLE = "stateOfCharge_stor"
+
+# relative tolerance of the state of charge that is carried from one window to the next, the values of a solution are
+# rounded and may violate the bounds of the state of charge otherwise
+STATE_OF_CHARGE_TOLERANCE = 1e-6
+
+
+def get_window_sizes(window_time_steps: int | None, overlap_time_steps: int | None) -> tuple[int, int]:
+    """
+    Return the number of time steps of each window and of its overlap, the defaults if they aren't given.
+    """
+    return window_time_steps or DEFAULT_WINDOW_TIME_STEPS, overlap_time_steps if overlap_time_steps is not None else DEFAULT_OVERLAP_TIME_STEPS
+
+
+def get_windows(number_of_time_steps: int, window_time_steps: int, overlap_time_steps: int) -> list[tuple[int, int, int]]:
+    """
+    Split the time steps into windows.
+
+    :return: First time step, end of the kept time steps and end of the optimized time steps of each window
+    """
+    windows = []
+    for start in range(0, number_of_time_steps, window_time_steps):
+        end = min(start + window_time_steps, number_of_time_steps)
+        windows.append((start, end, min(end + overlap_time_steps, number_of_time_steps)))
+    return windows
+
+
+def get_capacities(solution: dict[str, dict[Any, float]]) -> dict[str, dict[str, float]]:
+    """
+    Return the optimal capacity of each component in each location from the solution of an optimization.
+    The locations of transmissions are the connections of two regions, e.g. "north_south".
+    """
+    capacities = defaultdict(dict)
+    for variable in CAPACITY_VARIABLES:
+        for (location, component_name, _investment_period), value in solution.get(variable, {}).items():
+            capacities[component_name][location] = max(value, 0.0)
+    return dict(capacities)
+
+
+def fix_capacities(esm_data: dict[str, Any], capacities: dict[str, dict[str, float]]) -> dict[str, Any]:
+    """
+    Fix the capacities of all components with a capacity variable, their capacity bounds are removed. Components
+    without capacity are removed.
+
+    :param esm_data: Parameters of the ESM and of all its components, see get_esm_data()
+    :param capacities: Optimal capacity of each component in each location, see get_capacities()
+    :return: Parameters of the ESM with fixed capacities
+    """
+    if not capacities:
+        raise ValueError("The solution contains no capacities to fix.")
+
+    regions = sorted(esm_data["esm"]["locations"])
+    connections = {f"{region_from}_{region_to}": (region_from, region_to) for region_from in regions for region_to in regions}
+    fixed_data = {**esm_data}
+    for component_type in COMPONENT_TYPES:
+        fixed_data[component_type] = []
+        for component in esm_data[component_type]:
+            if not component["hasCapacityVariable"]:
+                fixed_data[component_type].append(component)
+                continue
+            component_capacities = capacities.get(component["name"], {})
+            if not any(capacity > 0 for capacity in component_capacities.values()):
+                continue
+
+            if component_type == "transmissions":
+                capacity_fix = pd.DataFrame(0.0, index=regions, columns=regions)
+                for connection, capacity in component_capacities.items():
+                    capacity_fix.loc[connections[connection]] = capacity
+            else:
+                capacity_fix = pd.Series({region: component_capacities.get(region, 0.0) for region in regions})
+            fixed_component = {key: value for key, value in component.items() if key not in UNFIXED_CAPACITY_PARAMETERS}
+            fixed_component["capacityFix"] = capacity_fix
+            fixed_component["capacityVariableDomain"] = "continuous"
+            fixed_data[component_type].append(fixed_component)
+    return fixed_data
+
+
+def get_unserved_demand_cost(esm_data: dict[str, Any]) -> float:
+    """
+    Return the cost of unserved demand per unit of a commodity, a multiple of the highest cost or revenue per operation.
+    """
+    highest_cost = max(
+        (
+            float(np.nanmax(np.abs(np.asarray(component[parameter], dtype=float)), initial=0.0))
+            for component_type in COMPONENT_TYPES
+            for component in esm_data[component_type]
+            for parameter in OPERATION_COST_PARAMETERS
+            if parameter in component
+        ),
+        default=0.0,
+    )
+    return UNSERVED_DEMAND_COST_FACTOR * highest_cost if highest_cost > 0 else 1.0
+
+
+def add_unserved_demand(esm_data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Add a source of unserved demand for each commodity with a fixed demand, so that every window has a feasible operation.
+    """
+    unserved_demand_cost = get_unserved_demand_cost(esm_data)
+    demanded_commodities = {sink["commodity"] for sink in esm_data["sinks"] if "operationRateFix" in sink}
+    unserved_demand = [
+        {
+            "name": f"{UNSERVED_DEMAND_PREFIX}{commodity}",
+            "commodity": commodity,
+            "hasCapacityVariable": False,
+            "opexPerOperation": unserved_demand_cost,
+        }
+        for commodity in sorted(demanded_commodities)
+    ]
+    return {**esm_data, "sources": [*esm_data["sources"], *unserved_demand]}
+
+
+def get_window_data(esm_data: dict[str, Any], start: int, end: int) -> dict[str, Any]:
+    """
+    Return the parameters of the ESM of the time steps of a window.
+
+    The yearly limits and full load hours are removed instead of being scaled to the window, which can make a window
+    infeasible if the time series of a component differ between the seasons, see YEARLY_PARAMETERS.
+    """
+    window_data = {**esm_data, "esm": {**esm_data["esm"], "numberOfTimeSteps": end - start}}
+    for component_type in COMPONENT_TYPES:
+        window_data[component_type] = [
+            {
+                key: value.iloc[start:end].reset_index(drop=True) if key in TIME_SERIES_PARAMETERS and isinstance(value, pd.DataFrame) else value
+                for key, value in component.items()
+                if key not in YEARLY_PARAMETERS
+            }
+            for component in esm_data[component_type]
+        ]
+    return window_data
+
+
+def set_state_of_charge(
+    esM: EnergySystemModel,
+    initial_state_of_charge: dict[tuple[str, str], float],
+    final_state_of_charge: dict[tuple[str, str], float] | None,
+) -> None:
+    """
+    Replace FINE's constraint that the state of charge of the storages at the end equals the state of charge at the
+    beginning.
+
+    :param initial_state_of_charge: State of charge of each storage at the beginning
+    :param final_state_of_charge: Minimal state of charge of each storage at the end, None to leave it free
+    """
+    variable = getattr(esM.pyM, STATE_OF_CHARGE_VARIABLE, None)
+    if variable is None:
+        return
+    esM.pyM.ConstrCyclicState_stor.deactivate()
+    last_time_step = max(index[-1] for index in variable)
+    esM.pyM.ConstrFinalState_stor = pyo.ConstraintList()
+    for index in variable:
+        location, component_name, _investment_period, _period, time_step = index
+        if time_step == 0:
+            value = initial_state_of_charge.get((location, component_name), 0.0)
+            variable[index].setlb(value * (1 - STATE_OF_CHARGE_TOLERANCE))
+            variable[index].setub(value * (1 + STATE_OF_CHARGE_TOLERANCE))
+        if time_step == last_time_step and final_state_of_charge is not None:
+            value = final_state_of_charge.get((location, component_name), 0.0)
+            esM.pyM.ConstrFinalState_stor.add(variable[index] >= value * (1 - STATE_OF_CHARGE_TOLERANCE))
+
+
+def rolling_horizon_optimize_esm(
+    esm_data: dict[str, Any],
+    capacities: dict[str, dict[str, float]],
+    window_time_steps: int = DEFAULT_WINDOW_TIME_STEPS,
+    overlap_time_steps: int = DEFAULT_OVERLAP_TIME_STEPS,
+    solver_parameters: EnergyModelSolver | EnergyModelSolverBase | None = None,
+) -> Path:
+    """
+    Optimize the operation of an ESM with fixed capacities at full temporal resolution in windows.
+
+    Demand that can't be covered by the fixed capacities is supplied by the sources of unserved demand, see
+    add_unserved_demand(). The first window keeps FINE's cyclic state of charge, every further window starts with the
+    state of charge at the end of the kept time steps of the previous window. The state of charge at the end of the
+    last window must be at least the state of charge at the beginning of the first window, so that the storages aren't
+    emptied over the horizon.
+
+    :param esm_data: Parameters of the ESM and of all its components, see get_esm_data()
+    :param capacities: Optimal capacity of each component in each location, see get_capacities()
+    :param window_time_steps: Number of time steps that are kept of each window
+    :param overlap_time_steps: Number of time steps that each window is extended by
+    :param solver_parameters: Solver and solver options, None to use the default solver.
+    :return: Path to the result file
+    """
+    fixed_data = add_unserved_demand(fix_capacities(esm_data, capacities))
+    number_of_time_steps = esm_data["esm"]["numberOfTimeSteps"]
+    windows = get_windows(number_of_time_steps, window_time_steps, overlap_time_steps)
+    operation = defaultdict(lambda: [0.0] * number_of_time_steps)
+    state_of_charge = defaultdict(lambda: [0.0] * (number_of_time_steps + 1))
+    window_rows = []
+    initial_state_of_charge = None
+
+    with phase("rolling_horizon"), configured_solver(solver_parameters) as solver_kwargs:
+        for start, end, optimized_end in windows:
+            esM = build_esm(get_window_data(fixed_data, start, optimized_end))
+            esM.declareOptimizationProblem(timeSeriesAggregation=False)
+            if initial_state_of_charge is not None:
+                final_state_of_charge = get_first_state_of_charge(state_of_charge) if end == number_of_time_steps else None
+                set_state_of_charge(esM, initial_state_of_charge, final_state_of_charge)
+            esM.optimize(declaresOptimizationProblem=False, timeSeriesAggregation=False, **solver_kwargs)
+            if esM.solverSpecs["terminationCondition"] != "optimal":
+                raise ValueError(f"The window of the time steps {start} to {optimized_end - 1} is {esM.solverSpecs['terminationCondition']}.")
+
+            for (variable_name, component_name, location, time_step), value in get_window_values(esM, OPERATION_VARIABLES, end - start):
+                operation[(variable_name, component_name, location)][start + time_step] = value
+            initial_state_of_charge = {}
+            for (_, component_name, location, time_step), value in get_window_values(esM, (STATE_OF_CHARGE_VARIABLE,), end - start + 1):
+                state_of_charge[(component_name, location)][start + time_step] = value
+                if time_step == end - start:
+                    initial_state_of_charge[(location, component_name)] = value
+            window_rows.append(
+                {
+                    "start": start,
+                    "end": end - 1,
+                    "optimized_end": optimized_end - 1,
+                    "objective": esM.objectiveValue,
+                    "unserved_demand": get_unserved_demand(operation, start, end),
+                }
+            )
+
+    return write_rolling_horizon_result(capacities, operation, state_of_charge, window_rows, esM)
+
+
+def get_unserved_demand(operation: dict[tuple[str, str, str], list[float]], start: int, end: int) -> float:
+    """
+    Return the unserved demand of all commodities in the kept time steps of a window.
+    """
+    return sum(
+        sum(values[start:end])
+        for (variable_name, component_name, _location), values in operation.items()
+        if variable_name == "op_srcSnk" and component_name.startswith(UNSERVED_DEMAND_PREFIX)
+    )
+
+
+def get_first_state_of_charge(state_of_charge: dict[tuple[str, str], list[float]]) -> dict[tuple[str, str], float]:
+    """
+    Return the state of charge of each storage at the beginning of the first window.
+    """
+    return {(location, component_name): values[0] for (component_name, location), values in state_of_charge.items()}
+
+
+def get_window_values(esM: EnergySystemModel, variable_names: tuple[str, ...], number_of_time_steps: int) -> Iterator[tuple[tuple, float]]:
+    """
+    Return the values of the kept time steps of an optimized window.
+
+    :param number_of_time_steps: Number of time steps that are kept, the time steps of the overlap are skipped.
+    :return: Variable, component, location and time step and the value of each kept value
+    """
+    for variable_name in variable_names:
+        variable = getattr(esM.pyM, variable_name, None)
+        if variable is None:
+            continue
+        for (location, component_name, _, _, time_step), value in variable.extract_values().items():
+            if time_step < number_of_time_steps and value is not None:
+                yield (variable_name, component_name, location, time_step), value
+
+
+def write_rolling_horizon_result(
+    capacities: dict[str, dict[str, float]],
+    operation: dict[tuple[str, str, str], list[float]],
+    state_of_charge: dict[tuple[str, str], list[float]],
+    window_rows: list[dict[str, Any]],
+    esM: EnergySystemModel,
+) -> Path:
+    """
+    Write the stitched results of all windows to an Excel file.
+
+    The sheet "Operation" contains the operation of each component in each location and time step, the sheet
+    "StateOfCharge" the state of charge of each storage. The sheet "Capacities" contains the fixed capacities and the
+    sheet "Windows" the time steps, the objective value and the unserved demand of each window.
+    """
+    operation_sheet = pd.DataFrame.from_dict(operation, orient="index")
+    operation_sheet.index = pd.MultiIndex.from_tuples(operation_sheet.index, names=["variable", "component", "location"])
+    state_of_charge_sheet = pd.DataFrame.from_dict(state_of_charge, orient="index")
+    if not state_of_charge_sheet.empty:
+        state_of_charge_sheet.index = pd.MultiIndex.from_tuples(state_of_charge_sheet.index, names=["component", "location"])
+    capacity_sheet = pd.DataFrame.from_dict(capacities, orient="index")
+    capacity_sheet.index.name = "component"
+
+    result_file_path = create_temp_file(dir=settings.OPTIMIZATION_RESULT_DIR, prefix="ensysmod_result_", suffix=".xlsx")
+    with pd.ExcelWriter(result_file_path) as writer:
+        operation_sheet.sort_index().to_excel(writer, sheet_name="Operation")
+        state_of_charge_sheet.sort_index().to_excel(writer, sheet_name="StateOfCharge")
+        capacity_sheet.sort_index().to_excel(writer, sheet_name="Capacities")
+        pd.DataFrame(window_rows).to_excel(writer, sheet_name="Windows", index=False)
+    write_region_groups(esM, result_file_path)
+    return result_file_path
@@ -0,0 +1,195 @@
+"""
+Optimization of many scenarios of one energy model.
+
+The parameters of the energy model are read from the database once. Each scenario applies its override parameters
+to a copy of them and is optimized in its own worker process. The results are collected into one comparative report.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from ensysmod.core import settings
+from ensysmod.core.fine_esm import COMPONENT_TYPES, aggregate_and_optimize_esm, apply_override, build_esm
+from ensysmod.core.spatial_aggregation import aggregate_model_regions
+from ensysmod.core.time_series_aggregation import time_series_cache_key
+from ensysmod.schemas import EnergyModelAggregationSchema, EnergyModelSolverSchema, ScenarioSweepCreate
+from ensysmod.utils.utils import create_temp_file
+
+logger = logging.getLogger(__name__)
+
+
+def expand_scenarios(request: ScenarioSweepCreate) -> list[list[dict[str, Any]]]:
+    """
+    Expand a scenario sweep into the override parameters of each scenario.
+
+    :param request: The scenario sweep with a grid of parameters or a list of scenarios.
+    :return: List of scenarios, each a list of override parameters.
+    """
+    if request.scenarios is not None:
+        return [[override.model_dump() for override in scenario] for scenario in request.scenarios]
+
+    return [
+        [
+            {
+                "component_name": parameter.component_name,
+                "attribute": parameter.attribute,
+                "operation": parameter.operation,
+                "value": value,
+                "regions": parameter.regions,
+            }
+            for parameter, value in zip(request.grid, values, strict=True)
+        ]
+        for values in product(*(parameter.values for parameter in request.grid))  # noqa: PD011
+    ]
+
+
+def apply_scenario(esm_data: dict[str, Any], overrides: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Apply the override parameters of a scenario to the parameters of an ESM.
+
+    Only the overridden components are copied, the parameters of the ESM stay unchanged.
+
+    :param esm_data: Parameters of the ESM and of all its components, see get_esm_data()
+    :param overrides: Override parameters of the scenario
+    :return: Parameters of the ESM of the scenario
+    """
+    scenario_data = {"esm": esm_data["esm"]}
+    overridden_components = {override["component_name"] for override in overrides}
+    for component_type in COMPONENT_TYPES:
+        scenario_data[component_type] = [
+            dict(component) if component["name"] in overridden_components else component for component in esm_data[component_type]
+        ]
+
+    components = {component["name"]: component for component_type in COMPONENT_TYPES for component in scenario_data[component_type]}
+    for override in overrides:
+        component = components.get(override["component_name"])
+        if component is None:
+            raise ValueError(f"Component {override['component_name']} not found!")
+        apply_override(component, override["attribute"], override["operation"], override["value"], regions=override.get("regions"))
+    return scenario_data
+
+
+def optimize_scenario(
+    esm_data: dict[str, Any],
+    overrides: list[dict[str, Any]],
+    aggregation_parameters: EnergyModelAggregationSchema | None,
+    aggregation_cache_key: str | None,
+    solver_parameters: EnergyModelSolverSchema | None,
+) -> dict[str, Any]:
+    """
+    Optimize a scenario. This function is executed inside a worker process.
+
+    :return: Objective value and total optimal capacity of each component
+    """
+    # the regions are aggregated after the overrides, which may refer to regions of the dataset
+    esM = build_esm(aggregate_model_regions(apply_scenario(esm_data, overrides), aggregation_parameters))
+    override_parameters = [
+        (override["component_name"], override["attribute"], override["operation"], override["value"], override.get("regions"))
+        for override in overrides
+    ]
+    number_of_regions = aggregation_parameters.number_of_regions if aggregation_parameters else None
+    aggregate_and_optimize_esm(
+        esM,
+        aggregation_parameters=aggregation_parameters,
+        aggregation_cache_key=time_series_cache_key(aggregation_cache_key, override_parameters, number_of_regions),
+        solver_parameters=solver_parameters,
+    )
+
+    capacities = {}
+    for modeling_class in esM.componentModelingDict:
+        summary = esM.getOptimizationSummary(modeling_class, outputLevel=2)
+        if "capacity" in summary.index.get_level_values("Property"):
+            capacity = summary.xs("capacity", level="Property").sum(axis=1).groupby(level="Component").sum()
+            capacities.update(capacity.to_dict())
+    return {"objective": esM.objectiveValue, "capacities": capacities}
+
+
+def get_sweep_workers(number_of_scenarios: int) -> int:
+    """
+    Return the number of scenarios that are optimized in parallel.
+
+    By default, each worker of the optimization jobs gets an equal share of the CPUs, so parallel sweeps don't start
+    more processes than there are CPUs.
+    """
+    workers = settings.SCENARIO_SWEEP_WORKERS or max(1, (os.cpu_count() or 1) // settings.OPTIMIZATION_WORKERS)
+    return min(workers, number_of_scenarios)
+
+
+def optimize_scenarios(
+    esm_data: dict[str, Any],
+    scenarios: list[list[dict[str, Any]]],
+    aggregation_parameters: EnergyModelAggregationSchema | None = None,
+    aggregation_cache_key: str | None = None,
+    solver_parameters: EnergyModelSolverSchema | None = None,
+) -> Path:
+    """
+    Optimize all scenarios in a pool of worker processes and write a comparative report.
+
+    A failed scenario is reported with its error, the sweep only fails if all scenarios fail.
+
+    :param esm_data: Parameters of the ESM and of all its components, see get_esm_data()
+    :param scenarios: Override parameters of each scenario
+    :param aggregation_parameters: Aggregation parameters of the energy model
+    :param aggregation_cache_key: Key of the time series of the energy model in the aggregation cache, scenarios add their overrides of time series.
+    :param solver_parameters: Solver parameters of the energy model
+    :return: Path to the report
+    """
+    workers = get_sweep_workers(len(scenarios))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [
+            executor.submit(optimize_scenario, esm_data, overrides, aggregation_parameters, aggregation_cache_key, solver_parameters)
+            for overrides in scenarios
+        ]
+        for number, future in enumerate(futures, start=1):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logger.exception("Scenario %s failed.", number)
+                results.append({"error": str(e)})
+
+    if all("error" in result for result in results):
+        raise ValueError(f"All scenarios failed. Error of the first scenario: {results[0]['error']}")
+
+    return write_scenario_report(scenarios, results)
+
+
+def write_scenario_report(scenarios: list[list[dict[str, Any]]], results: list[dict[str, Any]]) -> Path:
+    """
+    Write the results of all scenarios to an Excel file.
+
+    The sheet "Scenarios" contains the overridden values, the objective value and the error of each scenario.
+    The sheet "Capacities" contains the total optimal capacity of each component in each scenario.
+    """
+    scenario_rows = []
+    for overrides, result in zip(scenarios, results, strict=True):
+        row = {scenario_column(override): override["value"] for override in overrides}
+        row["objective"] = result.get("objective")
+        row["error"] = result.get("error")
+        scenario_rows.append(row)
+    scenario_numbers = pd.RangeIndex(1, len(scenarios) + 1, name="scenario")
+    scenario_sheet = pd.DataFrame(scenario_rows, index=scenario_numbers)
+    capacity_sheet = pd.DataFrame({number: result.get("capacities", {}) for number, result in zip(scenario_numbers, results, strict=True)})
+    capacity_sheet.index.name = "component"
+
+    result_file_path = create_temp_file(dir=settings.OPTIMIZATION_RESULT_DIR, prefix="ensysmod_result_", suffix=".xlsx")
+    with pd.ExcelWriter(result_file_path) as writer:
+        scenario_sheet.to_excel(writer, sheet_name="Scenarios")
+        capacity_sheet.to_excel(writer, sheet_name="Capacities")
+    return result_file_path
+
+
+def scenario_column(override: dict[str, Any]) -> str:
+    """
+    Return the column of an override parameter in the scenario report.
+    """
+    column = f"{override['component_name']} {override['attribute'].name} ({override['operation'].value})"
+    if override.get("regions"):
+        column += f" in {', '.join(override['regions'])}"
+    return column
@@ -0,0 +1,114 @@
+"""
+Selection of the solver and its options for the optimizations of FINE.
+
+FINE only forwards the number of threads and the time limit to Gurobi and silently falls back to another solver
+if the requested one isn't available. Inside a configured_solver() context, the options are set on every solver
+that FINE creates, and an unavailable solver fails the optimization instead. FINE also only warm starts Gurobi,
+so the context passes the warm start to every solver that supports it.
+
+Solvers inside the Python process can't be killed by the watchdog, so they are refused while the optimization has a
+timeout or memory limit, see core.watchdog.
+
+FINE 2.3 creates its solvers by the pyomo.opt module that energySystemModel imported as ``opt``. Inside a
+configured_solver() context, that name is replaced by a _SolverModule.
+"""
+from __future__ import annotations
+
+import functools
+import logging
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any
+
+import fine.energySystemModel
+import pyomo.opt
+
+from ensysmod.core.solver_options import IN_PROCESS_SOLVERS, get_solver_name, get_solver_options
+from ensysmod.core.watchdog import check_stopped, is_limited
+from ensysmod.utils.utils import patched_attribute
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from ensysmod.model import EnergyModelSolver
+    from ensysmod.schemas.energy_model_solver import EnergyModelSolverBase
+
+logger = logging.getLogger(__name__)
+
+# whether FINE creates its solvers by the name it imported from pyomo, which configured_solver() replaces
+FINE_USES_PYOMO_OPT = getattr(fine.energySystemModel, "opt", None) is pyomo.opt
+
+# solver, its options and whether to warm start the current optimization
+_solver_context: ContextVar[tuple[str | None, dict[str, Any], bool] | None] = ContextVar("_solver_context", default=None)
+
+
+@contextmanager
+def configured_solver(solver_parameters: EnergyModelSolver | EnergyModelSolverBase | None, *, warm_start: bool = False) -> Iterator[dict[str, Any]]:
+    """
+    Configure the solver of the optimizations inside the context.
+
+    :param solver_parameters: Solver parameters of the model, None to use the default solver with its default options.
+    :param warm_start: Whether the solver starts from the current values of the variables, if the solver supports it.
+    :return: Arguments for EnergySystemModel.optimize() and optimizeSimpleMyopic()
+    """
+    solver = get_solver_name(solver_parameters)
+    optimize_kwargs: dict[str, Any] = {}
+    options = {}
+    if solver is not None:
+        if solver in IN_PROCESS_SOLVERS and is_limited():
+            raise ValueError(f"Solver {solver} solves inside the worker process and can't be stopped by a timeout or memory limit.")
+        if not pyomo.opt.SolverFactory(solver).available(exception_flag=False):
+            raise ValueError(f"Solver {solver} is not available!")
+
+        optimize_kwargs["solver"] = solver
+        if solver_parameters is not None and solver_parameters.threads is not None:
+            optimize_kwargs["threads"] = solver_parameters.threads
+        if solver_parameters is not None and solver_parameters.time_limit is not None:
+            optimize_kwargs["timeLimit"] = solver_parameters.time_limit
+        options = get_solver_options(solver, solver_parameters)
+
+    if FINE_USES_PYOMO_OPT:
+        solver_module = patched_attribute(fine.energySystemModel, "opt", _solver_module)
+    else:
+        logger.warning("This version of FINE doesn't create its solvers by pyomo.opt, the solver options and warm starts aren't applied.")
+        solver_module = nullcontext()
+
+    token = _solver_context.set((solver, options, warm_start))
+    try:
+        with solver_module:
+            yield optimize_kwargs
+    finally:
+        _solver_context.reset(token)
+
+
+class _SolverModule:
+    """
+    Replacement of the pyomo.opt module in FINE, which sets the options of the configured solver of the current context.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(pyomo.opt, name)
+
+    @staticmethod
+    def SolverFactory(name: str, *args: Any, **kwargs: Any) -> Any:
+        # FINE creates a solver for every solve, a stopped optimization must not start another one
+        check_stopped()
+        solver = pyomo.opt.SolverFactory(name, *args, **kwargs)
+        context = _solver_context.get()
+        if context is None:
+            return solver
+
+        configured_solver_name, options, warm_start = context
+        if configured_solver_name == name:
+            solver.options.update(options)
+        if warm_start:
+            warm_start_capable = getattr(solver, "warm_start_capable", None)
+            if warm_start_capable is not None and warm_start_capable():
+                solver.solve = functools.partial(solver.solve, warmstart=True)
+            else:
+                logger.info("Solver %s doesn't support warm starts, the optimization starts cold.", name)
+        return solver
+
+
+# the replacement is visible to all threads while a configured_solver() context is active, outside of a context it creates solvers like pyomo.opt
+_solver_module = _SolverModule()
@@ -0,0 +1,73 @@
+"""
+Names and values of the options of the solvers.
+
+This module doesn't import FINE or pyomo, so that the schemas can validate solver parameters without them.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from ensysmod.core import settings
+
+if TYPE_CHECKING:
+    from ensysmod.model import EnergyModelSolver
+    from ensysmod.schemas.energy_model_solver import EnergyModelSolverBase
+
+# names of the solver options of each solver
+SOLVER_OPTION_NAMES = {
+    "gurobi": {"threads": "Threads", "time_limit": "TimeLimit", "mip_gap": "MIPGap", "presolve": "Presolve"},
+    "cbc": {"threads": "threads", "time_limit": "sec", "mip_gap": "ratioGap", "presolve": "presolve"},
+    "glpk": {"time_limit": "tmlim", "mip_gap": "mipgap"},
+    "appsi_highs": {"threads": "threads", "time_limit": "time_limit", "mip_gap": "mip_rel_gap", "presolve": "presolve"},
+}
+
+# values of the presolve option of each solver for enabled and disabled presolve
+PRESOLVE_VALUES = {
+    "gurobi": (-1, 0),
+    "cbc": ("on", "off"),
+    "appsi_highs": ("on", "off"),
+}
+
+# solvers that solve inside the Python process, the watchdog can't kill them like the processes of other solvers
+IN_PROCESS_SOLVERS = ("appsi_highs",)
+
+
+def get_allowed_solvers() -> list[str]:
+    """
+    Return the solvers that users may choose. Solvers inside the Python process aren't allowed while a timeout or a
+    memory limit is set, because the watchdog couldn't stop them, see core.watchdog.
+    """
+    if settings.OPTIMIZATION_TIMEOUT_SECONDS is None and settings.OPTIMIZATION_MEMORY_LIMIT_MB is None:
+        return settings.ALLOWED_SOLVERS
+    return [solver for solver in settings.ALLOWED_SOLVERS if solver not in IN_PROCESS_SOLVERS]
+
+
+def get_solver_name(solver_parameters: EnergyModelSolver | EnergyModelSolverBase | None) -> str | None:
+    """
+    Return the solver of an optimization, None if FINE should choose the solver.
+    """
+    if solver_parameters is not None and solver_parameters.solver is not None:
+        return solver_parameters.solver
+    return settings.DEFAULT_SOLVER
+
+
+def get_solver_options(solver: str, solver_parameters: EnergyModelSolver | EnergyModelSolverBase | None) -> dict[str, Any]:
+    """
+    Convert the solver parameters of a model to the options of the solver.
+    """
+    if solver_parameters is None:
+        return {}
+
+    option_names = SOLVER_OPTION_NAMES.get(solver, {})
+    options = {}
+    for parameter in ("threads", "time_limit", "mip_gap", "presolve"):
+        value = getattr(solver_parameters, parameter)
+        if value is None:
+            continue
+        if parameter not in option_names:
+            raise ValueError(f"Solver {solver} doesn't support the parameter {parameter}.")
+        if parameter == "presolve":
+            enabled, disabled = PRESOLVE_VALUES[solver]
+            value = enabled if value else disabled
+        options[option_names[parameter]] = value
+    return options
@@ -0,0 +1,205 @@
+"""
+Spatial aggregation of the regions of an energy system model.
+
+The regions are grouped by the similarity of their time series and capacity bounds. Regions are only grouped with
+neighbors that are connected by a transmission. The parameters of each group are aggregated with the same rules as the
+spatial aggregation of FINE. FINE's own spatial aggregation needs the geometries of the regions, which the datasets
+don't contain, so the grouping and the aggregation work on the parameters collected by get_esm_data().
+"""
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from sklearn.cluster import AgglomerativeClustering
+
+from ensysmod.core.profiling import phase
+from ensysmod.model import EnergyModelAggregation
+from ensysmod.schemas.energy_model_aggregation import EnergyModelAggregationBase
+
+# components with parameters per region, the parameters of transmissions are given per connection of two regions
+REGIONAL_COMPONENT_TYPES = ("sources", "sinks", "conversions", "storages")
+
+# aggregation of the regional parameters, as in the spatial aggregation of FINE
+AGGREGATION_MODES = {
+    "operationRateFix": "sum",
+    "operationRateMax": "weighted mean",
+    "capacityFix": "sum",
+    "capacityMax": "sum",
+    "capacityMin": "sum",
+    "yearlyFullLoadHoursMax": "mean",
+    "yearlyFullLoadHoursMin": "mean",
+    "distances": "mean",
+    "losses": "mean",
+}
+
+# parameters with a time series per region, which are the features of the grouping
+TIME_SERIES_PARAMETERS = ("operationRateFix", "operationRateMax")
+
+
+def aggregate_model_regions(
+    esm_data: dict[str, Any],
+    aggregation_parameters: EnergyModelAggregation | EnergyModelAggregationBase | None,
+) -> dict[str, Any]:
+    """
+    Aggregate the regions of an ESM if the aggregation parameters of its energy model give a number of regions.
+
+    :param esm_data: Parameters of the ESM and of all its components, see get_esm_data()
+    :param aggregation_parameters: Aggregation parameters of the energy model
+    :return: Parameters of the aggregated ESM, the unchanged parameters if the regions aren't aggregated
+    """
+    if aggregation_parameters is None or aggregation_parameters.number_of_regions is None:
+        return esm_data
+    with phase("aggregate_regions"):
+        return aggregate_regions(esm_data, aggregation_parameters.number_of_regions)
+
+
+def aggregate_regions(esm_data: dict[str, Any], number_of_regions: int) -> dict[str, Any]:
+    """
+    Aggregate the regions of an ESM into groups of similar regions.
+
+    :param esm_data: Parameters of the ESM and of all its components, see get_esm_data()
+    :param number_of_regions: Number of regions after the aggregation
+    :return: Parameters of the aggregated ESM. The original regions of each aggregated region are given by "regionGroups".
+    """
+    region_groups = group_regions(esm_data, number_of_regions)
+    region_map = {region: group for group, regions in region_groups.items() for region in regions}
+
+    aggregated_data = {"esm": {**esm_data["esm"], "locations": set(region_groups)}, "regionGroups": region_groups}
+    for component_type in (*REGIONAL_COMPONENT_TYPES, "transmissions"):
+        aggregated_components = [aggregate_component(component, region_map) for component in esm_data[component_type]]
+        # transmissions inside of a group are dropped
+        aggregated_data[component_type] = [component for component in aggregated_components if component is not None]
+    return aggregated_data
+
+
+def group_regions(esm_data: dict[str, Any], number_of_regions: int) -> dict[str, list[str]]:
+    """
+    Group the regions by the similarity of their normalized time series and capacity bounds.
+
+    :return: Original regions of each aggregated region
+    """
+    regions = sorted(esm_data["esm"]["locations"])
+    if number_of_regions >= len(regions):
+        return {region: [region] for region in regions}
+
+    features = get_region_features(esm_data, regions)
+    connectivity = get_region_connectivity(esm_data, regions)
+    linkage = "ward" if features.shape[1] > 0 else "single"
+    clustering = AgglomerativeClustering(n_clusters=number_of_regions, connectivity=connectivity, linkage=linkage)
+    labels = clustering.fit_predict(features if features.shape[1] > 0 else np.zeros((len(regions), 1)))
+
+    groups: dict[int, list[str]] = {}
+    for region, label in zip(regions, labels, strict=True):
+        groups.setdefault(label, []).append(region)
+    # number the groups in the order of their first region
+    return {f"cluster_{number}": group for number, group in enumerate(sorted(groups.values()), start=1)}
+
+
+def get_region_features(esm_data: dict[str, Any], regions: list[str]) -> np.ndarray:
+    """
+    Return the features of each region: all time series and capacity bounds, each scaled to a maximum of 1.
+    """
+    features = []
+    for component_type in REGIONAL_COMPONENT_TYPES:
+        for component in esm_data[component_type]:
+            for parameter in (*TIME_SERIES_PARAMETERS, "capacityMax", "capacityFix"):
+                data = component.get(parameter)
+                if not isinstance(data, pd.DataFrame | pd.Series):
+                    continue
+                if isinstance(data, pd.Series):
+                    data = data.to_frame().T
+                values = data.reindex(columns=regions, fill_value=0).to_numpy(dtype=float).T
+                scale = np.abs(values).max()
+                if scale > 0:
+                    features.append(values / scale)
+    if not features:
+        return np.empty((len(regions), 0))
+    return np.hstack(features)
+
+
+def get_region_connectivity(esm_data: dict[str, Any], regions: list[str]) -> csr_matrix | None:
+    """
+    Return the adjacency matrix of the regions that are connected by a transmission, None if there are no transmissions.
+    """
+    connections = []
+    for transmission in esm_data["transmissions"]:
+        for parameter in ("distances", "capacityMax", "capacityFix"):
+            data = transmission.get(parameter)
+            if isinstance(data, pd.DataFrame):
+                connections.append(data.reindex(index=regions, columns=regions, fill_value=0).to_numpy(dtype=float) != 0)
+    if not connections:
+        return None
+    adjacency = np.logical_or.reduce(connections)
+    return csr_matrix(adjacency | adjacency.T)
+
+
+def aggregate_component(component: dict[str, Any], region_map: dict[str, str]) -> dict[str, Any] | None:
+    """
+    Aggregate the regional parameters of a component.
+
+    :return: Aggregated component, None for a transmission without connections between aggregated regions
+    """
+    aggregated_component = dict(component)
+    weights = component.get("capacityMax") if isinstance(component.get("capacityMax"), pd.Series) else None
+    for parameter, mode in AGGREGATION_MODES.items():
+        data = component.get(parameter)
+        if isinstance(data, pd.DataFrame) and is_region_matrix(data, region_map):
+            aggregated_component[parameter] = aggregate_matrix(data, region_map, mode)
+        elif isinstance(data, pd.DataFrame):
+            aggregated_component[parameter] = aggregate_time_series(data, region_map, mode, weights)
+        elif isinstance(data, pd.Series):
+            aggregated_component[parameter] = aggregate_values(data, region_map, mode)
+
+    if "distances" in aggregated_component and not (aggregated_component["distances"].to_numpy() != 0).any():
+        return None
+    return aggregated_component
+
+
+def is_region_matrix(data: pd.DataFrame, region_map: dict[str, str]) -> bool:
+    """
+    Return whether a dataframe is a matrix of the connections between two regions instead of a time series.
+    """
+    return data.index.isin(list(region_map)).all() and data.columns.isin(list(region_map)).all()
+
+
+def aggregate_time_series(data: pd.DataFrame, region_map: dict[str, str], mode: str, weights: pd.Series | None) -> pd.DataFrame:
+    """
+    Aggregate a time series with a column per region.
+    """
+    groups = data.columns.map(region_map)
+    if mode == "sum":
+        return data.T.groupby(groups).sum().T
+    if mode == "weighted mean" and weights is not None:
+        column_weights = weights.reindex(data.columns, fill_value=0).astype(float)
+        group_weights = column_weights.groupby(groups).transform("sum")
+        # groups without weights are averaged
+        column_weights = column_weights.where(group_weights > 0, 1)
+        weighted_sum = (data * column_weights).T.groupby(groups).sum()
+        return (weighted_sum.T / column_weights.groupby(groups).sum()).fillna(0)
+    return data.T.groupby(groups).mean().T
+
+
+def aggregate_values(data: pd.Series, region_map: dict[str, str], mode: str) -> pd.Series:
+    """
+    Aggregate a parameter with a value per region.
+    """
+    grouped_data = data.groupby(data.index.map(region_map))
+    return grouped_data.sum() if mode == "sum" else grouped_data.mean()
+
+
+def aggregate_matrix(data: pd.DataFrame, region_map: dict[str, str], mode: str) -> pd.DataFrame:
+    """
+    Aggregate a matrix of the connections between two regions. Connections inside of an aggregated region are dropped,
+    the distances and losses of the connections between two aggregated regions are averaged.
+    """
+    groups = sorted(set(region_map.values()))
+    members = {group: [region for region in data.index if region_map[region] == group] for group in groups}
+    aggregated_data = pd.DataFrame(0.0, index=groups, columns=groups)
+    for group_from in groups:
+        for group_to in groups:
+            values = data.loc[members[group_from], members[group_to]].to_numpy(dtype=float)
+            values = values[values != 0]
+            if group_from != group_to and values.size > 0:
+                aggregated_data.loc[group_from, group_to] = values.sum() if mode == "sum" else values.mean()
+    return aggregated_data
@@ -0,0 +1,133 @@
+"""
+Reuse of the time series clusterings of FINE across energy system models.
+
+EnergySystemModel.aggregateTemporally() clusters the time series of all components with tsam for every investment period.
+All models of a dataset whose overrides leave the time series untouched result in the same clustering,
+so the clusterings are stored in the aggregation cache and reused instead of clustering the time series again.
+Overrides of operation rates and the spatial aggregation change the time series and are part of the cache key.
+
+FINE 2.3 clusters by the TimeSeriesAggregation class that energySystemModel imported from tsam. Inside a
+cached_clustering() context, that name is replaced by time_series_aggregation(). A cached clustering only has the
+attributes that FINE reads, see CLUSTERING_ATTRIBUTES, and a freshly computed clustering is the tsam object itself.
+"""
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import count
+from types import SimpleNamespace
+from typing import Any
+
+import fine.energySystemModel
+from tsam.timeseriesaggregation import TimeSeriesAggregation
+
+from ensysmod.core.cache import aggregation_cache, hash_content
+from ensysmod.model import EnergyModelOverrideAttribute
+from ensysmod.utils.utils import patched_attribute
+
+logger = logging.getLogger(__name__)
+
+# override attributes that change the time series
+TIME_SERIES_ATTRIBUTES = (EnergyModelOverrideAttribute.operationRateFix, EnergyModelOverrideAttribute.operationRateMax)
+
+# attributes of tsam's TimeSeriesAggregation that FINE reads: the clustering and, to summarize the performance, the settings
+CLUSTERING_ATTRIBUTES = ("clusterPeriodDict", "clusterPeriodIdx", "clusterOrder")
+SETTINGS_ATTRIBUTES = ("clusterMethod", "noTypicalPeriods", "hoursPerPeriod", "segmentation", "noSegments", "solver", "timeStepsPerPeriod")
+
+# version of the cached clusterings, clusterings of an earlier version have other content
+CLUSTERING_FORMAT_VERSION = 2
+
+# whether FINE clusters by the name it imported from tsam, which cached_clustering() replaces
+FINE_USES_TSAM = getattr(fine.energySystemModel, "TimeSeriesAggregation", None) is TimeSeriesAggregation
+
+# key of the clustered data and counter of the clusterings in the current aggregation, None if the clusterings aren't cached
+_cache_context: ContextVar[tuple[str, Iterator[int]] | None] = ContextVar("_cache_context", default=None)
+
+
+@contextmanager
+def cached_clustering(cache_key: str | None) -> Iterator[None]:
+    """
+    Cache all clusterings of time series inside the context.
+
+    The cache key must identify the time series data, e.g. by the fingerprint of the dataset.
+    The settings of the aggregation and the names of the time series are added to the key of each clustering.
+
+    :param cache_key: Key of the time series data, None disables the cache.
+    """
+    if cache_key is not None and not FINE_USES_TSAM:
+        logger.warning("This version of FINE doesn't cluster by tsam's TimeSeriesAggregation, the clusterings aren't cached.")
+        cache_key = None
+
+    token = _cache_context.set((cache_key, count()) if cache_key is not None else None)
+    try:
+        if cache_key is None:
+            yield
+        else:
+            with patched_attribute(fine.energySystemModel, "TimeSeriesAggregation", time_series_aggregation):
+                yield
+    finally:
+        _cache_context.reset(token)
+
+
+def time_series_cache_key(cache_key: str | None, override_parameters: list[tuple[Any, ...]], number_of_regions: int | None = None) -> str | None:
+    """
+    Add the overrides of time series to the key of the time series data.
+
+    The regions of a spatially aggregated model are grouped by all their parameters, so all overrides change its time series.
+
+    :param cache_key: Key of the time series data without overrides, e.g. the fingerprint of the dataset.
+    :param override_parameters: Override parameters as tuples of component name, attribute, operation, value and regions.
+    :param number_of_regions: Number of regions of the spatial aggregation, None if the regions aren't aggregated.
+    :return: Key of the overridden time series data, None if the cache is disabled.
+    """
+    if cache_key is not None and number_of_regions is not None:
+        return hash_content({"cache_key": cache_key, "override_parameters": override_parameters, "number_of_regions": number_of_regions})
+    time_series_overrides = [override for override in override_parameters if override[1] in TIME_SERIES_ATTRIBUTES]
+    if cache_key is None or not time_series_overrides:
+        return cache_key
+    return hash_content({"cache_key": cache_key, "override_parameters": time_series_overrides})
+
+
+def time_series_aggregation(**kwargs: Any) -> Any:
+    """
+    Replacement of tsam's TimeSeriesAggregation for FINE, which takes the clustering from the aggregation cache if possible.
+
+    The replacement is visible to all threads while a cached_clustering() context is active, outside of a context
+    it clusters like tsam.
+    """
+    context = _cache_context.get()
+    if context is None or not aggregation_cache.enabled:
+        return TimeSeriesAggregation(**kwargs)
+
+    cache_key, clustering_number = context
+    time_series = kwargs["timeSeries"]
+    settings = {key: value for key, value in kwargs.items() if key != "timeSeries"}
+    clustering_key = hash_content(
+        {
+            "cache_key": cache_key,
+            # FINE clusters once per investment period and once per step of a myopic optimization
+            "clustering_number": next(clustering_number),
+            "time_series": list(time_series.columns),
+            "number_of_time_steps": len(time_series),
+            "settings": settings,
+            "format_version": CLUSTERING_FORMAT_VERSION,
+        }
+    )
+    cached_clustering = aggregation_cache.load(clustering_key)
+    if cached_clustering is not None:
+        return SimpleNamespace(**cached_clustering)
+
+    clustering = TimeSeriesAggregation(**kwargs)
+    aggregation_cache.dump(clustering_key, get_clustering_attributes(clustering))
+    return clustering
+
+
+def get_clustering_attributes(clustering: TimeSeriesAggregation) -> dict[str, Any]:
+    """
+    Return the attributes of a clustering of tsam that FINE reads.
+    """
+    attributes = {name: getattr(clustering, name) for name in (*CLUSTERING_ATTRIBUTES, *SETTINGS_ATTRIBUTES)}
+    # the durations of the segments are only computed for a segmentation
+    if clustering.segmentation:
+        attributes["segmentDurationDict"] = clustering.segmentDurationDict
+    return attributes
@@ -0,0 +1,148 @@
+"""
+Cancellation, timeouts and memory limits of running optimizations.
+
+Inside a supervised() context, a watchdog thread checks periodically whether the optimization was cancelled, exceeded
+its wall-clock timeout or uses more memory than allowed. The memory includes child processes, like in core.profiling.
+If the optimization has to stop, the watchdog kills all child processes, i.e. the solver and the workers of a scenario
+sweep, so the running solve fails, and every further solve is refused by check_stopped(). Python code between two
+solves, e.g. the clustering of the time series, can't be interrupted and runs until the next solve.
+
+Solvers that solve inside the worker process, like appsi_highs, have no process to kill: a cancelled solve runs until
+it ends. These solvers are refused while a timeout or memory limit applies, see solver_options.get_allowed_solvers()
+and solver.configured_solver().
+
+Jobs that run in the API process, see optimization_jobs.get_executor(), share the child processes with each other.
+"""
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+
+import psutil
+
+from ensysmod.core.profiling import get_rss
+
+logger = logging.getLogger(__name__)
+
+# interval in seconds at which the watchdog checks the optimization
+CHECK_INTERVAL = 1.0
+
+# watchdog of the current optimization, None if the optimization isn't supervised
+_watchdog_context: ContextVar["Watchdog | None"] = ContextVar("_watchdog_context", default=None)
+
+
+class OptimizationStoppedError(RuntimeError):
+    """
+    Raised when a solve is started after the watchdog stopped the optimization.
+    """
+
+
+class Watchdog:
+    """
+    Checks an optimization in a background thread and kills its solver processes if it has to stop.
+    """
+
+    def __init__(self, is_cancelled: Callable[[], bool] | None, timeout: float | None, memory_limit_mb: int | None):
+        self.is_cancelled = is_cancelled
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.cancelled = False
+        self.error: str | None = None
+        self._process = psutil.Process()
+        self._start_time = time.monotonic()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def stopped(self) -> bool:
+        """
+        Whether the optimization was cancelled or exceeded a limit.
+        """
+        return self.error is not None
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def check(self) -> str | None:
+        """
+        Return why the optimization has to stop, None if it may continue.
+        """
+        if self.is_cancelled is not None and self.is_cancelled():
+            self.cancelled = True
+            return "The optimization was cancelled."
+        if self.timeout is not None and time.monotonic() - self._start_time > self.timeout:
+            return f"The optimization exceeded its timeout of {self.timeout:g} seconds."
+        if self.memory_limit_mb is not None and get_rss(self._process) > self.memory_limit_mb * 1024 * 1024:
+            return f"The optimization exceeded the memory limit of {self.memory_limit_mb} MB."
+        return None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(CHECK_INTERVAL):
+            try:
+                error = self.check()
+            except Exception:
+                # a failed check, e.g. a lost database connection, must not stop the optimization
+                logger.exception("Watchdog check failed.")
+                continue
+            if error is not None:
+                self.error = error
+                logger.warning("%s Killing the solver processes.", error)
+                kill_children(self._process)
+                return
+
+
+def kill_children(process: psutil.Process) -> None:
+    """
+    Kill all child processes of a process, e.g. the solver.
+    """
+    for child in process.children(recursive=True):
+        # the child may have terminated in the meantime
+        with suppress(psutil.NoSuchProcess):
+            child.kill()
+
+
+@contextmanager
+def supervised(
+    is_cancelled: Callable[[], bool] | None = None,
+    timeout: float | None = None,
+    memory_limit_mb: int | None = None,
+) -> Iterator[Watchdog]:
+    """
+    Supervise the optimization inside the context.
+
+    :param is_cancelled: Returns whether the optimization was cancelled, None if it can't be cancelled.
+    :param timeout: Wall-clock timeout of the optimization in seconds, None for no timeout.
+    :param memory_limit_mb: Maximum memory of the process and its child processes, None for no limit.
+    :return: Watchdog of the optimization. Its error tells why the optimization stopped.
+    """
+    watchdog = Watchdog(is_cancelled, timeout, memory_limit_mb)
+    token = _watchdog_context.set(watchdog)
+    watchdog.start()
+    try:
+        yield watchdog
+    finally:
+        watchdog.stop()
+        _watchdog_context.reset(token)
+
+
+def check_stopped() -> None:
+    """
+    Raise an error if the watchdog of the current optimization stopped it.
+    """
+    watchdog = _watchdog_context.get()
+    if watchdog is not None and watchdog.stopped:
+        raise OptimizationStoppedError(watchdog.error)
+
+
+def is_limited() -> bool:
+    """
+    Return whether the current optimization is supervised with a timeout or a memory limit.
+    """
+    watchdog = _watchdog_context.get()
+    return watchdog is not None and (watchdog.timeout is not None or watchdog.memory_limit_mb is not None)
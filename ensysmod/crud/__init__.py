@@ -11,14 +11,18 @@ from .energy_component import energy_component
 from .energy_conversion import energy_conversion
 from .energy_conversion_factor import energy_conversion_factor
 from .energy_model import energy_model
+from .energy_model_aggregation import energy_model_aggregation
 from .energy_model_optimization import energy_model_optimization
 from .energy_model_override import energy_model_override
+from .energy_model_solver import energy_model_solver
 from .energy_sink import energy_sink
 from .energy_source import energy_source
 from .energy_storage import energy_storage
 from .energy_transmission import energy_transmission
 from .operation_rate_fix import operation_rate_fix
 from .operation_rate_max import operation_rate_max
+from .optimization_job import optimization_job
+from .optimization_result import optimization_result
 from .region import region
 from .transmission_distance import transmission_distance
 from .transmission_loss import transmission_loss
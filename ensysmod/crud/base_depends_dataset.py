@@ -1,6 +1,6 @@
 from typing import Generic
 
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ensysmod.crud.base import CreateSchemaType, CRUDBase, ModelType, UpdateSchemaType
@@ -18,3 +18,7 @@ class CRUDBaseDependsDataset(CRUDBase, Generic[ModelType, CreateSchemaType, Upda
     def get_by_dataset_and_name(self, db: Session, *, dataset_id: int, name: str) -> ModelType | None:
         query = select(self.model).where(self.model.ref_dataset == dataset_id, self.model.name == name)
         return db.execute(query).scalar_one_or_none()
+
+    def count_by_dataset(self, db: Session, *, dataset_id: int) -> int:
+        query = select(func.count()).select_from(self.model).where(self.model.ref_dataset == dataset_id)
+        return db.execute(query).scalar_one()
@@ -1,8 +1,10 @@
+from collections import defaultdict
 from typing import Generic
 
 import pandas as pd
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, Select, func, select
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.types import PickleType
 
 from ensysmod import crud
 from ensysmod.crud.base import CreateSchemaType, ModelType, UpdateSchemaType
@@ -60,26 +62,82 @@ class CRUDBaseDependsExcel(CRUDBaseDependsDataset, Generic[ModelType, CreateSche
         """
         Get dataframe for component and multiple regions.
         """
-        data = self.get_multi_by_component(db=db, component_id=component_id)
+        rows = db.execute(self._dataframe_query().where(self.model.ref_component == component_id)).all()
 
-        # Sort data by region
-        data.sort(key=lambda d: d.ref_region)
-
-        # if region_to is not None, return region x region matrix dataframe
-        if any(d.ref_region_to is not None for d in data):
+        region_names = None
+        if any(region_to_name is not None for _, _, region_to_name, _ in rows):
             dataset_id = crud.energy_component.get(db, id=component_id).ref_dataset
-            region_names = list(db.execute(select(Region.name).where(Region.ref_dataset == dataset_id)).scalars().all())
+            region_names = self._get_region_names(db, dataset_id=dataset_id)
+        return self._to_dataframe(rows, region_names)
+
+    def get_dataframes_by_dataset(self, db: Session, *, dataset_id: int) -> dict[int, pd.DataFrame]:
+        """
+        Get the dataframes of all components of a dataset, see get_dataframe().
+
+        All rows of the dataset are fetched by one query with the names of their regions.
+
+        :return: Dataframe of each component by the ID of the component
+        """
+        rows = db.execute(self._dataframe_query().where(self.model.ref_dataset == dataset_id)).all()
+
+        rows_by_component = defaultdict(list)
+        for row in rows:
+            rows_by_component[row[0]].append(row)
+
+        region_names = None
+        if any(region_to_name is not None for _, _, region_to_name, _ in rows):
+            region_names = self._get_region_names(db, dataset_id=dataset_id)
+        return {component_id: self._to_dataframe(component_rows, region_names) for component_id, component_rows in rows_by_component.items()}
+
+    def located_regions_query(self, *, dataset_id: int) -> Select:
+        """
+        Query the component and the region of each row of a dataset with a non-zero value.
+
+        Time series are pickled and can't be compared in the query, so every row of a time series is returned.
+        """
+        query = select(self.model.ref_component, self.model.ref_region).where(self.model.ref_dataset == dataset_id)
+        column = getattr(self.model, self.data_column)
+        if not isinstance(column.type, PickleType):
+            query = query.where(column != 0)
+        return query
+
+    def count_located_by_component(self, db: Session, *, dataset_id: int) -> dict[int, int]:
+        """
+        Count the rows of each component of a dataset with a non-zero value, without reading the values.
 
+        :return: Number of rows by the ID of the component
+        """
+        rows = self.located_regions_query(dataset_id=dataset_id).subquery()
+        query = select(rows.c.ref_component, func.count()).group_by(rows.c.ref_component)
+        return dict(db.execute(query).all())
+
+    def _dataframe_query(self) -> Select:
+        """
+        Query the component, the region names and the value of each row, sorted by region.
+        """
+        region_to = aliased(Region)
+        return (
+            select(self.model.ref_component, Region.name, region_to.name, getattr(self.model, self.data_column))
+            .join(Region, self.model.ref_region == Region.id)
+            .outerjoin(region_to, self.model.ref_region_to == region_to.id)
+            .order_by(self.model.ref_region)
+        )
+
+    def _get_region_names(self, db: Session, *, dataset_id: int) -> list[str]:
+        return list(db.execute(select(Region.name).where(Region.ref_dataset == dataset_id)).scalars().all())
+
+    def _to_dataframe(self, rows: list[Row], region_names: list[str] | None) -> pd.DataFrame:
+        # if region_to is not None, return region x region matrix dataframe
+        if any(region_to_name is not None for _, _, region_to_name, _ in rows):
             dataframe = pd.DataFrame(0, index=region_names, columns=region_names, dtype=float)
-            for d in data:
-                dataframe.loc[d.region.name, d.region_to.name] = getattr(d, self.data_column)
+            for _, region_name, region_to_name, value in rows:
+                dataframe.loc[region_name, region_to_name] = value
             return dataframe
 
         # otherwise return dataframe with 1 row and regions as columns
         data_dict = {}
-        for d in data:
-            value = getattr(d, self.data_column)
-            data_dict[d.region.name] = value if isinstance(value, list) else [value]
+        for _, region_name, _, value in rows:
+            data_dict[region_name] = value if isinstance(value, list) else [value]
         return pd.DataFrame(data=data_dict)
 
     def remove_multi_by_component(self, db: Session, *, component_id: int) -> list[ModelType]:
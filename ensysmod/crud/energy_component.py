@@ -1,4 +1,8 @@
+from sqlalchemy import func, select, union
+from sqlalchemy.orm import Session
+
 from ensysmod.crud.base_depends_dataset import CRUDBaseDependsDataset
+from ensysmod.crud.base_depends_excel import CRUDBaseDependsExcel
 from ensysmod.model import EnergyComponent
 from ensysmod.schemas import EnergyComponentCreate, EnergyComponentUpdate
 
@@ -9,5 +13,15 @@ class CRUDEnergyComponent(CRUDBaseDependsDataset[EnergyComponent, EnergyComponen
     CRUD operations for EnergyComponent
     """
 
+    def count_regions_by_component(self, db: Session, *, dataset_id: int, parameter_tables: list[CRUDBaseDependsExcel]) -> dict[int, int]:
+        """
+        Count the regions in which each component of a dataset has a non-zero value of any of the given parameters.
+
+        :return: Number of regions by the ID of the component, components without values are missing
+        """
+        located_regions = union(*(table.located_regions_query(dataset_id=dataset_id) for table in parameter_tables)).subquery()
+        query = select(located_regions.c.ref_component, func.count()).group_by(located_regions.c.ref_component)
+        return dict(db.execute(query).all())
+
 
 energy_component = CRUDEnergyComponent(EnergyComponent)
@@ -2,7 +2,7 @@ from sqlalchemy.orm import Session
 
 from ensysmod import crud
 from ensysmod.crud.base_depends_dataset import CRUDBaseDependsDataset
-from ensysmod.model import EnergyModel, EnergyModelOptimization, EnergyModelOverride
+from ensysmod.model import EnergyModel, EnergyModelAggregation, EnergyModelOptimization, EnergyModelOverride, EnergyModelSolver
 from ensysmod.schemas import EnergyModelCreate, EnergyModelUpdate
 
 
@@ -18,7 +18,7 @@ class CRUDEnergyModel(CRUDBaseDependsDataset[EnergyModel, EnergyModelCreate, Ene
         """
         new_model: EnergyModel = super().create(db, obj_in=obj_in)
 
-        # Create override and optimization parameters
+        # Create override, optimization, aggregation and solver parameters
         override_parameter_fields = set(EnergyModelOverride.__table__.columns.keys())
         for override_parameter_create in obj_in.override_parameters:
             component = crud.energy_component.get_by_dataset_and_name(
@@ -42,7 +42,30 @@ class CRUDEnergyModel(CRUDBaseDependsDataset[EnergyModel, EnergyModelCreate, Ene
             )
             crud.energy_model_optimization.create(db, obj_in=optimization_parameters)
 
+        if obj_in.aggregation_parameters is not None:
+            aggregation_parameter_fields = set(EnergyModelAggregation.__table__.columns.keys())
+            aggregation_parameters = EnergyModelAggregation(
+                ref_model=new_model.id,
+                **obj_in.aggregation_parameters.model_dump(include=aggregation_parameter_fields),
+            )
+            crud.energy_model_aggregation.create(db, obj_in=aggregation_parameters)
+
+        if obj_in.solver_parameters is not None:
+            solver_parameter_fields = set(EnergyModelSolver.__table__.columns.keys())
+            solver_parameters = EnergyModelSolver(
+                ref_model=new_model.id,
+                **obj_in.solver_parameters.model_dump(include=solver_parameter_fields),
+            )
+            crud.energy_model_solver.create(db, obj_in=solver_parameters)
+
         return new_model
 
+    def remove(self, db: Session, *, id: int) -> EnergyModel:
+        """
+        Remove an energy model. The results of its jobs are removed first, results of other models may share their values.
+        """
+        crud.optimization_result.remove_by_model(db, model_id=id)
+        return super().remove(db, id=id)
+
 
 energy_model = CRUDEnergyModel(EnergyModel)
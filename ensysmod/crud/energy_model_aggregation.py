@@ -0,0 +1,20 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ensysmod.crud.base import CRUDBase
+from ensysmod.model import EnergyModelAggregation
+from ensysmod.schemas import EnergyModelAggregationCreate, EnergyModelAggregationUpdate
+
+
+# noinspection PyMethodMayBeStatic,PyArgumentList
+class CRUDEnergyModelAggregation(CRUDBase[EnergyModelAggregation, EnergyModelAggregationCreate, EnergyModelAggregationUpdate]):
+    """
+    CRUD operations for EnergyModelAggregation
+    """
+
+    def get_by_ref_model(self, db: Session, *, ref_model: int) -> EnergyModelAggregation | None:
+        query = select(EnergyModelAggregation).where(EnergyModelAggregation.ref_model == ref_model)
+        return db.execute(query).scalar_one_or_none()
+
+
+energy_model_aggregation = CRUDEnergyModelAggregation(EnergyModelAggregation)
@@ -0,0 +1,20 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ensysmod.crud.base import CRUDBase
+from ensysmod.model import EnergyModelSolver
+from ensysmod.schemas import EnergyModelSolverCreate, EnergyModelSolverUpdate
+
+
+# noinspection PyMethodMayBeStatic,PyArgumentList
+class CRUDEnergyModelSolver(CRUDBase[EnergyModelSolver, EnergyModelSolverCreate, EnergyModelSolverUpdate]):
+    """
+    CRUD operations for EnergyModelSolver
+    """
+
+    def get_by_ref_model(self, db: Session, *, ref_model: int) -> EnergyModelSolver | None:
+        query = select(EnergyModelSolver).where(EnergyModelSolver.ref_model == ref_model)
+        return db.execute(query).scalar_one_or_none()
+
+
+energy_model_solver = CRUDEnergyModelSolver(EnergyModelSolver)
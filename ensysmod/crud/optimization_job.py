@@ -0,0 +1,155 @@
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import ColumnElement, and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from ensysmod.crud.base import CRUDBase
+from ensysmod.model import OptimizationJob, OptimizationJobStatus
+from ensysmod.schemas import OptimizationJobCreate, OptimizationJobUpdate
+
+
+# noinspection PyMethodMayBeStatic,PyArgumentList
+class CRUDOptimizationJob(CRUDBase[OptimizationJob, OptimizationJobCreate, OptimizationJobUpdate]):
+    """
+    CRUD operations for OptimizationJob
+    """
+
+    def get_multi_by_model(self, db: Session, *, skip: int = 0, limit: int = 100, model_id: int) -> list[OptimizationJob]:
+        query = select(self.model).where(self.model.ref_model == model_id).order_by(self.model.id).offset(skip).limit(limit)
+        return db.execute(query).scalars().all()
+
+    def get_multi_by_user(self, db: Session, *, skip: int = 0, limit: int = 100, user_id: int) -> list[OptimizationJob]:
+        query = select(self.model).where(self.model.ref_user == user_id).order_by(self.model.id).offset(skip).limit(limit)
+        return db.execute(query).scalars().all()
+
+    def get_latest_solved_by_model(self, db: Session, *, model_id: int) -> OptimizationJob | None:
+        query = (
+            select(self.model)
+            .where(self.model.ref_model == model_id, self.model.status == OptimizationJobStatus.FINISHED, self.model.solution_file.is_not(None))
+            .order_by(self.model.id.desc())
+            .limit(1)
+        )
+        return db.execute(query).scalar_one_or_none()
+
+    def is_cancel_requested(self, db: Session, *, id: int) -> bool:
+        query = select(self.model.cancel_requested).where(self.model.id == id)
+        return bool(db.execute(query).scalar_one_or_none())
+
+    def get_multi_unfinished(self, db: Session) -> list[OptimizationJob]:
+        query = select(self.model).where(self.model.status.in_([OptimizationJobStatus.PENDING, OptimizationJobStatus.RUNNING]))
+        return db.execute(query).scalars().all()
+
+    def claim_next(self, db: Session, *, worker: str, lease_seconds: int, max_attempts: int) -> OptimizationJob | None:
+        """
+        Claim the oldest pending job, or a running job whose lease expired, for a worker of the job queue.
+
+        Postgres skips the jobs that other workers are claiming at the same time. SQLite can't lock rows, there the job
+        is only claimed if no other worker claimed it in the meantime.
+        """
+        now = datetime.now(tz=UTC)
+        query = select(self.model.id).where(self._claimable(now, max_attempts)).order_by(self.model.id).limit(1)
+        if db.get_bind().dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True)
+        job_id = db.execute(query).scalar_one_or_none()
+        if job_id is None:
+            db.rollback()
+            return None
+
+        claim = (
+            update(self.model)
+            .where(self.model.id == job_id, self._claimable(now, max_attempts))
+            .values(
+                status=OptimizationJobStatus.RUNNING,
+                started_at=now,
+                worker=worker,
+                heartbeat_at=now,
+                lease_expires_at=now + timedelta(seconds=lease_seconds),
+                attempts=self.model.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        claimed = db.execute(claim).rowcount == 1
+        db.commit()
+        if not claimed:
+            return None
+        # the session may hold the job from before the claim
+        query = select(self.model).where(self.model.id == job_id).execution_options(populate_existing=True)
+        return db.execute(query).scalar_one()
+
+    def renew_lease(self, db: Session, *, id: int, worker: str, lease_seconds: int) -> bool:
+        """
+        Extend the lease of a running job.
+
+        :return: Whether the worker still holds the lease.
+        """
+        now = datetime.now(tz=UTC)
+        renewal = (
+            update(self.model)
+            .where(self._leased(id, worker))
+            .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        renewed = db.execute(renewal).rowcount == 1
+        db.commit()
+        return renewed
+
+    def holds_lease(self, db: Session, *, id: int, worker: str) -> bool:
+        """
+        Return whether a worker still holds the lease of a running job.
+        """
+        query = select(self.model.id).where(self._leased(id, worker))
+        return db.execute(query).scalar_one_or_none() is not None
+
+    def update_leased(self, db: Session, *, db_obj: OptimizationJob, worker: str, obj_in: dict[str, Any]) -> bool:
+        """
+        Update a running job only if the worker still holds its lease, e.g. to store the result of the worker.
+
+        :return: Whether the job was updated.
+        """
+        query = update(self.model).where(self._leased(db_obj.id, worker)).values(**obj_in).execution_options(synchronize_session=False)
+        updated = db.execute(query).rowcount == 1
+        db.commit()
+        db.refresh(db_obj)
+        return updated
+
+    def fail_expired(self, db: Session, *, max_attempts: int) -> list[int]:
+        """
+        Finish the running jobs whose lease expired and that aren't claimed again: jobs that were claimed by the maximum
+        number of workers fail, jobs whose cancellation was requested are cancelled.
+
+        :return: IDs of the failed jobs
+        """
+        now = datetime.now(tz=UTC)
+        cancelled = (
+            update(self.model)
+            .where(self._expired(now), self.model.cancel_requested.is_(True))
+            .values(status=OptimizationJobStatus.CANCELLED, finished_at=now, error="The optimization was cancelled.")
+            .execution_options(synchronize_session=False)
+        )
+        failed = (
+            update(self.model)
+            .where(self._expired(now), self.model.attempts >= max_attempts)
+            .values(status=OptimizationJobStatus.FAILED, finished_at=now, error=f"The workers of the job stopped responding {max_attempts} times.")
+            .returning(self.model.id)
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(cancelled)
+        job_ids = db.execute(failed).scalars().all()
+        db.commit()
+        return job_ids
+
+    def _leased(self, id: int, worker: str) -> ColumnElement[bool]:
+        return and_(self.model.id == id, self.model.worker == worker, self.model.status == OptimizationJobStatus.RUNNING)
+
+    def _expired(self, now: datetime) -> ColumnElement[bool]:
+        return and_(self.model.status == OptimizationJobStatus.RUNNING, self.model.lease_expires_at < now)
+
+    def _claimable(self, now: datetime, max_attempts: int) -> ColumnElement[bool]:
+        return and_(
+            self.model.cancel_requested.is_(False),
+            or_(self.model.status == OptimizationJobStatus.PENDING, and_(self._expired(now), self.model.attempts < max_attempts)),
+        )
+
+
+optimization_job = CRUDOptimizationJob(OptimizationJob)
@@ -0,0 +1,196 @@
+from typing import Any
+
+from sqlalchemy import ColumnElement, Row, Select, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from ensysmod.crud.base import CRUDBase
+from ensysmod.model import OptimizationJob, OptimizationJobStatus, OptimizationResult, OptimizationResultCapacity, OptimizationResultOperation
+from ensysmod.schemas import OptimizationResultCreate, OptimizationResultUpdate
+
+# tables of the values of a result and their columns, which the queries of the values return
+VALUE_COLUMNS = {
+    OptimizationResultCapacity: ("component", "region", "region_to", "variable", "value"),
+    OptimizationResultOperation: ("component", "region", "region_to", "variable", "values"),
+}
+
+
+# noinspection PyMethodMayBeStatic,PyArgumentList
+class CRUDOptimizationResult(CRUDBase[OptimizationResult, OptimizationResultCreate, OptimizationResultUpdate]):
+    """
+    CRUD operations for OptimizationResult
+    """
+
+    def create_with_values(
+        self,
+        db: Session,
+        *,
+        obj_in: OptimizationResultCreate,
+        capacities: list[dict[str, Any]],
+        operations: list[dict[str, Any]],
+    ) -> OptimizationResult:
+        """
+        Store an optimization result with its capacity variables and operation time series in one transaction.
+
+        A result of the same job and year is replaced. The transaction runs on the connection of the session, which no
+        other session shares, see database.session, so sessions of other threads can't commit or roll back a part of it.
+        """
+        self._remove(db, [result for result in self.get_multi_by_job(db, job_id=obj_in.ref_job) if result.year == obj_in.year])
+        result = self.model(**obj_in.model_dump())
+        db.add(result)
+        db.flush()
+        # bulk inserts, big models have millions of values
+        if capacities:
+            db.execute(insert(OptimizationResultCapacity), [{**row, "ref_result": result.id} for row in capacities])
+        if operations:
+            db.execute(insert(OptimizationResultOperation), [{**row, "ref_result": result.id} for row in operations])
+        db.commit()
+        db.refresh(result)
+        return result
+
+    def share_with_job(self, db: Session, *, result: OptimizationResult, job: OptimizationJob) -> OptimizationResult:
+        """
+        Store an optimization result as result of another job of the same content. The new result references the values
+        of the result instead of copying them.
+        """
+        shared = self.model(
+            ref_job=job.id,
+            ref_model=job.ref_model,
+            year=result.year,
+            objective_value=result.objective_value,
+            cache_key=result.cache_key,
+            ref_source_result=result.ref_source_result or result.id,
+        )
+        db.add(shared)
+        db.commit()
+        db.refresh(shared)
+        return shared
+
+    def get_multi_by_job(self, db: Session, *, job_id: int) -> list[OptimizationResult]:
+        query = select(self.model).where(self.model.ref_job == job_id).order_by(self.model.year, self.model.id)
+        return db.execute(query).scalars().all()
+
+    def get_multi_by_model(self, db: Session, *, skip: int = 0, limit: int = 100, model_id: int) -> list[OptimizationResult]:
+        query = select(self.model).where(self.model.ref_model == model_id).order_by(self.model.id).offset(skip).limit(limit)
+        return db.execute(query).scalars().all()
+
+    def get_multi_by_cache_key(self, db: Session, *, cache_key: str) -> list[OptimizationResult]:
+        """
+        Get the results of the latest finished job whose results have the key of an identical optimization.
+        """
+        return self._get_multi_of_latest_job(db, self.model.cache_key == cache_key)
+
+    def get_multi_of_latest_job(self, db: Session, *, model_id: int) -> list[OptimizationResult]:
+        """
+        Get the results of the latest finished job of a model that stored results.
+        """
+        return self._get_multi_of_latest_job(db, self.model.ref_model == model_id)
+
+    def remove_by_job(self, db: Session, *, job_id: int, except_cache_key: str | None = None) -> None:
+        """
+        Remove the results of a job with their values, except the results with a given cache key.
+        """
+        results = [result for result in self.get_multi_by_job(db, job_id=job_id) if except_cache_key is None or result.cache_key != except_cache_key]
+        self._remove(db, results)
+        db.commit()
+
+    def remove_by_model(self, db: Session, *, model_id: int) -> None:
+        """
+        Remove the results of all jobs of a model with their values.
+        """
+        self._remove(db, db.execute(select(self.model).where(self.model.ref_model == model_id)).scalars().all())
+        db.commit()
+
+    def get_capacities(
+        self,
+        db: Session,
+        *,
+        result_ids: list[int],
+        components: list[str] | None = None,
+        regions: list[str] | None = None,
+        variables: list[str] | None = None,
+    ) -> list[Row]:
+        """
+        Get the capacity variables of optimization results, optionally filtered by component, region and variable.
+
+        Each row has the columns of OptimizationResultCapacity, its ref_result is the requested result, also if the result
+        shares the values of another result.
+        """
+        query = self._select_values(OptimizationResultCapacity, result_ids, components, regions, variables)
+        return db.execute(query).all()
+
+    def get_operations(
+        self,
+        db: Session,
+        *,
+        result_ids: list[int],
+        components: list[str] | None = None,
+        regions: list[str] | None = None,
+        variables: list[str] | None = None,
+    ) -> list[Row]:
+        """
+        Get the operation time series of optimization results, optionally filtered by component, region and variable.
+
+        Each row has the columns of OptimizationResultOperation, its ref_result is the requested result, also if the
+        result shares the values of another result.
+        """
+        query = self._select_values(OptimizationResultOperation, result_ids, components, regions, variables)
+        return db.execute(query).all()
+
+    def _select_values(
+        self,
+        value_model: type[OptimizationResultCapacity | OptimizationResultOperation],
+        result_ids: list[int],
+        components: list[str] | None,
+        regions: list[str] | None,
+        variables: list[str] | None,
+    ) -> Select:
+        # the values of a result are stored with the result itself or with the result whose values it shares
+        value_owner = func.coalesce(self.model.ref_source_result, self.model.id)
+        query = (
+            select(self.model.id.label("ref_result"), *(getattr(value_model, column) for column in VALUE_COLUMNS[value_model]))
+            .select_from(value_model)
+            .join(self.model, value_model.ref_result == value_owner)
+            .where(self.model.id.in_(result_ids))
+        )
+        if components:
+            query = query.where(value_model.component.in_(components))
+        if regions:
+            query = query.where(value_model.region.in_(regions))
+        if variables:
+            query = query.where(value_model.variable.in_(variables))
+        return query.order_by(self.model.id, value_model.id)
+
+    def _get_multi_of_latest_job(self, db: Session, condition: ColumnElement[bool]) -> list[OptimizationResult]:
+        query = (
+            select(self.model.ref_job)
+            .join(OptimizationJob)
+            .where(condition, OptimizationJob.status == OptimizationJobStatus.FINISHED)
+            .order_by(self.model.ref_job.desc())
+            .limit(1)
+        )
+        job_id = db.execute(query).scalar_one_or_none()
+        return [] if job_id is None else self.get_multi_by_job(db, job_id=job_id)
+
+    def _remove(self, db: Session, results: list[OptimizationResult]) -> None:
+        result_ids = [result.id for result in results]
+        self._hand_over_values(db, result_ids)
+        # bulk deletes of the values instead of loading every value to delete it by cascade
+        for value_model in VALUE_COLUMNS:
+            db.execute(delete(value_model).where(value_model.ref_result.in_(result_ids)))
+        db.execute(delete(self.model).where(self.model.id.in_(result_ids)))
+
+    def _hand_over_values(self, db: Session, result_ids: list[int]) -> None:
+        # the values of a removed result that other results share are kept and stored with the oldest of them instead
+        new_owners = (
+            select(self.model.ref_source_result, func.min(self.model.id))
+            .where(self.model.ref_source_result.in_(result_ids), self.model.id.not_in(result_ids))
+            .group_by(self.model.ref_source_result)
+        )
+        for owner_id, new_owner_id in db.execute(new_owners).all():
+            for value_model in VALUE_COLUMNS:
+                db.execute(update(value_model).where(value_model.ref_result == owner_id).values(ref_result=new_owner_id))
+            db.execute(update(self.model).where(self.model.ref_source_result == owner_id).values(ref_source_result=new_owner_id))
+            db.execute(update(self.model).where(self.model.id == new_owner_id).values(ref_source_result=None))
+
+
+optimization_result = CRUDOptimizationResult(OptimizationResult)
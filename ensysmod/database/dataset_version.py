@@ -0,0 +1,99 @@
+"""
+Versioning of the content of datasets.
+
+Every flush that writes to the content of a dataset increments its version and renews its fingerprint.
+Caches can compare the fingerprint of a dataset instead of hashing its content.
+"""
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, UOWTransaction
+
+from ensysmod.model import (
+    CapacityFix,
+    CapacityMax,
+    CapacityMin,
+    Dataset,
+    EnergyCommodity,
+    EnergyComponent,
+    EnergyConversion,
+    EnergyConversionFactor,
+    EnergySink,
+    EnergySource,
+    EnergyStorage,
+    EnergyTransmission,
+    OperationRateFix,
+    OperationRateMax,
+    Region,
+    TransmissionDistance,
+    TransmissionLoss,
+    YearlyFullLoadHoursMax,
+    YearlyFullLoadHoursMin,
+)
+from ensysmod.model.dataset import new_fingerprint
+
+# models with a ref_dataset column that make up the content of a dataset
+DATASET_CONTENT_MODELS = (
+    Region,
+    EnergyCommodity,
+    EnergyComponent,
+    EnergySource,
+    EnergySink,
+    EnergyConversion,
+    EnergyStorage,
+    EnergyTransmission,
+    CapacityFix,
+    CapacityMax,
+    CapacityMin,
+    OperationRateFix,
+    OperationRateMax,
+    YearlyFullLoadHoursMax,
+    YearlyFullLoadHoursMin,
+    TransmissionDistance,
+    TransmissionLoss,
+)
+
+# attributes of a dataset that are passed to the energy system model
+DATASET_CONTENT_ATTRIBUTES = ("hours_per_time_step", "number_of_time_steps", "cost_unit", "length_unit")
+
+
+def bump_dataset_versions(session: Session, flush_context: UOWTransaction, instances: Any) -> None:  # noqa: ARG001
+    """
+    Increment the version and renew the fingerprint of all datasets whose content is written by a flush.
+
+    Registered as before_flush listener of the database sessions.
+    """
+    with session.no_autoflush:
+        dataset_ids = {get_dataset_id(session, obj) for obj in chain(session.new, session.deleted)}
+        dataset_ids.update(get_dataset_id(session, obj) for obj in session.dirty if session.is_modified(obj))
+        dataset_ids.update(obj.id for obj in session.dirty if isinstance(obj, Dataset) and is_content_modified(obj))
+
+        for dataset_id in dataset_ids - {None}:
+            dataset = session.get(Dataset, dataset_id)
+            if dataset is None or dataset in session.deleted:
+                continue
+            # increment in the database, so that concurrent writers don't overwrite each other's version
+            dataset.version = Dataset.version + 1
+            dataset.fingerprint = new_fingerprint()
+
+
+def get_dataset_id(session: Session, obj: object) -> int | None:
+    """
+    Return the ID of the dataset that the object is part of, or None if the object is no content of a dataset.
+    """
+    if isinstance(obj, DATASET_CONTENT_MODELS):
+        if obj.ref_dataset is None and obj.dataset is not None:
+            return obj.dataset.id
+        return obj.ref_dataset
+    if isinstance(obj, EnergyConversionFactor):
+        if obj.ref_component is None:
+            return obj.conversion.ref_dataset if obj.conversion is not None else None
+        component = session.get(EnergyComponent, obj.ref_component)
+        return component.ref_dataset if component is not None else None
+    return None
+
+
+def is_content_modified(dataset: Dataset) -> bool:
+    state = inspect(dataset)
+    return any(state.attrs[attribute].history.has_changes() for attribute in DATASET_CONTENT_ATTRIBUTES)
@@ -1,8 +1,41 @@
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event, make_url
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
 from ensysmod.core import settings
+from ensysmod.database.dataset_version import bump_dataset_versions
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+def is_in_memory_database(uri: str) -> bool:
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def create_database_engine(uri: str, **kwargs) -> Engine:
+    """
+    Create an engine for the database.
+
+    Only an in-memory database shares one connection between all sessions, because every connection would open its own
+    database. All other sessions get their own connection, so a session never commits or rolls back the transaction of
+    another thread.
+    """
+    if make_url(uri).get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if is_in_memory_database(uri):
+            kwargs["poolclass"] = StaticPool
+    return create_engine(uri, pool_pre_ping=True, **kwargs)
+
+
+engine = create_database_engine(settings.SQLALCHEMY_DATABASE_URI)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+event.listen(SessionLocal, "before_flush", bump_dataset_versions)
+
+# sessions of background threads that run next to a job, e.g. its watchdog and the heartbeat of its worker, get a new
+# connection each time, so they don't take a connection from the pool of the job. An in-memory database has only one
+# connection, which its jobs share with these threads, it is only meant for tests without optimizations.
+if is_in_memory_database(settings.SQLALCHEMY_DATABASE_URI):
+    background_engine = engine
+else:
+    background_engine = create_database_engine(settings.SQLALCHEMY_DATABASE_URI, poolclass=NullPool)
+BackgroundSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=background_engine)
+event.listen(BackgroundSessionLocal, "before_flush", bump_dataset_versions)
@@ -11,14 +11,20 @@ from .energy_component import CapacityVariableDomain, EnergyComponent, EnergyCom
 from .energy_conversion import EnergyConversion
 from .energy_conversion_factor import EnergyConversionFactor
 from .energy_model import EnergyModel
+from .energy_model_aggregation import ClusterMethod, EnergyModelAggregation
 from .energy_model_optimization import EnergyModelOptimization
 from .energy_model_override import EnergyModelOverride, EnergyModelOverrideAttribute, EnergyModelOverrideOperation
+from .energy_model_solver import EnergyModelSolver
 from .energy_sink import EnergySink
 from .energy_source import EnergySource
 from .energy_storage import EnergyStorage
 from .energy_transmission import EnergyTransmission
 from .operation_rate_fix import OperationRateFix
 from .operation_rate_max import OperationRateMax
+from .optimization_job import OptimizationJob, OptimizationJobStatus, OptimizationJobType, OptimizationResultFormat
+from .optimization_result import OptimizationResult
+from .optimization_result_capacity import OptimizationResultCapacity
+from .optimization_result_operation import OptimizationResultOperation
 from .region import Region
 from .transmission_distance import TransmissionDistance
 from .transmission_loss import TransmissionLoss
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
+from uuid import uuid4
 
 from sqlalchemy import ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -21,6 +22,10 @@ if TYPE_CHECKING:
     from ensysmod.model.region import Region
 
 
+def new_fingerprint() -> str:
+    return uuid4().hex
+
+
 class Dataset(Base):
     ref_user: Mapped[int] = mapped_column(ForeignKey("user.id"), index=True)
 
@@ -31,6 +36,11 @@ class Dataset(Base):
     cost_unit: Mapped[str]
     length_unit: Mapped[str]
 
+    # version of the content, incremented on every change of the content of the dataset
+    version: Mapped[int] = mapped_column(default=1)
+    # random identifier of the content, renewed on every change of the content of the dataset
+    fingerprint: Mapped[str] = mapped_column(default=new_fingerprint)
+
     # relationships
     user: Mapped[User] = relationship()
     permissions: Mapped[list[DatasetPermission]] = relationship(back_populates="dataset", cascade="all, delete-orphan")
@@ -9,8 +9,11 @@ from ensysmod.database.base_class import Base
 from ensysmod.database.ref_base_class import RefDataset
 
 if TYPE_CHECKING:
+    from ensysmod.model.energy_model_aggregation import EnergyModelAggregation
     from ensysmod.model.energy_model_optimization import EnergyModelOptimization
     from ensysmod.model.energy_model_override import EnergyModelOverride
+    from ensysmod.model.energy_model_solver import EnergyModelSolver
+    from ensysmod.model.optimization_job import OptimizationJob
 
 
 class EnergyModel(RefDataset, Base):
@@ -18,8 +21,14 @@ class EnergyModel(RefDataset, Base):
     description: Mapped[str | None]
 
     # relationships
-    override_parameters: Mapped[list[EnergyModelOverride]] = relationship(back_populates="model", cascade="all, delete-orphan")
+    # override parameters are applied in the order of their creation
+    override_parameters: Mapped[list[EnergyModelOverride]] = relationship(
+        back_populates="model", cascade="all, delete-orphan", order_by="EnergyModelOverride.id"
+    )
     optimization_parameters: Mapped[EnergyModelOptimization | None] = relationship(back_populates="model", cascade="all, delete-orphan")
+    aggregation_parameters: Mapped[EnergyModelAggregation | None] = relationship(back_populates="model", cascade="all, delete-orphan")
+    solver_parameters: Mapped[EnergyModelSolver | None] = relationship(back_populates="model", cascade="all, delete-orphan")
+    jobs: Mapped[list[OptimizationJob]] = relationship(back_populates="model", cascade="all, delete-orphan")
 
     # table constraints
     __table_args__ = (UniqueConstraint("ref_dataset", "name", name="_model_name_dataset_uc"),)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import enum
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from ensysmod.database.base_class import Base
+
+if TYPE_CHECKING:
+    from ensysmod.model.energy_model import EnergyModel
+
+
+class ClusterMethod(enum.Enum):
+    averaging = "averaging"
+    k_means = "k_means"
+    k_medoids = "k_medoids"
+    k_maxoids = "k_maxoids"
+    hierarchical = "hierarchical"
+    adjacent_periods = "adjacent_periods"
+
+
+class EnergyModelAggregation(Base):
+    ref_model: Mapped[int] = mapped_column(ForeignKey("energy_model.id"), unique=True)
+
+    number_of_typical_periods: Mapped[int] = mapped_column(default=7)
+    hours_per_period: Mapped[int] = mapped_column(default=24)
+    segmentation: Mapped[bool] = mapped_column(default=True)
+    number_of_segments_per_period: Mapped[int] = mapped_column(default=12)
+    cluster_method: Mapped[ClusterMethod] = mapped_column(default=ClusterMethod.hierarchical)
+    number_of_regions: Mapped[int | None]
+
+    # relationships
+    model: Mapped[EnergyModel] = relationship(back_populates="aggregation_parameters")
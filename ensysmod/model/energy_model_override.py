@@ -3,8 +3,9 @@ from __future__ import annotations
 import enum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.types import PickleType
 
 from ensysmod.database.base_class import Base
 from ensysmod.database.ref_base_class import RefComponent
@@ -36,6 +37,11 @@ class EnergyModelOverrideAttribute(enum.Enum):
     stateOfChargeMin = "state_of_charge_min"
     stateOfChargeMax = "state_of_charge_max"
 
+    # regional parameters, which can be overridden for selected regions
+    capacityMax = "capacity_max"
+    operationRateFix = "operation_rate_fix"
+    operationRateMax = "operation_rate_max"
+
 
 class EnergyModelOverrideOperation(enum.Enum):
     add = "add"
@@ -49,9 +55,8 @@ class EnergyModelOverride(RefComponent, Base):
     attribute: Mapped[EnergyModelOverrideAttribute]
     operation: Mapped[EnergyModelOverrideOperation]
     value: Mapped[float]
+    # names of the regions whose values of a regional parameter are overridden, None for all regions
+    regions: Mapped[list[str] | None] = mapped_column(PickleType)
 
     # relationships
     model: Mapped[EnergyModel] = relationship(back_populates="override_parameters")
-
-    # table constraints
-    __table_args__ = (UniqueConstraint("ref_model", "attribute", name="_model_attribute_uc"),)
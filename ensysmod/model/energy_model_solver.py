@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from ensysmod.database.base_class import Base
+
+if TYPE_CHECKING:
+    from ensysmod.model.energy_model import EnergyModel
+
+
+class EnergyModelSolver(Base):
+    ref_model: Mapped[int] = mapped_column(ForeignKey("energy_model.id"), unique=True)
+
+    # None uses the default solver of the server
+    solver: Mapped[str | None]
+    threads: Mapped[int | None]
+    time_limit: Mapped[int | None]
+    mip_gap: Mapped[float | None]
+    presolve: Mapped[bool | None]
+
+    # relationships
+    model: Mapped[EnergyModel] = relationship(back_populates="solver_parameters")
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import enum
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.types import PickleType
+
+from ensysmod.database.base_class import Base
+
+if TYPE_CHECKING:
+    from ensysmod.model.energy_model import EnergyModel
+    from ensysmod.model.optimization_result import OptimizationResult
+    from ensysmod.model.user import User
+
+
+class OptimizationJobType(enum.Enum):
+    OPTIMIZE = "OPTIMIZE"
+    MYOPIC_OPTIMIZE = "MYOPIC_OPTIMIZE"
+    SCENARIO_SWEEP = "SCENARIO_SWEEP"
+    ROLLING_HORIZON = "ROLLING_HORIZON"
+
+
+class OptimizationResultFormat(enum.Enum):
+    PARQUET = "PARQUET"
+    ARROW = "ARROW"
+    CSV = "CSV"
+    EXCEL = "EXCEL"
+
+
+class OptimizationJobStatus(enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    FINISHED = "FINISHED"
+    FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+
+class OptimizationJob(Base):
+    ref_model: Mapped[int] = mapped_column(ForeignKey("energy_model.id"), index=True)
+    ref_user: Mapped[int] = mapped_column(ForeignKey("user.id"), index=True)
+    # finished optimization job whose solution is the starting point of the solver, or whose capacities a rolling horizon optimization fixes
+    ref_warm_start_job: Mapped[int | None] = mapped_column(ForeignKey("optimization_job.id", ondelete="SET NULL"))
+
+    type: Mapped[OptimizationJobType]
+    status: Mapped[OptimizationJobStatus] = mapped_column(index=True, default=OptimizationJobStatus.PENDING)
+    created_at: Mapped[datetime] = mapped_column(default=lambda: datetime.now(tz=UTC))
+    started_at: Mapped[datetime | None]
+    finished_at: Mapped[datetime | None]
+    result_file: Mapped[str | None]
+    # format of the result file of an OPTIMIZE job, None for the default format, the other types have a fixed format
+    result_format: Mapped[OptimizationResultFormat | None]
+    # values of the variables of the optimization problem, only stored for OPTIMIZE jobs
+    solution_file: Mapped[str | None]
+    error: Mapped[str | None]
+    # override parameters of each scenario of a scenario sweep, applied on top of the override parameters of the model
+    scenarios: Mapped[list[list[dict]] | None] = mapped_column(PickleType)
+    # time steps of each window of a rolling horizon optimization and the time steps that each window is extended by
+    window_time_steps: Mapped[int | None]
+    overlap_time_steps: Mapped[int | None]
+    # wall-clock timeout of the optimization in seconds, limited by the OPTIMIZATION_TIMEOUT_SECONDS setting
+    timeout: Mapped[int | None]
+    # set by the API to stop a running job, the worker marks the job as cancelled as soon as the solver is stopped
+    cancel_requested: Mapped[bool] = mapped_column(default=False)
+    # worker of the job queue that claimed the job, the time it last reported to be alive and the end of its lease, see core.job_queue
+    worker: Mapped[str | None]
+    heartbeat_at: Mapped[datetime | None]
+    lease_expires_at: Mapped[datetime | None]
+    # number of workers that claimed the job
+    attempts: Mapped[int] = mapped_column(default=0)
+    # log messages and output of the solver, written while the job runs, see core.job_log
+    log_file: Mapped[str | None]
+    # result files of the completed years and checkpoint of a myopic optimization, see core.myopic
+    checkpoint_dir: Mapped[str | None]
+    # wall time, CPU time and peak RSS of each phase of the optimization, see core.profiling
+    timing: Mapped[list[dict] | None] = mapped_column(PickleType)
+
+    # relationships
+    model: Mapped[EnergyModel] = relationship(back_populates="jobs")
+    user: Mapped[User] = relationship()
+    results: Mapped[list[OptimizationResult]] = relationship(back_populates="job", cascade="all, delete-orphan", order_by="OptimizationResult.year")
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from ensysmod.database.base_class import Base
+
+if TYPE_CHECKING:
+    from ensysmod.model.energy_model import EnergyModel
+    from ensysmod.model.optimization_job import OptimizationJob
+    from ensysmod.model.optimization_result_capacity import OptimizationResultCapacity
+    from ensysmod.model.optimization_result_operation import OptimizationResultOperation
+
+
+class OptimizationResult(Base):
+    ref_job: Mapped[int] = mapped_column(ForeignKey("optimization_job.id", ondelete="CASCADE"), index=True)
+    ref_model: Mapped[int] = mapped_column(ForeignKey("energy_model.id"), index=True)
+    # optimized year of a myopic optimization, None for the other jobs
+    year: Mapped[int | None]
+    objective_value: Mapped[float]
+    # key of the result in the result cache, a job whose result is cached shares the values of the job that computed it
+    cache_key: Mapped[str | None] = mapped_column(index=True)
+    # result of an identical optimization that stores the values of this result, None if the result stores its own values
+    ref_source_result: Mapped[int | None] = mapped_column(ForeignKey("optimization_result.id", ondelete="SET NULL"), index=True)
+    created_at: Mapped[datetime] = mapped_column(default=lambda: datetime.now(tz=UTC))
+
+    # relationships
+    job: Mapped[OptimizationJob] = relationship(back_populates="results")
+    model: Mapped[EnergyModel] = relationship()
+    capacities: Mapped[list[OptimizationResultCapacity]] = relationship(back_populates="result", cascade="all, delete-orphan")
+    operations: Mapped[list[OptimizationResultOperation]] = relationship(back_populates="result", cascade="all, delete-orphan")
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.types import PickleType
+
+from ensysmod.database.base_class import Base
+
+if TYPE_CHECKING:
+    from ensysmod.model.optimization_result import OptimizationResult
+
+
+class OptimizationResultOperation(Base):
+    ref_result: Mapped[int] = mapped_column(ForeignKey("optimization_result.id", ondelete="CASCADE"), index=True)
+    # names of the FINE component and its region, e.g. the stock of a myopic optimization or an aggregated region
+    component: Mapped[str] = mapped_column(index=True)
+    region: Mapped[str]
+    # region at the other end of a transmission
+    region_to: Mapped[str | None]
+    # optimal value of FINE without the suffix "VariablesOptimum", e.g. "operation" or "stateOfCharge"
+    variable: Mapped[str]
+    # value of each time step of the dataset
+    values: Mapped[list[float]] = mapped_column(PickleType)
+
+    # relationships
+    result: Mapped[OptimizationResult] = relationship(back_populates="operations")
@@ -11,8 +11,10 @@ from .energy_component import EnergyComponentCreate, EnergyComponentSchema, Ener
 from .energy_conversion import EnergyConversionCreate, EnergyConversionSchema, EnergyConversionUpdate
 from .energy_conversion_factor import EnergyConversionFactorCreate, EnergyConversionFactorSchema, EnergyConversionFactorUpdate
 from .energy_model import EnergyModelCreate, EnergyModelSchema, EnergyModelUpdate
+from .energy_model_aggregation import EnergyModelAggregationCreate, EnergyModelAggregationSchema, EnergyModelAggregationUpdate
 from .energy_model_optimization import EnergyModelOptimizationCreate, EnergyModelOptimizationSchema, EnergyModelOptimizationUpdate
 from .energy_model_override import EnergyModelOverrideCreate, EnergyModelOverrideSchema, EnergyModelOverrideUpdate
+from .energy_model_solver import EnergyModelSolverCreate, EnergyModelSolverSchema, EnergyModelSolverUpdate
 from .energy_sink import EnergySinkCreate, EnergySinkSchema, EnergySinkUpdate
 from .energy_source import EnergySourceCreate, EnergySourceSchema, EnergySourceUpdate
 from .energy_storage import EnergyStorageCreate, EnergyStorageSchema, EnergyStorageUpdate
@@ -20,7 +22,18 @@ from .energy_transmission import EnergyTransmissionCreate, EnergyTransmissionSch
 from .file_upload import FileStatus, FileUploadResult, ZipArchiveUploadResult
 from .operation_rate_fix import OperationRateFixCreate, OperationRateFixSchema, OperationRateFixUpdate
 from .operation_rate_max import OperationRateMaxCreate, OperationRateMaxSchema, OperationRateMaxUpdate
+from .optimization_job import OptimizationJobCreate, OptimizationJobSchema, OptimizationJobUpdate, OptimizationPhaseTiming
+from .optimization_result import (
+    OptimizationResultCapacitySchema,
+    OptimizationResultCreate,
+    OptimizationResultOperationSchema,
+    OptimizationResultSchema,
+    OptimizationResultUpdate,
+)
+from .optimization_result_comparison import ComparedCapacity, ComparedCommodityBalance, ComparedValues, OptimizationResultComparison
+from .problem_size import ProblemSizeSchema
 from .region import RegionCreate, RegionSchema, RegionUpdate
+from .scenario_sweep import ScenarioSweepCreate, ScenarioSweepParameter
 from .token import Token, TokenPayload
 from .transmission_distance import TransmissionDistanceCreate, TransmissionDistanceSchema, TransmissionDistanceUpdate
 from .transmission_loss import TransmissionLossCreate, TransmissionLossSchema, TransmissionLossUpdate
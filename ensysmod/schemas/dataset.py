@@ -77,3 +77,9 @@ class DatasetSchema(DatasetBase, ReturnSchema):
 
     id: int = Field(default=..., description="The unique ID of the dataset.")
     user: UserSchema = Field(default=..., description="User that created the dataset.")
+    version: int = Field(default=..., description="Version of the content of the dataset. Incremented on every change of the content.")
+    fingerprint: str = Field(
+        default=...,
+        description="Fingerprint of the content of the dataset. Changes on every change of the content.",
+        examples=["3f2b8c1e9d4a4e6f8a7b5c2d1e0f9a8b"],
+    )
@@ -1,10 +1,12 @@
 from pydantic import Field
 
-from ensysmod.model import EnergyModelOverrideAttribute, EnergyModelOverrideOperation
+from ensysmod.model import ClusterMethod, EnergyModelOverrideAttribute, EnergyModelOverrideOperation
 from ensysmod.schemas.base_schema import MAX_DESC_LENGTH, MAX_STR_LENGTH, MIN_STR_LENGTH, BaseSchema, CreateSchema, ReturnSchema, UpdateSchema
 from ensysmod.schemas.dataset import DatasetSchema
+from ensysmod.schemas.energy_model_aggregation import EnergyModelAggregationCreate, EnergyModelAggregationSchema
 from ensysmod.schemas.energy_model_optimization import EnergyModelOptimizationCreate, EnergyModelOptimizationSchema
 from ensysmod.schemas.energy_model_override import EnergyModelOverrideCreate, EnergyModelOverrideSchema
+from ensysmod.schemas.energy_model_solver import EnergyModelSolverCreate, EnergyModelSolverSchema
 
 
 class EnergyModelBase(BaseSchema):
@@ -66,6 +68,24 @@ class EnergyModelCreate(EnergyModelBase, CreateSchema):
             )
         ],
     )
+    aggregation_parameters: EnergyModelAggregationCreate | None = Field(
+        default=None,
+        description="Parameters of the temporal and spatial aggregation before the optimization. If not given, 7 typical days are used.",
+        examples=[
+            EnergyModelAggregationCreate(
+                number_of_typical_periods=7,
+                hours_per_period=24,
+                segmentation=True,
+                number_of_segments_per_period=12,
+                cluster_method=ClusterMethod.hierarchical,
+            )
+        ],
+    )
+    solver_parameters: EnergyModelSolverCreate | None = Field(
+        default=None,
+        description="Solver and solver options of the optimization. If not given, the default solver of the server is used with its default options.",
+        examples=[EnergyModelSolverCreate(threads=4, time_limit=3600, mip_gap=0.01)],
+    )
 
 
 class EnergyModelUpdate(EnergyModelBase, UpdateSchema):
@@ -91,3 +111,5 @@ class EnergyModelSchema(EnergyModelBase, ReturnSchema):
     dataset: DatasetSchema
     override_parameters: list[EnergyModelOverrideSchema] | None
     optimization_parameters: EnergyModelOptimizationSchema | None
+    aggregation_parameters: EnergyModelAggregationSchema | None
+    solver_parameters: EnergyModelSolverSchema | None
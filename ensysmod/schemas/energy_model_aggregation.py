@@ -0,0 +1,67 @@
+from pydantic import Field, model_validator
+
+from ensysmod.model import ClusterMethod
+from ensysmod.schemas.base_schema import BaseSchema, CreateSchema, ReturnSchema, UpdateSchema
+from ensysmod.utils import validators
+
+
+class EnergyModelAggregationBase(BaseSchema):
+    """
+    Shared attributes for the aggregation parameters of a model. Used as a base class for all schemas.
+    """
+
+    number_of_typical_periods: int = Field(
+        default=7,
+        description="Number of typical periods into which the time series are clustered. Fewer periods result in a smaller and faster optimization.",
+        examples=[7],
+        gt=0,
+    )
+    hours_per_period: int = Field(
+        default=24,
+        description="Length of a period in hours. Must be a multiple of the hours per time step of the dataset.",
+        examples=[24],
+        gt=0,
+    )
+    segmentation: bool = Field(
+        default=True,
+        description="Whether the time steps of the typical periods are further clustered into segments. Not applied to myopic optimizations.",
+        examples=[True],
+    )
+    number_of_segments_per_period: int = Field(
+        default=12,
+        description="Number of segments per typical period, if segmentation is enabled. At most one segment per time step of a period is used.",
+        examples=[12],
+        gt=0,
+    )
+    cluster_method: ClusterMethod = Field(
+        default=ClusterMethod.hierarchical,
+        description="Method that is used to cluster the periods.",
+        examples=[ClusterMethod.hierarchical],
+    )
+    number_of_regions: int | None = Field(
+        default=None,
+        description="Number of regions into which the regions of the dataset are aggregated. By default, the regions aren't aggregated.",
+        examples=[10],
+        gt=0,
+    )
+
+    # validators
+    _valid_segmentation = model_validator(mode="after")(validators.validate_segmentation)
+
+
+class EnergyModelAggregationCreate(EnergyModelAggregationBase, CreateSchema):
+    """
+    Attributes to receive via API on creation of the aggregation parameters of a model.
+    """
+
+
+class EnergyModelAggregationUpdate(EnergyModelAggregationBase, UpdateSchema):
+    """
+    Attributes to receive via API on update of the aggregation parameters of a model.
+    """
+
+
+class EnergyModelAggregationSchema(EnergyModelAggregationBase, ReturnSchema):
+    """
+    Attributes to return via API for the aggregation parameters of a model.
+    """
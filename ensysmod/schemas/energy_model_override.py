@@ -1,7 +1,8 @@
-from pydantic import Field
+from pydantic import Field, model_validator
 
 from ensysmod.model import EnergyModelOverrideAttribute, EnergyModelOverrideOperation
 from ensysmod.schemas.base_schema import MAX_STR_LENGTH, MIN_STR_LENGTH, BaseSchema, CreateSchema, ReturnSchema, UpdateSchema
+from ensysmod.utils import validators
 
 
 class EnergyModelOverrideBase(BaseSchema):
@@ -20,6 +21,16 @@ class EnergyModelOverrideBase(BaseSchema):
         examples=[EnergyModelOverrideOperation.set],
     )
     value: float = Field(default=..., description="The value of the parameter.", examples=[-5.5])
+    regions: list[str] | None = Field(
+        default=None,
+        description="Names of the regions whose values are overridden. Only allowed for the regional parameters "
+        "capacity_max, operation_rate_fix and operation_rate_max, which are overridden in all regions by default.",
+        examples=[None],
+        min_length=1,
+    )
+
+    # validators
+    _valid_regions = model_validator(mode="after")(validators.validate_override_regions)
 
 
 class EnergyModelOverrideCreate(EnergyModelOverrideBase, CreateSchema):
@@ -43,6 +54,7 @@ class EnergyModelOverrideUpdate(EnergyModelOverrideBase, UpdateSchema):
     attribute: EnergyModelOverrideAttribute | None = None
     operation: EnergyModelOverrideOperation | None = None
     value: float | None = None
+    regions: list[str] | None = None
 
 
 class EnergyModelOverrideSchema(EnergyModelOverrideBase, ReturnSchema):
@@ -0,0 +1,61 @@
+from pydantic import Field, model_validator
+
+from ensysmod.schemas.base_schema import BaseSchema, CreateSchema, ReturnSchema, UpdateSchema
+from ensysmod.utils import validators
+
+
+class EnergyModelSolverBase(BaseSchema):
+    """
+    Shared attributes for the solver parameters of a model. Used as a base class for all schemas.
+    """
+
+    solver: str | None = Field(
+        default=None,
+        description="Solver of the optimization, must be allowed by the server. If not given, the default solver of the server is used.",
+        examples=["appsi_highs"],
+    )
+    threads: int | None = Field(
+        default=None,
+        description="Number of threads of the solver.",
+        examples=[4],
+        gt=0,
+    )
+    time_limit: int | None = Field(
+        default=None,
+        description="Time limit of the solver in seconds. The best solution found until then is returned.",
+        examples=[3600],
+        gt=0,
+    )
+    mip_gap: float | None = Field(
+        default=None,
+        description="Relative gap between the best solution and the best bound at which the solver stops a mixed-integer optimization.",
+        examples=[0.01],
+        ge=0,
+        le=1,
+    )
+    presolve: bool | None = Field(
+        default=None,
+        description="Whether the solver presolves the optimization problem. If not given, the solver decides.",
+        examples=[True],
+    )
+
+    # validators
+    _valid_solver = model_validator(mode="after")(validators.validate_solver)
+
+
+class EnergyModelSolverCreate(EnergyModelSolverBase, CreateSchema):
+    """
+    Attributes to receive via API on creation of the solver parameters of a model.
+    """
+
+
+class EnergyModelSolverUpdate(EnergyModelSolverBase, UpdateSchema):
+    """
+    Attributes to receive via API on update of the solver parameters of a model.
+    """
+
+
+class EnergyModelSolverSchema(EnergyModelSolverBase, ReturnSchema):
+    """
+    Attributes to return via API for the solver parameters of a model.
+    """
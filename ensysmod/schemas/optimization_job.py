@@ -0,0 +1,126 @@
+from datetime import datetime
+
+from pydantic import Field, model_validator
+
+from ensysmod.model import OptimizationJobStatus, OptimizationJobType, OptimizationResultFormat
+from ensysmod.schemas.base_schema import BaseSchema, CreateSchema, ReturnSchema, UpdateSchema
+from ensysmod.schemas.energy_model_override import EnergyModelOverrideCreate
+from ensysmod.utils import validators
+
+
+class OptimizationJobBase(BaseSchema):
+    """
+    Shared attributes for an optimization job. Used as a base class for all schemas.
+    """
+
+    ref_model: int = Field(
+        default=...,
+        description="ID of the energy model that is optimized.",
+        examples=[1],
+        gt=0,
+    )
+    type: OptimizationJobType = Field(
+        default=OptimizationJobType.OPTIMIZE,
+        description="Type of the optimization: 'OPTIMIZE', 'MYOPIC_OPTIMIZE' or 'ROLLING_HORIZON'. Scenario sweeps are submitted separately.",
+        examples=[OptimizationJobType.OPTIMIZE],
+    )
+    ref_warm_start_job: int | None = Field(
+        default=None,
+        description="ID of a finished optimization job of the same dataset. Its solution is the starting point of the solver. "
+        "A rolling horizon optimization fixes the capacities of the solution.",
+        examples=[None],
+        gt=0,
+    )
+    window_time_steps: int | None = Field(
+        default=None,
+        description="Number of time steps of each window of a rolling horizon optimization (default: 168).",
+        examples=[None],
+        gt=0,
+    )
+    overlap_time_steps: int | None = Field(
+        default=None,
+        description="Number of time steps that each window of a rolling horizon optimization is extended by (default: 24).",
+        examples=[None],
+        ge=0,
+    )
+    timeout: int | None = Field(
+        default=None,
+        description="Wall-clock timeout of the optimization in seconds. The server's timeout applies if it is shorter.",
+        examples=[None],
+        gt=0,
+    )
+    result_format: OptimizationResultFormat | None = Field(
+        default=None,
+        description="Format of the result file of an optimization: a zip file of 'PARQUET' (default), 'ARROW' IPC or 'CSV' files "
+        "of the result tables, or an 'EXCEL' file. The results of the other types have a fixed format.",
+        examples=[None],
+    )
+
+
+class OptimizationJobCreate(OptimizationJobBase, CreateSchema):
+    """
+    Attributes to receive via API on creation of an optimization job.
+    """
+
+    warm_start_model: int | None = Field(
+        default=None,
+        description="ID of an energy model of the same dataset. The solver starts from the solution of its latest finished optimization, "
+        "a rolling horizon optimization fixes its capacities.",
+        examples=[None],
+        gt=0,
+    )
+
+    # validators
+    _valid_warm_start = model_validator(mode="after")(validators.validate_warm_start)
+    _valid_rolling_horizon = model_validator(mode="after")(validators.validate_rolling_horizon)
+    _valid_result_format = model_validator(mode="after")(validators.validate_result_format)
+
+
+class OptimizationJobUpdate(UpdateSchema):
+    """
+    Attributes to update an optimization job. Only used internally by the job executor.
+    """
+
+    status: OptimizationJobStatus | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    result_file: str | None = None
+    solution_file: str | None = None
+    error: str | None = None
+    timing: list[dict] | None = None
+    cancel_requested: bool | None = None
+
+
+class OptimizationPhaseTiming(BaseSchema):
+    """
+    Measured resources of one phase of an optimization job.
+    """
+
+    phase: str = Field(default=..., description="Name of the phase, e.g. read_database, build_esm, aggregate, declare_problem or solve.")
+    wall_time: float = Field(default=..., description="Elapsed time of the phase in seconds.")
+    cpu_time: float = Field(default=..., description="CPU time of the phase in seconds, including solver processes.")
+    peak_rss: int = Field(default=..., description="Peak resident memory of the worker and its solver processes during the phase in bytes.")
+
+
+class OptimizationJobSchema(OptimizationJobBase, ReturnSchema):
+    """
+    Attributes to return via API for an optimization job.
+    """
+
+    id: int = Field(default=..., description="The unique ID of the optimization job.")
+    status: OptimizationJobStatus = Field(default=..., description="Current status of the optimization job.")
+    created_at: datetime = Field(default=..., description="Time the optimization job was submitted.")
+    started_at: datetime | None = Field(default=None, description="Time a worker started the optimization job.")
+    finished_at: datetime | None = Field(default=None, description="Time the optimization job finished, failed or was cancelled.")
+    error: str | None = Field(default=None, description="Error message if the optimization job failed or was cancelled.")
+    cancel_requested: bool = Field(default=False, description="Whether the optimization job is being cancelled.")
+    worker: str | None = Field(default=None, description="Dedicated worker that claimed the optimization job.")
+    heartbeat_at: datetime | None = Field(default=None, description="Time the worker last reported that it is still running the job.")
+    scenarios: list[list[EnergyModelOverrideCreate]] | None = Field(
+        default=None,
+        description="Override parameters of each scenario of a scenario sweep.",
+    )
+    timing: list[OptimizationPhaseTiming] | None = Field(
+        default=None,
+        description="Wall time, CPU time and peak memory of each phase of the optimization, in the order of execution.",
+    )
@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from pydantic import Field
+
+from ensysmod.schemas.base_schema import BaseSchema, CreateSchema, ReturnSchema, UpdateSchema
+
+
+class OptimizationResultBase(BaseSchema):
+    """
+    Shared attributes for a stored optimization result. Used as a base class for all schemas.
+    """
+
+    ref_job: int = Field(default=..., description="ID of the optimization job that computed the result.", examples=[1])
+    ref_model: int = Field(default=..., description="ID of the optimized energy model.", examples=[1])
+    year: int | None = Field(default=None, description="Optimized year of a myopic optimization.", examples=[None])
+    objective_value: float = Field(default=..., description="Value of the objective function, the total annual cost.", examples=[42.0])
+
+
+class OptimizationResultCreate(OptimizationResultBase, CreateSchema):
+    """
+    Attributes to store an optimization result. Only used internally by the job executor.
+    """
+
+    cache_key: str | None = None
+
+
+class OptimizationResultUpdate(UpdateSchema):
+    """
+    Attributes to update an optimization result. Results are never updated.
+    """
+
+
+class OptimizationResultSchema(OptimizationResultBase, ReturnSchema):
+    """
+    Attributes to return via API for a stored optimization result.
+    """
+
+    id: int = Field(default=..., description="The unique ID of the optimization result.")
+    created_at: datetime = Field(default=..., description="Time the result was stored.")
+
+
+class OptimizationResultValueSchema(ReturnSchema):
+    """
+    Shared attributes of the values of a stored optimization result.
+    """
+
+    ref_result: int = Field(default=..., description="ID of the optimization result.")
+    component: str = Field(default=..., description="Name of the component, e.g. of a stock component of a myopic optimization.")
+    region: str = Field(default=..., description="Name of the region, e.g. of an aggregated region.")
+    region_to: str | None = Field(default=None, description="Name of the region at the other end of a transmission.")
+    variable: str = Field(default=..., description="Name of the optimized variable.")
+
+
+class OptimizationResultCapacitySchema(OptimizationResultValueSchema):
+    """
+    Attributes to return via API for a capacity variable of a stored optimization result.
+    """
+
+    variable: str = Field(default=..., description="Name of the capacity variable: 'capacity', 'commissioning', 'decommissioning' or 'isBuilt'.")
+    value: float = Field(default=..., description="Optimal value of the variable.")
+
+
+class OptimizationResultOperationSchema(OptimizationResultValueSchema):
+    """
+    Attributes to return via API for an operation time series of a stored optimization result.
+    """
+
+    variable: str = Field(default=..., description="Name of the operation variable, e.g. 'operation', 'chargeOperation' or 'stateOfCharge'.")
+    values: list[float] = Field(default=..., description="Optimal value of the variable in each time step of the dataset.")
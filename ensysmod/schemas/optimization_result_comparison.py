@@ -0,0 +1,54 @@
+from pydantic import Field
+
+from ensysmod.schemas.base_schema import BaseSchema
+from ensysmod.schemas.optimization_result import OptimizationResultSchema
+
+
+class ComparedValues(BaseSchema):
+    """
+    Values of the compared optimization results, in the order of the results, and their statistics.
+    """
+
+    values: list[float] = Field(default=..., description="Value of each result, 0 if a result doesn't contain the value.")
+    differences: list[float] = Field(default=..., description="Difference of the value of each result to the value of the first result.")
+    min: float = Field(default=..., description="Minimum of the values.")
+    max: float = Field(default=..., description="Maximum of the values.")
+    mean: float = Field(default=..., description="Mean of the values.")
+    std: float = Field(default=..., description="Standard deviation of the values.")
+
+
+class ComparedCapacity(ComparedValues):
+    """
+    Compared capacities of a component in a region.
+    """
+
+    component: str = Field(default=..., description="Name of the component. The stock of a myopic optimization counts as the component itself.")
+    region: str = Field(default=..., description="Name of the region.")
+    region_to: str | None = Field(default=None, description="Name of the region at the other end of a transmission.")
+
+
+class ComparedCommodityBalance(ComparedValues):
+    """
+    Compared yearly amounts of a commodity that a component produces (positive) or consumes (negative) in a region.
+    """
+
+    commodity: str = Field(default=..., description="Name of the commodity.")
+    region: str = Field(default=..., description="Name of the region.")
+    component: str = Field(default=..., description="Name of the component. The stock of a myopic optimization counts as the component itself.")
+
+
+class OptimizationResultComparison(BaseSchema):
+    """
+    Comparison of stored optimization results, see core.result_comparison.
+    """
+
+    results: list[OptimizationResultSchema] = Field(
+        default=...,
+        description="Compared results, the first result is the reference of the differences.",
+    )
+    total_cost: ComparedValues = Field(default=..., description="Objective values of the results.")
+    capacities: list[ComparedCapacity] = Field(default=..., description="Optimal capacities of each component in each region.")
+    commodity_balances: list[ComparedCommodityBalance] = Field(
+        default=...,
+        description="Yearly production and consumption of each commodity by each component in each region.",
+    )
@@ -0,0 +1,20 @@
+from pydantic import Field
+
+from ensysmod.schemas.base_schema import ReturnSchema
+
+
+class ProblemSizeSchema(ReturnSchema):
+    """
+    Estimated size of the optimization problem of an energy model.
+    """
+
+    regions: int = Field(default=..., description="Number of regions of the dataset after the spatial aggregation.")
+    components: int = Field(default=..., description="Number of components of the dataset.")
+    transmission_connections: int = Field(default=..., description="Number of connections between two regions of all transmissions.")
+    time_steps: int = Field(default=..., description="Number of time steps of all typical periods after the temporal aggregation.")
+    variables: int = Field(default=..., description="Estimated number of variables.")
+    integer_variables: int = Field(default=..., description="Estimated number of integer variables of discrete capacities.")
+    constraints: int = Field(default=..., description="Estimated number of constraints.")
+    memory_mb: float = Field(default=..., description="Estimated memory of the optimization in MB.")
+    admissible: bool = Field(default=..., description="Whether the server accepts an optimization of this size.")
+    error: str | None = Field(default=None, description="The exceeded limit if the optimization isn't admissible.")
@@ -0,0 +1,87 @@
+from pydantic import Field, model_validator
+
+from ensysmod.model import EnergyModelOverrideAttribute, EnergyModelOverrideOperation
+from ensysmod.schemas.base_schema import MAX_STR_LENGTH, MIN_STR_LENGTH, BaseSchema, CreateSchema
+from ensysmod.schemas.energy_model_override import EnergyModelOverrideCreate
+from ensysmod.utils import validators
+
+
+class ScenarioSweepParameter(BaseSchema):
+    """
+    Attributes of a parameter that is varied in a grid of scenarios.
+    """
+
+    component_name: str = Field(
+        default=...,
+        description="The name of the component which attribute is varied.",
+        examples=["Wind (onshore)"],
+        min_length=MIN_STR_LENGTH,
+        max_length=MAX_STR_LENGTH,
+    )
+    attribute: EnergyModelOverrideAttribute = Field(
+        default=...,
+        description="The attribute of the component to be varied.",
+        examples=[EnergyModelOverrideAttribute.investPerCapacity],
+    )
+    operation: EnergyModelOverrideOperation = Field(
+        default=...,
+        description="The operation that is applied with each value. Input should be 'set', 'add' or 'multiply'.",
+        examples=[EnergyModelOverrideOperation.multiply],
+    )
+    values: list[float] = Field(
+        default=...,
+        description="The values of the parameter, each value results in its own scenario.",
+        examples=[[0.8, 1, 1.2]],
+        min_length=1,
+    )
+    regions: list[str] | None = Field(
+        default=None,
+        description="Names of the regions whose values are varied. Only allowed for the regional parameters "
+        "capacity_max, operation_rate_fix and operation_rate_max, which are varied in all regions by default.",
+        examples=[None],
+        min_length=1,
+    )
+
+    # validators
+    _valid_regions = model_validator(mode="after")(validators.validate_override_regions)
+
+
+class ScenarioSweepCreate(CreateSchema):
+    """
+    Attributes to receive via API on submission of a scenario sweep.
+
+    Either a grid of parameters or a list of scenarios must be given.
+    """
+
+    ref_model: int = Field(
+        default=...,
+        description="ID of the energy model that the scenarios are based on.",
+        examples=[1],
+        gt=0,
+    )
+    grid: list[ScenarioSweepParameter] | None = Field(
+        default=None,
+        description="Parameters to vary. Every combination of their values is optimized as a scenario.",
+        examples=[
+            [
+                {"component_name": "Wind (onshore)", "attribute": "invest_per_capacity", "operation": "multiply", "values": [0.8, 1, 1.2]},
+                {"component_name": "PV", "attribute": "invest_per_capacity", "operation": "multiply", "values": [0.8, 1, 1.2]},
+            ]
+        ],
+        min_length=1,
+    )
+    scenarios: list[list[EnergyModelOverrideCreate]] | None = Field(
+        default=None,
+        description="Override parameters of each scenario. They are applied on top of the override parameters of the energy model.",
+        examples=[[[{"component_name": "PV", "attribute": "invest_per_capacity", "operation": "multiply", "value": 0.8}], []]],
+        min_length=1,
+    )
+    timeout: int | None = Field(
+        default=None,
+        description="Wall-clock timeout of the whole sweep in seconds. The server's timeout applies if it is shorter.",
+        examples=[None],
+        gt=0,
+    )
+
+    # validators
+    _valid_scenarios = model_validator(mode="after")(validators.validate_scenario_sweep)
@@ -1,20 +1,36 @@
 import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
-from tempfile import mkstemp
+from tempfile import mkdtemp, mkstemp
+from typing import Any
 
 import pandas as pd
 
+# number of active patched_attribute() contexts and the original value of each patched attribute
+_patches: dict[tuple[int, str], tuple[int, Any]] = {}
+_patches_lock = threading.Lock()
+
 
 def get_project_root() -> Path:
     return Path(__file__).parents[2].resolve()
 
 
 def create_temp_file(dir: str | Path | None = None, prefix: str | None = None, suffix: str | None = None) -> Path:
+    if dir is not None:
+        Path(dir).mkdir(parents=True, exist_ok=True)
     fd, temp_file_path = mkstemp(dir=dir, prefix=prefix, suffix=suffix)
     os.close(fd)
     return Path(temp_file_path)
 
 
+def create_temp_dir(dir: str | Path | None = None, prefix: str | None = None) -> Path:
+    if dir is not None:
+        Path(dir).mkdir(parents=True, exist_ok=True)
+    return Path(mkdtemp(dir=dir, prefix=prefix))
+
+
 def remove_file(file_path: Path) -> None:
     file_path.unlink()
 
@@ -22,3 +38,29 @@ def remove_file(file_path: Path) -> None:
 def df_or_s(df: pd.DataFrame) -> pd.DataFrame | pd.Series:
     """Convert a dataframe to a series if it has only one row."""
     return df.squeeze(axis=0) if df.shape[0] == 1 else df
+
+
+@contextmanager
+def patched_attribute(obj: Any, name: str, value: Any) -> Iterator[None]:
+    """
+    Replace an attribute of an object, e.g. a module, inside the context.
+
+    The contexts of concurrent threads share the replacement, the original value is restored when the last context exits.
+    The replacement is visible to every thread in the meantime, so it has to behave like the original outside the context.
+    """
+    key = (id(obj), name)
+    with _patches_lock:
+        active, original = _patches.get(key, (0, None))
+        if active == 0:
+            original = getattr(obj, name)
+            setattr(obj, name, value)
+        _patches[key] = (active + 1, original)
+    try:
+        yield
+    finally:
+        with _patches_lock:
+            active, original = _patches.pop(key)
+            if active == 1:
+                setattr(obj, name, original)
+            else:
+                _patches[key] = (active - 1, original)
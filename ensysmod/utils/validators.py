@@ -2,10 +2,17 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
+from ensysmod.core.solver_options import get_allowed_solvers, get_solver_name, get_solver_options
+
 if TYPE_CHECKING:
+    from ensysmod.schemas.energy_model_aggregation import EnergyModelAggregationBase
     from ensysmod.schemas.energy_model_optimization import EnergyModelOptimizationBase
+    from ensysmod.schemas.energy_model_override import EnergyModelOverrideBase
+    from ensysmod.schemas.energy_model_solver import EnergyModelSolverBase
     from ensysmod.schemas.energy_sink import EnergySinkBase
     from ensysmod.schemas.energy_source import EnergySourceBase
+    from ensysmod.schemas.optimization_job import OptimizationJobCreate
+    from ensysmod.schemas.scenario_sweep import ScenarioSweepCreate, ScenarioSweepParameter
 
 
 def validate_conversion_factors(conversion_factors: list[Any]) -> list[Any]:
@@ -111,3 +118,117 @@ def validate_CO2_optimization(model: EnergyModelOptimizationBase) -> EnergyModel
         )
 
     return model
+
+
+def validate_segmentation(schema: EnergyModelAggregationBase) -> EnergyModelAggregationBase:
+    """
+    Validates the segmentation of the typical periods.
+
+    The hours per time step of the dataset are unknown here, so the number of segments is only checked against the
+    hours per period, which is an upper bound of the time steps per period. A model with more segments than time steps
+    per period is optimized with one segment per time step, see core.fine_esm.get_aggregation_kwargs().
+
+    :param segmentation: Whether the typical periods are segmented.
+    :param hours_per_period: Length of a period in hours.
+    :param number_of_segments_per_period: Number of segments per typical period.
+
+    :return: The validated segmentation parameters.
+    """
+    if schema.segmentation and schema.number_of_segments_per_period > schema.hours_per_period:
+        raise ValueError("The number_of_segments_per_period must not be greater than the hours_per_period.")
+    return schema
+
+
+def validate_scenario_sweep(schema: ScenarioSweepCreate) -> ScenarioSweepCreate:
+    """
+    Validates that the scenarios of a scenario sweep are either given as grid or as list.
+
+    :param grid: Parameters whose combinations of values are the scenarios.
+    :param scenarios: Override parameters of each scenario.
+
+    :return: The validated scenario sweep.
+    """
+    if (schema.grid is None) == (schema.scenarios is None):
+        raise ValueError("Either grid or scenarios must be specified.")
+    return schema
+
+
+def validate_solver(schema: EnergyModelSolverBase) -> EnergyModelSolverBase:
+    """
+    Validates that the solver is allowed by the server and supports the given solver parameters.
+
+    :param solver: The solver of the optimization, the default solver of the server if not given.
+    :param threads: The number of threads of the solver.
+    :param time_limit: The time limit of the solver.
+    :param mip_gap: The MIP gap at which the solver stops.
+    :param presolve: Whether the solver presolves.
+
+    :return: The validated solver parameters.
+    """
+    allowed_solvers = get_allowed_solvers()
+    if schema.solver is not None and schema.solver not in allowed_solvers:
+        raise ValueError(f"Solver {schema.solver} is not allowed. Allowed solvers are: {', '.join(allowed_solvers)}.")
+    solver = get_solver_name(schema)
+    if solver is not None:
+        get_solver_options(solver, schema)
+    return schema
+
+
+def validate_warm_start(schema: OptimizationJobCreate) -> OptimizationJobCreate:
+    """
+    Validates that the solution to warm start from is given by at most one reference and only for an optimization.
+
+    :param ref_warm_start_job: ID of the optimization job whose solution is the starting point.
+    :param warm_start_model: ID of the energy model whose latest solution is the starting point.
+
+    :return: The validated optimization job.
+    """
+    if schema.ref_warm_start_job is None and schema.warm_start_model is None:
+        return schema
+    if schema.ref_warm_start_job is not None and schema.warm_start_model is not None:
+        raise ValueError("Either ref_warm_start_job or warm_start_model can be specified, not both.")
+    if schema.type.value not in ("OPTIMIZE", "ROLLING_HORIZON"):
+        raise ValueError(f"Warm start is only supported for optimization jobs of type OPTIMIZE or ROLLING_HORIZON, not {schema.type.value}.")
+    return schema
+
+
+def validate_rolling_horizon(schema: OptimizationJobCreate) -> OptimizationJobCreate:
+    """
+    Validates that the windows are only specified for a rolling horizon optimization.
+
+    :param window_time_steps: Number of time steps of each window.
+    :param overlap_time_steps: Number of time steps that each window is extended by.
+
+    :return: The validated optimization job.
+    """
+    if schema.type.value != "ROLLING_HORIZON" and (schema.window_time_steps is not None or schema.overlap_time_steps is not None):
+        raise ValueError(f"Windows can only be specified for optimization jobs of type ROLLING_HORIZON, not {schema.type.value}.")
+    return schema
+
+
+def validate_result_format(schema: OptimizationJobCreate) -> OptimizationJobCreate:
+    """
+    Validates that the format of the result file is only selected for an optimization.
+
+    :param result_format: Format of the result file.
+
+    :return: The validated optimization job.
+    """
+    if schema.type.value != "OPTIMIZE" and schema.result_format is not None:
+        raise ValueError(f"The result format can only be selected for optimization jobs of type OPTIMIZE, not {schema.type.value}.")
+    return schema
+
+
+def validate_override_regions(schema: EnergyModelOverrideBase | ScenarioSweepParameter) -> EnergyModelOverrideBase | ScenarioSweepParameter:
+    """
+    Validates that only regional parameters are overridden for selected regions.
+
+    :param attribute: The overridden attribute.
+    :param regions: Names of the regions whose values are overridden.
+
+    :return: The validated override parameter or scenario sweep parameter.
+    """
+    regional_attributes = ("capacity_max", "operation_rate_fix", "operation_rate_max")
+    if schema.regions is not None and schema.attribute is not None and schema.attribute.value not in regional_attributes:
+        raise ValueError(f"Regions can only be specified for the regional parameters {', '.join(regional_attributes)}.")
+    return schema
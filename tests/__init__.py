@@ -1,5 +1,15 @@
+import atexit
 import os
+import shutil
+from tempfile import mkdtemp
 
 # Override env variables
-os.environ["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+# The database is a file, so that the worker processes of optimization jobs can access it.
+test_dir = mkdtemp(prefix="ensysmod_test_")
+# removed after the worker processes and the connections to the database were shut down
+atexit.register(shutil.rmtree, test_dir, ignore_errors=True)
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{test_dir}/test.db"
 os.environ["SERVER_NAME"] = "EnSysMod Test"
+os.environ["RESULT_CACHE_DIR"] = f"{test_dir}/result_cache"
+os.environ["AGGREGATION_CACHE_DIR"] = f"{test_dir}/aggregation_cache"
+os.environ["ESM_CACHE_DIR"] = f"{test_dir}/esm_cache"
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from ensysmod.schemas import DatasetUpdate
 from tests.utils.data_generator.datasets import dataset_create_request, new_dataset
+from tests.utils.data_generator.regions import new_region
 from tests.utils.utils import assert_response, clear_database, random_string
 
 
@@ -77,3 +78,32 @@ def test_remove_dataset(db: Session, client: TestClient, user_header: dict[str,
     existing_dataset = new_dataset(db, user_header)
     response = client.delete(f"/datasets/{existing_dataset.id}", headers=user_header)
     assert response.status_code == status.HTTP_200_OK
+
+
+def test_dataset_version(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test that the version and fingerprint of a dataset change with its content only.
+    """
+    dataset = new_dataset(db, user_header)
+    response = client.get(f"/datasets/{dataset.id}", headers=user_header)
+    assert response.json()["version"] == 1
+    fingerprint = response.json()["fingerprint"]
+
+    region = new_region(db, user_header, dataset_id=dataset.id)
+    response = client.get(f"/datasets/{dataset.id}", headers=user_header)
+    assert response.json()["version"] == 2
+    assert response.json()["fingerprint"] != fingerprint
+    fingerprint = response.json()["fingerprint"]
+
+    update_request = DatasetUpdate(description=f"New Dataset Description-{random_string()}")
+    response = client.put(f"/datasets/{dataset.id}", headers=user_header, content=update_request.model_dump_json(exclude_unset=True))
+    assert response.json()["version"] == 2
+    assert response.json()["fingerprint"] == fingerprint
+
+    update_request = DatasetUpdate(hours_per_time_step=2)
+    response = client.put(f"/datasets/{dataset.id}", headers=user_header, content=update_request.model_dump_json(exclude_unset=True))
+    assert response.json()["version"] == 3
+
+    client.delete(f"/regions/{region.id}", headers=user_header)
+    response = client.get(f"/datasets/{dataset.id}", headers=user_header)
+    assert response.json()["version"] == 4
@@ -1,10 +1,19 @@
+from io import BytesIO
+from pathlib import Path
+from zipfile import ZipFile
+
+import pandas as pd
 import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
+from ensysmod import crud
+from ensysmod.model import ClusterMethod, OptimizationResultFormat
+from ensysmod.schemas import EnergyModelAggregationCreate, EnergyModelCreate, EnergyModelSolverCreate
 from tests.utils.data_generator.datasets import EXAMPLE_DATASETS
-from tests.utils.data_generator.energy_models import get_example_model
+from tests.utils.data_generator.energy_models import get_example_model, new_energy_model, new_uncached_example_model
+from tests.utils.utils import random_string
 
 
 @pytest.mark.slow()
@@ -12,12 +21,134 @@ from tests.utils.data_generator.energy_models import get_example_model
 @pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS)
 def test_optimize_model(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
     """
-    Test optimizing an energy model.
+    Test optimizing an energy model. The result is an Excel file like before the other result formats.
     """
     model = get_example_model(db, user_header, example_dataset=example_dataset)
     response = client.get(f"/models/{model.id}/optimize/", headers=user_header)
     assert response.status_code == status.HTTP_200_OK
-    assert response.headers["Content-Type"] == "application/vnd.openxmlformats-officedocument. spreadsheetml.sheet"
+    assert response.headers["Content-Type"] == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    assert "SourceSinkOptSummary_1dim" in pd.ExcelFile(BytesIO(response.content)).sheet_names
+
+
+def record_removed_jobs(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    """
+    Record the files of every optimization job that is deleted.
+    """
+    removed_job_files = []
+    remove = crud.optimization_job.remove
+
+    def recording_remove(db: Session, *, id: int):
+        job = crud.optimization_job.get(db, id=id)
+        removed_job_files.append([file for file in (job.result_file, job.solution_file, job.log_file) if file is not None])
+        return remove(db, id=id)
+
+    monkeypatch.setattr(crud.optimization_job, "remove", recording_remove)
+    return removed_job_files
+
+
+def test_optimize_invalid_model_leaves_no_job(db: Session, client: TestClient, user_header: dict[str, str], monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that the job of a failed synchronous optimization is deleted with its log.
+    """
+    model = new_energy_model(db, user_header)
+    removed_job_files = record_removed_jobs(monkeypatch)
+    response = client.get(f"/models/{model.id}/optimize", headers=user_header)
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    assert crud.optimization_job.get_multi_by_model(db, model_id=model.id) == []
+    [files] = removed_job_files
+    assert files
+    assert not any(Path(file).exists() for file in files)
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_optimize_model_leaves_no_job(
+    db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Test that the job of a synchronous optimization is deleted with its files and stored results once the result was sent.
+    """
+    model = new_uncached_example_model(db, user_header, example_dataset)
+    removed_job_files = record_removed_jobs(monkeypatch)
+    response = client.get(f"/models/{model.id}/optimize", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+
+    assert crud.optimization_job.get_multi_by_model(db, model_id=model.id) == []
+    assert crud.optimization_result.get_multi_by_model(db, model_id=model.id) == []
+    [files] = removed_job_files
+    # result, solution and log
+    assert len(files) == 3
+    assert not any(Path(file).exists() for file in files)
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_optimize_model_with_aggregation_parameters(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
+    """
+    Test optimizing an energy model with coarse aggregation parameters.
+    """
+    example_model = get_example_model(db, user_header, example_dataset=example_dataset)
+    create_request = EnergyModelCreate(
+        name=f"{example_dataset}-{random_string()}",
+        ref_dataset=example_model.ref_dataset,
+        aggregation_parameters=EnergyModelAggregationCreate(
+            number_of_typical_periods=2,
+            segmentation=False,
+            cluster_method=ClusterMethod.k_means,
+        ),
+    )
+    model = crud.energy_model.create(db=db, obj_in=create_request)
+    response = client.get(f"/models/{model.id}/optimize/", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("result_format", [OptimizationResultFormat.PARQUET, OptimizationResultFormat.EXCEL])
+def test_optimize_model_with_aggregated_regions(
+    db: Session, client: TestClient, user_header: dict[str, str], result_format: OptimizationResultFormat
+):
+    """
+    Test optimizing an energy model whose regions are aggregated, the result maps each region to its aggregated region.
+    """
+    example_model = get_example_model(db, user_header, example_dataset="Multi-regional_Example")
+    create_request = EnergyModelCreate(
+        name=f"aggregated-regions-{random_string()}",
+        ref_dataset=example_model.ref_dataset,
+        aggregation_parameters=EnergyModelAggregationCreate(number_of_typical_periods=2, segmentation=False, number_of_regions=3),
+    )
+    model = crud.energy_model.create(db=db, obj_in=create_request)
+    response = client.get(f"/models/{model.id}/optimize/", headers=user_header, params={"result_format": result_format.value})
+    assert response.status_code == status.HTTP_200_OK
+
+    if result_format == OptimizationResultFormat.EXCEL:
+        regions = pd.read_excel(BytesIO(response.content), sheet_name="Regions")
+    else:
+        with ZipFile(BytesIO(response.content)) as zip_file, zip_file.open("Regions.parquet") as parquet_file:
+            regions = pd.read_parquet(parquet_file).reset_index()
+    assert sorted(regions["region"]) == sorted(region.name for region in example_model.dataset.regions)
+    assert regions["aggregated_region"].nunique() == 3
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("solver", ["cbc", "appsi_highs"])
+def test_optimize_model_with_solver_parameters(db: Session, client: TestClient, user_header: dict[str, str], solver: str):
+    """
+    Test optimizing an energy model with a chosen solver and solver options.
+    """
+    example_model = get_example_model(db, user_header, example_dataset=EXAMPLE_DATASETS[0])
+    create_request = EnergyModelCreate(
+        name=f"{solver}-{random_string()}",
+        ref_dataset=example_model.ref_dataset,
+        solver_parameters=EnergyModelSolverCreate(solver=solver, threads=2, time_limit=600, mip_gap=0.01, presolve=True),
+    )
+    model = crud.energy_model.create(db=db, obj_in=create_request)
+    response = client.get(f"/models/{model.id}/optimize/", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
 
 
 # TODO Add test for myopic_optimize_model
@@ -1,10 +1,11 @@
+import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from ensysmod.schemas import EnergyModelUpdate
-from tests.utils.data_generator.datasets import new_dataset
-from tests.utils.data_generator.energy_models import energy_model_create_request, new_energy_model
+from tests.utils.data_generator.datasets import EXAMPLE_DATASETS, new_dataset
+from tests.utils.data_generator.energy_models import energy_model_create_request, get_example_model, new_energy_model
 from tests.utils.utils import assert_response, random_string
 
 
@@ -84,6 +85,18 @@ def test_create_energy_model_with_optimization_parameters(db: Session, client: T
     assert_response(response.json(), create_request)
 
 
+def test_create_energy_model_with_aggregation_parameters(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test creating an energy model with aggregation parameters.
+    """
+    create_request = energy_model_create_request(db, user_header, generate_aggregation_parameters=True)
+    response = client.post("/models/", headers=user_header, content=create_request.model_dump_json())
+    assert response.status_code == status.HTTP_200_OK
+    assert_response(response.json(), create_request)
+    assert response.json()["aggregation_parameters"]["number_of_typical_periods"] == 2
+    assert response.json()["aggregation_parameters"]["cluster_method"] == "k_means"
+
+
 def test_update_energy_model(db: Session, client: TestClient, user_header: dict[str, str]):
     """
     Test updating an energy model.
@@ -105,3 +118,49 @@ def test_remove_energy_model(db: Session, client: TestClient, user_header: dict[
     response = client.delete(f"/models/{existing_model.id}", headers=user_header)
     assert response.status_code == status.HTTP_200_OK
     assert_response(response.json(), existing_model)
+
+
+@pytest.mark.parametrize("build_esm", [False, True])
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS)
+def test_validate_model(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str, *, build_esm: bool):
+    """
+    Test validating an energy model with and without building the energy system model by FINE.
+    """
+    model = get_example_model(db, user_header, example_dataset=example_dataset)
+    response = client.get(f"/models/{model.id}/esm", headers=user_header, params={"build_esm": build_esm})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["id"] == model.id
+
+
+def test_validate_invalid_model(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test that the validation of an energy model reports all errors.
+    """
+    model = new_energy_model(db, user_header)
+    response = client.get(f"/models/{model.id}/esm", headers=user_header)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["detail"] == ["The dataset has no regions."]
+
+
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS)
+def test_problem_size(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str, monkeypatch: pytest.MonkeyPatch):
+    """
+    Test estimating the size of the optimization problem of a model and refusing an optimization that exceeds the limits.
+    """
+    model = get_example_model(db, user_header, example_dataset=example_dataset)
+    response = client.get(f"/models/{model.id}/problem_size", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    problem_size = response.json()
+    assert problem_size["variables"] > 0
+    assert problem_size["constraints"] > 0
+    assert problem_size["admissible"] is True
+
+    monkeypatch.setattr("ensysmod.core.problem_size.settings.MAX_PROBLEM_VARIABLES", problem_size["variables"] - 1)
+    response = client.get(f"/models/{model.id}/problem_size", headers=user_header)
+    assert response.json()["admissible"] is False
+    assert "variables" in response.json()["error"]
+
+    response = client.get(f"/models/{model.id}/optimize", headers=user_header)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    response = client.post("/jobs/", headers=user_header, json={"ref_model": model.id})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,585 @@
+import time
+from io import BytesIO
+from zipfile import ZipFile
+
+import pandas as pd
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from ensysmod import crud
+from ensysmod.core import settings
+from ensysmod.core.optimization_jobs import result_cache_key
+from ensysmod.model import EnergyModelOverrideAttribute, EnergyModelOverrideOperation, OptimizationJobType, OptimizationResultFormat
+from ensysmod.schemas import (
+    EnergyModelCreate,
+    EnergyModelOptimizationCreate,
+    EnergyModelOverrideCreate,
+    EnergyModelSolverCreate,
+    OptimizationJobCreate,
+    ScenarioSweepCreate,
+)
+from tests.utils.data_generator.datasets import EXAMPLE_DATASETS
+from tests.utils.data_generator.energy_models import get_example_model, new_energy_model, new_uncached_example_model
+from tests.utils.data_generator.regions import new_region
+from tests.utils.utils import get_current_user_from_header, random_string, wait_for_job
+
+
+def test_submit_job(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test submitting an optimization job. The request returns before the job is solved.
+    """
+    model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    response = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json())
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "PENDING"
+    assert response.json()["ref_model"] == model.id
+
+
+def test_submit_job_unknown_model(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test submitting an optimization job for an unknown energy model.
+    """
+    create_request = OptimizationJobCreate(ref_model=123456)
+    response = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json())
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_submit_myopic_job_without_optimization_parameters(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test submitting a myopic optimization job for an energy model without optimization parameters.
+    """
+    model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=model.id, type=OptimizationJobType.MYOPIC_OPTIMIZE)
+    response = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json())
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_get_jobs_by_model(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test listing all optimization jobs of an energy model.
+    """
+    model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    client.post("/jobs/", headers=user_header, content=create_request.model_dump_json())
+    client.post("/jobs/", headers=user_header, content=create_request.model_dump_json())
+
+    response = client.get("/jobs/", headers=user_header, params={"model_id": model.id})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 2
+
+
+def test_failed_job(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test that an invalid energy model results in a failed job without result.
+    """
+    model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+
+    job = wait_for_job(client, user_header, job_id)
+    assert job["status"] == "FAILED"
+    assert job["error"] is not None
+    # the phases up to the failure are measured
+    assert [phase["phase"] for phase in job["timing"]][-2:] == ["read_database", "build_esm"]
+
+    response = client.get(f"/jobs/{job_id}/result", headers=user_header)
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+    response = client.delete(f"/jobs/{job_id}", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    response = client.get(f"/jobs/{job_id}", headers=user_header)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_job_result(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
+    """
+    Test downloading the result of a finished optimization job, by default a zip file of Parquet files.
+    """
+    model = get_example_model(db, user_header, example_dataset=example_dataset)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+
+    job = wait_for_job(client, user_header, job_id)
+    assert job["status"] == "FINISHED"
+
+    response = client.get(f"/jobs/{job_id}/result", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Content-Type"] == "application/zip"
+    with ZipFile(BytesIO(response.content)) as zip_file, zip_file.open("SourceSinkOptSummary_1dim.parquet") as parquet_file:
+        summary = pd.read_parquet(parquet_file)
+    assert "Wind (onshore)" in summary.index.get_level_values("Component")
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_job_excel_result(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
+    """
+    Test downloading the result of an optimization job that selected an Excel file.
+    """
+    model = get_example_model(db, user_header, example_dataset=example_dataset)
+    create_request = OptimizationJobCreate(ref_model=model.id, result_format=OptimizationResultFormat.EXCEL)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    assert wait_for_job(client, user_header, job_id)["status"] == "FINISHED"
+
+    response = client.get(f"/jobs/{job_id}/result", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Content-Type"] == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    summary = pd.read_excel(BytesIO(response.content), sheet_name="SourceSinkOptSummary_1dim", index_col=[0, 1, 2])
+    assert "Wind (onshore)" in summary.index.get_level_values(0)
+
+
+def test_submit_myopic_job_with_result_format(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test that the result format can only be selected for an optimization.
+    """
+    model = new_energy_model(db, user_header)
+    response = client.post("/jobs/", headers=user_header, json={"ref_model": model.id, "type": "MYOPIC_OPTIMIZE", "result_format": "EXCEL"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_job_stored_results(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
+    """
+    Test querying the stored result of an optimization job and its copy for a job whose result is cached.
+    """
+    model = new_uncached_example_model(db, user_header, example_dataset)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    assert wait_for_job(client, user_header, job_id)["status"] == "FINISHED"
+
+    response = client.get(f"/jobs/{job_id}/results", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    [result] = response.json()
+    assert result["year"] is None
+    assert result["objective_value"] > 0
+
+    params = {"component": ["Wind (onshore)", "PV"], "variable": "capacity"}
+    capacities = client.get(f"/jobs/{job_id}/results/capacities", headers=user_header, params=params).json()
+    assert capacities
+    assert {capacity["component"] for capacity in capacities} <= {"Wind (onshore)", "PV"}
+    assert {capacity["variable"] for capacity in capacities} == {"capacity"}
+
+    region = capacities[0]["region"]
+    params = {"component": "Wind (onshore)", "region": region, "variable": "operation"}
+    [operation] = client.get(f"/jobs/{job_id}/results/operations", headers=user_header, params=params).json()
+    assert operation["region"] == region
+    assert len(operation["values"]) > 0
+
+    # the second job takes the result of the first job from the result cache
+    cached_job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    assert wait_for_job(client, user_header, cached_job_id)["status"] == "FINISHED"
+    client.delete(f"/jobs/{job_id}", headers=user_header)
+    [cached_result] = client.get(f"/jobs/{cached_job_id}/results", headers=user_header).json()
+    assert cached_result["objective_value"] == pytest.approx(result["objective_value"])
+    cached_operations = client.get(f"/jobs/{cached_job_id}/results/operations", headers=user_header, params=params).json()
+    assert cached_operations[0]["values"] == operation["values"]
+
+    response = client.get(f"/models/{model.id}/results", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    assert [result["ref_job"] for result in response.json()] == [cached_job_id]
+
+
+def test_results_of_unknown_job(client: TestClient, user_header: dict[str, str]):
+    """
+    Test querying the stored results of an unknown optimization job.
+    """
+    response = client.get("/jobs/123456/results/capacities", headers=user_header)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_submit_job_warm_start_unknown_job(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test submitting an optimization job that starts from the solution of an unknown job.
+    """
+    model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=model.id, ref_warm_start_job=123456)
+    response = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json())
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_submit_job_warm_start_model_without_solution(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test submitting an optimization job that starts from the solution of a model that was never optimized.
+    """
+    model = new_energy_model(db, user_header)
+    warm_start_model = new_energy_model(db, user_header, dataset_id=model.ref_dataset)
+    create_request = OptimizationJobCreate(ref_model=model.id, warm_start_model=warm_start_model.id)
+    response = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json())
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_submit_job_warm_start_other_dataset(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test submitting an optimization job that starts from the solution of a model of another dataset.
+    """
+    model = new_energy_model(db, user_header)
+    warm_start_model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=model.id, warm_start_model=warm_start_model.id)
+    response = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json())
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_submit_job_warm_start_failed_job(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test submitting an optimization job that starts from a job without solution.
+    """
+    model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    failed_job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    assert wait_for_job(client, user_header, failed_job_id)["status"] == "FAILED"
+
+    create_request = OptimizationJobCreate(ref_model=model.id, ref_warm_start_job=failed_job_id)
+    response = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json())
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_warm_start(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
+    """
+    Test optimizing a model with changed override parameters, starting from the solution of the original model.
+    """
+    model = get_example_model(db, user_header, example_dataset=example_dataset)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    assert wait_for_job(client, user_header, job_id)["status"] == "FINISHED"
+
+    override_model = crud.energy_model.create(
+        db,
+        obj_in=EnergyModelCreate(
+            name=f"{example_dataset}-{random_string()}",
+            ref_dataset=model.ref_dataset,
+            override_parameters=[
+                EnergyModelOverrideCreate(
+                    component_name="Wind (onshore)",
+                    attribute=EnergyModelOverrideAttribute.investPerCapacity,
+                    operation=EnergyModelOverrideOperation.multiply,
+                    value=0.9,
+                )
+            ],
+            solver_parameters=EnergyModelSolverCreate(solver="cbc"),
+        ),
+    )
+    create_request = OptimizationJobCreate(ref_model=override_model.id, warm_start_model=model.id)
+    response = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json())
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["ref_warm_start_job"] == job_id
+
+    job = wait_for_job(client, user_header, response.json()["id"])
+    assert job["status"] == "FINISHED"
+    assert crud.optimization_job.get(db, id=job["id"]).solution_file is not None
+
+
+def test_submit_scenario_sweep_unknown_component(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test submitting a scenario sweep that varies a component which is not part of the dataset.
+    """
+    model = new_energy_model(db, user_header)
+    grid = [{"component_name": "unknown component", "attribute": "invest_per_capacity", "operation": "multiply", "values": [0.8, 1.2]}]
+    create_request = ScenarioSweepCreate(ref_model=model.id, grid=grid)
+    response = client.post("/jobs/sweep", headers=user_header, content=create_request.model_dump_json())
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_submit_scenario_sweep_too_many_scenarios(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test submitting a scenario sweep with more scenarios than allowed.
+    """
+    model = new_energy_model(db, user_header)
+    values = [float(value) for value in range(settings.SCENARIO_SWEEP_MAX_SCENARIOS + 1)]
+    grid = [{"component_name": "unknown component", "attribute": "invest_per_capacity", "operation": "multiply", "values": values}]
+    create_request = ScenarioSweepCreate(ref_model=model.id, grid=grid)
+    response = client.post("/jobs/sweep", headers=user_header, content=create_request.model_dump_json())
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_scenario_sweep(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
+    """
+    Test optimizing a grid of scenarios and downloading the comparative report.
+    """
+    model = get_example_model(db, user_header, example_dataset=example_dataset)
+    grid = [
+        {"component_name": "Wind (onshore)", "attribute": "invest_per_capacity", "operation": "multiply", "values": [0.8, 1.2]},
+        {"component_name": "Li-ion Batterien", "attribute": "invest_per_capacity", "operation": "multiply", "values": [0.5, 1]},
+    ]
+    create_request = ScenarioSweepCreate(ref_model=model.id, grid=grid)
+    response = client.post("/jobs/sweep", headers=user_header, content=create_request.model_dump_json())
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["scenarios"]) == 4
+
+    job = wait_for_job(client, user_header, response.json()["id"])
+    assert job["status"] == "FINISHED"
+
+    response = client.get(f"/jobs/{job['id']}/result", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    scenarios = pd.read_excel(BytesIO(response.content), sheet_name="Scenarios", index_col=0)
+    capacities = pd.read_excel(BytesIO(response.content), sheet_name="Capacities", index_col=0)
+    assert len(scenarios) == 4
+    assert scenarios["error"].isna().all()
+    # cheaper wind turbines result in lower costs
+    assert scenarios["objective"].iloc[0] < scenarios["objective"].iloc[2]
+    assert list(capacities.columns) == [1, 2, 3, 4]
+    assert "Wind (onshore)" in capacities.index
+
+
+def test_result_cache_key(db: Session, user_header: dict[str, str]):
+    """
+    Test that the result cache key only changes if the inputs of the optimization change.
+    """
+    model = new_energy_model(db, user_header)
+    override_model = new_energy_model(db, user_header, dataset_id=model.ref_dataset, generate_override_parameters=True)
+    user_id = get_current_user_from_header(db, user_header).id
+    job = crud.optimization_job.create(db, obj_in={"ref_model": model.id, "ref_user": user_id, "type": OptimizationJobType.OPTIMIZE})
+    override_job = crud.optimization_job.create(
+        db, obj_in={"ref_model": override_model.id, "ref_user": user_id, "type": OptimizationJobType.OPTIMIZE}
+    )
+
+    excel_job = crud.optimization_job.create(
+        db, obj_in={"ref_model": model.id, "ref_user": user_id, "type": OptimizationJobType.OPTIMIZE, "result_format": OptimizationResultFormat.EXCEL}
+    )
+
+    key = result_cache_key(job)
+    assert key == result_cache_key(job)
+    assert key != result_cache_key(override_job)
+    assert key != result_cache_key(excel_job)
+
+    new_region(db, user_header, dataset_id=model.ref_dataset)
+    assert key != result_cache_key(job)
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_rolling_horizon_job(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
+    """
+    Test a rolling horizon optimization of an example, whose capacities are fixed to the capacities of a previous optimization.
+    """
+    model = get_example_model(db, user_header, example_dataset=example_dataset)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    assert wait_for_job(client, user_header, job_id)["status"] == "FINISHED"
+
+    create_request = OptimizationJobCreate(
+        ref_model=model.id,
+        type=OptimizationJobType.ROLLING_HORIZON,
+        ref_warm_start_job=job_id,
+        window_time_steps=2190,
+        overlap_time_steps=24,
+    )
+    rolling_horizon_job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    job = wait_for_job(client, user_header, rolling_horizon_job_id)
+    assert job["status"] == "FINISHED", job["error"]
+    assert "rolling_horizon" in [phase["phase"] for phase in job["timing"]]
+
+    response = client.get(f"/jobs/{rolling_horizon_job_id}/result", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    windows = pd.read_excel(BytesIO(response.content), sheet_name="Windows")
+    assert len(windows) == 4
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_myopic_job_years(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
+    """
+    Test downloading the result of each year of a myopic optimization job.
+    """
+    model = get_example_model(db, user_header, example_dataset=example_dataset)
+    myopic_model = crud.energy_model.create(
+        db,
+        obj_in=EnergyModelCreate(
+            name=f"{example_dataset}-{random_string()}",
+            ref_dataset=model.ref_dataset,
+            optimization_parameters=EnergyModelOptimizationCreate(start_year=2020, end_year=2030, years_per_step=10),
+        ),
+    )
+    create_request = OptimizationJobCreate(ref_model=myopic_model.id, type=OptimizationJobType.MYOPIC_OPTIMIZE)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    assert wait_for_job(client, user_header, job_id)["status"] == "FINISHED"
+
+    response = client.get(f"/jobs/{job_id}/years", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [2020, 2030]
+
+    response = client.get(f"/jobs/{job_id}/years/2030", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    with ZipFile(BytesIO(response.content)) as zip_file:
+        assert "SourceSinkOptSummary_1dim.csv" in zip_file.namelist()
+
+    response = client.get(f"/jobs/{job_id}/years/2025", headers=user_header)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    results = client.get(f"/jobs/{job_id}/results", headers=user_header).json()
+    assert [result["year"] for result in results] == [2020, 2030]
+    response = client.get(f"/jobs/{job_id}/results/capacities", headers=user_header, params={"year": 2030, "variable": "capacity"})
+    assert response.status_code == status.HTTP_200_OK
+    assert {capacity["ref_result"] for capacity in response.json()} == {results[1]["id"]}
+    response = client.get(f"/jobs/{job_id}/results/capacities", headers=user_header, params={"year": 2025})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_years_of_other_job(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test that only myopic optimization jobs have years.
+    """
+    model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+
+    response = client.get(f"/jobs/{job_id}/years", headers=user_header)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_resume_failed_job(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test that a failed job is submitted again.
+    """
+    model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    assert wait_for_job(client, user_header, job_id)["status"] == "FAILED"
+
+    response = client.post(f"/jobs/{job_id}/resume", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] in ("PENDING", "RUNNING", "FAILED")
+    assert wait_for_job(client, user_header, job_id)["status"] == "FAILED"
+
+
+def test_resume_unknown_job(client: TestClient, user_header: dict[str, str]):
+    """
+    Test resuming an unknown optimization job.
+    """
+    response = client.post("/jobs/123456/resume", headers=user_header)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_cancel_pending_job(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test that a pending job is cancelled immediately and can't be cancelled again.
+    """
+    model = new_energy_model(db, user_header)
+    user_id = get_current_user_from_header(db, user_header).id
+    job = crud.optimization_job.create(db, obj_in={"ref_model": model.id, "ref_user": user_id, "type": OptimizationJobType.OPTIMIZE})
+
+    response = client.post(f"/jobs/{job.id}/cancel", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "CANCELLED"
+    assert response.json()["finished_at"] is not None
+
+    response = client.post(f"/jobs/{job.id}/cancel", headers=user_header)
+    assert response.status_code == status.HTTP_409_CONFLICT
+
+
+def test_cancel_unknown_job(client: TestClient, user_header: dict[str, str]):
+    """
+    Test cancelling an unknown optimization job.
+    """
+    response = client.post("/jobs/123456/cancel", headers=user_header)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_stream_job_log(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test that the log of a job is streamed as server-sent events until the job is done.
+    """
+    model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+
+    response = client.get(f"/jobs/{job_id}/log", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = response.text.split("\n\n")[:-1]
+    assert "Phase read_database started." in response.text
+    assert f"Optimization job {job_id} failed." in response.text
+    assert events[-1] == "event: status\ndata: FAILED"
+
+    # a reconnecting client only receives the lines after its last event
+    last_log_event = next(event for event in reversed(events) if event.startswith("event: log"))
+    last_event_id = last_log_event.split("id: ")[1]
+    response = client.get(f"/jobs/{job_id}/log", headers={**user_header, "Last-Event-ID": last_event_id})
+    assert response.text == "event: status\ndata: FAILED\n\n"
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_stream_solver_log(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
+    """
+    Test that the log of a job contains the phases of the optimization and the output of the solver.
+    """
+    model = new_uncached_example_model(db, user_header, example_dataset)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+
+    response = client.get(f"/jobs/{job_id}/log", headers=user_header)
+    for phase in ("build_esm", "aggregate", "declare_problem", "solve", "write_output"):
+        assert f"Phase {phase} started." in response.text
+    # the output of the solver is logged during the solve phase
+    solver_output = response.text.split("Phase solve started.")[1].split("Phase solve finished")[0]
+    assert solver_output.count("event: log") > 1
+    assert response.text.endswith("event: status\ndata: FINISHED\n\n")
+
+
+def test_stream_unknown_job_log(client: TestClient, user_header: dict[str, str]):
+    """
+    Test streaming the log of an unknown optimization job.
+    """
+    response = client.get("/jobs/123456/log", headers=user_header)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_cancel_running_job(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
+    """
+    Test that a running job is stopped and marked as cancelled, and that the worker takes the next job afterwards.
+    """
+    model = new_uncached_example_model(db, user_header, example_dataset)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    while client.get(f"/jobs/{job_id}", headers=user_header).json()["status"] == "PENDING":
+        time.sleep(0.5)
+
+    response = client.post(f"/jobs/{job_id}/cancel", headers=user_header)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["cancel_requested"]
+
+    job = wait_for_job(client, user_header, job_id)
+    assert job["status"] == "CANCELLED"
+    assert job["error"] == "The optimization was cancelled."
+
+    failing_model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=failing_model.id)
+    next_job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    assert wait_for_job(client, user_header, next_job_id, timeout=60)["status"] == "FAILED"
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_job_timeout(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
+    """
+    Test that a job that runs longer than its timeout fails.
+    """
+    model = new_uncached_example_model(db, user_header, example_dataset)
+    create_request = OptimizationJobCreate(ref_model=model.id, timeout=1)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+
+    job = wait_for_job(client, user_header, job_id)
+    assert job["status"] == "FAILED"
+    assert job["error"] == "The optimization exceeded its timeout of 1 seconds."
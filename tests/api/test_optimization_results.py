@@ -0,0 +1,75 @@
+from collections import defaultdict
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from ensysmod.schemas import OptimizationJobCreate
+from tests.utils.data_generator.datasets import EXAMPLE_DATASETS
+from tests.utils.data_generator.energy_models import new_energy_model, new_uncached_example_model
+from tests.utils.utils import wait_for_job
+
+
+@pytest.mark.slow()
+@pytest.mark.require_solver()
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_compare_results(db: Session, client: TestClient, user_header: dict[str, str], example_dataset: str):
+    """
+    Test comparing the result of an optimization job with the latest result of another model.
+    """
+    job_ids = []
+    models = [new_uncached_example_model(db, user_header, example_dataset) for _ in range(2)]
+    for model in models:
+        create_request = OptimizationJobCreate(ref_model=model.id)
+        job_ids.append(client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"])
+    for job_id in job_ids:
+        assert wait_for_job(client, user_header, job_id)["status"] == "FINISHED"
+    objective_values = [client.get(f"/jobs/{job_id}/results", headers=user_header).json()[0]["objective_value"] for job_id in job_ids]
+
+    response = client.get("/results/compare", headers=user_header, params={"job_id": job_ids[0], "model_id": models[1].id})
+    assert response.status_code == status.HTTP_200_OK
+    comparison = response.json()
+    assert [result["ref_job"] for result in comparison["results"]] == job_ids
+
+    total_cost = comparison["total_cost"]
+    assert total_cost["values"] == pytest.approx(objective_values)
+    assert total_cost["differences"] == pytest.approx([0, objective_values[1] - objective_values[0]])
+    assert total_cost["min"] == pytest.approx(min(objective_values))
+    assert total_cost["mean"] == pytest.approx(sum(objective_values) / 2)
+
+    [wind] = [capacity for capacity in comparison["capacities"] if capacity["component"] == "Wind (onshore)"]
+    assert len(wind["values"]) == 2
+    assert wind["region_to"] is None
+
+    # the commodity balances of the optimization are balanced
+    balances = defaultdict(lambda: [0.0, 0.0])
+    for balance in comparison["commodity_balances"]:
+        for index, value in enumerate(balance["values"]):
+            balances[(balance["commodity"], balance["region"])][index] += value
+    assert ("electricity", "GermanyRegion") in balances
+    for commodity_region, values in balances.items():
+        assert values == pytest.approx([0, 0], abs=1e-3), commodity_region
+
+
+def test_compare_results_of_job_without_results(db: Session, client: TestClient, user_header: dict[str, str]):
+    """
+    Test comparing the results of a job that didn't store results.
+    """
+    model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    assert wait_for_job(client, user_header, job_id)["status"] == "FAILED"
+
+    response = client.get("/results/compare", headers=user_header, params={"job_id": job_id})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = client.get("/results/compare", headers=user_header, params={"model_id": model.id})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_compare_no_results(client: TestClient, user_header: dict[str, str]):
+    """
+    Test comparing without results.
+    """
+    response = client.get("/results/compare", headers=user_header)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
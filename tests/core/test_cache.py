@@ -0,0 +1,84 @@
+import os
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ensysmod.core.cache import FileCache, hash_content
+
+
+def write_file(path: Path, size: int) -> Path:
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_cache_hit(tmp_path: Path):
+    cache = FileCache(tmp_path / "cache", max_size=1024, ttl=timedelta(hours=1))
+    cache.put("key", write_file(tmp_path / "result.xlsx", 10))
+
+    target = tmp_path / "copy.xlsx"
+    assert cache.copy_to("key", target)
+    assert target.read_bytes() == b"x" * 10
+    assert not cache.copy_to("other-key", tmp_path / "other.xlsx")
+
+
+def test_cache_ttl(tmp_path: Path):
+    cache = FileCache(tmp_path / "cache", max_size=1024, ttl=timedelta(hours=1))
+    cache.put("key", write_file(tmp_path / "result.xlsx", 10))
+
+    two_hours_ago = time.time() - 2 * 60 * 60
+    os.utime(tmp_path / "cache" / "key", (two_hours_ago, two_hours_ago))
+    assert cache.get("key") is None
+    assert not (tmp_path / "cache" / "key").exists()
+
+
+def test_cache_entry_evicted_by_other_process(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    cache = FileCache(tmp_path / "cache", max_size=1024, ttl=timedelta(hours=1))
+    cache.put("key", write_file(tmp_path / "result.xlsx", 10))
+
+    utime = os.utime
+
+    def evict_and_touch(path: Path, times: tuple[float, float]) -> None:
+        path.unlink()
+        utime(path, times)
+
+    monkeypatch.setattr("ensysmod.core.cache.os.utime", evict_and_touch)
+    assert cache.get("key") is None
+    assert not cache.copy_to("key", tmp_path / "copy.xlsx")
+    assert cache.load("key") is None
+
+
+def test_cache_size_evicts_least_recently_used(tmp_path: Path):
+    cache = FileCache(tmp_path / "cache", max_size=25, ttl=timedelta(hours=1))
+    cache.put("first", write_file(tmp_path / "first.xlsx", 10))
+    cache.put("second", write_file(tmp_path / "second.xlsx", 10))
+    one_minute_ago = time.time() - 60
+    os.utime(tmp_path / "cache" / "second", (one_minute_ago, one_minute_ago))
+    cache.get("first")
+
+    cache.put("third", write_file(tmp_path / "third.xlsx", 10))
+    assert cache.get("first") is not None
+    assert cache.get("second") is None
+    assert cache.get("third") is not None
+
+
+def test_disabled_cache(tmp_path: Path):
+    cache = FileCache(tmp_path / "cache", max_size=0, ttl=timedelta(hours=1))
+    cache.put("key", write_file(tmp_path / "result.xlsx", 10))
+    assert cache.get("key") is None
+
+
+def test_hash_content_is_order_independent():
+    assert hash_content({"a": 1, "b": {"x", "y"}}) == hash_content({"b": {"y", "x"}, "a": 1})
+    assert hash_content({"a": 1}) != hash_content({"a": 1.0})
+    assert hash_content({"a": "1"}) != hash_content({"a": 1})
+
+
+def test_hash_content_of_data_frames():
+    time_series = pd.DataFrame({"region-1": [1.0, 2.0], "region-2": [3.0, 4.0]})
+    assert hash_content(time_series) == hash_content(time_series.copy())
+    assert hash_content(time_series) != hash_content(time_series * 2)
+    assert hash_content(time_series) != hash_content(time_series.rename(columns={"region-1": "region-3"}))
+    assert hash_content(time_series["region-1"]) != hash_content(time_series["region-2"])
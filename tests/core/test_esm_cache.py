@@ -0,0 +1,244 @@
+import pickle
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from fine import EnergySystemModel
+from sqlalchemy.orm import Session
+
+from ensysmod import crud
+from ensysmod.core import fine_esm
+from ensysmod.core.cache import FileCache
+from ensysmod.core.esm_cache import ESMCache, esm_cache, esm_cache_key
+from ensysmod.core.fine_esm import build_esm, esm_base_key, get_component_hashes, update_esm
+from ensysmod.model import EnergyModelOverrideAttribute, EnergyModelOverrideOperation
+from ensysmod.schemas import EnergyModelCreate, EnergyModelOverrideCreate
+from tests.utils.data_generator.datasets import EXAMPLE_DATASETS
+from tests.utils.data_generator.energy_models import get_example_model, new_energy_model
+from tests.utils.data_generator.regions import new_region
+from tests.utils.utils import random_string
+
+
+def new_esm() -> EnergySystemModel:
+    return EnergySystemModel(
+        locations={"region"},
+        commodities={"electricity"},
+        commodityUnitsDict={"electricity": "GW"},
+        numberOfTimeSteps=8,
+        verboseLogLevel=2,
+    )
+
+
+def test_cached_esm_is_copy():
+    """
+    Test that every hit returns an independent copy of the cached energy system model.
+    """
+    cache = ESMCache(max_size=10 * 1024 * 1024)
+    cache.put("key", new_esm(), dataset_id=1, dataset_fingerprint="a")
+
+    esM = cache.get("key")
+    assert esM is not cache.get("key")
+    esM.numberOfTimeSteps = 1
+    assert cache.get("key").numberOfTimeSteps == 8
+    assert cache.get("unknown") is None
+
+
+def test_least_recently_used_eviction():
+    """
+    Test that the least recently used models are evicted if the size limit is exceeded.
+    """
+    size = len(pickle.dumps(new_esm(), protocol=pickle.HIGHEST_PROTOCOL))
+    cache = ESMCache(max_size=2 * size)
+    cache.put("first", new_esm(), dataset_id=1, dataset_fingerprint="a")
+    cache.put("second", new_esm(), dataset_id=1, dataset_fingerprint="a")
+    cache.get("first")
+    cache.put("third", new_esm(), dataset_id=1, dataset_fingerprint="a")
+
+    assert cache.get("first") is not None
+    assert cache.get("second") is None
+    assert cache.get("third") is not None
+    assert cache.size == 2 * size
+
+
+def test_invalidation():
+    """
+    Test that models of a dataset are removed explicitly and when a newer version of the dataset is cached.
+    """
+    cache = ESMCache(max_size=10 * 1024 * 1024)
+    cache.put("old", new_esm(), dataset_id=1, dataset_fingerprint="a")
+    cache.put("other", new_esm(), dataset_id=2, dataset_fingerprint="a")
+    cache.put("new", new_esm(), dataset_id=1, dataset_fingerprint="b")
+    assert cache.get("old") is None
+    assert len(cache) == 2
+
+    cache.invalidate(1)
+    assert cache.get("new") is None
+    assert cache.get("other") is not None
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_shared_file_cache(tmp_path: Path):
+    """
+    Test that a model cached by one process is loaded from disk by another process with its component hashes.
+    """
+    file_cache = FileCache(tmp_path / "esm_cache", max_size=10 * 1024 * 1024, ttl=timedelta(hours=1))
+    api_cache = ESMCache(max_size=10 * 1024 * 1024, file_cache=file_cache)
+    worker_cache = ESMCache(max_size=10 * 1024 * 1024, file_cache=file_cache)
+    api_cache.put("key", new_esm(), dataset_id=1, dataset_fingerprint="a", base_key="base", component_hashes={"plant": "1"})
+
+    esM = worker_cache.get("key")
+    assert esM is not None
+    assert esM.numberOfTimeSteps == 8
+    assert len(worker_cache) == 1
+    assert worker_cache.get_base(1, "base")[1] == {"plant": "1"}
+    assert worker_cache.get("unknown") is None
+
+    # the size limit of the memory doesn't apply to the disk
+    ESMCache(max_size=0, file_cache=file_cache).put("other", new_esm(), dataset_id=1, dataset_fingerprint="a")
+    assert worker_cache.get("other") is not None
+
+
+def new_esm_data(invest_per_capacity: float) -> dict:
+    """
+    Return the parameters of an ESM with a plant, a demand and, depending on the invest of the plant, a battery.
+    """
+    return {
+        "esm": {
+            "locations": {"region"},
+            "commodities": {"electricity"},
+            "commodityUnitsDict": {"electricity": "GW"},
+            "numberOfTimeSteps": 4,
+            "hoursPerTimeStep": 1,
+        },
+        "sources": [{"name": "plant", "commodity": "electricity", "hasCapacityVariable": True, "investPerCapacity": invest_per_capacity}],
+        "sinks": [
+            {"name": "demand", "commodity": "electricity", "hasCapacityVariable": False, "operationRateFix": pd.DataFrame({"region": [1.0] * 4})}
+        ],
+        "conversions": [],
+        "storages": [{"name": "battery", "commodity": "electricity", "hasCapacityVariable": True}] if invest_per_capacity > 1 else [],
+        "transmissions": [],
+    }
+
+
+def test_get_base():
+    """
+    Test that the most recently used model of a dataset with the same base key is returned with its component hashes.
+    """
+    cache = ESMCache(max_size=10 * 1024 * 1024)
+    cache.put("old", new_esm(), dataset_id=1, dataset_fingerprint="a", base_key="base", component_hashes={"plant": "1"})
+    cache.put("new", new_esm(), dataset_id=1, dataset_fingerprint="a", base_key="base", component_hashes={"plant": "2"})
+    cache.put("other", new_esm(), dataset_id=2, dataset_fingerprint="a", base_key="base", component_hashes={"plant": "3"})
+
+    base = cache.get_base(1, "base")
+    assert base is not None
+    assert base[1] == {"plant": "2"}
+    assert cache.get_base(1, "other base") is None
+    assert cache.get_base(3, "base") is None
+
+
+def test_update_esm():
+    """
+    Test that only changed components are built again and that the updated ESM equals a newly built ESM.
+    """
+    esm_data = new_esm_data(invest_per_capacity=1.0)
+    changed_esm_data = new_esm_data(invest_per_capacity=2.0)
+    assert esm_base_key(esm_data) == esm_base_key(changed_esm_data)
+    esM = build_esm(esm_data)
+    demand = esM.getComponent("demand")
+
+    update_esm(esM, changed_esm_data, component_hashes=get_component_hashes(changed_esm_data), cached_component_hashes=get_component_hashes(esm_data))
+    assert set(esM.componentNames) == {"plant", "demand", "battery"}
+    assert esM.getComponent("demand") is demand
+    assert esM.getComponent("plant").investPerCapacity == pytest.approx(2.0)
+
+    update_esm(esM, esm_data, component_hashes=get_component_hashes(esm_data), cached_component_hashes=get_component_hashes(changed_esm_data))
+    assert set(esM.componentNames) == {"plant", "demand"}
+    assert esM.getComponent("plant").investPerCapacity == pytest.approx(1.0)
+
+
+def test_disabled_cache():
+    """
+    Test that a cache with a size of 0 stores nothing.
+    """
+    cache = ESMCache(max_size=0)
+    cache.put("key", new_esm(), dataset_id=1, dataset_fingerprint="a")
+    assert cache.get("key") is None
+
+
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_generate_esm_from_model(db: Session, user_header: dict[str, str], example_dataset: str, monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that an unchanged energy model is only built once.
+    """
+    built_esms = []
+
+    def build_esm(esm_data: dict) -> EnergySystemModel:
+        built_esms.append(esm_data)
+        return original_build_esm(esm_data)
+
+    original_build_esm = fine_esm.build_esm
+    monkeypatch.setattr(fine_esm, "build_esm", build_esm)
+    esm_cache.clear()
+
+    model = get_example_model(db, user_header, example_dataset=example_dataset)
+    esM = fine_esm.generate_esm_from_model(db, model=model)
+    cached_esM = fine_esm.generate_esm_from_model(db, model=model)
+    assert len(built_esms) == 1
+    assert cached_esM is not esM
+    assert set(cached_esM.componentNames) == set(esM.componentNames)
+
+
+def test_esm_cache_key(db: Session, user_header: dict[str, str]):
+    """
+    Test that the key of an energy model changes with the content of its dataset and with its override parameters.
+    """
+    model = new_energy_model(db, user_header)
+    override_model = new_energy_model(db, user_header, dataset_id=model.ref_dataset, generate_override_parameters=True)
+    key = esm_cache_key(model)
+    assert key == esm_cache_key(model)
+    assert key != esm_cache_key(override_model)
+
+    new_region(db, user_header, dataset_id=model.ref_dataset)
+    assert key != esm_cache_key(model)
+
+
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS[:1])
+def test_generate_esm_incrementally(db: Session, user_header: dict[str, str], example_dataset: str, monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that a model that differs from a cached model in one component only builds that component.
+    """
+    updated_components = []
+
+    def update_esm(esM: EnergySystemModel, esm_data: dict, *, component_hashes: dict[str, str], cached_component_hashes: dict[str, str]) -> None:
+        updated_components.extend(name for name, component_hash in component_hashes.items() if cached_component_hashes.get(name) != component_hash)
+        original_update_esm(esM, esm_data, component_hashes=component_hashes, cached_component_hashes=cached_component_hashes)
+
+    original_update_esm = fine_esm.update_esm
+    monkeypatch.setattr(fine_esm, "update_esm", update_esm)
+    esm_cache.clear()
+
+    model = get_example_model(db, user_header, example_dataset=example_dataset)
+    esM = fine_esm.generate_esm_from_model(db, model=model)
+    override_model = crud.energy_model.create(
+        db,
+        obj_in=EnergyModelCreate(
+            name=f"{example_dataset}-{random_string()}",
+            ref_dataset=model.ref_dataset,
+            override_parameters=[
+                EnergyModelOverrideCreate(
+                    component_name="Wind (onshore)",
+                    attribute=EnergyModelOverrideAttribute.investPerCapacity,
+                    operation=EnergyModelOverrideOperation.multiply,
+                    value=0.9,
+                )
+            ],
+        ),
+    )
+    override_esM = fine_esm.generate_esm_from_model(db, model=override_model)
+    assert updated_components == ["Wind (onshore)"]
+    assert set(override_esM.componentNames) == set(esM.componentNames)
+    assert override_esM.getComponent("Wind (onshore)").investPerCapacity == pytest.approx(esM.getComponent("Wind (onshore)").investPerCapacity * 0.9)
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from ensysmod.core.esm_validation import validate_esm_data
+from ensysmod.model import EnergyModelOverrideAttribute
+
+
+def new_esm_data(**sink_parameters) -> dict:
+    sink = {"name": "demand", "commodity": "electricity", "hasCapacityVariable": False}
+    sink.update(sink_parameters)
+    return {
+        "esm": {"locations": {"north", "south"}, "commodities": {"electricity"}, "numberOfTimeSteps": 4},
+        "sources": [],
+        "sinks": [sink],
+        "conversions": [{"name": "heat pump", "commodityConversionFactors": {"electricity": -1, "heat": 3}, "investPerCapacity": 1}],
+        "storages": [],
+        "transmissions": [
+            {
+                "name": "cable",
+                "commodity": "electricity",
+                "distances": pd.DataFrame([[0, 10], [10, 0]], index=["north", "south"], columns=["north", "south"], dtype=float),
+            }
+        ],
+    }
+
+
+def test_valid_esm_data():
+    """
+    Test that valid parameters have no errors.
+    """
+    esm_data = new_esm_data(operationRateFix=pd.DataFrame({"north": [1.0, 2, 3, 4], "south": [0.0, 0, 1, 1]}))
+    esm_data["conversions"] = []
+    assert validate_esm_data(esm_data, []) == []
+
+
+@pytest.mark.parametrize(
+    ("sink_parameters", "error"),
+    [
+        (
+            {"operationRateFix": pd.DataFrame({"north": [1.0, 2, 3]})},
+            "operationRateFix of component demand has 3 time steps, the dataset has 4.",
+        ),
+        (
+            {"operationRateFix": pd.DataFrame({"west": [1.0, 2, 3, 4]})},
+            "operationRateFix of component demand has values for the region west, which is not part of the dataset.",
+        ),
+        (
+            {"operationRateMax": pd.DataFrame({"north": [1.0, None, 3, 4]})},
+            "operationRateMax of component demand has missing or infinite values.",
+        ),
+        (
+            {"capacityMax": pd.Series({"north": -1.0})},
+            "capacityMax of component demand has negative values.",
+        ),
+        (
+            {"commodity": "gas"},
+            "Commodity gas of component demand is not part of the dataset.",
+        ),
+    ],
+)
+def test_invalid_component(sink_parameters: dict, error: str):
+    """
+    Test that invalid parameters of a component are reported.
+    """
+    esm_data = new_esm_data(**sink_parameters)
+    esm_data["conversions"] = []
+    assert validate_esm_data(esm_data, []) == [error]
+
+
+def test_all_errors_are_reported():
+    """
+    Test that the errors of all components and override parameters are reported at once.
+    """
+    esm_data = new_esm_data(commodity="gas", operationRateFix=pd.DataFrame({"north": [1.0, 2, 3, 4], "south": [0.0, 0, 1, 1]}))
+    esm_data["transmissions"][0]["distances"] = pd.DataFrame([[0.0]], index=["north"], columns=["north"])
+    override_parameters = [
+        SimpleNamespace(component=SimpleNamespace(name="demand"), attribute=EnergyModelOverrideAttribute.investPerCapacity, regions=None),
+        SimpleNamespace(component=SimpleNamespace(name="heat pump"), attribute=EnergyModelOverrideAttribute.investPerCapacity, regions=None),
+        SimpleNamespace(component=SimpleNamespace(name="demand"), attribute=EnergyModelOverrideAttribute.operationRateFix, regions=["north", "west"]),
+    ]
+
+    assert validate_esm_data(esm_data, override_parameters) == [
+        "Commodity gas of component demand is not part of the dataset.",
+        "Commodity heat of component heat pump is not part of the dataset.",
+        "distances of component cable has the shape (1, 1), expected a matrix of all 2 regions.",
+        "Parameter investPerCapacity is undefined for component demand.",
+        "Override parameter operationRateFix of component demand refers to the region west, which is not part of the dataset.",
+    ]
@@ -0,0 +1,119 @@
+import pandas as pd
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ensysmod import crud
+from ensysmod.core.fine_esm import PARAMETER_TABLES, apply_override, get_esm_data, get_parameter_dataframes
+from ensysmod.core.time_series_aggregation import time_series_cache_key
+from ensysmod.model import EnergyModelOverrideAttribute, EnergyModelOverrideOperation
+from ensysmod.schemas import EnergyModelCreate, EnergyModelOverrideCreate
+from tests.utils.data_generator.datasets import EXAMPLE_DATASETS, get_example_dataset
+from tests.utils.data_generator.energy_models import get_example_model
+from tests.utils.utils import random_string
+
+
+@pytest.mark.parametrize("example_dataset", EXAMPLE_DATASETS)
+def test_parameter_dataframes(db: Session, user_header: dict[str, str], example_dataset: str):
+    """
+    Test that the parameters of all components are read with one query per table and match the parameters of each component.
+    """
+    dataset = get_example_dataset(db, user_header, example_dataset=example_dataset)
+
+    statements = []
+
+    def listener(_connection, _cursor, statement: str, *_args) -> None:
+        statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        parameters = get_parameter_dataframes(db, dataset_id=dataset.id)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    # one query per table, matrix parameters additionally query the regions of the dataset
+    assert len(statements) <= 2 * len(PARAMETER_TABLES)
+    assert any(len(dataframes) > 0 for dataframes in parameters.values())
+    for parameter, crud_repo in PARAMETER_TABLES.items():
+        for component_id, dataframe in parameters[parameter].items():
+            pd.testing.assert_frame_equal(dataframe, crud_repo.get_dataframe(db, component_id=component_id))
+
+
+def test_apply_override_to_time_series():
+    """
+    Test that an override of a time series is applied to all time steps of the given regions without modifying the original.
+    """
+    operation_rate = pd.DataFrame({"north": [0.5, 1.0], "south": [0.2, 0.4]})
+    component = {"name": "PV", "operationRateMax": operation_rate}
+
+    apply_override(component, EnergyModelOverrideAttribute.operationRateMax, EnergyModelOverrideOperation.multiply, 0.5, regions=["south"])
+    pd.testing.assert_frame_equal(component["operationRateMax"], pd.DataFrame({"north": [0.5, 1.0], "south": [0.1, 0.2]}))
+    assert operation_rate["south"].tolist() == [0.2, 0.4]
+
+    apply_override(component, EnergyModelOverrideAttribute.operationRateMax, EnergyModelOverrideOperation.set, 0.3)
+    pd.testing.assert_frame_equal(component["operationRateMax"], pd.DataFrame({"north": [0.3, 0.3], "south": [0.3, 0.3]}))
+
+
+def test_apply_override_to_regional_parameter():
+    """
+    Test that an override of a parameter with a value per region is applied to the given regions.
+    """
+    component = {"name": "PV", "capacityMax": pd.Series({"north": 10, "south": 20}), "investPerCapacity": 1.0}
+
+    apply_override(component, EnergyModelOverrideAttribute.capacityMax, EnergyModelOverrideOperation.add, 5, regions=["north"])
+    pd.testing.assert_series_equal(component["capacityMax"], pd.Series({"north": 15.0, "south": 20.0}))
+
+    with pytest.raises(ValueError, match="has no values for the regions"):
+        apply_override(component, EnergyModelOverrideAttribute.capacityMax, EnergyModelOverrideOperation.add, 5, regions=["west"])
+    with pytest.raises(ValueError, match="has no regional values"):
+        apply_override(component, EnergyModelOverrideAttribute.investPerCapacity, EnergyModelOverrideOperation.add, 5, regions=["north"])
+
+
+def test_time_series_cache_key():
+    """
+    Test that only overrides of time series change the key of the time series in the aggregation cache.
+    """
+    invest_override = ("PV", EnergyModelOverrideAttribute.investPerCapacity, EnergyModelOverrideOperation.multiply, 0.5, None)
+    time_series_override = ("PV", EnergyModelOverrideAttribute.operationRateMax, EnergyModelOverrideOperation.multiply, 0.5, ("north",))
+
+    assert time_series_cache_key("fingerprint", [invest_override]) == "fingerprint"
+    assert time_series_cache_key("fingerprint", [invest_override, time_series_override]) not in (None, "fingerprint")
+    assert time_series_cache_key(None, [time_series_override]) is None
+
+
+def test_override_time_series_of_model(db: Session, user_header: dict[str, str]):
+    """
+    Test that the override parameters of a model are applied to the time series of the given regions in the order of their creation.
+    """
+    model = get_example_model(db, user_header, example_dataset="Multi-regional_Example")
+    original_data = get_esm_data(db, model=model)
+    source = next(source for source in original_data["sources"] if isinstance(source.get("operationRateMax"), pd.DataFrame))
+    region = source["operationRateMax"].columns[0]
+
+    override_model = crud.energy_model.create(
+        db,
+        obj_in=EnergyModelCreate(
+            name=f"Override time series {random_string()}",
+            ref_dataset=model.ref_dataset,
+            override_parameters=[
+                EnergyModelOverrideCreate(
+                    component_name=source["name"],
+                    attribute=EnergyModelOverrideAttribute.operationRateMax,
+                    operation=EnergyModelOverrideOperation.multiply,
+                    value=0.5,
+                    regions=[region],
+                ),
+                EnergyModelOverrideCreate(
+                    component_name=source["name"],
+                    attribute=EnergyModelOverrideAttribute.operationRateMax,
+                    operation=EnergyModelOverrideOperation.add,
+                    value=0.1,
+                ),
+            ],
+        ),
+    )
+    overridden_source = next(other for other in get_esm_data(db, model=override_model)["sources"] if other["name"] == source["name"])
+
+    expected_operation_rate = source["operationRateMax"] + 0.1
+    expected_operation_rate[region] = source["operationRateMax"][region] * 0.5 + 0.1
+    pd.testing.assert_frame_equal(overridden_source["operationRateMax"], expected_operation_rate)
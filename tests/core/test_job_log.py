@@ -0,0 +1,43 @@
+import logging
+from pathlib import Path
+
+from ensysmod.core.job_log import job_logged, read_log_lines, server_sent_event
+
+
+def test_job_logged(tmp_path: Path):
+    """
+    Test that the output and the log messages inside the context are written to the log file.
+    """
+    log_file_path = tmp_path / "job.log"
+    with job_logged(log_file_path):
+        print("Solver output")  # noqa: T201
+        logging.getLogger("ensysmod.test").info("Log message")
+    print("Output after the job")  # noqa: T201
+
+    lines = [line for line, _ in read_log_lines(log_file_path, 0)]
+    assert lines[0] == "Solver output"
+    assert lines[1].endswith("INFO ensysmod.test: Log message")
+    assert len(lines) == 2
+
+
+def test_read_log_lines(tmp_path: Path):
+    """
+    Test that only complete lines are read and that reading continues at the returned position.
+    """
+    log_file_path = tmp_path / "job.log"
+    log_file_path.write_bytes(b"first\nsecond\r\nincomplete")
+    assert read_log_lines(log_file_path, 0) == [("first", 6), ("second", 14)]
+    assert read_log_lines(log_file_path, 14) == []
+
+    with log_file_path.open("ab") as log_file:
+        log_file.write(b" line\n")
+    assert read_log_lines(log_file_path, 14) == [("incomplete line", 30)]
+    assert read_log_lines(tmp_path / "missing.log", 0) == []
+
+
+def test_server_sent_event():
+    """
+    Test the format of server-sent events.
+    """
+    assert server_sent_event("status", "RUNNING") == "event: status\ndata: RUNNING\n\n"
+    assert server_sent_event("log", "line", event_id=5) == "event: log\ndata: line\nid: 5\n\n"
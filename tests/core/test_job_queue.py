@@ -0,0 +1,183 @@
+import subprocess
+import sys
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from ensysmod import crud
+from ensysmod.core import optimization_jobs, settings, watchdog
+from ensysmod.core.job_queue import run_next_job
+from ensysmod.core.optimization_jobs import cancel_job
+from ensysmod.core.watchdog import check_stopped
+from ensysmod.model import OptimizationJob, OptimizationJobStatus, OptimizationJobType
+from ensysmod.schemas import OptimizationJobCreate
+from tests.utils.data_generator.energy_models import new_energy_model
+from tests.utils.utils import get_current_user_from_header
+
+
+@pytest.fixture(autouse=True)
+def _empty_queue(db: Session):
+    """
+    Cancel the pending jobs of other tests, so that the tests claim their own jobs.
+    """
+    for job in crud.optimization_job.get_multi_unfinished(db):
+        if job.status == OptimizationJobStatus.PENDING:
+            cancel_job(db, job)
+
+
+def new_job(db: Session, user_header: dict[str, str]) -> OptimizationJob:
+    """
+    Create a pending optimization job of a new energy model, whose optimization fails.
+    """
+    model = new_energy_model(db, user_header)
+    user = get_current_user_from_header(db, user_header)
+    return crud.optimization_job.create(db, obj_in={"ref_model": model.id, "ref_user": user.id, "type": OptimizationJobType.OPTIMIZE})
+
+
+def expire_lease(db: Session, job: OptimizationJob) -> None:
+    crud.optimization_job.update(db, db_obj=job, obj_in={"lease_expires_at": datetime.now(tz=UTC) - timedelta(seconds=1)})
+
+
+def test_claim_next(db: Session, user_header: dict[str, str]):
+    """
+    Test that a pending job is claimed by exactly one worker.
+    """
+    job = new_job(db, user_header)
+    claimed = crud.optimization_job.claim_next(db, worker="worker-a", lease_seconds=60, max_attempts=3)
+    assert claimed is not None
+    assert claimed.id == job.id
+    assert claimed.status == OptimizationJobStatus.RUNNING
+    assert claimed.worker == "worker-a"
+    assert claimed.attempts == 1
+    assert claimed.lease_expires_at is not None
+
+    assert crud.optimization_job.claim_next(db, worker="worker-b", lease_seconds=60, max_attempts=3) is None
+
+
+def test_claim_expired_lease(db: Session, user_header: dict[str, str]):
+    """
+    Test that the job of a worker that stopped responding is claimed by another worker.
+    """
+    job = new_job(db, user_header)
+    crud.optimization_job.claim_next(db, worker="worker-a", lease_seconds=60, max_attempts=3)
+    expire_lease(db, job)
+
+    claimed = crud.optimization_job.claim_next(db, worker="worker-b", lease_seconds=60, max_attempts=3)
+    assert claimed is not None
+    assert claimed.id == job.id
+    assert claimed.worker == "worker-b"
+    assert claimed.attempts == 2
+
+
+def test_fail_expired(db: Session, user_header: dict[str, str]):
+    """
+    Test that a job fails after its workers stopped responding the maximum number of times.
+    """
+    job = new_job(db, user_header)
+    crud.optimization_job.claim_next(db, worker="worker-a", lease_seconds=60, max_attempts=1)
+    expire_lease(db, job)
+
+    assert crud.optimization_job.fail_expired(db, max_attempts=1) == [job.id]
+    db.refresh(job)
+    assert job.status == OptimizationJobStatus.FAILED
+    assert job.error == "The workers of the job stopped responding 1 times."
+    assert crud.optimization_job.claim_next(db, worker="worker-b", lease_seconds=60, max_attempts=1) is None
+
+
+def test_renew_lease(db: Session, user_header: dict[str, str]):
+    """
+    Test that only the worker that claimed a job renews its lease.
+    """
+    job = new_job(db, user_header)
+    crud.optimization_job.claim_next(db, worker="worker-a", lease_seconds=60, max_attempts=3)
+    assert crud.optimization_job.renew_lease(db, id=job.id, worker="worker-a", lease_seconds=60)
+    assert not crud.optimization_job.renew_lease(db, id=job.id, worker="worker-b", lease_seconds=60)
+    assert crud.optimization_job.holds_lease(db, id=job.id, worker="worker-a")
+    assert not crud.optimization_job.holds_lease(db, id=job.id, worker="worker-b")
+
+
+def test_cancelled_job_is_not_claimed(db: Session, user_header: dict[str, str]):
+    """
+    Test that a job that was cancelled before a worker claimed it is never run.
+    """
+    job = new_job(db, user_header)
+    cancel_job(db, job)
+    assert crud.optimization_job.claim_next(db, worker="worker-a", lease_seconds=60, max_attempts=3) is None
+
+
+def test_run_next_job(db: Session, user_header: dict[str, str]):
+    """
+    Test that a worker runs the next job and stores its result.
+    """
+    job = new_job(db, user_header)
+    assert run_next_job("worker-a")
+    db.refresh(job)
+    assert job.status == OptimizationJobStatus.FAILED
+    assert job.worker == "worker-a"
+    assert job.error is not None
+
+    assert not run_next_job("worker-a")
+
+
+def test_lost_lease(db: Session, user_header: dict[str, str], monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that a worker that lost the lease of its job kills the solver and leaves the job to the worker that claimed it.
+    """
+    monkeypatch.setattr(settings, "WORKER_LEASE_SECONDS", 1)
+    monkeypatch.setattr(watchdog, "CHECK_INTERVAL", 0.05)
+    job = new_job(db, user_header)
+    solvers = []
+
+    def execute_job(db: Session, job: OptimizationJob, *, worker: str):
+        # another worker claims the job, e.g. because this worker couldn't renew the lease in time
+        crud.optimization_job.update(db, db_obj=job, obj_in={"worker": "worker-b"})
+        solvers.append(subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"]))
+        solvers[0].wait(timeout=10)
+        check_stopped()
+
+    monkeypatch.setattr(optimization_jobs, "execute_job", execute_job)
+    assert run_next_job("worker-a")
+    assert solvers[0].returncode != 0
+    db.refresh(job)
+    assert job.status == OptimizationJobStatus.RUNNING
+    assert job.worker == "worker-b"
+    assert job.error is None
+
+
+def test_lost_lease_discards_result(db: Session, user_header: dict[str, str], monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    Test that a worker that lost the lease of its job doesn't finish the job that another worker claimed.
+    """
+    job = new_job(db, user_header)
+    result_file_path = tmp_path / "result.zip"
+    result_file_path.touch()
+
+    def execute_job(db: Session, job: OptimizationJob, *, worker: str):
+        crud.optimization_job.update(db, db_obj=job, obj_in={"worker": "worker-b"})
+        return result_file_path, None
+
+    monkeypatch.setattr(optimization_jobs, "execute_job", execute_job)
+    assert run_next_job("worker-a")
+    db.refresh(job)
+    assert job.status == OptimizationJobStatus.RUNNING
+    assert job.result_file is None
+    assert not result_file_path.exists()
+
+
+def test_submit_job_to_external_workers(client: TestClient, db: Session, user_header: dict[str, str], monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that the API leaves submitted jobs to the dedicated workers.
+    """
+    monkeypatch.setattr(settings, "OPTIMIZATION_EXTERNAL_WORKERS", True)
+    model = new_energy_model(db, user_header)
+    create_request = OptimizationJobCreate(ref_model=model.id)
+    job_id = client.post("/jobs/", headers=user_header, content=create_request.model_dump_json()).json()["id"]
+    assert client.get(f"/jobs/{job_id}", headers=user_header).json()["status"] == "PENDING"
+
+    assert run_next_job("worker-a")
+    job = client.get(f"/jobs/{job_id}", headers=user_header).json()
+    assert job["status"] == "FAILED"
+    assert job["worker"] == "worker-a"
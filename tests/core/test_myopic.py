@@ -0,0 +1,174 @@
+from pathlib import Path
+from zipfile import ZipFile
+
+import pandas as pd
+import pytest
+from fine import EnergySystemModel
+
+from ensysmod.core import myopic
+from ensysmod.core.fine_esm import build_esm
+from ensysmod.core.myopic import CHECKPOINT_FILE_NAME, get_completed_years, get_years, get_zipped_years, myopic_optimize_esm, update_stock
+from ensysmod.model import ClusterMethod
+from ensysmod.schemas import EnergyModelAggregationCreate, EnergyModelOptimizationCreate
+
+DEMAND = [1.0, 1.0, 3.0, 3.0, 1.0, 1.0, 3.0, 3.0, 1.0, 1.0, 3.0, 3.0]
+
+OPTIMIZATION_PARAMETERS = EnergyModelOptimizationCreate(start_year=2020, end_year=2040, years_per_step=10)
+
+AGGREGATION_PARAMETERS = EnergyModelAggregationCreate(
+    number_of_typical_periods=2,
+    hours_per_period=4,
+    segmentation=False,
+    number_of_segments_per_period=1,
+    cluster_method=ClusterMethod.hierarchical,
+)
+
+
+def new_esm() -> EnergySystemModel:
+    """
+    Return an ESM with a fluctuating demand and a plant whose capacity lasts for more than one step.
+    """
+    return build_esm(
+        {
+            "esm": {
+                "locations": {"north"},
+                "commodities": {"electricity"},
+                "commodityUnitsDict": {"electricity": "GW_el"},
+                "numberOfTimeSteps": len(DEMAND),
+                "hoursPerTimeStep": 1,
+                "costUnit": "1e9 Euro",
+                "lengthUnit": "km",
+            },
+            "sources": [
+                {
+                    "name": "plant",
+                    "commodity": "electricity",
+                    "hasCapacityVariable": True,
+                    "investPerCapacity": 1.0,
+                    "opexPerOperation": 0.01,
+                    "technicalLifetime": 30,
+                }
+            ],
+            "sinks": [
+                {
+                    "name": "demand",
+                    "commodity": "electricity",
+                    "hasCapacityVariable": False,
+                    "operationRateFix": pd.DataFrame({"north": DEMAND}),
+                }
+            ],
+            "conversions": [],
+            "storages": [],
+            "transmissions": [],
+        }
+    )
+
+
+def optimize(checkpoint_dir: Path, checkpoint_key: str = "model") -> Path:
+    return myopic_optimize_esm(
+        new_esm(),
+        OPTIMIZATION_PARAMETERS,
+        aggregation_parameters=AGGREGATION_PARAMETERS,
+        checkpoint_dir=checkpoint_dir,
+        checkpoint_key=checkpoint_key,
+    )
+
+
+def fail_in_year(monkeypatch: pytest.MonkeyPatch, failing_year: int) -> None:
+    """
+    Let the optimization fail after the years before the failing year are completed.
+    """
+    write_year_tables = myopic.write_year_tables
+
+    def write_year_tables_until_failure(checkpoint_dir: Path, year: int, tables: dict[str, pd.DataFrame]) -> None:
+        if year == failing_year:
+            raise RuntimeError("Solver crashed.")
+        write_year_tables(checkpoint_dir, year, tables)
+
+    monkeypatch.setattr(myopic, "write_year_tables", write_year_tables_until_failure)
+
+
+def record_years(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """
+    Record the years that are optimized.
+    """
+    years = []
+    write_year_tables = myopic.write_year_tables
+
+    def write_and_record_year_tables(checkpoint_dir: Path, year: int, tables: dict[str, pd.DataFrame]) -> None:
+        years.append(year)
+        write_year_tables(checkpoint_dir, year, tables)
+
+    monkeypatch.setattr(myopic, "write_year_tables", write_and_record_year_tables)
+    return years
+
+
+def test_get_years():
+    """
+    Test that the years are derived from any two of the end year, the number of steps and the years per step.
+    """
+    assert get_years(EnergyModelOptimizationCreate(start_year=2020, end_year=2050, years_per_step=10)) == ([2020, 2030, 2040, 2050], 10)
+    assert get_years(EnergyModelOptimizationCreate(start_year=2020, end_year=2050, number_of_steps=3)) == ([2020, 2030, 2040, 2050], 10)
+    assert get_years(EnergyModelOptimizationCreate(start_year=2020, number_of_steps=2, years_per_step=5)) == ([2020, 2025, 2030], 5)
+
+
+@pytest.mark.require_solver()
+def test_myopic_optimize_esm(tmp_path: Path):
+    """
+    Test that the result tables of each year are zipped and that the capacity of the first year is the stock of the later years.
+    """
+    result_file_path = optimize(tmp_path)
+
+    assert get_zipped_years(result_file_path) == [2020, 2030, 2040]
+    assert get_completed_years(tmp_path) == [2020, 2030, 2040]
+    with ZipFile(result_file_path) as zip_file, zip_file.open("2030/SourceSinkOptSummary_1dim.csv") as summary_file:
+        summary = pd.read_csv(summary_file, index_col=[0, 1, 2])
+    assert summary.loc[("plant_stock_2020", "capacity")].iloc[0, 0] == pytest.approx(3.0)
+
+
+def test_update_stock():
+    """
+    Test that the installed capacities are a stock component until the technical lifetime of the component ends.
+    """
+    esM = new_esm()
+    capacities = {2020: {"plant": pd.Series({"north": 3.0})}}
+
+    update_stock(esM, capacities, 2040)
+    assert "plant_stock_2020" in esM.componentNames
+    assert esM.getComponent("plant_stock_2020").processedCapacityFix[0]["north"] == pytest.approx(3.0)
+
+    update_stock(esM, capacities, 2050)
+    assert "plant_stock_2020" not in esM.componentNames
+
+
+@pytest.mark.require_solver()
+def test_resume_myopic_optimization(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that a failed optimization keeps the completed years and resumes after them.
+    """
+    with monkeypatch.context() as failing_monkeypatch:
+        fail_in_year(failing_monkeypatch, 2030)
+        with pytest.raises(RuntimeError, match="Solver crashed"):
+            optimize(tmp_path)
+    assert get_completed_years(tmp_path) == [2020]
+    assert (tmp_path / CHECKPOINT_FILE_NAME).is_file()
+
+    optimized_years = record_years(monkeypatch)
+    result_file_path = optimize(tmp_path)
+    assert optimized_years == [2030, 2040]
+    assert get_zipped_years(result_file_path) == [2020, 2030, 2040]
+
+
+@pytest.mark.require_solver()
+def test_discard_checkpoint_of_other_model(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that the optimization starts over if the model was changed since the checkpoint.
+    """
+    with monkeypatch.context() as failing_monkeypatch:
+        fail_in_year(failing_monkeypatch, 2030)
+        with pytest.raises(RuntimeError, match="Solver crashed"):
+            optimize(tmp_path)
+
+    optimized_years = record_years(monkeypatch)
+    optimize(tmp_path, checkpoint_key="changed model")
+    assert optimized_years == [2020, 2030, 2040]
@@ -0,0 +1,135 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pyomo.environ as pyo
+import pytest
+from sqlalchemy.orm import Session
+
+from ensysmod.core.fine_esm import build_esm, get_aggregation_kwargs, get_esm_data
+from ensysmod.core.problem_size import (
+    check_problem_size,
+    estimate_problem_size,
+    get_aggregated_time_steps,
+    get_problem_shape,
+    query_problem_shape,
+)
+from ensysmod.schemas import EnergyModelAggregationCreate
+from tests.utils.data_generator.energy_models import get_example_model
+
+
+def new_esm_data() -> dict:
+    return {
+        "esm": {"locations": {"north", "south", "west"}, "commodities": {"electricity"}, "numberOfTimeSteps": 48, "hoursPerTimeStep": 1},
+        "sources": [
+            {
+                "name": "wind",
+                "hasCapacityVariable": True,
+                "capacityVariableDomain": "discrete",
+                "operationRateMax": pd.DataFrame({"north": [0.5] * 48, "south": [0.0] * 48}),
+            }
+        ],
+        "sinks": [{"name": "demand", "hasCapacityVariable": False}],
+        "conversions": [],
+        "storages": [{"name": "battery", "hasCapacityVariable": True, "capacityVariableDomain": "continuous"}],
+        "transmissions": [
+            {
+                "name": "cable",
+                "hasCapacityVariable": True,
+                "capacityVariableDomain": "continuous",
+                "distances": pd.DataFrame([[0, 10, 0], [10, 0, 0], [0, 0, 0]], index=["north", "south", "west"], columns=["north", "south", "west"]),
+            }
+        ],
+    }
+
+
+def test_estimate_problem_size():
+    """
+    Test the size of a small problem: wind is only located in the north, the cable only connects north and south.
+    """
+    aggregation_parameters = EnergyModelAggregationCreate(
+        number_of_typical_periods=2, hours_per_period=24, segmentation=True, number_of_segments_per_period=4
+    )
+    problem_size = estimate_problem_size(get_problem_shape(new_esm_data()), aggregation_parameters)
+    time_steps = 2 * 4
+    assert problem_size["regions"] == 3
+    assert problem_size["components"] == 4
+    assert problem_size["transmission_connections"] == 2
+    assert problem_size["time_steps"] == time_steps
+    assert problem_size["integer_variables"] == 1
+    wind_variables = 4 + time_steps
+    demand_variables = 3 * time_steps
+    battery_variables = 3 * (4 + 3 * time_steps + 2 + 1)
+    cable_variables = 2 * (4 + time_steps)
+    assert problem_size["variables"] == wind_variables + demand_variables + battery_variables + cable_variables
+
+    # myopic optimizations aren't segmented
+    assert estimate_problem_size(get_problem_shape(new_esm_data()), aggregation_parameters, segmentation=False)["time_steps"] == 2 * 24
+
+
+def test_aggregated_problem_shape():
+    """
+    Test that the components of aggregated regions are located in at most all aggregated regions.
+    """
+    shape = get_problem_shape(new_esm_data(), number_of_regions=2)
+    assert shape.regions == 2
+    assert [component.locations for component in shape.components] == [1, 2, 2, 2]
+
+
+def test_check_problem_size(monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that problems that exceed the limits of the server are refused.
+    """
+    problem_size = estimate_problem_size(get_problem_shape(new_esm_data()), None)
+    check_problem_size(problem_size)
+
+    monkeypatch.setattr("ensysmod.core.problem_size.settings.MAX_PROBLEM_MEMORY_MB", problem_size["memory_mb"] * 1.5)
+    check_problem_size(problem_size)
+    with pytest.raises(ValueError, match="MB of memory"):
+        check_problem_size(problem_size, parallel_problems=2)
+
+    monkeypatch.setattr("ensysmod.core.problem_size.settings.MAX_PROBLEM_VARIABLES", problem_size["variables"] - 1)
+    with pytest.raises(ValueError, match="variables"):
+        check_problem_size(problem_size)
+
+
+def test_segments_limited_to_time_steps():
+    """
+    Test that a period isn't clustered into more segments than it has time steps, like in the estimate of the problem size.
+    """
+    aggregation_parameters = EnergyModelAggregationCreate(
+        number_of_typical_periods=2, hours_per_period=24, segmentation=True, number_of_segments_per_period=20
+    )
+    shape = get_problem_shape(new_esm_data())._replace(hours_per_time_step=2)
+
+    kwargs = get_aggregation_kwargs(SimpleNamespace(hoursPerTimeStep=2), aggregation_parameters)
+    assert kwargs["numberOfTimeStepsPerPeriod"] == 12
+    assert kwargs["numberOfSegmentsPerPeriod"] == 12
+    assert get_aggregated_time_steps(shape, aggregation_parameters, segmentation=True)[0] == 2 * 12
+
+
+def test_estimate_matches_declared_problem(db: Session, user_header: dict[str, str]):
+    """
+    Test that the estimate is close to the size of the optimization problem that FINE declares.
+    """
+    model = get_example_model(db, user_header, example_dataset="1node_Example")
+    esm_data = get_esm_data(db, model=model)
+    problem_size = estimate_problem_size(get_problem_shape(esm_data), None)
+
+    esM = build_esm(esm_data)
+    esM.aggregateTemporally(**get_aggregation_kwargs(esM, None))
+    esM.declareOptimizationProblem(timeSeriesAggregation=True)
+    # FINE declares binary operation variables that are only used by components with a minimal part load
+    variables = sum(1 for variable in esM.pyM.component_data_objects(pyo.Var, active=True) if variable.is_continuous())
+    constraints = sum(1 for _ in esM.pyM.component_data_objects(pyo.Constraint, active=True))
+    assert 0.5 * variables <= problem_size["variables"] <= 2 * variables
+    assert 0.5 * constraints <= problem_size["constraints"] <= 2 * constraints
+
+
+def test_query_problem_shape(db: Session, user_header: dict[str, str]):
+    """
+    Test that the shape counted by the database equals the shape of the parameters of the ESM.
+    """
+    model = get_example_model(db, user_header, example_dataset="1node_Example")
+    queried_shape = query_problem_shape(db, model)
+    shape = get_problem_shape(get_esm_data(db, model=model))
+    assert queried_shape._replace(components=sorted(queried_shape.components)) == shape._replace(components=sorted(shape.components))
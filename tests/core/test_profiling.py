@@ -0,0 +1,44 @@
+import time
+
+from ensysmod.core.profiling import phase, profiled, server_timing
+
+
+def test_phases_are_measured():
+    """
+    Test that the wall time, CPU time and peak RSS of each phase are measured in the order of execution.
+    """
+    with profiled() as phases:
+        with phase("sleep"):
+            time.sleep(0.2)
+        with phase("allocate"):
+            data = b"x" * (100 * 1024 * 1024)
+            time.sleep(0.3)  # the RSS is sampled periodically
+            del data
+
+    assert [measured_phase["phase"] for measured_phase in phases] == ["sleep", "allocate"]
+    sleep_phase, allocate_phase = phases
+    assert sleep_phase["wall_time"] >= 0.2
+    assert sleep_phase["cpu_time"] < sleep_phase["wall_time"]
+    assert allocate_phase["peak_rss"] >= sleep_phase["peak_rss"] + 90 * 1024 * 1024
+
+
+def test_phases_outside_of_profiled_context():
+    """
+    Test that phases are only measured inside a profiled context.
+    """
+    with phase("unmeasured"):
+        pass
+    with profiled() as phases:
+        pass
+    assert phases == []
+
+
+def test_server_timing():
+    """
+    Test the Server-Timing header of measured phases.
+    """
+    phases = [
+        {"phase": "build_esm", "wall_time": 1.5, "cpu_time": 1.2, "peak_rss": 1024},
+        {"phase": "solve", "wall_time": 0.01234, "cpu_time": 0.01, "peak_rss": 2048},
+    ]
+    assert server_timing(phases) == "build_esm;dur=1500.0, solve;dur=12.3"
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.orm import Session
+
+from ensysmod.core.myopic import stock_component_name, stock_origin
+from ensysmod.core.result_comparison import compare_rows, compare_values, get_commodity_factors
+from tests.utils.data_generator.energy_models import get_example_model
+
+
+def test_compare_values():
+    """
+    Test the differences to the first result and the statistics of each row.
+    """
+    [compared] = compare_values(np.array([[1.0, 3.0, 2.0]]))
+    assert compared["values"] == [1.0, 3.0, 2.0]
+    assert compared["differences"] == [0.0, 2.0, 1.0]
+    assert compared["min"] == 1.0
+    assert compared["max"] == 3.0
+    assert compared["mean"] == pytest.approx(2.0)
+    assert compared["std"] == pytest.approx(np.std([1.0, 3.0, 2.0]))
+
+
+def test_compare_rows():
+    """
+    Test that each row is returned with its keys, a missing key as None.
+    """
+    index = pd.MultiIndex.from_tuples([("cable", "north", "south"), ("plant", "north", np.nan)], names=["component", "region", "region_to"])
+    matrix = pd.DataFrame([[1.0, 2.0], [3.0, 3.0]], index=index, columns=[1, 2])
+
+    cable, plant = compare_rows(matrix)
+    assert cable["component"] == "cable"
+    assert cable["region_to"] == "south"
+    assert cable["differences"] == [0.0, 1.0]
+    assert plant["region_to"] is None
+    assert plant["std"] == 0.0
+
+
+def test_stock_origin():
+    """
+    Test that a stock component of a myopic optimization is attributed to its component.
+    """
+    assert stock_origin(stock_component_name("PV", 2020)) == "PV"
+    assert stock_origin("PV") == "PV"
+
+
+def test_get_commodity_factors(db: Session, user_header: dict[str, str]):
+    """
+    Test the commodities that the components of a dataset produce and consume.
+    """
+    dataset = get_example_model(db, user_header, example_dataset="Multi-regional_Example").dataset
+    factors = get_commodity_factors(dataset)
+
+    assert factors[("Wind Onshore", "operation")] == [("Elektrizität", 1.0)]
+    assert factors[("Elektrizität-Verbrauch", "operation")] == [("Elektrizität", -1.0)]
+    assert sorted(factors[("Elektrolyseure", "operation")]) == [("Elektrizität", -1.0), ("Wasserstoff", 0.7)]
+    assert factors[("Li-ion Batterien", "chargeOperation")] == [("Elektrizität", -1.0)]
+    assert factors[("Li-ion Batterien", "dischargeOperation")] == [("Elektrizität", 1.0)]
+    assert factors[("AC Leitungen", "operation")] == [("Elektrizität", -1.0)]
@@ -0,0 +1,109 @@
+import threading
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from ensysmod import crud
+from ensysmod.core.optimization_jobs import remove_job
+from ensysmod.core.result_store import get_capacity_rows, get_operation_rows, share_stored_results
+from ensysmod.core.result_tables import get_result_tables
+from ensysmod.database.session import BackgroundSessionLocal, SessionLocal
+from ensysmod.model import OptimizationJobStatus, OptimizationResult, OptimizationResultCapacity, OptimizationResultOperation
+from ensysmod.schemas import OptimizationResultCreate
+from tests.core.test_job_queue import new_job
+from tests.core.test_result_tables import DEMAND, new_optimized_esm
+
+
+@pytest.mark.require_solver()
+def test_get_result_rows():
+    """
+    Test that the result tables are converted to a row of each variable of each component in each region.
+    """
+    tables = get_result_tables(new_optimized_esm())
+
+    capacities = {(row["component"], row["region"], row["region_to"], row["variable"]): row["value"] for row in get_capacity_rows(tables)}
+    assert capacities[("plant", "north", None, "capacity")] == pytest.approx(3.0)
+    assert capacities[("cable", "north", "south", "capacity")] == pytest.approx(3.0)
+    assert ("cable", "north", "north", "capacity") not in capacities
+
+    operations = {(row["component"], row["region"], row["region_to"], row["variable"]): row["values"] for row in get_operation_rows(tables)}
+    assert operations[("demand", "south", None, "operation")] == pytest.approx(DEMAND)
+    assert operations[("cable", "north", "south", "operation")] == pytest.approx(DEMAND)
+
+
+def test_share_stored_results(db: Session, user_header: dict[str, str]):
+    """
+    Test that jobs whose result is cached share the stored values, which are kept when the job that computed them is deleted.
+    """
+    job, cached_job, other_cached_job = (new_job(db, user_header) for _ in range(3))
+    result = crud.optimization_result.create_with_values(
+        db,
+        obj_in=OptimizationResultCreate(ref_job=job.id, ref_model=job.ref_model, objective_value=1.0, cache_key="shared"),
+        capacities=[{"component": "PV", "region": "north", "region_to": None, "variable": "capacity", "value": 2.0}],
+        operations=[{"component": "PV", "region": "north", "region_to": None, "variable": "operation", "values": [1.0, 2.0]}],
+    )
+    crud.optimization_job.update(db, db_obj=job, obj_in={"status": OptimizationJobStatus.FINISHED})
+    assert share_stored_results(db, cached_job, "shared") == 1
+    assert share_stored_results(db, other_cached_job, "shared") == 1
+
+    [cached_result] = crud.optimization_result.get_multi_by_job(db, job_id=cached_job.id)
+    [other_cached_result] = crud.optimization_result.get_multi_by_job(db, job_id=other_cached_job.id)
+    assert cached_result.ref_source_result == result.id
+    assert cached_result.objective_value == 1.0
+    result_ids = [result.id, cached_result.id, other_cached_result.id]
+    count = select(func.count()).select_from(OptimizationResultCapacity).where(OptimizationResultCapacity.ref_result.in_(result_ids))
+    assert db.execute(count).scalar_one() == 1
+    [capacity] = crud.optimization_result.get_capacities(db, result_ids=[cached_result.id])
+    assert capacity.ref_result == cached_result.id
+    assert capacity.value == 2.0
+
+    # the oldest result that shares the values stores them
+    remove_job(db, job)
+    db.refresh(cached_result)
+    db.refresh(other_cached_result)
+    assert cached_result.ref_source_result is None
+    assert other_cached_result.ref_source_result == cached_result.id
+    [operation] = crud.optimization_result.get_operations(db, result_ids=[other_cached_result.id])
+    assert operation.ref_result == other_cached_result.id
+    assert operation.values == [1.0, 2.0]
+
+    crud.energy_model.remove(db, id=cached_job.ref_model)
+    db.refresh(other_cached_result)
+    assert other_cached_result.ref_source_result is None
+    [capacity] = crud.optimization_result.get_capacities(db, result_ids=[other_cached_result.id])
+    assert capacity.value == 2.0
+
+
+def test_store_values_while_other_sessions_close(user_header: dict[str, str]):
+    """
+    Test that sessions of other threads, e.g. of the watchdog and the heartbeat, don't roll back a part of the stored values.
+    """
+
+    def use_other_sessions(*_) -> None:
+        def select_and_close() -> None:
+            for session_factory in (SessionLocal, BackgroundSessionLocal):
+                with session_factory() as other_db:
+                    other_db.execute(select(1))
+
+        thread = threading.Thread(target=select_and_close)
+        thread.start()
+        thread.join()
+
+    with SessionLocal() as db:
+        job = new_job(db, user_header)
+        # the result is flushed, but not committed, before its values are inserted
+        event.listen(db, "after_flush", use_other_sessions)
+        result = crud.optimization_result.create_with_values(
+            db,
+            obj_in=OptimizationResultCreate(ref_job=job.id, ref_model=job.ref_model, objective_value=1.0, cache_key="concurrent"),
+            capacities=[{"component": "PV", "region": "north", "region_to": None, "variable": "capacity", "value": 2.0}],
+            operations=[{"component": "PV", "region": "north", "region_to": None, "variable": "operation", "values": [1.0, 2.0]}],
+        )
+        event.remove(db, "after_flush", use_other_sessions)
+
+    with SessionLocal() as db:
+        assert db.get(OptimizationResult, result.id) is not None
+        for table in (OptimizationResultCapacity, OptimizationResultOperation):
+            count = select(func.count()).select_from(table).where(table.ref_result == result.id)
+            assert db.execute(count).scalar_one() == 1
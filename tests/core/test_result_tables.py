@@ -0,0 +1,121 @@
+from pathlib import Path
+from zipfile import ZipFile
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from fine import EnergySystemModel, writeOptimizationOutputToExcel
+
+from ensysmod.core.fine_esm import build_esm
+from ensysmod.core.result_tables import get_result_tables, write_csv_tables, write_result_file
+from ensysmod.core.solver import configured_solver
+from ensysmod.model import OptimizationResultFormat
+
+DEMAND = [1.0, 1.0, 3.0, 3.0]
+
+
+def new_optimized_esm() -> EnergySystemModel:
+    """
+    Return an optimized ESM with a plant in the north that supplies the demand in the south through a cable.
+    """
+    esM = build_esm(
+        {
+            "esm": {
+                "locations": {"north", "south"},
+                "commodities": {"electricity"},
+                "commodityUnitsDict": {"electricity": "GW_el"},
+                "numberOfTimeSteps": len(DEMAND),
+                "hoursPerTimeStep": 1,
+                "costUnit": "1e9 Euro",
+                "lengthUnit": "km",
+            },
+            "sources": [
+                {
+                    "name": "plant",
+                    "commodity": "electricity",
+                    "hasCapacityVariable": True,
+                    "capacityMax": pd.Series({"north": 10.0, "south": 0.0}),
+                    "investPerCapacity": 1.0,
+                    "opexPerOperation": 0.01,
+                }
+            ],
+            "sinks": [
+                {
+                    "name": "demand",
+                    "commodity": "electricity",
+                    "hasCapacityVariable": False,
+                    "operationRateFix": pd.DataFrame({"north": [0.0] * len(DEMAND), "south": DEMAND}),
+                }
+            ],
+            "conversions": [],
+            "storages": [],
+            "transmissions": [{"name": "cable", "commodity": "electricity", "hasCapacityVariable": True, "investPerCapacity": 0.1}],
+        }
+    )
+    with configured_solver(None) as solver_kwargs:
+        esM.optimize(timeSeriesAggregation=False, **solver_kwargs)
+    return esM
+
+
+@pytest.mark.require_solver()
+def test_get_result_tables(tmp_path: Path):
+    """
+    Test that the result tables are the sheets of the Excel file that FINE writes.
+    """
+    esM = new_optimized_esm()
+    tables = get_result_tables(esM)
+
+    writeOptimizationOutputToExcel(esM=esM, outputFileName=str(tmp_path / "result"), optSumOutputLevel=2, optValOutputLevel=1)
+    with pd.ExcelFile(tmp_path / "result.xlsx") as excel_file:
+        assert sorted(tables) == sorted(excel_file.sheet_names)
+        summary = pd.read_excel(excel_file, sheet_name="TransmissionOptSummary_2dim", index_col=[0, 1, 2, 3])
+    pd.testing.assert_frame_equal(tables["TransmissionOptSummary_2dim"], summary, check_names=False, check_dtype=False, check_column_type=False)
+
+
+@pytest.mark.require_solver()
+def test_write_csv_tables(tmp_path: Path):
+    """
+    Test that each result table is a CSV file in the zip file.
+    """
+    tables = get_result_tables(new_optimized_esm())
+
+    with ZipFile(tmp_path / "result.zip", "w") as zip_file:
+        write_csv_tables(zip_file, tables, prefix="2020/")
+    with ZipFile(tmp_path / "result.zip") as zip_file:
+        assert sorted(zip_file.namelist()) == sorted(f"2020/{name}.csv" for name in tables)
+        with zip_file.open("2020/SourceSink_TIoptVar_1dim.csv") as csv_file:
+            capacities = pd.read_csv(csv_file, index_col=[0, 1])
+    assert capacities.loc[("capacityVariablesOptimum", "plant"), "north"] == pytest.approx(3.0)
+
+
+@pytest.mark.require_solver()
+@pytest.mark.parametrize(
+    ("result_format", "suffix"),
+    [(OptimizationResultFormat.PARQUET, ".parquet"), (OptimizationResultFormat.ARROW, ".arrow"), (OptimizationResultFormat.CSV, ".csv")],
+)
+def test_write_result_file(tmp_path: Path, result_format: OptimizationResultFormat, suffix: str):
+    """
+    Test that the result file contains a file of each result table, from which the table can be read again.
+    """
+    tables = get_result_tables(new_optimized_esm())
+    write_result_file(tmp_path / "result.zip", tables, result_format)
+
+    with ZipFile(tmp_path / "result.zip") as zip_file:
+        assert sorted(zip_file.namelist()) == sorted(f"{name}{suffix}" for name in tables)
+        with zip_file.open(f"Transmission_TDoptVar_2dim{suffix}") as file:
+            if result_format == OptimizationResultFormat.PARQUET:
+                operation = pd.read_parquet(file)
+            elif result_format == OptimizationResultFormat.ARROW:
+                operation = pa.ipc.open_file(file.read()).read_pandas()
+            else:
+                operation = pd.read_csv(file, index_col=[0, 1, 2, 3])
+    expected = tables["Transmission_TDoptVar_2dim"].rename(columns=str)
+    pd.testing.assert_frame_equal(operation, expected, check_dtype=False)
+
+
+def test_write_excel_result_file(tmp_path: Path):
+    """
+    Test that Excel files are not written from the result tables.
+    """
+    with pytest.raises(ValueError, match="EXCEL"):
+        write_result_file(tmp_path / "result.zip", {}, OptimizationResultFormat.EXCEL)
@@ -0,0 +1,195 @@
+import pandas as pd
+import pytest
+
+from ensysmod.core.rolling_horizon import (
+    UNSERVED_DEMAND_COST_FACTOR,
+    add_unserved_demand,
+    fix_capacities,
+    get_capacities,
+    get_window_data,
+    get_windows,
+    rolling_horizon_optimize_esm,
+)
+
+DEMAND = [1.0, 1.0, 3.0, 3.0, 1.0, 1.0, 3.0, 3.0, 1.0, 1.0, 3.0, 3.0]
+
+
+def new_esm_data() -> dict:
+    """
+    Return the parameters of an ESM with a fluctuating demand, a source and a storage in two regions.
+    """
+    regions = ["north", "south"]
+    return {
+        "esm": {
+            "locations": set(regions),
+            "commodities": {"electricity"},
+            "commodityUnitsDict": {"electricity": "GW_el"},
+            "numberOfTimeSteps": len(DEMAND),
+            "hoursPerTimeStep": 1,
+            "costUnit": "1e9 Euro",
+            "lengthUnit": "km",
+        },
+        "sources": [
+            {
+                "name": "plant",
+                "commodity": "electricity",
+                "hasCapacityVariable": True,
+                "capacityMax": pd.Series({"north": 10.0, "south": 10.0}),
+                "investPerCapacity": 1.0,
+                "opexPerOperation": 0.01,
+            }
+        ],
+        "sinks": [
+            {
+                "name": "demand",
+                "commodity": "electricity",
+                "hasCapacityVariable": False,
+                "operationRateFix": pd.DataFrame({"north": DEMAND, "south": [0.0] * len(DEMAND)}),
+            }
+        ],
+        "conversions": [],
+        "storages": [{"name": "battery", "commodity": "electricity", "hasCapacityVariable": True, "investPerCapacity": 0.1}],
+        "transmissions": [],
+    }
+
+
+def test_get_windows():
+    """
+    Test that the windows cover all time steps once and are extended by the overlap within the time steps.
+    """
+    assert get_windows(10, 4, 2) == [(0, 4, 6), (4, 8, 10), (8, 10, 10)]
+    assert get_windows(8, 4, 0) == [(0, 4, 4), (4, 8, 8)]
+
+
+def test_fix_capacities():
+    """
+    Test that the capacities of a solution are fixed, including the capacities of transmissions, and that components
+    without capacity are removed.
+    """
+    solution = {
+        "cap_srcSnk": {("north", "plant", 0): 2.0},
+        "cap_stor": {("north", "battery", 0): 0.0},
+        "cap_trans": {("north_south", "cable", 0): 1.5, ("south_north", "cable", 0): 1.5},
+    }
+    esm_data = new_esm_data()
+    esm_data["transmissions"] = [{"name": "cable", "commodity": "electricity", "hasCapacityVariable": True}]
+
+    fixed_data = fix_capacities(esm_data, get_capacities(solution))
+    plant = fixed_data["sources"][0]
+    assert plant["capacityFix"].to_dict() == {"north": 2.0, "south": 0.0}
+    assert "capacityMax" not in plant
+    assert fixed_data["storages"] == []
+    assert fixed_data["sinks"] == esm_data["sinks"]
+    cable = fixed_data["transmissions"][0]
+    assert cable["capacityFix"].loc["north", "south"] == 1.5
+    assert cable["capacityFix"].loc["south", "north"] == 1.5
+
+    with pytest.raises(ValueError, match="no capacities"):
+        fix_capacities(esm_data, get_capacities({}))
+
+
+def test_get_window_data():
+    """
+    Test that the time series of a window start at its first time step.
+    """
+    window_data = get_window_data(new_esm_data(), 2, 6)
+    assert window_data["esm"]["numberOfTimeSteps"] == 4
+    assert window_data["sinks"][0]["operationRateFix"]["north"].tolist() == DEMAND[2:6]
+
+
+def test_get_window_data_without_yearly_constraints():
+    """
+    Test that the yearly limits and full load hours aren't scaled to the windows, but removed.
+    """
+    esm_data = new_esm_data()
+    esm_data["sources"][0].update(yearlyLimit=-10.0, commodityLimitID="imports", yearlyFullLoadHoursMin=pd.Series({"north": 1000.0}))
+    plant = get_window_data(esm_data, 2, 6)["sources"][0]
+    assert not {"yearlyLimit", "commodityLimitID", "yearlyFullLoadHoursMin"} & plant.keys()
+    assert plant["opexPerOperation"] == pytest.approx(0.01)
+
+
+def test_add_unserved_demand():
+    """
+    Test that unserved demand is only supplied for commodities with a demand, at a multiple of the highest operation cost.
+    """
+    esm_data = new_esm_data()
+    esm_data["esm"]["commodities"].add("heat")
+    esm_data["sources"].append({"name": "boiler", "commodity": "heat", "hasCapacityVariable": True, "commodityCost": -0.5})
+
+    sources = add_unserved_demand(esm_data)["sources"]
+    assert [source["name"] for source in sources] == ["plant", "boiler", "Unserved electricity"]
+    assert sources[-1]["opexPerOperation"] == pytest.approx(UNSERVED_DEMAND_COST_FACTOR * 0.5)
+
+    esm_data["sources"] = [{**source, "opexPerOperation": 0.0, "commodityCost": 0.0} for source in esm_data["sources"]]
+    assert add_unserved_demand(esm_data)["sources"][-1]["opexPerOperation"] == 1.0
+
+
+@pytest.mark.require_solver()
+def test_rolling_horizon_optimize_esm():
+    """
+    Test that the operation of all windows is stitched together and covers the demand in every time step.
+    """
+    capacities = {"plant": {"north": 2.0}, "battery": {"north": 2.0}}
+    result_file_path = rolling_horizon_optimize_esm(new_esm_data(), capacities, window_time_steps=4, overlap_time_steps=2)
+
+    windows = pd.read_excel(result_file_path, sheet_name="Windows")
+    assert windows["start"].tolist() == [0, 4, 8]
+    assert windows["unserved_demand"].sum() == pytest.approx(0)
+    operation = pd.read_excel(result_file_path, sheet_name="Operation", index_col=[0, 1, 2])
+    assert operation.loc[("op_srcSnk", "demand", "north")].tolist() == pytest.approx(DEMAND)
+    # the plant can't cover the peaks without the battery
+    assert operation.loc[("dischargeOp_stor", "battery", "north")].sum() > 0
+    state_of_charge = pd.read_excel(result_file_path, sheet_name="StateOfCharge", index_col=[0, 1])
+    assert len(state_of_charge.columns) == len(DEMAND) + 1
+
+
+@pytest.mark.require_solver()
+def test_rolling_horizon_unserved_demand():
+    """
+    Test that demand that exceeds the fixed capacities is reported as unserved instead of failing the optimization.
+    """
+    result_file_path = rolling_horizon_optimize_esm(new_esm_data(), {"plant": {"north": 1.0}}, window_time_steps=4, overlap_time_steps=2)
+
+    windows = pd.read_excel(result_file_path, sheet_name="Windows")
+    assert windows["unserved_demand"].tolist() == pytest.approx([4.0, 4.0, 4.0])
+    operation = pd.read_excel(result_file_path, sheet_name="Operation", index_col=[0, 1, 2])
+    assert operation.loc[("op_srcSnk", "Unserved electricity", "north")].tolist() == pytest.approx([max(demand - 1.0, 0) for demand in DEMAND])
+
+
+@pytest.mark.require_solver()
+def test_rolling_horizon_expensive_source():
+    """
+    Test that an expensive source covers the demand instead of unserved demand, whose cost is above any operation cost.
+    """
+    esm_data = new_esm_data()
+    esm_data["sources"].append({"name": "peaker", "commodity": "electricity", "hasCapacityVariable": True, "commodityCost": 5.0})
+    capacities = {"plant": {"north": 1.0}, "peaker": {"north": 2.0}}
+    result_file_path = rolling_horizon_optimize_esm(esm_data, capacities, window_time_steps=4, overlap_time_steps=2)
+
+    windows = pd.read_excel(result_file_path, sheet_name="Windows")
+    assert windows["unserved_demand"].sum() == pytest.approx(0)
+    operation = pd.read_excel(result_file_path, sheet_name="Operation", index_col=[0, 1, 2])
+    assert operation.loc[("op_srcSnk", "peaker", "north")].tolist() == pytest.approx([max(demand - 1.0, 0) for demand in DEMAND])
+
+
+@pytest.mark.require_solver()
+def test_rolling_horizon_yearly_full_load_hours():
+    """
+    Test that a minimum of yearly full load hours doesn't make a window without sun infeasible.
+    """
+    esm_data = new_esm_data()
+    esm_data["sources"].append(
+        {
+            "name": "solar",
+            "commodity": "electricity",
+            "hasCapacityVariable": True,
+            "operationRateMax": pd.DataFrame({"north": [0.0] * 4 + [1.0] * 8, "south": [0.0] * len(DEMAND)}),
+            "yearlyFullLoadHoursMin": pd.Series({"north": 4.0, "south": 0.0}),
+        }
+    )
+    capacities = {"plant": {"north": 3.0}, "solar": {"north": 1.0}}
+    result_file_path = rolling_horizon_optimize_esm(esm_data, capacities, window_time_steps=4, overlap_time_steps=2)
+
+    windows = pd.read_excel(result_file_path, sheet_name="Windows")
+    assert windows["start"].tolist() == [0, 4, 8]
+    assert windows["unserved_demand"].sum() == pytest.approx(0)
@@ -0,0 +1,20 @@
+import pytest
+
+from ensysmod.core.scenario_sweep import get_sweep_workers
+
+
+def test_get_sweep_workers(monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that the job workers share the CPUs between their scenario sweeps by default.
+    """
+    monkeypatch.setattr("ensysmod.core.scenario_sweep.os.cpu_count", lambda: 8)
+    monkeypatch.setattr("ensysmod.core.scenario_sweep.settings.SCENARIO_SWEEP_WORKERS", None)
+    monkeypatch.setattr("ensysmod.core.scenario_sweep.settings.OPTIMIZATION_WORKERS", 3)
+    assert get_sweep_workers(10) == 2
+    assert get_sweep_workers(1) == 1
+
+    monkeypatch.setattr("ensysmod.core.scenario_sweep.settings.OPTIMIZATION_WORKERS", 16)
+    assert get_sweep_workers(10) == 1
+
+    monkeypatch.setattr("ensysmod.core.scenario_sweep.settings.SCENARIO_SWEEP_WORKERS", 4)
+    assert get_sweep_workers(10) == 4
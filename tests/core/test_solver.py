@@ -0,0 +1,81 @@
+import functools
+
+import fine.energySystemModel
+import pyomo.opt
+import pytest
+
+from ensysmod.core.solver import configured_solver
+from ensysmod.core.solver_options import get_solver_options
+from ensysmod.core.watchdog import supervised
+from ensysmod.schemas import EnergyModelSolverCreate
+
+
+@pytest.mark.parametrize(
+    ("solver", "expected"),
+    [
+        ("cbc", {"threads": 2, "sec": 60, "ratioGap": 0.01, "presolve": "off"}),
+        ("appsi_highs", {"threads": 2, "time_limit": 60, "mip_rel_gap": 0.01, "presolve": "off"}),
+        ("gurobi", {"Threads": 2, "TimeLimit": 60, "MIPGap": 0.01, "Presolve": 0}),
+    ],
+)
+def test_solver_options(solver: str, expected: dict):
+    """
+    Test that the solver parameters are converted to the option names of each solver.
+    """
+    solver_parameters = EnergyModelSolverCreate(solver=solver, threads=2, time_limit=60, mip_gap=0.01, presolve=False)
+    assert get_solver_options(solver, solver_parameters) == expected
+
+
+def test_unsupported_solver_option():
+    """
+    Test that a parameter which the solver doesn't support is rejected instead of ignored, e.g. of parameters that were
+    stored before the default solver of the server changed.
+    """
+    with pytest.raises(ValueError, match="doesn't support the parameter threads"):
+        get_solver_options("glpk", EnergyModelSolverCreate.model_construct(solver="glpk", threads=2))
+
+
+def test_solver_module_only_replaced_in_context():
+    """
+    Test that FINE creates its solvers by pyomo.opt outside of a configured_solver() context.
+    """
+    assert fine.energySystemModel.opt is pyomo.opt
+    with configured_solver(None):
+        assert fine.energySystemModel.opt is not pyomo.opt
+        with configured_solver(None):
+            pass
+        assert fine.energySystemModel.opt is not pyomo.opt
+    assert fine.energySystemModel.opt is pyomo.opt
+
+
+def test_unavailable_solver(monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that an unavailable solver fails instead of falling back to another solver.
+    """
+    monkeypatch.setattr("ensysmod.core.settings.ALLOWED_SOLVERS", ["not_installed_solver"])
+    solver_parameters = EnergyModelSolverCreate(solver="not_installed_solver")
+    with pytest.raises(ValueError, match="Solver not_installed_solver is not available!"), configured_solver(solver_parameters):
+        pass
+
+
+def test_in_process_solver_with_timeout():
+    """
+    Test that a solver inside the worker process is refused if the optimization has a timeout, which it couldn't enforce.
+    """
+    solver_parameters = EnergyModelSolverCreate(solver="appsi_highs")
+    with supervised(timeout=60), pytest.raises(ValueError, match="can't be stopped"), configured_solver(solver_parameters):
+        pass
+
+
+@pytest.mark.require_solver()
+def test_warm_start():
+    """
+    Test that a warm start is passed to every solver that supports it, not only to Gurobi as in FINE.
+    """
+    with configured_solver(EnergyModelSolverCreate(solver="cbc"), warm_start=True):
+        solver = fine.energySystemModel.opt.SolverFactory("cbc")
+    assert solver.solve.keywords == {"warmstart": True}
+
+    with configured_solver(EnergyModelSolverCreate(solver="cbc")):
+        solver = fine.energySystemModel.opt.SolverFactory("cbc")
+    assert not isinstance(solver.solve, functools.partial)
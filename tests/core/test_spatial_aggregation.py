@@ -0,0 +1,115 @@
+import pandas as pd
+import pytest
+from sqlalchemy.orm import Session
+
+from ensysmod.core.fine_esm import build_esm, get_esm_data
+from ensysmod.core.spatial_aggregation import aggregate_regions, group_regions
+from tests.utils.data_generator.energy_models import get_example_model
+
+REGIONS = ["east", "north", "south", "west"]
+
+
+def new_esm_data() -> dict:
+    """
+    Return the parameters of an ESM with a windy north and east and a sunny south and west, which are connected in a ring.
+    """
+    return {
+        "esm": {"locations": set(REGIONS), "commodities": {"electricity"}, "numberOfTimeSteps": 4, "hoursPerTimeStep": 1},
+        "sources": [
+            {
+                "name": "wind",
+                "hasCapacityVariable": True,
+                "capacityMax": pd.Series({"east": 10.0, "north": 30.0, "south": 0.0, "west": 0.0}),
+                "operationRateMax": pd.DataFrame(
+                    {"east": [1.0, 0.8, 0.2, 0.0], "north": [0.6, 0.8, 0.2, 0.0], "south": [0.0] * 4, "west": [0.0] * 4}
+                ),
+            },
+            {
+                "name": "pv",
+                "hasCapacityVariable": True,
+                "operationRateMax": pd.DataFrame(
+                    {"east": [0.0] * 4, "north": [0.0] * 4, "south": [0.0, 0.5, 1.0, 0.5], "west": [0.0, 0.4, 0.9, 0.5]}
+                ),
+            },
+        ],
+        "sinks": [
+            {
+                "name": "demand",
+                "hasCapacityVariable": False,
+                "operationRateFix": pd.DataFrame({region: [1.0, 2.0, 2.0, 1.0] for region in REGIONS}),
+            }
+        ],
+        "conversions": [],
+        "storages": [],
+        "transmissions": [
+            {
+                "name": "cable",
+                "hasCapacityVariable": True,
+                "distances": pd.DataFrame(
+                    [[0, 10, 0, 20], [10, 0, 30, 0], [0, 30, 0, 40], [20, 0, 40, 0]], index=REGIONS, columns=REGIONS, dtype=float
+                ),
+                "capacityMax": pd.DataFrame([[0, 5, 0, 5], [5, 0, 5, 0], [0, 5, 0, 5], [5, 0, 5, 0]], index=REGIONS, columns=REGIONS, dtype=float),
+            }
+        ],
+    }
+
+
+def test_group_regions():
+    """
+    Test that regions with similar time series are grouped and that nothing is grouped if there are enough regions.
+    """
+    assert group_regions(new_esm_data(), 2) == {"cluster_1": ["east", "north"], "cluster_2": ["south", "west"]}
+    assert group_regions(new_esm_data(), 4) == {region: [region] for region in REGIONS}
+
+
+def test_aggregate_regions():
+    """
+    Test that the parameters of the grouped regions are aggregated: capacities and fixed operation rates are summed,
+    maximum operation rates are averaged weighted by the maximum capacity and the connections between groups are averaged.
+    """
+    aggregated_data = aggregate_regions(new_esm_data(), 2)
+    assert aggregated_data["esm"]["locations"] == {"cluster_1", "cluster_2"}
+    assert aggregated_data["regionGroups"] == {"cluster_1": ["east", "north"], "cluster_2": ["south", "west"]}
+
+    wind, pv = aggregated_data["sources"]
+    assert wind["capacityMax"].to_dict() == {"cluster_1": 40.0, "cluster_2": 0.0}
+    assert wind["operationRateMax"]["cluster_1"].tolist() == pytest.approx([0.7, 0.8, 0.2, 0.0])
+    # without capacities, the operation rates are averaged
+    assert pv["operationRateMax"]["cluster_2"].tolist() == pytest.approx([0.0, 0.45, 0.95, 0.5])
+    assert aggregated_data["sinks"][0]["operationRateFix"]["cluster_1"].tolist() == [2.0, 4.0, 4.0, 2.0]
+
+    cable = aggregated_data["transmissions"][0]
+    # the connections north-south (30) and east-west (20) remain, the connection east-north is inside of a group
+    assert cable["distances"].loc["cluster_1", "cluster_2"] == 25.0
+    assert cable["distances"].loc["cluster_2", "cluster_1"] == 25.0
+    assert cable["distances"].loc["cluster_1", "cluster_1"] == 0.0
+    assert cable["capacityMax"].loc["cluster_1", "cluster_2"] == 10.0
+
+
+def test_aggregate_regions_drops_internal_transmissions():
+    """
+    Test that a transmission that only connects regions of the same group is dropped.
+    """
+    esm_data = new_esm_data()
+    esm_data["transmissions"][0]["distances"] = pd.DataFrame(0.0, index=REGIONS, columns=REGIONS)
+    esm_data["transmissions"][0]["distances"].loc["east", "north"] = 10.0
+    esm_data["transmissions"][0]["distances"].loc["north", "east"] = 10.0
+    del esm_data["transmissions"][0]["capacityMax"]
+    assert aggregate_regions(esm_data, 2)["transmissions"] == []
+
+
+def test_aggregate_example_regions(db: Session, user_header: dict[str, str]):
+    """
+    Test that the aggregated regions of the multi-regional example partition its regions and that the aggregated ESM can be built.
+    """
+    model = get_example_model(db, user_header, example_dataset="Multi-regional_Example")
+    esm_data = get_esm_data(db, model=model)
+
+    aggregated_data = aggregate_regions(esm_data, 3)
+    region_groups = aggregated_data["regionGroups"]
+    assert len(region_groups) == 3
+    assert sorted(region for group in region_groups.values() for region in group) == sorted(esm_data["esm"]["locations"])
+
+    esM = build_esm(aggregated_data)
+    assert esM.locations == set(region_groups)
+    assert esM.regionGroups == region_groups
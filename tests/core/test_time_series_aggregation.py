@@ -0,0 +1,48 @@
+import fine.energySystemModel
+import pytest
+from sqlalchemy.orm import Session
+from tsam.timeseriesaggregation import TimeSeriesAggregation
+
+from ensysmod.core import time_series_aggregation
+from ensysmod.core.fine_esm import generate_esm_from_model
+from ensysmod.core.time_series_aggregation import cached_clustering
+from tests.utils.data_generator.datasets import EXAMPLE_DATASETS
+from tests.utils.data_generator.energy_models import get_example_model
+from tests.utils.utils import random_string
+
+
+def fail_clustering(**kwargs):
+    raise AssertionError("The time series were clustered again.")
+
+
+@pytest.mark.slow()
+def test_cached_clustering(db: Session, user_header: dict[str, str], monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that the clustering of the time series is reused for the next energy system model.
+
+    FINE clusters by tsam outside of a cached_clustering() context and keeps the tsam object of a new clustering.
+    """
+    model = get_example_model(db, user_header, example_dataset=EXAMPLE_DATASETS[0])
+    cache_key = random_string()
+    aggregation_kwargs = {"numberOfTypicalPeriods": 4, "segmentation": True, "numberOfSegmentsPerPeriod": 6, "storeTSAinstance": True}
+
+    esM = generate_esm_from_model(db, model=model)
+    with cached_clustering(cache_key):
+        esM.aggregateTemporally(**aggregation_kwargs)
+    assert isinstance(esM.tsaInstance, TimeSeriesAggregation)
+    assert fine.energySystemModel.TimeSeriesAggregation is TimeSeriesAggregation
+
+    monkeypatch.setattr(time_series_aggregation, "TimeSeriesAggregation", fail_clustering)
+    cached_esM = generate_esm_from_model(db, model=model)
+    with cached_clustering(cache_key):
+        cached_esM.aggregateTemporally(**aggregation_kwargs)
+
+    for ip in esM.investmentPeriods:
+        assert list(cached_esM.periodsOrder[ip]) == list(esM.periodsOrder[ip])
+    assert list(cached_esM.typicalPeriods) == list(esM.typicalPeriods)
+    assert cached_esM.timeStepsPerSegment[0].equals(esM.timeStepsPerSegment[0])
+    assert cached_esM.tsaInstance.noTypicalPeriods == 4
+
+    # different aggregation settings need another clustering
+    with pytest.raises(AssertionError), cached_clustering(cache_key):
+        cached_esM.aggregateTemporally(numberOfTypicalPeriods=3)
@@ -0,0 +1,73 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from ensysmod.core import watchdog
+from ensysmod.core.watchdog import OptimizationStoppedError, check_stopped, supervised
+
+
+@pytest.fixture(autouse=True)
+def _fast_checks(monkeypatch: pytest.MonkeyPatch):
+    """
+    Check the optimization every 50 milliseconds instead of every second.
+    """
+    monkeypatch.setattr(watchdog, "CHECK_INTERVAL", 0.05)
+
+
+def start_solver() -> subprocess.Popen:
+    """
+    Start a child process that runs like a solver until it is killed.
+    """
+    return subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+
+
+def test_timeout_kills_solver():
+    """
+    Test that the solver is killed and further solves are refused after the timeout.
+    """
+    with supervised(timeout=0.2) as supervising_watchdog:
+        solver = start_solver()
+        assert solver.wait(timeout=10) != 0
+        assert supervising_watchdog.error == "The optimization exceeded its timeout of 0.2 seconds."
+        assert not supervising_watchdog.cancelled
+        with pytest.raises(OptimizationStoppedError, match="timeout"):
+            check_stopped()
+    # outside of the context nothing is stopped
+    check_stopped()
+
+
+def test_cancel_kills_solver():
+    """
+    Test that the solver is killed as soon as the optimization is cancelled.
+    """
+    cancelled = False
+    with supervised(is_cancelled=lambda: cancelled) as supervising_watchdog:
+        solver = start_solver()
+        time.sleep(0.2)
+        assert solver.poll() is None
+        cancelled = True
+        assert solver.wait(timeout=10) != 0
+        assert supervising_watchdog.cancelled
+        assert supervising_watchdog.error == "The optimization was cancelled."
+
+
+def test_memory_limit_kills_solver():
+    """
+    Test that the solver is killed if the process and its children exceed the memory limit.
+    """
+    with supervised(memory_limit_mb=1) as supervising_watchdog:
+        solver = start_solver()
+        assert solver.wait(timeout=10) != 0
+        assert supervising_watchdog.error == "The optimization exceeded the memory limit of 1 MB."
+
+
+def test_unlimited_optimization_continues():
+    """
+    Test that an optimization without limits isn't stopped.
+    """
+    with supervised(is_cancelled=lambda: False) as supervising_watchdog:
+        time.sleep(0.2)
+        check_stopped()
+    assert supervising_watchdog.error is None
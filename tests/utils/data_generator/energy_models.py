@@ -1,8 +1,10 @@
+import random
+
 from sqlalchemy.orm import Session
 
 from ensysmod import crud
-from ensysmod.model import EnergyModel, EnergyModelOverrideAttribute, EnergyModelOverrideOperation
-from ensysmod.schemas import EnergyModelCreate, EnergyModelOptimizationCreate, EnergyModelOverrideCreate
+from ensysmod.model import ClusterMethod, EnergyModel, EnergyModelOverrideAttribute, EnergyModelOverrideOperation
+from ensysmod.schemas import EnergyModelAggregationCreate, EnergyModelCreate, EnergyModelOptimizationCreate, EnergyModelOverrideCreate
 from tests.utils.data_generator.datasets import get_example_dataset, new_dataset
 from tests.utils.data_generator.energy_sinks import new_sink
 from tests.utils.utils import random_string
@@ -15,6 +17,7 @@ def energy_model_create_request(
     dataset_id: int | None = None,
     generate_override_parameters: bool = False,
     generate_optimization_parameters: bool = False,
+    generate_aggregation_parameters: bool = False,
 ) -> EnergyModelCreate:
     """
     Generate an energy model create request with the specified dataset.
@@ -47,6 +50,15 @@ def energy_model_create_request(
             CO2_reference=366.6,
             CO2_reduction_targets=[0, 25, 50, 100],
         ),
+        aggregation_parameters=None
+        if generate_aggregation_parameters is False
+        else EnergyModelAggregationCreate(
+            number_of_typical_periods=2,
+            hours_per_period=24,
+            segmentation=True,
+            number_of_segments_per_period=4,
+            cluster_method=ClusterMethod.k_means,
+        ),
     )
 
 
@@ -57,6 +69,7 @@ def new_energy_model(
     dataset_id: int | None = None,
     generate_override_parameters: bool = False,
     generate_optimization_parameters: bool = False,
+    generate_aggregation_parameters: bool = False,
 ) -> EnergyModel:
     """
     Create an energy model with the specified dataset.
@@ -68,6 +81,7 @@ def new_energy_model(
         dataset_id=dataset_id,
         generate_override_parameters=generate_override_parameters,
         generate_optimization_parameters=generate_optimization_parameters,
+        generate_aggregation_parameters=generate_aggregation_parameters,
     )
     return crud.energy_model.create(db=db, obj_in=create_request)
 
@@ -88,3 +102,25 @@ def get_example_model(db: Session, user_header: dict[str, str], *, example_datas
         )
         model = crud.energy_model.create(db=db, obj_in=create_request)
     return model
+
+
+def new_uncached_example_model(db: Session, user_header: dict[str, str], example_dataset: str) -> EnergyModel:
+    """
+    Return a model of an example whose optimization isn't cached, because it overrides a parameter by a random factor.
+    """
+    model = get_example_model(db, user_header, example_dataset=example_dataset)
+    return crud.energy_model.create(
+        db,
+        obj_in=EnergyModelCreate(
+            name=f"{example_dataset}-{random_string()}",
+            ref_dataset=model.ref_dataset,
+            override_parameters=[
+                EnergyModelOverrideCreate(
+                    component_name="Wind (onshore)",
+                    attribute=EnergyModelOverrideAttribute.investPerCapacity,
+                    operation=EnergyModelOverrideOperation.multiply,
+                    value=1 + random.random(),
+                )
+            ],
+        ),
+    )
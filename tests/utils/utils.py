@@ -1,8 +1,10 @@
 import string
+import time
 from enum import Enum
 from typing import Any
 
 import numpy as np
+from fastapi.testclient import TestClient
 from sqlalchemy import delete
 from sqlalchemy.orm import Session
 
@@ -66,3 +68,16 @@ def assert_response(response_json: dict[str, Any], expected: Base | CreateSchema
             assert response_json_value == expected_value.value
         else:
             assert response_json_value == expected_value
+
+
+def wait_for_job(client: TestClient, user_header: dict[str, str], job_id: int, timeout: float = 600) -> dict:
+    """
+    Poll the status of an optimization job until it is finished, failed or cancelled.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}", headers=user_header).json()
+        if job["status"] in ("FINISHED", "FAILED", "CANCELLED"):
+            return job
+        time.sleep(1)
+    raise TimeoutError(f"Optimization job {job_id} did not finish within {timeout} seconds.")
@@ -0,0 +1,80 @@
+from typing import Any
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from ensysmod.schemas import EnergyModelAggregationCreate, EnergyModelAggregationUpdate
+
+schemas_with_aggregation_parameters: list[type[BaseModel]] = [EnergyModelAggregationCreate, EnergyModelAggregationUpdate]
+
+
+@pytest.mark.parametrize("schema", schemas_with_aggregation_parameters)
+def test_ok_default_aggregation_parameters(schema: type[BaseModel]):
+    """
+    Test that all aggregation parameters have valid defaults
+    """
+    schema()
+
+
+@pytest.mark.parametrize("schema", schemas_with_aggregation_parameters)
+def test_ok_coarse_aggregation_parameters(schema: type[BaseModel]):
+    """
+    Test aggregation parameters for a quick screening run
+    """
+    schema(number_of_typical_periods=2, hours_per_period=24, segmentation=True, number_of_segments_per_period=4, cluster_method="k_means")
+
+
+@pytest.mark.parametrize("schema", schemas_with_aggregation_parameters)
+@pytest.mark.parametrize("field", ["number_of_typical_periods", "hours_per_period", "number_of_segments_per_period"])
+def test_error_on_zero_aggregation_parameter(schema: type[BaseModel], field: str):
+    """
+    Test that the number of periods, the hours per period and the number of segments are positive
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        schema(**{field: 0})
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["loc"] == (field,)
+    assert exc_info.value.errors()[0]["msg"] == "Input should be greater than 0"
+    assert exc_info.value.errors()[0]["type"] == "greater_than"
+
+
+@pytest.mark.parametrize("schema", schemas_with_aggregation_parameters)
+def test_error_on_unknown_cluster_method(schema: type[BaseModel]):
+    """
+    Test that the cluster method is one of the methods of tsam
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        schema(cluster_method="foo")
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["loc"] == ("cluster_method",)
+    assert exc_info.value.errors()[0]["type"] == "enum"
+
+
+@pytest.mark.parametrize("schema", schemas_with_aggregation_parameters)
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"segmentation": True, "hours_per_period": 24, "number_of_segments_per_period": 24},
+        {"segmentation": False, "hours_per_period": 24, "number_of_segments_per_period": 25},
+    ],
+)
+def test_ok_segmentation(schema: type[BaseModel], data: dict[str, Any]):
+    """
+    Test that the number of segments may exceed the hours per period only if segmentation is disabled
+    """
+    schema(**data)
+
+
+@pytest.mark.parametrize("schema", schemas_with_aggregation_parameters)
+def test_error_on_too_many_segments(schema: type[BaseModel]):
+    """
+    Test that the number of segments doesn't exceed the hours per period if segmentation is enabled
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        schema(segmentation=True, hours_per_period=24, number_of_segments_per_period=25)
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["msg"] == "Value error, The number_of_segments_per_period must not be greater than the hours_per_period."
+    assert exc_info.value.errors()[0]["type"] == "value_error"
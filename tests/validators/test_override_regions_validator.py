@@ -0,0 +1,58 @@
+import pytest
+from pydantic import ValidationError
+
+from ensysmod.model import EnergyModelOverrideAttribute, EnergyModelOverrideOperation
+from ensysmod.schemas import EnergyModelOverrideCreate
+from ensysmod.schemas.scenario_sweep import ScenarioSweepParameter
+
+
+@pytest.mark.parametrize(
+    "attribute",
+    [EnergyModelOverrideAttribute.capacityMax, EnergyModelOverrideAttribute.operationRateFix, EnergyModelOverrideAttribute.operationRateMax],
+)
+def test_ok_override_regions(attribute: EnergyModelOverrideAttribute):
+    """
+    Test that regional parameters can be overridden for selected regions
+    """
+    EnergyModelOverrideCreate(
+        component_name="PV", attribute=attribute, operation=EnergyModelOverrideOperation.multiply, value=0.5, regions=["region"]
+    )
+    ScenarioSweepParameter(
+        component_name="PV", attribute=attribute, operation=EnergyModelOverrideOperation.multiply, values=[0.5], regions=["region"]
+    )
+
+
+def test_error_on_override_regions_of_scalar_parameter():
+    """
+    Test that scalar parameters can't be overridden for selected regions
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        EnergyModelOverrideCreate(
+            component_name="PV",
+            attribute=EnergyModelOverrideAttribute.investPerCapacity,
+            operation=EnergyModelOverrideOperation.multiply,
+            value=0.5,
+            regions=["region"],
+        )
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["msg"] == (
+        "Value error, Regions can only be specified for the regional parameters capacity_max, operation_rate_fix, operation_rate_max."
+    )
+
+
+def test_error_on_empty_override_regions():
+    """
+    Test that the regions of an override parameter are omitted instead of empty
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        EnergyModelOverrideCreate(
+            component_name="PV",
+            attribute=EnergyModelOverrideAttribute.capacityMax,
+            operation=EnergyModelOverrideOperation.set,
+            value=1,
+            regions=[],
+        )
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["type"] == "too_short"
@@ -0,0 +1,36 @@
+import pytest
+from pydantic import ValidationError
+
+from ensysmod.model import OptimizationJobType
+from ensysmod.schemas import OptimizationJobCreate
+
+
+def test_ok_rolling_horizon():
+    """
+    Test that a rolling horizon optimization can be submitted with windows and with the capacities of a job
+    """
+    OptimizationJobCreate(ref_model=1, type=OptimizationJobType.ROLLING_HORIZON, window_time_steps=24, overlap_time_steps=0, ref_warm_start_job=1)
+    OptimizationJobCreate(ref_model=1, type=OptimizationJobType.ROLLING_HORIZON)
+
+
+@pytest.mark.parametrize("window", [{"window_time_steps": 24}, {"overlap_time_steps": 12}])
+def test_error_on_windows_of_optimization(window: dict):
+    """
+    Test that windows can only be specified for a rolling horizon optimization
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        OptimizationJobCreate(ref_model=1, type=OptimizationJobType.OPTIMIZE, **window)
+
+    assert len(exc_info.value.errors()) == 1
+    assert (
+        exc_info.value.errors()[0]["msg"] == "Value error, Windows can only be specified for optimization jobs of type ROLLING_HORIZON, not OPTIMIZE."
+    )
+
+
+@pytest.mark.parametrize("window", [{"window_time_steps": 0}, {"overlap_time_steps": -1}])
+def test_error_on_invalid_windows(window: dict):
+    """
+    Test that a window has at least one time step and the overlap isn't negative
+    """
+    with pytest.raises(ValidationError):
+        OptimizationJobCreate(ref_model=1, type=OptimizationJobType.ROLLING_HORIZON, **window)
@@ -0,0 +1,46 @@
+import pytest
+from pydantic import ValidationError
+
+from ensysmod.schemas import ScenarioSweepCreate
+
+grid = [{"component_name": "PV", "attribute": "invest_per_capacity", "operation": "multiply", "values": [0.8, 1, 1.2]}]
+scenarios = [[{"component_name": "PV", "attribute": "invest_per_capacity", "operation": "multiply", "value": 0.8}], []]
+
+
+def test_ok_grid():
+    """
+    Test a scenario sweep with a grid of parameters
+    """
+    ScenarioSweepCreate(ref_model=1, grid=grid)
+
+
+def test_ok_scenarios():
+    """
+    Test a scenario sweep with a list of scenarios
+    """
+    ScenarioSweepCreate(ref_model=1, scenarios=scenarios)
+
+
+@pytest.mark.parametrize("data", [{}, {"grid": grid, "scenarios": scenarios}])
+def test_error_on_grid_and_scenarios(data: dict):
+    """
+    Test that either a grid or a list of scenarios is specified
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        ScenarioSweepCreate(ref_model=1, **data)
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["msg"] == "Value error, Either grid or scenarios must be specified."
+    assert exc_info.value.errors()[0]["type"] == "value_error"
+
+
+def test_error_on_empty_values():
+    """
+    Test that a parameter of the grid has at least one value
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        ScenarioSweepCreate(ref_model=1, grid=[{**grid[0], "values": []}])
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["loc"] == ("grid", 0, "values")
+    assert exc_info.value.errors()[0]["type"] == "too_short"
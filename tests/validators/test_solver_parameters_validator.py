@@ -0,0 +1,105 @@
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from ensysmod.core import settings
+from ensysmod.core.solver_options import SOLVER_OPTION_NAMES
+from ensysmod.schemas import EnergyModelSolverCreate, EnergyModelSolverUpdate
+
+schemas_with_solver_parameters: list[type[BaseModel]] = [EnergyModelSolverCreate, EnergyModelSolverUpdate]
+
+
+@pytest.mark.parametrize("schema", schemas_with_solver_parameters)
+def test_ok_default_solver_parameters(schema: type[BaseModel]):
+    """
+    Test that all solver parameters are optional
+    """
+    schema()
+
+
+@pytest.mark.parametrize("schema", schemas_with_solver_parameters)
+@pytest.mark.parametrize("solver", settings.ALLOWED_SOLVERS)
+def test_ok_allowed_solver(schema: type[BaseModel], solver: str):
+    """
+    Test that every allowed solver can be chosen with the parameters it supports
+    """
+    parameters = {"threads": 4, "time_limit": 60, "mip_gap": 0.01, "presolve": True}
+    schema(solver=solver, **{name: value for name, value in parameters.items() if name in SOLVER_OPTION_NAMES[solver]})
+
+
+@pytest.mark.parametrize("schema", schemas_with_solver_parameters)
+def test_error_on_unsupported_solver_parameter(schema: type[BaseModel]):
+    """
+    Test that a parameter which the solver doesn't support is rejected
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        schema(solver="glpk", threads=4)
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["msg"] == "Value error, Solver glpk doesn't support the parameter threads."
+    assert exc_info.value.errors()[0]["type"] == "value_error"
+
+
+@pytest.mark.parametrize("schema", schemas_with_solver_parameters)
+def test_error_on_parameter_unsupported_by_default_solver(schema: type[BaseModel], monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that the parameters are checked against the default solver of the server if no solver is chosen
+    """
+    monkeypatch.setattr(settings, "DEFAULT_SOLVER", "glpk")
+    with pytest.raises(ValidationError) as exc_info:
+        schema(presolve=True)
+
+    assert exc_info.value.errors()[0]["msg"] == "Value error, Solver glpk doesn't support the parameter presolve."
+
+
+@pytest.mark.parametrize("schema", schemas_with_solver_parameters)
+def test_error_on_unknown_solver(schema: type[BaseModel]):
+    """
+    Test that the solver must be allowed by the server
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        schema(solver="foo")
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["msg"].startswith("Value error, Solver foo is not allowed.")
+    assert exc_info.value.errors()[0]["type"] == "value_error"
+
+
+@pytest.mark.parametrize("schema", schemas_with_solver_parameters)
+@pytest.mark.parametrize("setting", ["OPTIMIZATION_TIMEOUT_SECONDS", "OPTIMIZATION_MEMORY_LIMIT_MB"])
+def test_error_on_in_process_solver_with_limit(schema: type[BaseModel], setting: str, monkeypatch: pytest.MonkeyPatch):
+    """
+    Test that a solver inside the worker process isn't allowed while the watchdog has to stop optimizations
+    """
+    monkeypatch.setattr(settings, setting, 60)
+    with pytest.raises(ValidationError) as exc_info:
+        schema(solver="appsi_highs")
+
+    assert exc_info.value.errors()[0]["msg"].startswith("Value error, Solver appsi_highs is not allowed.")
+    schema(solver="cbc")
+
+
+@pytest.mark.parametrize("schema", schemas_with_solver_parameters)
+@pytest.mark.parametrize("field", ["threads", "time_limit"])
+def test_error_on_zero_solver_parameter(schema: type[BaseModel], field: str):
+    """
+    Test that the number of threads and the time limit are positive
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        schema(**{field: 0})
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["loc"] == (field,)
+    assert exc_info.value.errors()[0]["type"] == "greater_than"
+
+
+@pytest.mark.parametrize("schema", schemas_with_solver_parameters)
+@pytest.mark.parametrize("mip_gap", [-0.1, 1.1])
+def test_error_on_invalid_mip_gap(schema: type[BaseModel], mip_gap: float):
+    """
+    Test that the MIP gap is between 0 and 1
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        schema(mip_gap=mip_gap)
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["loc"] == ("mip_gap",)
@@ -0,0 +1,37 @@
+import pytest
+from pydantic import ValidationError
+
+from ensysmod.model import OptimizationJobType
+from ensysmod.schemas import OptimizationJobCreate
+
+
+@pytest.mark.parametrize("warm_start", [{"ref_warm_start_job": 1}, {"warm_start_model": 2}])
+def test_ok_warm_start(warm_start: dict):
+    """
+    Test that an optimization can start from the solution of a job or of a model
+    """
+    OptimizationJobCreate(ref_model=1, **warm_start)
+
+
+def test_error_on_warm_start_job_and_model():
+    """
+    Test that the solution to start from is given by at most one reference
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        OptimizationJobCreate(ref_model=1, ref_warm_start_job=1, warm_start_model=2)
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["msg"] == "Value error, Either ref_warm_start_job or warm_start_model can be specified, not both."
+
+
+def test_error_on_warm_start_of_myopic_optimization():
+    """
+    Test that only optimizations of type OPTIMIZE or ROLLING_HORIZON can be warm started
+    """
+    with pytest.raises(ValidationError) as exc_info:
+        OptimizationJobCreate(ref_model=1, type=OptimizationJobType.MYOPIC_OPTIMIZE, warm_start_model=2)
+
+    assert len(exc_info.value.errors()) == 1
+    assert exc_info.value.errors()[0]["msg"] == (
+        "Value error, Warm start is only supported for optimization jobs of type OPTIMIZE or ROLLING_HORIZON, not MYOPIC_OPTIMIZE."
+    )